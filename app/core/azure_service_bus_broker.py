@@ -7,8 +7,11 @@ values and handling messaging operations.
 """
 
 import asyncio
+import contextlib
 import gzip
-from collections.abc import AsyncGenerator, Callable
+import time
+from collections import defaultdict
+from collections.abc import AsyncGenerator, Callable, Iterable, Mapping, Sequence
 from datetime import UTC, datetime, timedelta
 from typing import TypeVar
 
@@ -26,10 +29,13 @@ from azure.servicebus.aio import (
 )
 from azure.servicebus.amqp import AmqpAnnotatedMessage, AmqpMessageBodyType
 from azure.servicebus.exceptions import MessageSizeExceededError
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
 from pydantic import TypeAdapter
 from taskiq import AckableMessage, AsyncBroker, BrokerMessage
 
-from app.core.config import get_settings
+from app.core.claim_check import CLAIM_CHECK_LABEL, release_claim_check
+from app.core.config import TaskFamily, TaskQueueConfig, get_settings
 from app.core.exceptions import MessageBrokerError, MessageTooLargeError
 from app.core.telemetry.logger import get_logger
 from app.core.telemetry.taskiq import TaskPriority
@@ -38,6 +44,7 @@ _T = TypeVar("_T")
 
 settings = get_settings()
 logger = get_logger(__name__)
+meter = metrics.get_meter(__name__)
 
 _COMPRESSION_THRESHOLD_BYTES = 200 * 1024
 
@@ -62,6 +69,115 @@ def parse_val(
         return None
 
 
+class _ReceiveQueue:
+    """A queue received from by a worker, with its share of receives."""
+
+    def __init__(
+        self,
+        name: str,
+        receiver: ServiceBusReceiver,
+        weight: int = 1,
+        max_concurrency: int | None = None,
+    ) -> None:
+        self.name = name
+        self.receiver = receiver
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.current_weight = 0
+        self.idle_until = 0.0
+
+    @property
+    def has_capacity(self) -> bool:
+        """Whether the worker may run more tasks from this queue."""
+        return self.max_concurrency is None or self.in_flight < self.max_concurrency
+
+
+class _QueueScheduler:
+    """
+    Chooses which queue a worker receives from next.
+
+    Queues are chosen by smooth weighted round robin among those with capacity, so
+    each gets its weight's share of receives without long runs of any one queue.
+    A queue which was empty when last received from is skipped for the idle
+    backoff, unless no other queue can be received from, so that idle queues
+    don't hold up busy ones with receive timeouts.
+    """
+
+    def __init__(
+        self,
+        queues: Sequence[_ReceiveQueue],
+        idle_backoff: float,
+        slot_timeout: float,
+    ) -> None:
+        """
+        Schedule receives from ``queues``.
+
+        :param queues: The queues to receive from.
+        :param idle_backoff: How long to skip an empty queue for, in seconds.
+        :param slot_timeout: How long a received message may count towards its
+            queue's concurrency before it is assumed lost, in seconds.
+        """
+        self.queues = queues
+        self._idle_backoff = idle_backoff
+        self._slot_timeout = slot_timeout
+        self._capacity = asyncio.Event()
+
+    def next(self) -> _ReceiveQueue | None:
+        """Return the queue to receive from next, or None if all are at capacity."""
+        available = [queue for queue in self.queues if queue.has_capacity]
+        if not available:
+            self._capacity.clear()
+            return None
+        now = time.monotonic()
+        ready = [queue for queue in available if queue.idle_until <= now] or available
+
+        for queue in ready:
+            queue.current_weight += queue.weight
+        chosen = max(ready, key=lambda queue: queue.current_weight)
+        chosen.current_weight -= sum(queue.weight for queue in ready)
+        return chosen
+
+    def received(self, queue: _ReceiveQueue, n_messages: int) -> None:
+        """Record how many messages a receive from ``queue`` returned."""
+        queue.idle_until = 0.0 if n_messages else time.monotonic() + self._idle_backoff
+
+    def acquire(self, queue: _ReceiveQueue) -> Callable[[], None]:
+        """
+        Count a received message towards its queue's concurrency.
+
+        The slot is held until released, e.g. on completing the message, or until
+        the slot timeout in case the message is never completed.
+
+        :return: A callable releasing the slot, which may be called more than once.
+        """
+        queue.in_flight += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            timeout.cancel()
+            queue.in_flight -= 1
+            self._capacity.set()
+
+        timeout = asyncio.get_running_loop().call_later(self._slot_timeout, release)
+        return release
+
+    async def wait_for_capacity(self) -> None:
+        """Wait for a slot to be released, if every queue is at capacity."""
+        await self._capacity.wait()
+
+    def observe_in_flight(self, _options: CallbackOptions) -> Iterable[Observation]:
+        """Report the messages in flight from each queue."""
+        return [
+            Observation(queue.in_flight, {"messaging.destination.name": queue.name})
+            for queue in self.queues
+        ]
+
+
 class AzureServiceBusBroker(AsyncBroker):
     """
     Broker that works with Azure Service Bus.
@@ -69,13 +185,16 @@ class AzureServiceBusBroker(AsyncBroker):
     See https://taskiq-python.github.io/extending-taskiq/broker.html
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         max_lock_renewal_duration: int = 10800,  # 3 hours
         connection_string: str | None = None,
         namespace: str | None = None,
         queue_name: str = "taskiq",
         priority_queue_name: str = "taskiq-priority",
+        family_queues: Mapping[TaskFamily, TaskQueueConfig] | None = None,
+        queue_weight: int = 1,
+        idle_queue_backoff: float = 5.0,
     ) -> None:
         """
         Construct a new broker.
@@ -87,6 +206,12 @@ class AzureServiceBusBroker(AsyncBroker):
         :param queue_name: queue used to get normal priority incoming messages with.
         :param priority_queue_name: queue used to get high priority incoming
             messages with.
+        :param family_queues: queues used for normal priority messages of task
+            families, instead of the default queue.
+        :param queue_weight: share of receives given to the default queue,
+            relative to the family queues.
+        :param idle_queue_backoff: how long to skip receiving from an empty queue
+            while others can be received from, in seconds.
         """
         super().__init__()
 
@@ -94,6 +219,9 @@ class AzureServiceBusBroker(AsyncBroker):
         self.namespace = namespace
         self._queue_name = queue_name
         self._priority_queue_name = priority_queue_name
+        self._family_queues = dict(family_queues or {})
+        self._queue_weight = queue_weight
+        self._idle_queue_backoff = idle_queue_backoff
         self.max_lock_renewal_duration = max_lock_renewal_duration
 
         self.service_bus_client: ServiceBusClient | None = None
@@ -101,6 +229,9 @@ class AzureServiceBusBroker(AsyncBroker):
         self.receiver: ServiceBusReceiver | None = None
         self.priority_sender: ServiceBusSender | None = None
         self.priority_receiver: ServiceBusReceiver | None = None
+        self.family_senders: dict[TaskFamily, ServiceBusSender] = {}
+        self.family_receivers: dict[TaskFamily, ServiceBusReceiver] = {}
+        self.scheduler: _QueueScheduler | None = None
         self.credential: DefaultAzureCredential | None = None
         self.auto_lock_renewer: AutoLockRenewer | None = None
 
@@ -134,6 +265,11 @@ class AzureServiceBusBroker(AsyncBroker):
             queue_name=self._priority_queue_name
         )
 
+        self.family_senders = {
+            family: self.service_bus_client.get_queue_sender(queue_name=queue.name)
+            for family, queue in self._family_queues.items()
+        }
+
         if self.is_worker_process:
             self.receiver = self.service_bus_client.get_queue_receiver(
                 queue_name=self._queue_name,
@@ -145,6 +281,43 @@ class AzureServiceBusBroker(AsyncBroker):
                 receive_mode=ServiceBusReceiveMode.PEEK_LOCK,
             )
 
+            self.family_receivers = {
+                family: self.service_bus_client.get_queue_receiver(
+                    queue_name=queue.name,
+                    receive_mode=ServiceBusReceiveMode.PEEK_LOCK,
+                )
+                for family, queue in self._family_queues.items()
+            }
+
+            self.scheduler = _QueueScheduler(
+                [
+                    _ReceiveQueue(
+                        self._queue_name, self.receiver, weight=self._queue_weight
+                    ),
+                    *(
+                        _ReceiveQueue(
+                            queue.name,
+                            self.family_receivers[family],
+                            weight=queue.weight,
+                            max_concurrency=queue.max_concurrency,
+                        )
+                        for family, queue in self._family_queues.items()
+                    ),
+                ],
+                idle_backoff=self._idle_queue_backoff,
+                # Messages not completed by then have lost their lock anyway.
+                slot_timeout=self.max_lock_renewal_duration,
+            )
+            meter.create_observable_gauge(
+                "messaging.client.in_flight_messages",
+                callbacks=[self.scheduler.observe_in_flight],
+                unit="{message}",
+                description=(
+                    "Messages received from each queue by the worker and not yet "
+                    "completed."
+                ),
+            )
+
             if not self.auto_lock_renewer:
                 self.auto_lock_renewer = AutoLockRenewer(
                     max_lock_renewal_duration=self.max_lock_renewal_duration
@@ -162,6 +335,10 @@ class AzureServiceBusBroker(AsyncBroker):
             await self.receiver.close()
         if self.priority_receiver:
             await self.priority_receiver.close()
+        for sender in self.family_senders.values():
+            await sender.close()
+        for receiver in self.family_receivers.values():
+            await receiver.close()
         if self.service_bus_client:
             await self.service_bus_client.close()
         if self.credential:
@@ -189,28 +366,59 @@ class AzureServiceBusBroker(AsyncBroker):
             )
             return TaskPriority.NORMAL
 
-    async def kick(self, message: BrokerMessage) -> None:
+    def _resolve_family(self, message: BrokerMessage) -> TaskFamily | None:
         """
-        Send message to the queue.
+        Resolve the ``family`` label on a broker message to a TaskFamily.
 
-        This function constructs a service bus message and sends it with the
-        appropriate metadata and routing.
+        Unrecognised values log a warning and fall back to no family.
+        """
+        raw_family = parse_val(str, message.labels.get("family"))
+
+        if raw_family is None:
+            return None
+
+        try:
+            return TaskFamily(raw_family)
+        except ValueError:
+            logger.warning(
+                "Unknown task family, defaulting to none",
+                family=raw_family,
+                task_id=message.task_id,
+            )
+            return None
+
+    def _resolve_sender(
+        self, message: BrokerMessage, priority: TaskPriority
+    ) -> ServiceBusSender | None:
+        """
+        Choose the queue to send a message to.
 
-        Messages with TaskPriority.HIGH label are sent to the priority queue.
+        High priority messages go to the priority queue, then messages of task
+        families with their own queue go to that queue, and the rest go to the
+        default queue.
+        """
+        if priority > TaskPriority.NORMAL:
+            return self.priority_sender
+        family = self._resolve_family(message)
+        if family is not None and family in self.family_senders:
+            return self.family_senders[family]
+        return self.sender
+
+    def _prepare_message(
+        self, message: BrokerMessage
+    ) -> tuple[ServiceBusSender, int | None, AmqpAnnotatedMessage]:
+        """
+        Build the service bus message for a broker message.
 
         :raises MessageBrokerError:detail= if startup wasn't called.
-        :raises MessageTooLargeError:detail= if the message is too large.
         :param message: message to send.
+        :return: the sender for the message's queue, its delay in seconds if any,
+            and the service bus message.
         """
-        if (
-            self.sender is None
-            or self.priority_sender is None
-            or self.service_bus_client is None
-        ):
-            raise MessageBrokerError(detail="Please run startup before kicking.")
-
         priority = self._resolve_priority(message)
-        sender = self.priority_sender if priority > TaskPriority.NORMAL else self.sender
+        sender = self._resolve_sender(message, priority)
+        if sender is None or self.service_bus_client is None:
+            raise MessageBrokerError(detail="Please run startup before kicking.")
 
         body = message.message
         compressed = False
@@ -229,19 +437,42 @@ class AzureServiceBusBroker(AsyncBroker):
                 "message_id": message.task_id,
                 "renew_lock": str(message.labels.get("renew_lock", False)),
                 "compressed": compressed,
+                # Surfaced so the claim check can be released on completion
+                # without parsing the body.
+                **(
+                    {CLAIM_CHECK_LABEL: claim_check}
+                    if (claim_check := message.labels.get(CLAIM_CHECK_LABEL))
+                    else {}
+                ),
             },
         )
 
-        try:
-            # Handle delay
-            delay = parse_val(int, message.labels.get("delay"))
-            logger.debug(
-                "Sending message...",
-                task_id=message.task_id,
-                delay=delay,
-                priority=priority,
-            )
+        delay = parse_val(int, message.labels.get("delay"))
+        logger.debug(
+            "Sending message...",
+            task_id=message.task_id,
+            delay=delay,
+            priority=priority,
+        )
+        return sender, delay, service_bus_message
+
+    async def kick(self, message: BrokerMessage) -> None:
+        """
+        Send message to the queue.
 
+        This function constructs a service bus message and sends it with the
+        appropriate metadata and routing.
+
+        Messages with TaskPriority.HIGH label are sent to the priority queue, and
+        other messages of task families with their own queue to that queue.
+
+        :raises MessageBrokerError:detail= if startup wasn't called.
+        :raises MessageTooLargeError:detail= if the message is too large.
+        :param message: message to send.
+        """
+        sender, delay, service_bus_message = self._prepare_message(message)
+
+        try:
             if delay is None:
                 async with self._send_lock:
                     await sender.send_messages(service_bus_message)
@@ -253,16 +484,97 @@ class AzureServiceBusBroker(AsyncBroker):
         except MessageSizeExceededError as exc:
             raise MessageTooLargeError(detail=exc.message) from exc
 
+    async def kick_batch(self, messages: Sequence[BrokerMessage]) -> None:
+        """
+        Send messages to their queues in as few requests as possible.
+
+        Messages are routed and compressed as by :meth:`kick`, and packed into
+        service bus message batches which are each sent once full. Messages with
+        the same delay are scheduled together in the same way.
+
+        Every message that fits in a batch is sent, even if others are too large.
+
+        :raises MessageBrokerError:detail= if startup wasn't called.
+        :raises MessageTooLargeError:detail= if any message is too large, listing
+            the task IDs of those not sent.
+        :param messages: messages to send.
+        """
+        grouped: defaultdict[
+            tuple[ServiceBusSender, int | None], list[tuple[str, AmqpAnnotatedMessage]]
+        ] = defaultdict(list)
+        for message in messages:
+            sender, delay, service_bus_message = self._prepare_message(message)
+            grouped[sender, delay].append((message.task_id, service_bus_message))
+
+        too_large: list[str] = []
+        async with self._send_lock:
+            for (sender, delay), group in grouped.items():
+                scheduled_time = (
+                    None
+                    if delay is None
+                    else datetime.now(UTC) + timedelta(seconds=delay)
+                )
+                too_large += await self._send_in_batches(sender, group, scheduled_time)
+
+        if too_large:
+            raise MessageTooLargeError(
+                detail="Message exceeds the maximum message size.", task_ids=too_large
+            )
+
+    async def _send_in_batches(
+        self,
+        sender: ServiceBusSender,
+        messages: list[tuple[str, AmqpAnnotatedMessage]],
+        scheduled_time: datetime | None,
+    ) -> list[str]:
+        """
+        Send messages in as few size-limited batches as possible.
+
+        :return: the task IDs of the messages too large to send.
+        """
+
+        async def send(batch: list[AmqpAnnotatedMessage]) -> None:
+            if scheduled_time is None:
+                await sender.send_messages(batch)
+            else:
+                await sender.schedule_messages(batch, scheduled_time)
+
+        too_large: list[str] = []
+        # The service bus batch is only used to measure against the size limit, as
+        # scheduling doesn't accept one.
+        service_bus_batch = await sender.create_message_batch()
+        batch: list[AmqpAnnotatedMessage] = []
+        for task_id, message in messages:
+            try:
+                service_bus_batch.add_message(message)
+            except MessageSizeExceededError:
+                if batch:
+                    await send(batch)
+                    service_bus_batch = await sender.create_message_batch()
+                    batch = []
+                try:
+                    service_bus_batch.add_message(message)
+                except MessageSizeExceededError:
+                    too_large.append(task_id)
+                    continue
+            batch.append(message)
+        if batch:
+            await send(batch)
+        return too_large
+
     def _build_ackable(
         self,
         sb_message: ServiceBusReceivedMessage,
         receiver: ServiceBusReceiver,
+        release: Callable[[], None] | None = None,
     ) -> AckableMessage:
         """
         Wrap a received Service Bus message as an AckableMessage.
 
         Captures ``receiver`` in the ack closure so completion and lock
         renewal re-registration target the queue the message was received from.
+        ``release`` is called once the message is completed, to free its slot in
+        the queue's concurrency.
         """
         if self.auto_lock_renewer is None:
             msg = "auto_lock_renewer must be set on the worker process"
@@ -277,10 +589,26 @@ class AzureServiceBusBroker(AsyncBroker):
                 sb_message.application_properties.get("message_id"),
             )
             logger.info("Attempting to complete message", task_id=task_id)
-            async with self._receive_lock:
-                logger.info("Completing message", task_id=task_id)
-                await receiver.complete_message(sb_message)
-                logger.info("Completed message", task_id=task_id)
+            try:
+                async with self._receive_lock:
+                    logger.info("Completing message", task_id=task_id)
+                    await receiver.complete_message(sb_message)
+                    logger.info("Completed message", task_id=task_id)
+            finally:
+                if release is not None:
+                    release()
+            # The message can no longer be redelivered, so its offloaded
+            # arguments are no longer needed.
+            properties = sb_message.application_properties or {}
+            claim_check = properties.get(
+                CLAIM_CHECK_LABEL.encode(), properties.get(CLAIM_CHECK_LABEL)
+            )
+            if claim_check:
+                await release_claim_check(
+                    claim_check.decode()
+                    if isinstance(claim_check, bytes)
+                    else str(claim_check)
+                )
 
         async def lock_renewal_failure_callback(
             sb_message: ServiceBusReceivedMessage | ServiceBusSession,
@@ -341,20 +669,21 @@ class AzureServiceBusBroker(AsyncBroker):
 
     async def listen(self) -> AsyncGenerator[AckableMessage, None]:
         """
-        Listen on the priority queue first, then the default queue.
+        Listen on the priority queue first, then the default and family queues.
 
         Each iteration drains the priority queue with a short wait, then
-        polls the default queue with a longer wait.
+        polls the default or a family queue, as chosen by their weights and
+        concurrency limits, with a longer wait.
 
         If priority messages are received, re-enter priority branch to ensure
         full consumption of priority messages before moving to
-        normal priority queue.
+        normal priority queues.
 
         :yields: parsed broker message.
         :raises MessageBrokerError:detail= if startup wasn't called.
         """
         if (
-            self.receiver is None
+            self.scheduler is None
             or self.priority_receiver is None
             or self.auto_lock_renewer is None
         ):
@@ -370,16 +699,30 @@ class AzureServiceBusBroker(AsyncBroker):
                     logger.info("Yielding priority message")
                     yield self._build_ackable(sb_message, self.priority_receiver)
                 if priority_batch:
-                    # Keep draining priority before touching the default queue
+                    # Keep draining priority before touching the other queues
+                    continue
+
+                queue = self.scheduler.next()
+                if queue is None:
+                    # Every queue is at its concurrency limit. Wait for capacity,
+                    # checking the priority queue again in the meantime.
+                    with contextlib.suppress(TimeoutError):
+                        async with asyncio.timeout(
+                            settings.message_broker_queue_max_wait
+                        ):
+                            await self.scheduler.wait_for_capacity()
                     continue
 
                 async with self._receive_lock:
-                    batch_messages = await self.receiver.receive_messages(
+                    batch_messages = await queue.receiver.receive_messages(
                         max_wait_time=settings.message_broker_queue_max_wait
                     )
+                self.scheduler.received(queue, len(batch_messages))
                 for sb_message in batch_messages:
-                    logger.info("Yielding message")
-                    yield self._build_ackable(sb_message, self.receiver)
+                    logger.info("Yielding message", queue=queue.name)
+                    yield self._build_ackable(
+                        sb_message, queue.receiver, self.scheduler.acquire(queue)
+                    )
             except Exception:
                 logger.exception("Error receiving messages")
                 # Wait a bit before retrying
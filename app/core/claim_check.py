@@ -0,0 +1,167 @@
+"""
+Claim checks for task payloads too large to send through the message broker.
+
+A task whose serialized arguments exceed a threshold has them stored in blob
+storage when it is sent, and the message carries only a reference to the blob in
+its labels. The worker fetches the arguments back before the task runs, so tasks
+are unaware of whether their arguments were offloaded.
+
+The blob is deleted once the task has run. Blobs of messages that are never run,
+such as dead-lettered or expired messages, are left to the operations container's
+lifecycle rule for claim checks, so a message redriven after that has deleted its
+blob cannot be run.
+"""
+
+from io import BytesIO
+from typing import Any, TypedDict
+
+from pydantic import TypeAdapter
+from taskiq import TaskiqMessage, TaskiqMiddleware, TaskiqResult
+
+from app.core.telemetry.logger import get_logger
+from app.persistence.blob.models import BlobContainer, BlobStorageFile
+from app.persistence.blob.repository import BlobRepository
+
+logger = get_logger(__name__)
+
+CLAIM_CHECK_LABEL = "claim_check"
+_CLAIM_CHECK_PATH = "claim-checks"
+
+
+class _ClaimedPayload(TypedDict):
+    """The arguments of a task, as stored in blob storage."""
+
+    args: list[Any]
+    kwargs: dict[str, Any]
+
+
+_claimed_payload_adapter = TypeAdapter(_ClaimedPayload)
+
+
+async def release_claim_check(
+    uri: str, blob_repository: BlobRepository | None = None
+) -> None:
+    """
+    Delete the blob holding a task's offloaded arguments.
+
+    Failures are logged rather than raised: the task has already run, and a
+    leftover blob is harmless.
+
+    Args:
+        uri: The claim check label of the task's message.
+        blob_repository: The repository to delete the blob with.
+
+    """
+    try:
+        file = BlobStorageFile.model_validate(uri)
+        await (blob_repository or BlobRepository()).delete_file(file)
+    except Exception:
+        logger.exception("Failed to release claim check", claim_check=uri)
+
+
+class ClaimCheckMiddleware(TaskiqMiddleware):
+    """
+    Taskiq middleware offloading large task arguments to blob storage.
+
+    Must be added before any middleware reading task arguments on execution, so
+    that the arguments are restored first.
+    """
+
+    def __init__(
+        self,
+        threshold_bytes: int,
+        blob_repository: BlobRepository | None = None,
+        *,
+        delete_after_execution: bool = True,
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            threshold_bytes: Size of a task's serialized arguments above which they
+                are offloaded.
+            blob_repository: The repository to store arguments in.
+            delete_after_execution: Whether to delete offloaded arguments once the
+                task's result is saved. Brokers that delete them on
+                acknowledgement instead should disable this.
+
+        """
+        super().__init__()
+        self.threshold_bytes = threshold_bytes
+        self.blob_repository = blob_repository or BlobRepository()
+        self.delete_after_execution = delete_after_execution
+
+    async def pre_send(self, message: TaskiqMessage) -> TaskiqMessage:
+        """
+        Offload the message's arguments if they exceed the threshold.
+
+        Args:
+            message: The outgoing TaskIQ message
+
+        Returns:
+            The message, with its arguments replaced by a claim check if offloaded.
+
+        """
+        payload = message.model_dump_json(include={"args", "kwargs"}).encode()
+        if len(payload) <= self.threshold_bytes:
+            return message
+
+        file = await self.blob_repository.upload_file_to_blob_storage(
+            content=BytesIO(payload),
+            path=_CLAIM_CHECK_PATH,
+            filename=f"{message.task_id}.json",
+            container=BlobContainer.OPERATIONS,
+            content_type="application/json",
+        )
+        logger.info(
+            "Offloaded task arguments to blob storage",
+            task_id=message.task_id,
+            task_name=message.task_name,
+            size=len(payload),
+        )
+        return message.model_copy(
+            update={
+                "args": [],
+                "kwargs": {},
+                "labels": {**message.labels, CLAIM_CHECK_LABEL: file.to_uri()},
+            }
+        )
+
+    async def pre_execute(self, message: TaskiqMessage) -> TaskiqMessage:
+        """
+        Restore the message's arguments if they were offloaded.
+
+        Args:
+            message: The incoming TaskIQ message
+
+        Returns:
+            The message with its original arguments.
+
+        """
+        uri = message.labels.get(CLAIM_CHECK_LABEL)
+        if not uri:
+            return message
+        file = BlobStorageFile.model_validate(uri)
+        payload = _claimed_payload_adapter.validate_json(
+            await self.blob_repository.read_file(file)
+        )
+        return message.model_copy(
+            update={"args": payload["args"], "kwargs": payload["kwargs"]}
+        )
+
+    async def post_save(
+        self,
+        message: TaskiqMessage,
+        result: TaskiqResult[Any],  # noqa: ARG002
+    ) -> None:
+        """
+        Delete the message's offloaded arguments, if enabled.
+
+        Args:
+            message: The executed TaskIQ message
+            result: The result of the task
+
+        """
+        uri = message.labels.get(CLAIM_CHECK_LABEL)
+        if uri and self.delete_after_execution:
+            await release_claim_check(uri, self.blob_repository)
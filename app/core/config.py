@@ -212,6 +212,16 @@ class MinioConfig(BlobBackendConfig):
             "MinIO's default region."
         ),
     )
+    upload_part_size: int = Field(
+        default=8 * 1024 * 1024,
+        ge=5 * 1024 * 1024,
+        le=5 * 1024 * 1024 * 1024,
+        description=(
+            "Size in bytes of each part of a streamed multipart upload, bounding "
+            "the memory an upload holds. Files smaller than one part are uploaded "
+            "in a single request. S3 requires parts of 5MiB to 5GiB."
+        ),
+    )
 
 
 class AzureBlobConfig(BlobBackendConfig):
@@ -222,6 +232,38 @@ class AzureBlobConfig(BlobBackendConfig):
     storage_account_name: str
     credential: str | None = None
     user_delegation_key_duration: int = 60 * 60 * 24  # 1 day
+    endpoint: str | None = Field(
+        default=None,
+        description=(
+            "Account URL override, e.g. `http://127.0.0.1:10000/devstoreaccount1` "
+            "for Azurite. Defaults to the public Azure endpoint for the account."
+        ),
+    )
+    upload_block_size: int = Field(
+        default=4 * 1024 * 1024,
+        ge=64 * 1024,
+        le=4000 * 1024 * 1024,
+        description=(
+            "Size in bytes of each block a streamed upload is staged in. Streams "
+            "shorter than one block are uploaded in a single request."
+        ),
+    )
+    upload_max_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description=(
+            "Blocks of a single upload staged concurrently. An upload holds at most "
+            "one more block than this in memory."
+        ),
+    )
+    upload_block_attempts: int = Field(
+        default=3,
+        ge=1,
+        description=(
+            "Attempts to stage each block. A block that fails transiently is "
+            "restaged on its own; blocks already staged are kept."
+        ),
+    )
 
     @property
     def uses_managed_identity(self) -> bool:
@@ -231,6 +273,8 @@ class AzureBlobConfig(BlobBackendConfig):
     @property
     def account_url(self) -> str:
         """Return the account URL for Azure Blob Storage."""
+        if self.endpoint:
+            return self.endpoint.rstrip("/")
         return f"https://{self.storage_account_name}.blob.core.windows.net"
 
 
@@ -351,6 +395,39 @@ class UploadFile(StrEnum):
     SEARCH_EXPORT = auto()
 
 
+class TaskFamily(StrEnum):
+    """Families of tasks, each of which may be routed to its own queue."""
+
+    IMPORT = auto()
+    INDEX = auto()
+    DEDUP = auto()
+    ROBOT = auto()
+    EXPORT = auto()
+
+
+class TaskQueueConfig(BaseModel):
+    """Configuration for the message broker queue of a task family."""
+
+    name: str = Field(description="Name of the queue.")
+    weight: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Share of receives given to this queue, relative to the other queues "
+            "with capacity. The default queue's weight is "
+            "`message_broker_queue_weight`."
+        ),
+    )
+    max_concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Maximum number of tasks from this queue each worker runs at once. "
+            "Unlimited beyond the worker's own limit if not set."
+        ),
+    )
+
+
 class TOML(BaseModel):
     """Information extracted from a pyproject.toml file."""
 
@@ -426,6 +503,111 @@ class DedupAssessmentRecordingConfig(BaseModel):
     )
 
 
+class SearchCacheConfig(BaseModel):
+    """Configuration for the search result and facet response cache."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Whether to cache search, facet and cross-facet results.",
+    )
+    max_entries: int = Field(
+        default=1024,
+        ge=1,
+        description="Maximum number of results held in the cache per process.",
+    )
+    ttl_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description=(
+            "Maximum age of a cached result. Writes made by this process invalidate "
+            "entries immediately; this bounds how long writes made by other "
+            "processes (e.g. workers indexing references) can go unseen."
+        ),
+    )
+
+
+class SignedUrlCacheConfig(BaseModel):
+    """Configuration for the cache of signed blob storage URLs."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Whether to reuse signed URLs for the same file and interaction.",
+    )
+    max_entries: int = Field(
+        default=10_000,
+        ge=1,
+        description="Maximum number of signed URLs held in the cache per process.",
+    )
+    min_remaining_seconds: int = Field(
+        default=600,
+        ge=0,
+        description=(
+            "Validity a signed URL must have left to be handed out from the cache. "
+            "URLs are cached for `presigned_url_expiry_seconds` less this, so a "
+            "consumer always has at least this long to use one."
+        ),
+    )
+
+
+class SearchCoalescingConfig(BaseModel):
+    """Configuration for coalescing identical concurrent facet aggregations."""
+
+    enabled: bool = Field(
+        default=True,
+        description=(
+            "Whether identical in-flight facet and cross-facet aggregations share a "
+            "single Elasticsearch request."
+        ),
+    )
+    freshness_seconds: float = Field(
+        default=0.5,
+        ge=0,
+        description=(
+            "How long a completed aggregation may be handed to further identical "
+            "requests. 0 only coalesces requests that overlap in flight."
+        ),
+    )
+    max_fresh_entries: int = Field(
+        default=256,
+        ge=1,
+        description="Maximum number of completed aggregations held for reuse.",
+    )
+
+
+class RobotAutomationMatcherConfig(BaseModel):
+    """Configuration for matching robot automations in process."""
+
+    enabled: bool = Field(
+        default=True,
+        description=(
+            "Whether to match automations with simple queries in process, only "
+            "percolating the remainder in Elasticsearch."
+        ),
+    )
+
+
+class MessageClaimCheckConfig(BaseModel):
+    """Configuration for offloading large task payloads to blob storage."""
+
+    enabled: bool = Field(
+        default=True,
+        description=(
+            "Whether task arguments too large to queue are stored in blob storage, "
+            "with the message carrying a reference to them instead."
+        ),
+    )
+    threshold_bytes: int = Field(
+        default=192 * 1024,
+        ge=0,
+        description=(
+            "Size of a task's serialized arguments above which they are offloaded "
+            "to blob storage. Must leave room for the rest of the message under the "
+            "broker's maximum message size, which is 256 KiB including headers on "
+            "the Azure Service Bus Standard tier."
+        ),
+    )
+
+
 class Settings(BaseSettings):
     """Settings model for API."""
 
@@ -441,6 +623,13 @@ class Settings(BaseSettings):
     dedup_assessment_recording: DedupAssessmentRecordingConfig = (
         DedupAssessmentRecordingConfig()
     )
+    search_cache: SearchCacheConfig = SearchCacheConfig()
+    search_coalescing: SearchCoalescingConfig = SearchCoalescingConfig()
+    signed_url_cache: SignedUrlCacheConfig = SignedUrlCacheConfig()
+    robot_automation_matcher: RobotAutomationMatcherConfig = (
+        RobotAutomationMatcherConfig()
+    )
+    message_claim_check: MessageClaimCheckConfig = MessageClaimCheckConfig()
 
     db_config: DatabaseConfig
     es_config: ESConfig
@@ -515,6 +704,46 @@ class Settings(BaseSettings):
             "(in seconds)."
         ),
     )
+    message_broker_queue_weight: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Share of receives given to the default queue, relative to the task "
+            "family queues with capacity."
+        ),
+    )
+    message_broker_family_queues: dict[TaskFamily, TaskQueueConfig] = Field(
+        default_factory=dict,
+        description=(
+            "Queues for task families, so that a flood of one family's tasks "
+            "doesn't hold up the others. Families without a queue share the "
+            "default queue. High priority tasks go to the priority queue whatever "
+            "their family."
+        ),
+    )
+    message_broker_idle_queue_backoff: float = Field(
+        default=5.0,
+        ge=0,
+        description=(
+            "How long a worker skips a queue that was empty when last received "
+            "from, unless no other queue can be received from (in seconds)."
+        ),
+    )
+    message_broker_batch_max_messages: int = Field(
+        default=100,
+        ge=1,
+        description=(
+            "Max number of tasks held in a batch of queued tasks before it is sent."
+        ),
+    )
+    message_broker_batch_window: float = Field(
+        default=1.0,
+        gt=0,
+        description=(
+            "Max time a task is held in a batch of queued tasks before the batch is "
+            "sent (in seconds)."
+        ),
+    )
 
     cli_client_id: str | None = None
     app_name: str
@@ -541,6 +770,21 @@ class Settings(BaseSettings):
             "Maximum number of identifiers to allow in a single reference lookup query."
         ),
     )
+    max_bulk_lookup_identifiers: int = Field(
+        default=50_000,
+        ge=1,
+        description=(
+            "Maximum number of identifiers to allow in a single bulk reference lookup."
+        ),
+    )
+    bulk_lookup_chunk_size: int = Field(
+        default=500,
+        ge=1,
+        description=(
+            "Number of identifiers hydrated and streamed back together in a bulk "
+            "reference lookup."
+        ),
+    )
 
     max_reference_export_size: int = Field(
         default=10000,
@@ -585,6 +829,14 @@ class Settings(BaseSettings):
         default_factory=dict,
         description=("Override the default Elasticsearch percolation chunk size."),
     )
+    es_percolation_queries_per_request: int = Field(
+        default=10,
+        ge=1,
+        description=(
+            "Number of percolate queries, each of a chunk of records, sent together "
+            "in one Elasticsearch multi search request."
+        ),
+    )
 
     import_reference_retry_count: int = Field(
         default=3,
@@ -614,6 +866,15 @@ class Settings(BaseSettings):
         default_factory=lambda: {UploadFile.SEARCH_EXPORT: 1000},
         description=("Override the default upload file chunk size."),
     )
+    upload_file_prefetch_chunks: int = Field(
+        default=2,
+        ge=1,
+        description=(
+            "Number of chunks fetched ahead of the one being serialized when "
+            "streaming references to a file. Memory is bounded by this many "
+            "chunks, plus the ones being serialized and uploaded."
+        ),
+    )
 
     default_download_file_chunk_size: Literal[1] = Field(
         default=1,
@@ -667,6 +928,58 @@ class Settings(BaseSettings):
             "source. Aborts the stream and rejects the enhancement if exceeded."
         ),
     )
+    full_text_copy_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description=(
+            "Maximum number of a reference's full-text sources copied into blob "
+            "storage at once."
+        ),
+    )
+    full_text_defer_copy: bool = Field(
+        default=False,
+        description=(
+            "Whether to copy full texts declaring both their sha256 and byte size "
+            "in a background task, rather than while ingesting the reference. The "
+            "enhancement is stored pointing at the content-addressed blob the copy "
+            "will write, and is removed if the copy fails."
+        ),
+    )
+    enhancement_content_hash_backfill_batch_size: int = Field(
+        default=1000,
+        ge=1,
+        description=(
+            "Number of enhancements stored without a content hash that each "
+            "backfill task records the hash of."
+        ),
+    )
+    full_text_removal_retries: int = Field(
+        default=10,
+        ge=0,
+        description=(
+            "Number of times removing a full text enhancement whose deferred copy "
+            "failed is requeued while the enhancement is not yet committed, "
+            "before it is assumed never to have been."
+        ),
+    )
+
+    robot_result_chunk_size: int = Field(
+        default=500,
+        ge=1,
+        description=(
+            "Number of robot result lines imported together. Each chunk's "
+            "enhancements are inserted, its pending enhancements updated and its "
+            "references indexed in one go."
+        ),
+    )
+    robot_result_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description=(
+            "Maximum number of lines of a robot result chunk validated at once, "
+            "e.g. fetching linked data vocabularies or copying full texts."
+        ),
+    )
 
     default_pending_enhancement_lease_duration: datetime.timedelta = Field(
         default=iso8601_duration_adapter.validate_python("PT10M"),
@@ -675,6 +988,40 @@ class Settings(BaseSettings):
             "in ISO 8601 duration format eg 'PT10M'."
         ),
     )
+    pending_enhancement_expiry_batch_size: int = Field(
+        default=1000,
+        ge=1,
+        description=(
+            "Number of expired pending enhancements the expiry sweep expires and "
+            "replaces per transaction."
+        ),
+    )
+    prepared_robot_enhancement_batches: int = Field(
+        default=1,
+        ge=0,
+        description=(
+            "Number of robot enhancement batches to prepare per robot ahead of its "
+            "polls, so that a poll claims a batch whose reference data file is "
+            "already uploaded. 0 builds every batch as it is polled for."
+        ),
+    )
+    prepared_robot_enhancement_batch_max_age: datetime.timedelta = Field(
+        default=iso8601_duration_adapter.validate_python("PT1H"),
+        description=(
+            "How long a prepared robot enhancement batch may wait to be claimed "
+            "before its reference data is considered stale and it is rebuilt, "
+            "provided in ISO 8601 duration format eg 'PT1H'."
+        ),
+    )
+    max_robot_enhancement_batch_wait: datetime.timedelta = Field(
+        default=iso8601_duration_adapter.validate_python("PT30S"),
+        description=(
+            "The longest a robot's poll for an enhancement batch may wait for "
+            "pending enhancements to arrive before returning empty, provided in "
+            "ISO 8601 duration format eg 'PT30S'. Robots choose how long to wait "
+            "up to this. Keep it within any proxy's request timeout."
+        ),
+    )
 
     env: Environment = Field(
         default=Environment.PRODUCTION,
@@ -1,6 +1,7 @@
 """Custom exceptions for the app."""
 
 import re
+from collections.abc import Sequence
 from typing import Any, Self
 
 import destiny_sdk
@@ -54,15 +55,20 @@ class MessageBrokerError(DestinyRepositoryError):
 class MessageTooLargeError(MessageBrokerError):
     """An exception thrown by a message broker if the message is too large to queue."""
 
-    def __init__(self, detail: str, *args: object) -> None:
+    def __init__(
+        self, detail: str, *args: object, task_ids: Sequence[str] = ()
+    ) -> None:
         """
         Initialize the MessageTooLargeError exception.
 
         Args:
             detail (str): The detail message for the exception.
             *args: Additional arguments for the exception.
+            task_ids (Sequence[str]): The IDs of the tasks too large to queue, if
+                raised when queueing a batch of tasks.
 
         """
+        self.task_ids = task_ids
         super().__init__(detail, *args)
 
 
@@ -501,6 +507,21 @@ class BlobSizeExceededError(BlobStorageError):
         super().__init__(detail, *args)
 
 
+class BlobIntegrityError(BlobStorageError):
+    """Streamed content did not match the caller-supplied checksum."""
+
+    def __init__(self, detail: str, *args: object) -> None:
+        """
+        Initialize the BlobIntegrityError exception.
+
+        Args:
+            detail (str): The detail message for the exception.
+            *args: Additional arguments for the exception.
+
+        """
+        super().__init__(detail, *args)
+
+
 class FullTextIngestionError(DestinyRepositoryError):
     """Base exception for failures storing a full-text enhancement."""
 
@@ -724,6 +745,20 @@ class StateTransitionError(DestinyRepositoryError):
         super().__init__(detail)
 
 
+class ExportSupersededError(DestinyRepositoryError):
+    """An exception for when a later attempt has reclaimed a running export."""
+
+    def __init__(self, detail: str) -> None:
+        """
+        Initialize the ExportSupersededError exception.
+
+        Args:
+            detail (str): The detail message for the exception.
+
+        """
+        super().__init__(detail)
+
+
 class ContextNotPreFetchedError(DestinyRepositoryError):
     """Raised when document_loader is called for a URI that hasn't been pre-fetched."""
 
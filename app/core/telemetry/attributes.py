@@ -102,6 +102,10 @@ class Attributes(StrEnum):
         "app.robot_automation.pending_enhancement_count"
     )
 
+    # Search
+    SEARCH_CACHE_HIT = "app.search_cache.hit"
+    SEARCH_HYDRATED_HITS = "app.search.hydrated_hits"
+
     # Other
     FILE_LINE_NO = "app.file.line_number"
 
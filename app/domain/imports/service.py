@@ -14,7 +14,7 @@ from app.core.exceptions import MessageTooLargeError, SQLIntegrityError
 from app.core.telemetry.attributes import Attributes, sample_trace, trace_attribute
 from app.core.telemetry.logger import get_logger
 from app.core.telemetry.otel import new_linked_trace
-from app.core.telemetry.taskiq import queue_task_with_trace
+from app.core.telemetry.taskiq import TaskBatch
 from app.domain.imports.models.models import (
     ImportBatch,
     ImportRecord,
@@ -27,9 +27,11 @@ from app.domain.imports.services.anti_corruption_service import (
 )
 from app.domain.references.service import ReferenceService
 from app.domain.service import GenericService
+from app.persistence.blob.compression import decompress_chunks
 from app.persistence.blob.repository import BlobRepository
 from app.persistence.sql.uow import AsyncSqlUnitOfWork
 from app.persistence.sql.uow import unit_of_work as sql_unit_of_work
+from app.utils.aio import decode_lines
 
 logger = get_logger(__name__)
 tracer = trace.get_tracer(__name__)
@@ -238,93 +240,110 @@ class ImportService(GenericService[ImportAntiCorruptionService]):
         return import_result, reference_result.duplicate_decision_id
 
     @sql_unit_of_work
-    async def _queue_import_line(
-        self, import_batch_id: UUID, line: str, line_number: int
-    ) -> None:
-        """Queue a single line for import processing."""
-        import_result = await self.register_result(
+    async def _register_import_line(self, import_batch_id: UUID) -> ImportResult:
+        """Register the result of a line to import."""
+        return await self.register_result(
             ImportResult(
                 import_batch_id=import_batch_id,
                 status=ImportResultStatus.CREATED,
             )
         )
+
+    async def _queue_import_line(
+        self, tasks: TaskBatch, import_batch_id: UUID, line: str, line_number: int
+    ) -> None:
+        """Queue a single line for import processing."""
+        import_result = await self._register_import_line(import_batch_id)
         trace_attribute(Attributes.IMPORT_RESULT_ID, str(import_result.id))
-        try:
-            await queue_task_with_trace(
-                ("app.domain.imports.tasks", "import_reference"),
-                import_result.id,
-                line,
-                line_number,
-                settings.import_reference_retry_count,
-                otel_enabled=settings.otel_enabled,
-            )
-        except MessageTooLargeError as exc:
+
+        async def fail(exc: MessageTooLargeError) -> None:
             sample_trace()
-            await self._update_import_result(
-                import_result_id=import_result.id,
+            await self.update_import_result(
+                import_result.id,
                 status=ImportResultStatus.FAILED,
                 failure_details=exc.detail,
             )
 
+        await tasks.queue(
+            ("app.domain.imports.tasks", "import_reference"),
+            import_result.id,
+            line,
+            line_number,
+            settings.import_reference_retry_count,
+            on_too_large=fail,
+        )
+
     async def distribute_import_batch(self, import_batch: ImportBatch) -> None:
-        """Distribute an import batch, retrying on connection errors."""
+        """
+        Distribute an import batch, retrying on connection errors.
+
+        The batch file may be gzip or zstd compressed; it is decompressed as it
+        streams.
+        """
         last_processed_line = 0
-        async for attempt in tenacity.AsyncRetrying(
-            retry=tenacity.retry_if_exception_type(httpx.TransportError),
-            before_sleep=lambda rs: logger.warning(
-                "Retrying import batch stream",
-                extra={
-                    "import_batch_id": str(import_batch.id),
-                    "attempt": rs.attempt_number,
-                    "last_processed_line": last_processed_line,  # noqa: B023
-                    "exc": repr(rs.outcome.exception()),
-                },
-            ),
-            wait=tenacity.wait_exponential(multiplier=1, max=30),
-            stop=tenacity.stop_after_attempt(5),
-            reraise=True,
-        ):
-            with attempt:
-                async with httpx.AsyncClient(
-                    follow_redirects=False,
-                ) as client:
-                    HTTPXClientInstrumentor().instrument_client(client)
-                    async with client.stream(
-                        "GET", str(import_batch.storage_url)
-                    ) as response:
-                        # Reject non-2xx explicitly: follow_redirects is
-                        # disabled to prevent open-redirect, so 3xx must
-                        # be caught here rather than relying on
-                        # raise_for_status (4xx/5xx only).
-                        if not response.is_success:
-                            msg = (
-                                f"Unexpected status {response.status_code} "
-                                f"fetching storage_url"
-                            )
-                            raise httpx.HTTPStatusError(
-                                msg,
-                                request=response.request,
-                                response=response,
-                            )
-                        line_number = 0
-                        async for line in response.aiter_lines():
-                            line_number += 1
-                            if line_number <= last_processed_line:
-                                continue
-                            if line := line.strip():
-                                with new_linked_trace(
-                                    "Queue import reference task",
-                                    attributes={
-                                        Attributes.FILE_LINE_NO: line_number,
-                                        Attributes.IMPORT_BATCH_ID: str(
-                                            import_batch.id
-                                        ),
-                                    },
-                                ):
-                                    await self._queue_import_line(
-                                        import_batch.id, line, line_number
-                                    )
-                            last_processed_line = line_number
+        async with TaskBatch(
+            max_messages=settings.message_broker_batch_max_messages,
+            window=settings.message_broker_batch_window,
+            otel_enabled=settings.otel_enabled,
+        ) as tasks:
+            async for attempt in tenacity.AsyncRetrying(
+                retry=tenacity.retry_if_exception_type(httpx.TransportError),
+                before_sleep=lambda rs: logger.warning(
+                    "Retrying import batch stream",
+                    extra={
+                        "import_batch_id": str(import_batch.id),
+                        "attempt": rs.attempt_number,
+                        "last_processed_line": last_processed_line,  # noqa: B023
+                        "exc": repr(rs.outcome.exception()),
+                    },
+                ),
+                wait=tenacity.wait_exponential(multiplier=1, max=30),
+                stop=tenacity.stop_after_attempt(5),
+                reraise=True,
+            ):
+                with attempt:
+                    async with httpx.AsyncClient(
+                        follow_redirects=False,
+                    ) as client:
+                        HTTPXClientInstrumentor().instrument_client(client)
+                        async with client.stream(
+                            "GET", str(import_batch.storage_url)
+                        ) as response:
+                            # Reject non-2xx explicitly: follow_redirects is
+                            # disabled to prevent open-redirect, so 3xx must
+                            # be caught here rather than relying on
+                            # raise_for_status (4xx/5xx only).
+                            if not response.is_success:
+                                msg = (
+                                    f"Unexpected status {response.status_code} "
+                                    f"fetching storage_url"
+                                )
+                                raise httpx.HTTPStatusError(
+                                    msg,
+                                    request=response.request,
+                                    response=response,
+                                )
+                            line_number = 0
+                            async for line in decode_lines(
+                                decompress_chunks(response.aiter_bytes())
+                            ):
+                                line_number += 1
+                                if line_number <= last_processed_line:
+                                    continue
+                                if line := line.strip():
+                                    with new_linked_trace(
+                                        "Queue import reference task",
+                                        attributes={
+                                            Attributes.FILE_LINE_NO: line_number,
+                                            Attributes.IMPORT_BATCH_ID: str(
+                                                import_batch.id
+                                            ),
+                                        },
+                                    ):
+                                        await self._queue_import_line(
+                                            tasks, import_batch.id, line, line_number
+                                        )
+                                last_processed_line = line_number
 
     @sql_unit_of_work
     async def get_import_results(
@@ -6,7 +6,7 @@ from uuid import UUID
 
 from opentelemetry import trace
 
-from app.core.config import get_settings
+from app.core.config import TaskFamily, get_settings
 from app.core.telemetry.attributes import (
     Attributes,
     name_span,
@@ -75,7 +75,7 @@ async def get_reference_service(
     )
 
 
-@broker.task
+@broker.task(family=TaskFamily.IMPORT)
 async def distribute_import_batch(
     import_record_id: UUID, import_batch_id: UUID
 ) -> None:
@@ -90,7 +90,7 @@ async def distribute_import_batch(
         await import_service.distribute_import_batch(import_batch)
 
 
-@broker.task
+@broker.task(family=TaskFamily.IMPORT)
 async def import_reference(
     import_result_id: UUID, content: str, line_number: int, remaining_retries: int
 ) -> None:
@@ -1,7 +1,7 @@
 """Objects used to interface with Elasticsearch implementations."""
 
 import datetime
-from typing import Any, Self
+from typing import Any, ClassVar, Self
 from uuid import UUID
 
 from elasticsearch.dsl import (
@@ -397,6 +397,7 @@ class ReferenceDocument(
 
     Full reference data (including identifiers) is stored in PostgreSQL and hydrated
     from there when needed. Identifier lookups are done via PostgreSQL, not ES.
+    A pre-rendered, unindexed SDK payload lets search serve hits without hydrating.
     Nested structures (identifiers, enhancements) are preserved only in the
     RobotAutomationPercolationDocument for percolation queries.
     """
@@ -411,6 +412,28 @@ class ReferenceDocument(
     duplicate_determination: DuplicateDetermination | None = mapped_field(
         Keyword(required=False),
     )
+    sdk_payload: str | None = mapped_field(
+        Text(required=False, index=False),
+        default=None,
+    )
+    """
+    The SDK JSON of the reference, excluding full-text enhancements.
+
+    Stored for retrieval only. Absent on documents indexed before it was introduced,
+    in which case the reference must be hydrated from PostgreSQL.
+    """
+    has_full_text: bool | None = mapped_field(
+        Boolean(required=False, index=False),
+        default=None,
+    )
+    """Whether the reference has full-text enhancements, omitted from the payload."""
+
+    payload_fields: ClassVar[tuple[str, ...]] = (
+        "visibility",
+        "sdk_payload",
+        "has_full_text",
+    )
+    """The source fields needed to serve a hit from its payload."""
 
     @classmethod
     def from_domain(cls, domain_obj: ReferenceSearchProjection) -> Self:
@@ -421,6 +444,8 @@ class ReferenceDocument(
             id=domain_obj.id,
             visibility=domain_obj.visibility,
             duplicate_determination=domain_obj.duplicate_determination,
+            sdk_payload=domain_obj.sdk_payload,
+            has_full_text=domain_obj.has_full_text,
             **ReferenceSearchFieldsMixin.from_projections(
                 domain_obj.search_fields,
                 domain_obj.linked_data_projection,
@@ -433,12 +458,14 @@ class ReferenceDocument(
 
         Since ES is now search-only, full hydration should be done from PostgreSQL.
         This returns a minimal ReferenceSearchProjection with only the ID, visibility,
-        and empty search fields.
+        SDK payload and empty search fields.
         """
         return ReferenceSearchProjection(
             id=self.meta.id,  # Pydantic handles str -> UUID coercion
             visibility=self.visibility,
             search_fields=ReferenceSearchFields(),
+            sdk_payload=self.sdk_payload,
+            has_full_text=bool(self.has_full_text),
         )
 
 
@@ -483,7 +510,11 @@ class RobotAutomationPercolationDocument(GenericESPersistence[RobotAutomation]):
     def to_domain(self) -> RobotAutomation:
         """Create a domain model from this persistence model."""
         return RobotAutomation(
-            id=self.meta.id, robot_id=self.robot_id, query=self.query
+            id=self.meta.id,
+            robot_id=self.robot_id,
+            query=self.query,
+            # Documents are versioned with the revision they were indexed from.
+            revision=self.meta.to_dict().get("version", 1),
         )
 
     @classmethod
@@ -1,6 +1,7 @@
 """Models associated with references."""
 
 import datetime
+import hashlib
 import json
 from enum import StrEnum, auto
 from typing import Annotated, Any, Literal, Self
@@ -35,7 +36,7 @@ from app.domain.base import (
     StateMachineMixin,
 )
 from app.domain.references.services.world_bank_regions import WBRegionID
-from app.persistence.blob.models import BlobStorageFile
+from app.persistence.blob.models import BlobStorageFile, ContentEncoding
 from app.persistence.es.persistence import ESSearchTotal
 from app.utils.time_and_date import apply_positive_timedelta
 
@@ -108,12 +109,19 @@ class ExportFormat(StrEnum):
     """JSON Lines: one reference per line."""
     RIS = auto()
     """RIS: tagged citation format consumed by reference managers."""
+    PARQUET = auto()
+    """Parquet: columnar, one flattened row per reference, for bulk analytics."""
 
     @property
     def extension(self) -> str:
         """The file extension for this format."""
         return self.value
 
+    @property
+    def concatenable(self) -> bool:
+        """Whether a file can be written as independently serialized chunks."""
+        return self != ExportFormat.PARQUET
+
 
 class Visibility(StrEnum):
     """
@@ -525,12 +533,8 @@ class Enhancement(DomainBaseModel, SQLTimestampMixin):
         description="The reference this enhancement is associated with.",
     )
 
-    def hash_data(self) -> int:
-        """
-        Contentwise hash of the enhancement.
-
-        Excludes relationships and timestamps.
-        """
+    def _fingerprint(self) -> str:
+        """Canonical representation of the enhancement's identifying data."""
         if hasattr(self.content, "fingerprint"):
             content_fingerprint = self.content.fingerprint
         else:
@@ -543,7 +547,25 @@ class Enhancement(DomainBaseModel, SQLTimestampMixin):
             include={"source", "visibility", "robot_version", "derived_from"},
             exclude_none=True,
         ) | {"content": content_fingerprint}
-        return hash(json.dumps(json_repr, sort_keys=True))
+        return json.dumps(json_repr, sort_keys=True)
+
+    def hash_data(self) -> int:
+        """
+        Contentwise hash of the enhancement.
+
+        Excludes relationships and timestamps.
+        """
+        return hash(self._fingerprint())
+
+    @property
+    def content_hash(self) -> str:
+        """
+        Contentwise sha256 hex digest of the enhancement, stable across processes.
+
+        Identifies the same data as :meth:`hash_data`, and is persisted so that
+        exact duplicates on a reference are rejected by the database.
+        """
+        return hashlib.sha256(self._fingerprint().encode()).hexdigest()
 
 
 class EnhancementRequest(DomainBaseModel, ProjectedBaseModel, SQLAttributeMixin):
@@ -632,6 +654,10 @@ class Export(DomainBaseModel, SQLAttributeMixin):
         default=ExportFormat.JSONL,
         description="The serialization format of the produced file.",
     )
+    compression: ContentEncoding | None = Field(
+        default=None,
+        description="The compression applied to the produced file, if any.",
+    )
     status: ExportStatus = Field(
         default=ExportStatus.PENDING,
         description="The current status of the export job.",
@@ -648,6 +674,21 @@ class Export(DomainBaseModel, SQLAttributeMixin):
         default=None,
         description="Error message, if the job failed.",
     )
+    attempt: int = Field(
+        default=0,
+        description=(
+            "The number of times the job has been claimed. Each claim fences out "
+            "the checkpoints of earlier attempts."
+        ),
+    )
+    committed_chunks: int = Field(
+        default=0,
+        description="The number of file chunks durably staged in blob storage.",
+    )
+    committed_references: int = Field(
+        default=0,
+        description="The number of references in the committed chunks.",
+    )
 
 
 class ReferenceExport(Export):
@@ -669,9 +710,9 @@ class SearchExport(Export):
     truncated: bool = Field(
         default=False,
         description=(
-            "Whether the matching result set was larger than the server's "
-            "result-window cap. When true, the JSONL contains only the first "
-            "window's worth of matches."
+            "Whether the export contains only part of the matching result set. "
+            "Search exports now scan every match, so this is only true for "
+            "exports produced before the result-window cap was lifted."
         ),
     )
 
@@ -710,6 +751,14 @@ class RobotAutomation(DomainBaseModel, SQLAttributeMixin):
     query: dict[str, Any] = Field(
         description="The query that will be used to match references against."
     )
+    revision: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Incremented whenever the robot or query changes. Used as the version "
+            "of the automation's percolator document."
+        ),
+    )
 
 
 class RobotAutomationPercolationResult(BaseModel):
@@ -1403,6 +1452,17 @@ class ReferenceSearchProjection(SQLAttributeMixin):
         default=None,
         description="Pre-computed linked data projection, if any.",
     )
+    sdk_payload: str | None = Field(
+        default=None,
+        description=(
+            "Pre-rendered SDK JSON of the deduplicated reference, excluding "
+            "full-text enhancements, served by search without hydration."
+        ),
+    )
+    has_full_text: bool = Field(
+        default=False,
+        description="Whether the reference has full-text enhancements.",
+    )
 
 
 class ReferenceDuplicateDeterminationResult(BaseModel):
@@ -1653,6 +1713,14 @@ class PendingEnhancement(DomainBaseModel, SQLAttributeMixin):
             "The ID of the pending enhancement that this is a retry of, if any."
         ),
     )
+    retry_depth: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "The number of retries preceding this pending enhancement in its "
+            "retry_of chain, 0 for an original."
+        ),
+    )
 
     @field_validator("expires_at", mode="before")
     @classmethod
@@ -1675,7 +1743,7 @@ class PendingEnhancement(DomainBaseModel, SQLAttributeMixin):
         return self
 
 
-class RobotEnhancementBatch(DomainBaseModel, SQLAttributeMixin):
+class RobotEnhancementBatch(DomainBaseModel, SQLTimestampMixin):
     """A batch of references to be enhanced by a robot."""
 
     robot_id: UUID = Field(
@@ -1698,6 +1766,11 @@ class RobotEnhancementBatch(DomainBaseModel, SQLAttributeMixin):
         default=None,
         description="Error encountered during the enhancement batch process.",
     )
+    claimed_at: datetime.datetime | None = Field(
+        default=None,
+        description="When the robot claimed the batch. Batches prepared ahead of "
+        "a claim are unclaimed until a robot polls for them.",
+    )
     pending_enhancements: list[PendingEnhancement] | None = Field(
         default=None,
         description="The pending enhancements in this batch.",
@@ -0,0 +1,172 @@
+"""
+Parquet columnar model for reference exports.
+
+Parquet suits bulk analytics consumers (pandas, Polars, DuckDB, Spark) that read
+a few columns across many references. Each reference is flattened into a single
+row of the fixed :data:`PARQUET_SCHEMA`, and rows are written a row group at a
+time so an export's memory is bounded by its page size, not its length.
+"""
+
+import datetime
+from collections.abc import Sequence
+
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+from pydantic import Field
+
+from app.domain.base import ProjectedBaseModel
+
+PARQUET_SCHEMA = pa.schema(
+    [
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("visibility", pa.string(), nullable=False),
+        pa.field("doi", pa.string()),
+        pa.field("pm_id", pa.string()),
+        pa.field("open_alex", pa.string()),
+        pa.field("eric", pa.string()),
+        pa.field("pro_quest", pa.string()),
+        pa.field("title", pa.string()),
+        pa.field("abstract", pa.string()),
+        pa.field("authors", pa.list_(pa.string())),
+        pa.field("publication_year", pa.int32()),
+        pa.field("publication_date", pa.date32()),
+        pa.field("venue", pa.string()),
+        pa.field("volume", pa.string()),
+        pa.field("issue", pa.string()),
+        pa.field("start_page", pa.string()),
+        pa.field("end_page", pa.string()),
+        pa.field("publisher", pa.string()),
+        pa.field("issns", pa.list_(pa.string())),
+        pa.field("annotations", pa.list_(pa.string())),
+        pa.field("evaluated_schemes", pa.list_(pa.string())),
+        pa.field("destiny_inclusion_score", pa.float64()),
+        pa.field("annotation_scores", pa.map_(pa.string(), pa.float64())),
+        pa.field("linked_data_concepts", pa.list_(pa.string())),
+        pa.field("linked_data_labels", pa.list_(pa.string())),
+        pa.field("linked_data_countries", pa.list_(pa.string())),
+        pa.field("linked_data_country_wb_regions", pa.list_(pa.string())),
+    ]
+)
+"""The flattened schema of a Parquet reference export, one row per reference."""
+
+
+class ParquetRecord(ProjectedBaseModel):
+    """A single reference flattened into a row of :data:`PARQUET_SCHEMA`."""
+
+    id: str
+    visibility: str
+    doi: str | None = None
+    pm_id: str | None = None
+    open_alex: str | None = None
+    eric: str | None = None
+    pro_quest: str | None = None
+    title: str | None = None
+    abstract: str | None = None
+    authors: list[str] = Field(default_factory=list)
+    publication_year: int | None = None
+    publication_date: datetime.date | None = None
+    venue: str | None = None
+    volume: str | None = None
+    issue: str | None = None
+    start_page: str | None = None
+    end_page: str | None = None
+    publisher: str | None = None
+    issns: list[str] = Field(default_factory=list)
+    annotations: list[str] = Field(
+        default_factory=list,
+        description="Qualified labels of positive boolean annotations.",
+    )
+    evaluated_schemes: list[str] = Field(default_factory=list)
+    destiny_inclusion_score: float | None = None
+    annotation_scores: dict[str, float] = Field(
+        default_factory=dict,
+        description="Score of every scored annotation, keyed on qualified label.",
+    )
+    linked_data_concepts: list[str] = Field(default_factory=list)
+    linked_data_labels: list[str] = Field(default_factory=list)
+    linked_data_countries: list[str] = Field(default_factory=list)
+    linked_data_country_wb_regions: list[str] = Field(default_factory=list)
+
+
+class _DrainableSink:
+    """
+    A write-only file that hands back what was written since it was last drained.
+
+    ``tell`` reports the total bytes ever written, so the offsets Parquet records in
+    its footer stay correct although the buffer itself is emptied on every drain.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetExportWriter:
+    """
+    Incrementally writes a Parquet file, one row group per batch of records.
+
+    Each call returns the bytes produced since the last, so the file can be
+    streamed to blob storage as it is written. Writing is CPU-bound; callers on
+    the event loop should run it in a worker thread. Calls must not overlap.
+    """
+
+    def __init__(self, compression: str = "zstd") -> None:
+        """
+        Start a new file.
+
+        :param compression: The Parquet column compression codec.
+        :type compression: str
+        """
+        self._sink = _DrainableSink()
+        self._writer = pq.ParquetWriter(
+            self._sink, PARQUET_SCHEMA, compression=compression
+        )
+
+    def write_row_group(self, records: Sequence[ParquetRecord]) -> bytes:
+        """
+        Write ``records`` as a row group.
+
+        :param records: The rows to write. An empty batch writes nothing.
+        :type records: Sequence[ParquetRecord]
+        :return: The bytes of the file written by this call.
+        :rtype: bytes
+        """
+        if records:
+            self._writer.write_table(
+                pa.Table.from_pylist(
+                    [record.model_dump() for record in records], schema=PARQUET_SCHEMA
+                ),
+                row_group_size=len(records),
+            )
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """
+        Finish the file by writing its footer.
+
+        :return: The remaining bytes of the file.
+        :rtype: bytes
+        """
+        self._writer.close()
+        return self._sink.drain()
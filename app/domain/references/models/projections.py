@@ -19,10 +19,12 @@ from app.domain.references.models.models import (
     EnhancementRequestStatus,
     EnhancementType,
     ExternalIdentifierType,
+    LinkedDataProjection,
     PendingEnhancementStatus,
     Reference,
     ReferenceSearchFields,
 )
+from app.domain.references.models.parquet import ParquetRecord
 from app.domain.references.models.ris import RisRecord, RisType
 
 
@@ -85,6 +87,17 @@ def _order_authorship_by_position(
     return [author.display_name for author in sorted(authorship, key=_sort_key)]
 
 
+def _identifier_value(
+    reference: Reference,
+    identifier_type: destiny_sdk.identifiers.ExternalIdentifierType,
+) -> str | None:
+    """Return the first matching external identifier value, if present."""
+    for linked in reference.identifiers or []:
+        if linked.identifier.identifier_type == identifier_type:
+            return str(linked.identifier.identifier)
+    return None
+
+
 class ReferenceSearchFieldsProjection(GenericProjection[ReferenceSearchFields]):
     """Projection functions for candidate selection used in duplicate detection."""
 
@@ -483,7 +496,7 @@ class ReferenceRisProjection(GenericProjection[RisRecord]):
                 or (venue.host_organization_name if venue else None),
                 issns=venue.issn if venue and venue.issn else [],
                 abstract=abstract,
-                doi=cls._identifier_value(
+                doi=_identifier_value(
                     reference, destiny_sdk.identifiers.ExternalIdentifierType.DOI
                 ),
                 accession=str(reference.id),
@@ -504,17 +517,6 @@ class ReferenceRisProjection(GenericProjection[RisRecord]):
             return cls.VENUE_TYPE_TO_RIS_TYPE.get(venue.venue_type, RisType.GENERIC)
         return RisType.GENERIC
 
-    @staticmethod
-    def _identifier_value(
-        reference: Reference,
-        identifier_type: destiny_sdk.identifiers.ExternalIdentifierType,
-    ) -> str | None:
-        """Return the first matching external identifier value, if present."""
-        for linked in reference.identifiers or []:
-            if linked.identifier.identifier_type == identifier_type:
-                return str(linked.identifier.identifier)
-        return None
-
     @classmethod
     def _identifier_urls(cls, reference: Reference) -> list[str]:
         """Resolve external identifiers to public URLs for the `UR` tag."""
@@ -528,6 +530,105 @@ class ReferenceRisProjection(GenericProjection[RisRecord]):
         return urls
 
 
+class ReferenceParquetProjection(GenericProjection[ParquetRecord]):
+    """
+    Projection from a reference to a flattened ``ParquetRecord`` for Parquet export.
+
+    Bibliographic fields are coalesced as for RIS (authors in citation order) and
+    annotation fields as for search. Linked data must be projected beforehand, as
+    that resolves the enhancement against its vocabulary asynchronously.
+    """
+
+    @classmethod
+    def get_from_reference(
+        cls,
+        reference: Reference,
+        linked_data_projection: LinkedDataProjection | None = None,
+    ) -> ParquetRecord:
+        """
+        Project a ``ParquetRecord`` from a reference.
+
+        :param reference: The reference to project from.
+        :type reference: app.domain.references.models.models.Reference
+        :param linked_data_projection: The projection of the reference's
+            highest-priority linked data enhancement, if it has one.
+        :type linked_data_projection: LinkedDataProjection | None
+        :raises ProjectionError: If the projection fails.
+        :return: The projected record.
+        :rtype: ParquetRecord
+        """
+        try:
+            ris = ReferenceRisProjection.get_from_reference(reference)
+            search_fields = ReferenceSearchFieldsProjection.get_from_reference(
+                reference
+            )
+            linked_data = linked_data_projection or LinkedDataProjection()
+            return ParquetRecord(
+                id=str(reference.id),
+                visibility=reference.visibility,
+                doi=_identifier_value(reference, ExternalIdentifierType.DOI),
+                pm_id=_identifier_value(reference, ExternalIdentifierType.PM_ID),
+                open_alex=_identifier_value(
+                    reference, ExternalIdentifierType.OPEN_ALEX
+                ),
+                eric=_identifier_value(reference, ExternalIdentifierType.ERIC),
+                pro_quest=_identifier_value(
+                    reference, ExternalIdentifierType.PRO_QUEST
+                ),
+                title=ris.title,
+                abstract=ris.abstract,
+                authors=ris.authors,
+                publication_year=ris.publication_year,
+                publication_date=ris.publication_date,
+                venue=ris.journal,
+                volume=ris.volume,
+                issue=ris.issue,
+                start_page=ris.start_page,
+                end_page=ris.end_page,
+                publisher=ris.publisher,
+                issns=ris.issns,
+                annotations=sorted(search_fields.annotations),
+                evaluated_schemes=sorted(search_fields.evaluated_schemes),
+                destiny_inclusion_score=search_fields.destiny_inclusion_score,
+                annotation_scores=cls._annotation_scores(reference),
+                linked_data_concepts=sorted(linked_data.concepts),
+                linked_data_labels=sorted(linked_data.labels),
+                linked_data_countries=sorted(linked_data.countries),
+                linked_data_country_wb_regions=sorted(linked_data.country_wb_regions),
+            )
+        except Exception as exc:
+            msg = "Failed to project ParquetRecord from Reference"
+            raise ProjectionError(msg) from exc
+
+    @staticmethod
+    def _annotation_scores(reference: Reference) -> dict[str, float]:
+        """
+        Map each scored annotation's qualified label to its score.
+
+        As for search, each scheme is taken wholly from its highest-priority
+        annotation enhancement.
+        """
+        annotations_by_scheme: dict[str, list[destiny_sdk.enhancements.Annotation]] = {}
+        for enhancement in _priority_sorted_enhancements(
+            reference.id, reference.enhancements
+        ):
+            if enhancement.content.enhancement_type != EnhancementType.ANNOTATION:
+                continue
+            _annotations_by_scheme: dict[
+                str, list[destiny_sdk.enhancements.Annotation]
+            ] = defaultdict(list)
+            for annotation in enhancement.content.annotations or []:
+                _annotations_by_scheme[annotation.scheme].append(annotation)
+            annotations_by_scheme |= _annotations_by_scheme
+
+        return {
+            annotation.qualified_label: annotation.score
+            for annotations in annotations_by_scheme.values()
+            for annotation in annotations
+            if annotation.score is not None
+        }
+
+
 class DeduplicatedReferenceProjection(GenericProjection[Reference]):
     """
     Projection functions for deduplicating canonical references.
@@ -552,28 +653,35 @@ class DeduplicatedReferenceProjection(GenericProjection[Reference]):
             msg = "Reference must have duplicates preloaded to be deduplicated."
             raise ProjectionError(msg)
 
-        deduplicated_reference = reference.model_copy(
-            deep=True,
+        # A shallow copy with fresh lists: the enhancements and identifiers
+        # themselves are shared with the source references rather than deep-copied,
+        # which dominated the cost of exporting and indexing.
+        return reference.model_copy(
             update={
                 "duplicate_references": None,
+                "enhancements": [
+                    *reference.enhancements,
+                    *(
+                        enhancement
+                        for ref in reference.duplicate_references
+                        for enhancement in ref.enhancements or []
+                    ),
+                ]
+                if reference.enhancements is not None
+                else None,
+                "identifiers": [
+                    *reference.identifiers,
+                    *(
+                        identifier
+                        for ref in reference.duplicate_references
+                        for identifier in ref.identifiers or []
+                    ),
+                ]
+                if reference.identifiers is not None
+                else None,
             },
         )
 
-        if deduplicated_reference.enhancements is not None:
-            deduplicated_reference.enhancements += [
-                enhancement
-                for ref in reference.duplicate_references
-                for enhancement in ref.enhancements or []
-            ]
-        if deduplicated_reference.identifiers is not None:
-            deduplicated_reference.identifiers += [
-                identifier
-                for ref in reference.duplicate_references
-                for identifier in (ref.identifiers or [])
-            ]
-
-        return deduplicated_reference
-
 
 class EnhancementRequestStatusProjection(GenericProjection[EnhancementRequest]):
     """Projection functions to hydrate enhancement request status."""
@@ -82,7 +82,7 @@ from app.domain.references.models.models import (
 from app.domain.references.models.models import (
     SearchExport as DomainSearchExport,
 )
-from app.persistence.blob.models import BlobStorageFile
+from app.persistence.blob.models import BlobStorageFile, ContentEncoding
 from app.persistence.sql.generics import GenericSQLPreloadableType
 from app.persistence.sql.persistence import (
     GenericSQLPersistence,
@@ -319,14 +319,27 @@ class Enhancement(GenericSQLPersistence[DomainEnhancement]):
         ARRAY(SQL_UUID), nullable=True
     )
     content: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+    """The domain model's ``content_hash``. Null on enhancements stored before it
+    was recorded."""
 
     reference: Mapped["Reference"] = relationship(
         "Reference", back_populates="enhancements"
     )
 
+    content_uniqueness_index = Index(
+        "uq_enhancement_reference_id_content_hash",
+        "reference_id",
+        "content_hash",
+        unique=True,
+    )
+    """At most one enhancement per reference with the same content. Relied upon
+    to discard exact duplicate enhancements on insert."""
+
     __table_args__ = (
         Index("ix_enhancement_reference_id", "reference_id"),
         Index("ix_enhancement_enhancement_type", "enhancement_type"),
+        content_uniqueness_index,
     )
 
     @classmethod
@@ -356,6 +369,7 @@ class Enhancement(GenericSQLPersistence[DomainEnhancement]):
             robot_version=domain_obj.robot_version,
             derived_from=domain_obj.derived_from,
             content=domain_obj.content.model_dump(mode="json"),
+            content_hash=domain_obj.content_hash,
         )
 
     def to_domain(
@@ -490,10 +504,18 @@ class ExportSQLMixin:
     export_format: Mapped[ExportFormat] = mapped_column(
         String, nullable=False, server_default=ExportFormat.JSONL.value
     )
+    compression: Mapped[ContentEncoding | None] = mapped_column(String, nullable=True)
     status: Mapped[ExportStatus] = mapped_column(String, nullable=False)
     result_file: Mapped[str | None] = mapped_column(String, nullable=True)
     n_references: Mapped[int | None] = mapped_column(Integer, nullable=True)
     error: Mapped[str | None] = mapped_column(String, nullable=True)
+    attempt: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    committed_chunks: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    committed_references: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
 
 
 class ReferenceExport(ExportSQLMixin, GenericSQLPersistence[DomainReferenceExport]):
@@ -511,11 +533,15 @@ class ReferenceExport(ExportSQLMixin, GenericSQLPersistence[DomainReferenceExpor
             reference_ids=domain_obj.reference_ids,
             status=domain_obj.status,
             export_format=domain_obj.export_format,
+            compression=domain_obj.compression,
             result_file=domain_obj.result_file.to_uri()
             if domain_obj.result_file
             else None,
             n_references=domain_obj.n_references,
             error=domain_obj.error,
+            attempt=domain_obj.attempt,
+            committed_chunks=domain_obj.committed_chunks,
+            committed_references=domain_obj.committed_references,
         )
 
     def to_domain(
@@ -528,11 +554,15 @@ class ReferenceExport(ExportSQLMixin, GenericSQLPersistence[DomainReferenceExpor
             reference_ids=self.reference_ids,
             status=self.status,
             export_format=self.export_format,
+            compression=self.compression,
             result_file=BlobStorageFile.from_uri(self.result_file)
             if self.result_file
             else None,
             n_references=self.n_references,
             error=self.error,
+            attempt=self.attempt,
+            committed_chunks=self.committed_chunks,
+            committed_references=self.committed_references,
         )
 
 
@@ -588,12 +618,16 @@ class SearchExport(ExportSQLMixin, GenericSQLPersistence[DomainSearchExport]):
             sort=domain_obj.sort,
             status=domain_obj.status,
             export_format=domain_obj.export_format,
+            compression=domain_obj.compression,
             result_file=domain_obj.result_file.to_uri()
             if domain_obj.result_file
             else None,
             n_references=domain_obj.n_references,
             truncated=domain_obj.truncated,
             error=domain_obj.error,
+            attempt=domain_obj.attempt,
+            committed_chunks=domain_obj.committed_chunks,
+            committed_references=domain_obj.committed_references,
         )
 
     def to_domain(
@@ -631,12 +665,16 @@ class SearchExport(ExportSQLMixin, GenericSQLPersistence[DomainSearchExport]):
             sort=self.sort,
             status=self.status,
             export_format=self.export_format,
+            compression=self.compression,
             result_file=BlobStorageFile.from_uri(self.result_file)
             if self.result_file
             else None,
             n_references=self.n_references,
             truncated=self.truncated,
             error=self.error,
+            attempt=self.attempt,
+            committed_chunks=self.committed_chunks,
+            committed_references=self.committed_references,
         )
 
 
@@ -656,6 +694,10 @@ class RobotAutomation(GenericSQLPersistence[DomainRobotAutomation]):
 
     query: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
 
+    revision: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+
     __table_args__ = (
         UniqueConstraint(
             "robot_id",
@@ -671,6 +713,7 @@ class RobotAutomation(GenericSQLPersistence[DomainRobotAutomation]):
             id=domain_obj.id,
             robot_id=domain_obj.robot_id,
             query=domain_obj.query,
+            revision=domain_obj.revision,
         )
 
     def to_domain(
@@ -682,6 +725,7 @@ class RobotAutomation(GenericSQLPersistence[DomainRobotAutomation]):
             id=self.id,
             robot_id=self.robot_id,
             query=self.query,
+            revision=self.revision,
         )
 
 
@@ -964,6 +1008,9 @@ class PendingEnhancement(GenericSQLPersistence[DomainPendingEnhancement]):
     retry_of: Mapped[UUID | None] = mapped_column(
         SQL_UUID, ForeignKey("pending_enhancement.id"), nullable=True
     )
+    retry_depth: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     robot_enhancement_batch: Mapped["RobotEnhancementBatch"] = relationship(
         "RobotEnhancementBatch", back_populates="pending_enhancements"
@@ -998,9 +1045,9 @@ class PendingEnhancement(GenericSQLPersistence[DomainPendingEnhancement]):
             postgresql_where="robot_enhancement_batch_id IS NULL",
         ),
         Index(
-            "ix_pending_enhancement_processing",
-            "status",
-            postgresql_where=(status == PendingEnhancementStatus.PROCESSING),
+            "ix_pending_enhancement_lease_expiry",
+            "expires_at",
+            postgresql_where=text("status = 'processing'"),
         ),
         Index(
             "ix_pending_enhancement_robot_enhancement_batch_id",
@@ -1022,6 +1069,7 @@ class PendingEnhancement(GenericSQLPersistence[DomainPendingEnhancement]):
             source=domain_obj.source,
             expires_at=domain_obj.expires_at,
             retry_of=domain_obj.retry_of,
+            retry_depth=domain_obj.retry_depth,
         )
 
     def to_domain(
@@ -1039,6 +1087,7 @@ class PendingEnhancement(GenericSQLPersistence[DomainPendingEnhancement]):
             source=self.source,
             expires_at=self.expires_at,
             retry_of=self.retry_of,
+            retry_depth=self.retry_depth,
         )
 
 
@@ -1059,6 +1108,9 @@ class RobotEnhancementBatch(GenericSQLPersistence[DomainRobotEnhancementBatch]):
     result_file: Mapped[str | None] = mapped_column(String, nullable=True)
     validation_result_file: Mapped[str | None] = mapped_column(String, nullable=True)
     error: Mapped[str | None] = mapped_column(String, nullable=True)
+    claimed_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     pending_enhancements: Mapped[list["PendingEnhancement"]] = relationship(
         "PendingEnhancement",
@@ -1066,6 +1118,15 @@ class RobotEnhancementBatch(GenericSQLPersistence[DomainRobotEnhancementBatch]):
         cascade="save-update, merge",
     )
 
+    __table_args__ = (
+        Index(
+            "ix_robot_enhancement_batch_prepared",
+            "robot_id",
+            "created_at",
+            postgresql_where=text("claimed_at IS NULL"),
+        ),
+    )
+
     @classmethod
     def from_domain(cls, domain_obj: DomainRobotEnhancementBatch) -> Self:
         """Create a persistence model from a domain RobotEnhancementBatch object."""
@@ -1082,6 +1143,7 @@ class RobotEnhancementBatch(GenericSQLPersistence[DomainRobotEnhancementBatch]):
             if domain_obj.validation_result_file
             else None,
             error=domain_obj.error,
+            claimed_at=domain_obj.claimed_at,
             pending_enhancements=[
                 PendingEnhancement.from_domain(pe)
                 for pe in domain_obj.pending_enhancements
@@ -1102,6 +1164,9 @@ class RobotEnhancementBatch(GenericSQLPersistence[DomainRobotEnhancementBatch]):
             result_file=self.result_file,
             validation_result_file=self.validation_result_file,
             error=self.error,
+            claimed_at=self.claimed_at,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
             pending_enhancements=[pe.to_domain() for pe in self.pending_enhancements]
             if "pending_enhancements" in (preload or [])
             else [],
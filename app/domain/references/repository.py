@@ -2,13 +2,22 @@
 
 import datetime
 from abc import ABC
-from collections.abc import AsyncGenerator, Collection, Mapping, Sequence
-from typing import Any, ClassVar, Literal
+from collections import defaultdict
+from collections.abc import (
+    AsyncGenerator,
+    Collection,
+    Iterable,
+    Mapping,
+    Sequence,
+)
+from http import HTTPStatus
+from typing import Any, ClassVar, Literal, cast
 from uuid import UUID
 
 import elastic_transport
-from elasticsearch import ApiError, AsyncElasticsearch
-from elasticsearch.dsl import AsyncSearch, Q
+from elasticsearch import ApiError, AsyncElasticsearch, ConflictError
+from elasticsearch.dsl import AsyncMultiSearch, AsyncSearch, Q
+from elasticsearch.dsl.exceptions import UnknownDslObject
 from elasticsearch.dsl.query import (
     Bool,
     Exists,
@@ -20,26 +29,37 @@ from elasticsearch.dsl.query import (
     Terms,
 )
 from elasticsearch.dsl.response import Response
+from elasticsearch.exceptions import BadRequestError
 from opentelemetry import trace
 from sqlalchemy import (
+    ARRAY,
     CompoundSelect,
     Select,
+    String,
     and_,
+    bindparam,
+    case,
+    column,
+    exists,
     func,
     intersect_all,
     literal,
     or_,
     select,
+    union_all,
     update,
 )
+from sqlalchemy import UUID as SQL_UUID
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
-from app.core.config import get_settings
-from app.core.exceptions import ESError, SQLIntegrityError
+from app.core.config import ESPercolationOperation, get_settings
+from app.core.exceptions import ESError, ESMalformedDocumentError, SQLIntegrityError
 from app.core.telemetry.attributes import Attributes, trace_attribute
+from app.core.telemetry.logger import get_logger
 from app.core.telemetry.repository import (
     trace_repository_generator,
     trace_repository_method,
@@ -56,6 +76,7 @@ from app.domain.references.models.models import (
     CrossFacetResult,
     DuplicateDetermination,
     EnhancementRequestSearchStatus,
+    ExternalIdentifierType,
     FacetType,
     GenericExternalIdentifier,
     LinkedDataConceptFilter,
@@ -141,9 +162,22 @@ from app.persistence.es.persistence import (
 from app.persistence.es.repository import GenericAsyncESRepository
 from app.persistence.generics import GenericPersistenceType
 from app.persistence.repository import GenericAsyncRepository
+from app.persistence.sql.notifications import (
+    PENDING_ENHANCEMENT_CREATED_CHANNEL,
+    notify,
+)
 from app.persistence.sql.repository import GenericAsyncSqlRepository
 
 settings = get_settings()
+
+# The most automations one percolate query reports matches for, being
+# Elasticsearch's default result window.
+_MAX_PERCOLATION_MATCHES = 10_000
+# Percolator documents are versioned with their automation's revision. Rewriting
+# the same revision is allowed, so that repeated writes are idempotent.
+_AUTOMATION_VERSION_TYPE = "external_gte"
+
+logger = get_logger(__name__)
 tracer = trace.get_tracer(__name__)
 
 
@@ -286,6 +320,90 @@ class ReferenceSQLRepository(
             db_reference.to_domain(preload=preload) for db_reference in db_references
         ]
 
+    @trace_repository_method(tracer)
+    async def resolve_identifiers(
+        self,
+        identifiers: Sequence[GenericExternalIdentifier],
+    ) -> list[list[UUID]]:
+        """
+        Resolve each external identifier to the references that carry it.
+
+        The identifiers are bound as three parallel arrays and unnested into a
+        relation that is joined against external identifiers, so one statement with
+        a fixed number of parameters resolves any number of identifiers. The join is
+        split by whether the type is ``other`` so each half can use its partial index.
+
+        :param identifiers: The external identifiers to resolve. Each must have an
+            identifier type.
+        :type identifiers: Sequence[GenericExternalIdentifier]
+        :return: For each identifier, in order, the IDs of the references carrying
+            it. Empty if none do.
+        :rtype: list[list[UUID]]
+        """
+        if not identifiers:
+            return []
+
+        lookup = (
+            func.unnest(
+                literal(
+                    [identifier.identifier_type for identifier in identifiers],
+                    ARRAY(String),
+                ),
+                literal(
+                    [identifier.identifier for identifier in identifiers],
+                    ARRAY(String),
+                ),
+                literal(
+                    [identifier.other_identifier_name for identifier in identifiers],
+                    ARRAY(String),
+                ),
+            )
+            .table_valued(
+                column("identifier_type", String),
+                column("identifier", String),
+                column("other_identifier_name", String),
+                with_ordinality="ordinal",
+            )
+            .render_derived(name="lookup")
+        )
+        # Rendered inline so the planner can match the partial indexes' predicates.
+        other = bindparam(
+            "other_identifier_type",
+            ExternalIdentifierType.OTHER,
+            type_=String,
+            literal_execute=True,
+        )
+        typed = (
+            select(lookup.c.ordinal, SQLExternalIdentifier.reference_id)
+            .join(
+                SQLExternalIdentifier,
+                and_(
+                    SQLExternalIdentifier.identifier_type == lookup.c.identifier_type,
+                    SQLExternalIdentifier.identifier == lookup.c.identifier,
+                ),
+            )
+            .where(SQLExternalIdentifier.identifier_type != other)
+        )
+        untyped = (
+            select(lookup.c.ordinal, SQLExternalIdentifier.reference_id)
+            .join(
+                SQLExternalIdentifier,
+                and_(
+                    SQLExternalIdentifier.identifier_type == lookup.c.identifier_type,
+                    SQLExternalIdentifier.other_identifier_name
+                    == lookup.c.other_identifier_name,
+                    SQLExternalIdentifier.identifier == lookup.c.identifier,
+                ),
+            )
+            .where(SQLExternalIdentifier.identifier_type == other)
+        )
+
+        matches: list[list[UUID]] = [[] for _ in identifiers]
+        result = await self._session.execute(union_all(typed, untyped))
+        for ordinal, reference_id in result.all():
+            matches[ordinal - 1].append(reference_id)
+        return matches
+
 
 _TOO_MANY_REQUESTS = 429
 _SERVER_ERROR = 500
@@ -431,8 +549,15 @@ class ReferenceESRepository(
         page: int = 1,
         page_size: int = 20,
         sort: list[str] | None = None,
+        *,
+        with_payload: bool = False,
     ) -> ESSearchResult:
-        """Search references matching ``query``; structured filters AND with q."""
+        """
+        Search references matching ``query``; structured filters AND with q.
+
+        With ``with_payload``, each hit's document carries the pre-rendered SDK
+        payload (and nothing else of the source).
+        """
         # Append the unique doc id as a final tie-breaker so equal-sort-value hits
         # have a deterministic order. unmapped_type allows it to work prior to the
         # migration that adds the id field, this can optionally be removed later
@@ -450,7 +575,8 @@ class ReferenceESRepository(
             page_size=page_size,
             sort=[*sort_keys, tiebreaker],
             filter_clauses=self._build_filter_clauses(query),
-            parse_document=False,
+            parse_document=with_payload,
+            source_includes=ReferenceDocument.payload_fields,
         )
 
     @trace_repository_generator(tracer)
@@ -933,6 +1059,137 @@ class EnhancementSQLRepository(
             SQLEnhancement,
         )
 
+    @trace_repository_method(tracer)
+    async def add_bulk_ignore_duplicates(
+        self, records: Collection[DomainEnhancement]
+    ) -> set[UUID]:
+        """
+        Insert enhancements, skipping exact duplicates of stored ones.
+
+        A row is skipped when its reference already has an enhancement with the
+        same ``content_hash``, including one inserted earlier in ``records``.
+        Duplicates are detected by the database, so no aggregate is loaded.
+
+        Returns the ids of the enhancements actually inserted.
+        """
+        records = list(records)
+        if not records:
+            return set()
+
+        rows = [
+            SQLEnhancement.from_domain(record).to_write_values() for record in records
+        ]
+
+        stmt = (
+            pg_insert(SQLEnhancement)
+            .on_conflict_do_nothing(constraint=SQLEnhancement.content_uniqueness_index)
+            .returning(SQLEnhancement.id)
+        )
+        try:
+            result = await self._session.execute(stmt, rows)
+        except IntegrityError as e:
+            raise SQLIntegrityError.from_sqlalchemy_integrity_error(
+                e, SQLEnhancement.__name__
+            ) from e
+        inserted = set(result.scalars().all())
+
+        await self._session.flush()
+        return inserted
+
+    @trace_repository_method(tracer)
+    async def get_unhashed_by_reference_ids(
+        self, reference_ids: Collection[UUID]
+    ) -> list[DomainEnhancement]:
+        """
+        Get enhancements on the given references that have no ``content_hash``.
+
+        These were stored before content hashes were recorded, so the database
+        can't detect duplicates of them.
+        """
+        if not reference_ids:
+            return []
+        query = select(SQLEnhancement).where(
+            SQLEnhancement.reference_id.in_(reference_ids),
+            SQLEnhancement.content_hash.is_(None),
+        )
+        result = await self._session.execute(query)
+        return [record.to_domain() for record in result.scalars().all()]
+
+    @trace_repository_method(tracer)
+    async def get_unhashed_page(
+        self, after_id: UUID | None, limit: int
+    ) -> list[DomainEnhancement]:
+        """
+        Get a page of enhancements that have no ``content_hash``, in ID order.
+
+        Args:
+            after_id (UUID | None): Only get enhancements with a greater ID.
+            limit (int): The maximum number of enhancements to get.
+
+        Returns:
+            list[DomainEnhancement]: The enhancements.
+
+        """
+        query = select(SQLEnhancement).where(SQLEnhancement.content_hash.is_(None))
+        if after_id is not None:
+            query = query.where(SQLEnhancement.id > after_id)
+        query = query.order_by(SQLEnhancement.id).limit(limit)
+        result = await self._session.execute(query)
+        return [record.to_domain() for record in result.scalars().all()]
+
+    @trace_repository_method(tracer)
+    async def set_content_hashes(self, content_hashes: Mapping[UUID, str]) -> int:
+        """
+        Record the ``content_hash`` of enhancements stored without one.
+
+        An enhancement is left without a hash if its reference already has another
+        with the same hash, as the two can't both hold it.
+
+        Args:
+            content_hashes (Mapping[UUID, str]): The hash of each enhancement, at
+                most one per reference and hash.
+
+        Returns:
+            int: The number of enhancements whose hash was recorded.
+
+        """
+        if not content_hashes:
+            return 0
+        hashes = (
+            func.unnest(
+                literal(list(content_hashes), ARRAY(SQL_UUID)),
+                literal(list(content_hashes.values()), ARRAY(String)),
+            )
+            .table_valued(column("id", SQL_UUID), column("content_hash", String))
+            .render_derived(name="hashes")
+        )
+        existing = aliased(SQLEnhancement)
+        stmt = (
+            update(SQLEnhancement)
+            .where(
+                SQLEnhancement.id == hashes.c.id,
+                SQLEnhancement.content_hash.is_(None),
+                ~exists().where(
+                    existing.reference_id == SQLEnhancement.reference_id,
+                    existing.content_hash == hashes.c.content_hash,
+                ),
+            )
+            # The enhancement's content is unchanged, so its timestamp is too.
+            .values(
+                content_hash=hashes.c.content_hash,
+                updated_at=SQLEnhancement.updated_at,
+            )
+            .returning(SQLEnhancement.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            result = await self._session.execute(stmt)
+        except IntegrityError as e:
+            raise SQLIntegrityError.from_sqlalchemy_integrity_error(
+                e, SQLEnhancement.__name__
+            ) from e
+        return len(result.scalars().all())
+
 
 class EnhancementRequestRepositoryBase(
     GenericAsyncRepository[DomainEnhancementRequest, GenericPersistenceType],
@@ -1107,6 +1364,103 @@ class RobotAutomationSQLRepository(
             SQLRobotAutomation,
         )
 
+    @trace_repository_method(tracer)
+    async def revise(self, automation: DomainRobotAutomation) -> DomainRobotAutomation:
+        """
+        Update an automation's robot and query, advancing its revision if changed.
+
+        The revision is advanced in the same statement, so concurrent updates each
+        take their own revision.
+
+        Args:
+            automation (DomainRobotAutomation): The automation to update.
+
+        Returns:
+            DomainRobotAutomation: The updated automation.
+
+        """
+        trace_attribute(Attributes.DB_PK, str(automation.id))
+        stmt = (
+            update(SQLRobotAutomation)
+            .where(SQLRobotAutomation.id == automation.id)
+            .values(
+                robot_id=automation.robot_id,
+                query=automation.query,
+                revision=case(
+                    (
+                        or_(
+                            SQLRobotAutomation.robot_id != automation.robot_id,
+                            SQLRobotAutomation.query != automation.query,
+                        ),
+                        SQLRobotAutomation.revision + 1,
+                    ),
+                    else_=SQLRobotAutomation.revision,
+                ),
+            )
+            .returning(SQLRobotAutomation)
+            .execution_options(populate_existing=True)
+        )
+        try:
+            result = await self._session.execute(stmt)
+        except IntegrityError as e:
+            raise SQLIntegrityError.from_sqlalchemy_integrity_error(
+                e, SQLRobotAutomation.__name__
+            ) from e
+        return result.scalar_one().to_domain()
+
+    @trace_repository_method(tracer)
+    async def advance_revision(
+        self, automation_id: UUID, revision: int
+    ) -> DomainRobotAutomation:
+        """
+        Advance an automation's revision to at least the given revision.
+
+        Args:
+            automation_id (UUID): The ID of the automation.
+            revision (int): The lowest revision the automation should have.
+
+        Returns:
+            DomainRobotAutomation: The automation with its advanced revision.
+
+        """
+        trace_attribute(Attributes.DB_PK, str(automation_id))
+        stmt = (
+            update(SQLRobotAutomation)
+            .where(SQLRobotAutomation.id == automation_id)
+            .values(revision=func.greatest(SQLRobotAutomation.revision, revision))
+            .returning(SQLRobotAutomation)
+            .execution_options(populate_existing=True)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one().to_domain()
+
+    @trace_repository_method(tracer)
+    async def get_fingerprint(self) -> str:
+        """
+        Get a fingerprint of the IDs and revisions of every automation.
+
+        The fingerprint changes whenever an automation is added, removed or revised,
+        so it identifies the current set of automations across processes.
+
+        Returns:
+            str: The fingerprint, empty if there are no automations.
+
+        """
+        stmt = select(
+            func.coalesce(
+                func.md5(
+                    func.string_agg(
+                        func.concat(
+                            SQLRobotAutomation.id, ":", SQLRobotAutomation.revision
+                        ),
+                        aggregate_order_by(literal(","), SQLRobotAutomation.id),
+                    )
+                ),
+                "",
+            )
+        )
+        return (await self._session.execute(stmt)).scalar_one()
+
 
 class RobotAutomationESRepository(
     GenericAsyncESRepository[DomainRobotAutomation, RobotAutomationPercolationDocument],
@@ -1126,52 +1480,83 @@ class RobotAutomationESRepository(
     async def percolate(
         self,
         percolatables: Sequence[ReferenceWithChangeset],
+        chunk_size: int | None = None,
+        automation_ids: Collection[UUID] | None = None,
     ) -> list[RobotAutomationPercolationResult]:
         """
         Percolate documents against the percolation queries in Elasticsearch.
 
+        The documents are split into multi-document percolate queries of
+        ``chunk_size`` documents, which are sent together in one multi search.
+
         :param percolatables: A list of percolatable domain objects.
         :type percolatables: list[ReferenceWithChangeset]
-        :return: The results of the percolation.
+        :param chunk_size: The number of documents per percolate query. Defaults
+            to the robot automation percolation chunk size.
+        :type chunk_size: int | None
+        :param automation_ids: Only percolate against these automations. Defaults
+            to every automation.
+        :type automation_ids: Collection[UUID] | None
+        :return: The results of the percolation, one per matching automation.
         :rtype: list[RobotAutomationPercolationResult]
         """
-        if not settings.feature_flags.enable_percolation:
+        if (
+            not settings.feature_flags.enable_percolation
+            or not percolatables
+            or (automation_ids is not None and not automation_ids)
+        ):
             return []
 
+        if chunk_size is None:
+            chunk_size = settings.es_percolation_chunk_size_override.get(
+                ESPercolationOperation.ROBOT_AUTOMATION,
+                settings.default_es_percolation_chunk_size,
+            )
         documents = [
             (
                 self._persistence_cls.percolatable_document_from_domain(percolatable)
             ).to_dict()
             for percolatable in percolatables
         ]
-        results = await (
-            self._persistence_cls.search()
-            .using(self._client)
-            .query(
+        multi_search = AsyncMultiSearch[RobotAutomationPercolationDocument](
+            index=self._persistence_cls.Index.name
+        ).using(self._client)
+        offsets = range(0, len(documents), chunk_size)
+        for offset in offsets:
+            search = self._persistence_cls.search().query(
                 {
                     "percolate": {
                         "field": "query",
-                        "documents": documents,
+                        "documents": documents[offset : offset + chunk_size],
                     }
                 }
             )
-            .execute()
-        )
-
-        robot_automation_percolation_results: list[
-            RobotAutomationPercolationResult
-        ] = []
-        for result in results:
-            matches: list[ReferenceWithChangeset] = [
-                percolatables[slot]
-                for slot in result.meta.fields["_percolator_document_slot"]
-            ]
-            robot_automation_percolation_results.append(
-                RobotAutomationPercolationResult(
-                    robot_id=result.robot_id,
-                    reference_ids={reference.id for reference in matches},
+            if automation_ids is not None:
+                search = search.filter(
+                    "ids",
+                    values=[str(automation_id) for automation_id in automation_ids],
+                )
+            multi_search = multi_search.add(
+                search
+                # Every matching automation, not just the first page of them.
+                .extra(size=_MAX_PERCOLATION_MATCHES).source(["robot_id"])
+            )
+        responses = await multi_search.execute()
+
+        reference_ids_by_robot: dict[UUID, set[UUID]] = defaultdict(set)
+        for offset, response in zip(offsets, responses, strict=True):
+            for result in response:
+                # Slots index the documents of this query, not of the whole batch.
+                reference_ids_by_robot[UUID(str(result.robot_id))].update(
+                    percolatables[offset + slot].id
+                    for slot in result.meta.fields["_percolator_document_slot"]
                 )
+        robot_automation_percolation_results = [
+            RobotAutomationPercolationResult(
+                robot_id=robot_id, reference_ids=reference_ids
             )
+            for robot_id, reference_ids in reference_ids_by_robot.items()
+        ]
 
         trace_attribute(Attributes.PERCOLATION_DOCUMENT_COUNT, len(documents))
         trace_attribute(
@@ -1181,6 +1566,112 @@ class RobotAutomationESRepository(
 
         return robot_automation_percolation_results
 
+    @trace_repository_method(tracer)
+    async def add(self, record: DomainRobotAutomation) -> DomainRobotAutomation:
+        """
+        Index an automation's percolator document, versioned with its revision.
+
+        A write of an older revision than the one already indexed is ignored.
+
+        :param record: The automation to index.
+        :type record: DomainRobotAutomation
+        :return: The automation.
+        :rtype: DomainRobotAutomation
+        """
+        es_record = self._persistence_cls.from_domain(record)
+        try:
+            await es_record.save(
+                using=self._client,
+                version=record.revision,
+                version_type=_AUTOMATION_VERSION_TYPE,
+            )
+        except ConflictError:
+            logger.info(
+                "Newer robot automation revision already indexed.",
+                robot_automation_id=str(record.id),
+                revision=record.revision,
+            )
+        except (BadRequestError, UnknownDslObject) as exc:
+            msg = f"Malformed Elasticsearch document: {record}. Error: {exc}."
+            raise ESMalformedDocumentError(msg) from exc
+        self._bump_generation()
+        return record
+
+    @trace_repository_method(tracer)
+    async def get_revisions(self) -> dict[UUID, int]:
+        """
+        Get the revision each indexed percolator document was written from.
+
+        :return: The indexed revisions, keyed by automation ID.
+        :rtype: dict[UUID, int]
+        """
+        return {
+            UUID(hit.meta.id): hit.meta.version
+            async for hit in self._persistence_cls.search(using=self._client)
+            .source(includes=[])
+            .extra(version=True)
+            .scan()
+        }
+
+    @trace_repository_method(tracer)
+    async def sync(
+        self,
+        automations: Sequence[DomainRobotAutomation],
+        indexed_revisions: Mapping[UUID, int],
+    ) -> int:
+        """
+        Index the automations revised since their documents were last indexed.
+
+        Stale documents are written in a single bulk request. Writes are version
+        checked, so one racing a newer revision leaves the newer one in place.
+
+        :param automations: The automations to sync.
+        :type automations: Sequence[DomainRobotAutomation]
+        :param indexed_revisions: The revisions currently indexed, as returned by
+            :meth:`get_revisions`.
+        :type indexed_revisions: Mapping[UUID, int]
+        :return: The number of documents written.
+        :rtype: int
+        """
+        stale = [
+            automation
+            for automation in automations
+            if automation.revision > indexed_revisions.get(automation.id, 0)
+        ]
+        trace_attribute(Attributes.DB_RECORD_COUNT, len(stale))
+        if not stale:
+            return 0
+
+        async def generate_actions() -> AsyncGenerator[dict[str, Any], None]:
+            for automation in stale:
+                yield {
+                    "_id": str(automation.id),
+                    "_version": automation.revision,
+                    "_version_type": _AUTOMATION_VERSION_TYPE,
+                    "_source": self._persistence_cls.from_domain(automation),
+                }
+
+        try:
+            _, errors = await self._persistence_cls.bulk(
+                generate_actions(), using=self._client, raise_on_error=False
+            )
+        finally:
+            self._bump_generation()
+
+        conflicts = 0
+        failures: list[dict[str, Any]] = []
+        for item in cast("list[dict[str, dict[str, Any]]]", errors):
+            error = item["index"]
+            if error["status"] == HTTPStatus.CONFLICT:
+                # A newer revision was indexed meanwhile.
+                conflicts += 1
+            else:
+                failures.append(error)
+        if failures:
+            msg = f"Failed to index robot automations: {failures}."
+            raise ESMalformedDocumentError(msg)
+        return len(stale) - conflicts
+
 
 class ReferenceDuplicateDecisionRepositoryBase(
     GenericAsyncRepository[DomainReferenceDuplicateDecision, GenericPersistenceType],
@@ -1435,13 +1926,31 @@ class PendingEnhancementSQLRepository(
             .on_conflict_do_nothing(
                 constraint=SQLPendingEnhancement.non_retry_uniqueness_index
             )
-            .returning(SQLPendingEnhancement.id)
+            .returning(SQLPendingEnhancement.robot_id)
         )
         result = await self._session.execute(stmt, rows)
-        inserted = len(result.all())
+        inserted = result.scalars().all()
 
         await self._session.flush()
-        return inserted
+        await self._notify_created(inserted)
+        return len(inserted)
+
+    @trace_repository_method(tracer)
+    async def add_bulk(
+        self, records: Collection[DomainPendingEnhancement]
+    ) -> list[DomainPendingEnhancement]:
+        """Add pending enhancements and notify their robots' waiting polls."""
+        added = await super().add_bulk(records)
+        await self._notify_created(record.robot_id for record in added)
+        return added
+
+    async def _notify_created(self, robot_ids: Iterable[UUID]) -> None:
+        """Wake polls waiting on the robots, once this transaction commits."""
+        await notify(
+            self._session,
+            PENDING_ENHANCEMENT_CREATED_CHANNEL,
+            {str(robot_id) for robot_id in robot_ids},
+        )
 
     @trace_repository_method(tracer)
     async def find_available_for_robot(
@@ -1470,72 +1979,52 @@ class PendingEnhancementSQLRepository(
         result = await self._session.execute(query)
         return [record.to_domain() for record in result.scalars().all()]
 
-    @trace_repository_method(tracer)
-    async def get_retry_depths(self, ids: list[UUID]) -> dict[UUID, int]:
-        """
-        Return the retry-chain depth for each given pending enhancement id.
-
-        Depth is the number of retries preceding a pending enhancement in its
-        ``retry_of`` chain (0 for an original, non-retry enhancement).
-
-        Args:
-            ids: Pending enhancement ids to compute depths for
-
-        Returns:
-            Mapping of id to retry depth
-
-        """
-        base = (
-            select(
-                SQLPendingEnhancement.id.label("seed_id"),
-                SQLPendingEnhancement.retry_of,
-                literal(0).label("depth"),
-            )
-            .where(self.any_of(SQLPendingEnhancement.id, ids))
-            .cte("retry_chain", recursive=True)
-        )
-        recursive = select(
-            base.c.seed_id,
-            SQLPendingEnhancement.retry_of,
-            (base.c.depth + 1).label("depth"),
-        ).join(
-            SQLPendingEnhancement,
-            SQLPendingEnhancement.id == base.c.retry_of,
-        )
-        chain = base.union_all(recursive)
-
-        query = select(chain.c.seed_id, func.max(chain.c.depth)).group_by(
-            chain.c.seed_id
-        )
-        result = await self._session.execute(query)
-        return dict(result.all())
-
     @trace_repository_method(tracer)
     async def expire_pending_enhancements_past_expiry(
         self,
         now: datetime.datetime,
         statuses: list[PendingEnhancementStatus],
+        limit: int,
     ) -> list[DomainPendingEnhancement]:
         """
-        Atomically find and expire pending enhancements past their expiry time.
+        Atomically find and expire a batch of pending enhancements past expiry.
 
         This method updates the status to EXPIRED and returns the expired records
-        in a single atomic operation to prevent race conditions in parallel execution.
+        in a single atomic operation. At most ``limit`` records are expired, those
+        whose leases lapsed first. Rows locked by a concurrent sweep are skipped
+        rather than waited on, so overlapping sweeps share out the work.
 
         Args:
             now: Current datetime to compare against expires_at
             statuses: List of statuses to filter by (e.g., PROCESSING)
+            limit: Maximum number of pending enhancements to expire
 
         Returns:
             List of pending enhancements that were expired
 
         """
-        stmt = (
-            update(SQLPendingEnhancement)
+        expiring = (
+            select(SQLPendingEnhancement.id)
             .where(
                 SQLPendingEnhancement.expires_at < now,
-                SQLPendingEnhancement.status.in_([status.value for status in statuses]),
+                # Inlined rather than bound, so that the planner can match the
+                # statuses against ix_pending_enhancement_lease_expiry's predicate.
+                SQLPendingEnhancement.status.in_(
+                    bindparam(
+                        "expiring_statuses",
+                        [status.value for status in statuses],
+                        expanding=True,
+                        literal_execute=True,
+                    )
+                ),
             )
+            .order_by(SQLPendingEnhancement.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(SQLPendingEnhancement)
+            .where(SQLPendingEnhancement.id.in_(expiring.scalar_subquery()))
             .values(status=PendingEnhancementStatus.EXPIRED.value)
             .returning(SQLPendingEnhancement)
         )
@@ -1571,3 +2060,43 @@ class RobotEnhancementBatchSQLRepository(
             DomainRobotEnhancementBatch,
             SQLRobotEnhancementBatch,
         )
+
+    @trace_repository_method(tracer)
+    async def find_prepared_for_robot(
+        self,
+        robot_id: UUID,
+    ) -> DomainRobotEnhancementBatch | None:
+        """
+        Find the oldest prepared, unclaimed batch for a robot, locking it.
+
+        Uses SELECT ... FOR UPDATE SKIP LOCKED so that concurrent polls each claim
+        a different batch, rather than waiting on one another.
+        """
+        query = (
+            select(SQLRobotEnhancementBatch)
+            .where(
+                SQLRobotEnhancementBatch.robot_id == robot_id,
+                SQLRobotEnhancementBatch.claimed_at.is_(None),
+            )
+            .order_by(SQLRobotEnhancementBatch.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .options(
+                *self._get_relationship_loads(
+                    ["pending_enhancements"], force_selectin=True
+                )
+            )
+        )
+        result = await self._session.execute(query)
+        record = result.scalars().first()
+        return record.to_domain(preload=["pending_enhancements"]) if record else None
+
+    @trace_repository_method(tracer)
+    async def count_prepared_for_robot(self, robot_id: UUID) -> int:
+        """Count the prepared, unclaimed batches for a robot."""
+        query = select(func.count()).where(
+            SQLRobotEnhancementBatch.robot_id == robot_id,
+            SQLRobotEnhancementBatch.claimed_at.is_(None),
+        )
+        result = await self._session.execute(query)
+        return result.scalar_one()
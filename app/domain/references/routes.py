@@ -9,7 +9,7 @@
 """Router for handling management of references."""
 
 import datetime
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterable, Awaitable, Callable
 from typing import Annotated, Any
 
 import destiny_sdk
@@ -86,6 +86,7 @@ from app.domain.references.services.export_service import (
 )
 from app.domain.references.services.search_service import SearchService
 from app.domain.references.tasks import (
+    prepare_robot_enhancement_batch,
     run_reference_export_task,
     run_search_enhancement_request_task,
     run_search_export_task,
@@ -95,9 +96,11 @@ from app.domain.robots.service import RobotService
 from app.domain.robots.services.anti_corruption_service import (
     RobotAntiCorruptionService,
 )
+from app.persistence.blob.models import ContentEncoding
 from app.persistence.blob.repository import BlobRepository
 from app.persistence.es.client import get_client
 from app.persistence.es.uow import AsyncESUnitOfWork
+from app.persistence.sql.notifications import get_pending_enhancement_listener
 from app.persistence.sql.session import get_session
 from app.persistence.sql.uow import AsyncSqlUnitOfWork
 from app.utils.time_and_date import utc_now
@@ -129,7 +132,10 @@ def reference_anti_corruption_service(
     blob_repository: Annotated[BlobRepository, Depends(blob_repository)],
 ) -> ReferenceAntiCorruptionService:
     """Return the reference anti-corruption service."""
-    return ReferenceAntiCorruptionService(sign_url=blob_repository.get_signed_url)
+    return ReferenceAntiCorruptionService(
+        sign_url=blob_repository.get_signed_url,
+        sign_urls=blob_repository.get_signed_urls,
+    )
 
 
 def robot_anti_corruption_service() -> RobotAntiCorruptionService:
@@ -567,6 +573,7 @@ SortParam = Annotated[
 @search_router.get(
     "/",
     status_code=status.HTTP_200_OK,
+    response_model=destiny_sdk.references.ReferenceSearchResult,
     responses={
         status.HTTP_400_BAD_REQUEST: {
             "description": "Bad Query String",
@@ -581,7 +588,9 @@ SortParam = Annotated[
     "search over fields on the root level of the Reference document.\n\n"
     "A natural limit of 10,000 results is imposed. You cannot page beyond this limit, "
     "and if a query would return more than 10,000 results the total count is listed as "
-    ">10,000.",
+    ">10,000.\n\n"
+    "References are served from a snapshot taken when they were last indexed. Pass "
+    "`hydrate=true` to read them from the database instead.",
 )
 async def search_references(
     reference_service: Annotated[ReferenceService, Depends(reference_service)],
@@ -602,13 +611,33 @@ async def search_references(
             "Each page contains 20 results.",
         ),
     ] = 1,
-) -> destiny_sdk.references.ReferenceSearchResult:
+    *,
+    hydrate: Annotated[
+        bool,
+        Query(
+            description="Read each reference from the database rather than serving "
+            "the snapshot stored in the search index. Slower, but reflects writes "
+            "not yet indexed.",
+        ),
+    ] = False,
+) -> destiny_sdk.references.ReferenceSearchResult | Response:
     """Search for references given a query string."""
     search_result = await reference_service.search_references(
         query,
         page=page,
         sort=sort,
+        with_payload=not hydrate,
     )
+    if not hydrate:
+        return Response(
+            content=anti_corruption_service.reference_search_result_to_sdk_json(
+                search_result,
+                await reference_service.render_search_hits(
+                    search_result, access_control_service
+                ),
+            ),
+            media_type="application/json",
+        )
     references = (
         await reference_service.get_deduplicated_references(
             [hit.id for hit in search_result.hits]
@@ -840,9 +869,10 @@ async def _enqueue_export_task(
     status_code=status.HTTP_202_ACCEPTED,
     description=(
         "Queue an export job that produces a file of references matching the given "
-        "search, in JSONL (default) or RIS via the `export_format` parameter. "
-        "Accepts the same filter parameters as `/references/search/` without "
-        "pagination. Returns the job id with `status: pending`; poll "
+        "search, in JSONL (default), RIS or Parquet via the `export_format` "
+        "parameter, optionally gzip or zstd compressed via the `compression` "
+        "parameter. Accepts the same filter parameters as `/references/search/` "
+        "without pagination. Returns the job id with `status: pending`; poll "
         "`GET /references/search/exports/{id}/` until the job completes."
     ),
 )
@@ -857,12 +887,14 @@ async def request_search_export(
     query: Annotated[SearchQuery, Depends(parse_search_query)],
     sort: SortParam = None,
     export_format: ExportFormat = ExportFormat.JSONL,
+    compression: ContentEncoding | None = None,
 ) -> destiny_sdk.references.SearchExportRead:
     """Queue a search export job and return its id and pending status."""
     search_export = await search_export_service.request_search_export(
         query,
         sort=sort,
         export_format=export_format,
+        compression=compression,
     )
     await _enqueue_export_task(
         task=run_search_export_task,
@@ -881,11 +913,9 @@ async def request_search_export(
     description=(
         "Get the status of a search export job. Once `status` is "
         "`completed`, the response includes a signed `result_url` for the "
-        "produced export file, and `truncated: true` if the matching set "
-        f"exceeded the {SearchService.MAX_RESULT_WINDOW:,}-result cap (the "
-        f"file contains only the first {SearchService.MAX_RESULT_WINDOW:,} "
-        "matches). The URL is re-signed on each call, so an expired URL can "
-        "be refreshed by polling again."
+        "produced export file, which contains every matching reference. The "
+        "URL is re-signed on each call, so an expired URL can be refreshed by "
+        "polling again."
     ),
 )
 async def get_search_export(
@@ -909,7 +939,8 @@ async def get_search_export(
     status_code=status.HTTP_202_ACCEPTED,
     description=(
         "Queue an export job that produces a file of the given references, in JSONL "
-        "(default) or RIS via the `export_format` parameter. Accepts an explicit list "
+        "(default), RIS or Parquet via the `export_format` parameter, optionally gzip "
+        "or zstd compressed via the `compression` parameter. Accepts an explicit list "
         f"of reference IDs (at most {settings.max_reference_export_size:,}). Requests "
         "that are empty, exceed the limit, or name references that do not exist are "
         "rejected. Returns the job id with `status: pending`; poll "
@@ -933,11 +964,13 @@ async def request_reference_export(
     ],
     entitlements: Annotated[frozenset[Entitlement], Depends(reference_reader_auth)],
     export_format: ExportFormat = ExportFormat.JSONL,
+    compression: ContentEncoding | None = None,
 ) -> destiny_sdk.references.ReferenceExportRead:
     """Queue a reference export job and return its id and pending status."""
     reference_export = await reference_export_service.request_reference_export(
         reference_ids,
         export_format=export_format,
+        compression=compression,
     )
     await _enqueue_export_task(
         task=run_reference_export_task,
@@ -1071,6 +1104,62 @@ async def lookup_references(
     ]
 
 
+def parse_bulk_identifiers(
+    lookup_request: destiny_sdk.references.ReferenceLookupRequest,
+) -> list[destiny_sdk.identifiers.IdentifierLookup]:
+    """
+    Parse the identifiers of a bulk lookup request into IdentifierLookup objects.
+
+    This is a dependency rather than part of the route so that invalid requests
+    are rejected before the response starts streaming.
+    """
+    if len(lookup_request.identifiers) > settings.max_bulk_lookup_identifiers:
+        raise ParseError(
+            detail=(
+                "Too many identifiers: at most "
+                f"{settings.max_bulk_lookup_identifiers} may be looked up at once."
+            )
+        )
+    try:
+        return [
+            destiny_sdk.identifiers.IdentifierLookup.parse(identifier_string)
+            for identifier_string in lookup_request.identifiers
+        ]
+    except ValueError as exc:
+        raise ParseError(detail=str(exc)) from exc
+
+
+@reference_router.post("/lookup/")
+@experimental
+async def bulk_lookup_references(
+    reference_service: Annotated[ReferenceService, Depends(reference_service)],
+    anti_corruption_service: Annotated[
+        ReferenceAntiCorruptionService, Depends(reference_anti_corruption_service)
+    ],
+    access_control_service: Annotated[
+        ReferenceAccessControlService, Depends(reference_reader_access_control_service)
+    ],
+    identifiers: Annotated[
+        list[destiny_sdk.identifiers.IdentifierLookup], Depends(parse_bulk_identifiers)
+    ],
+) -> AsyncIterable[destiny_sdk.references.ReferenceLookupResult]:
+    """
+    Look up references for many identifiers, streaming one JSON line per result.
+
+    Results are in the order of the given identifiers. An identifier matching no
+    reference yields a single result with a null reference; one carried by several
+    references yields a result for each.
+    """
+    async for identifier, reference in reference_service.lookup_references_in_bulk(
+        anti_corruption_service.identifier_lookups_from_sdk(identifiers),
+        chunk_size=settings.bulk_lookup_chunk_size,
+    ):
+        yield await anti_corruption_service.reference_lookup_result_to_sdk(
+            identifier,
+            access_control_service.redact_reference(reference) if reference else None,
+        )
+
+
 @enhancement_request_automation_router.post(
     path="/", status_code=status.HTTP_201_CREATED
 )
@@ -1164,11 +1253,29 @@ async def request_robot_enhancement_batch(
             "provided in ISO 8601 duration format.",
         ),
     ] = settings.default_pending_enhancement_lease_duration,
+    compression: Annotated[
+        ContentEncoding | None,
+        Query(
+            description="The compression to apply to the batch's reference data "
+            "file, if any. Compressed files are suffixed with the encoding.",
+        ),
+    ] = None,
+    wait: Annotated[
+        datetime.timedelta,
+        Query(
+            description="How long to wait for pending enhancements to arrive if "
+            "none are available, provided in ISO 8601 duration format. The "
+            "request returns as soon as a batch can be claimed, or empty once "
+            "this has passed. Capped by the repository's configured maximum.",
+        ),
+    ] = datetime.timedelta(0),
 ) -> destiny_sdk.robots.RobotEnhancementBatch | Response:
     """
     Request a batch of references to enhance.
 
-    This endpoint is used by robots to poll for new enhancement requests.
+    This endpoint is used by robots to poll for new enhancement requests. With
+    ``wait``, it long-polls: the request is held until pending enhancements are
+    created for the robot, rather than the robot polling again and again.
     """
     if limit > settings.max_pending_enhancements_batch_size:
         limit = settings.max_pending_enhancements_batch_size
@@ -1177,19 +1284,52 @@ async def request_robot_enhancement_batch(
             "Using max_pending_enhancements_batch_size: %d",
             limit,
         )
-    robot_enhancement_batch = (
-        await reference_service.claim_and_create_robot_enhancement_batch(
-            robot_id=robot_id,
-            limit=limit,
-            lease_duration=lease,
-            blob_repository=blob_repository,
-            access_control_service=access_control_service,
+    wait = min(wait, settings.max_robot_enhancement_batch_wait)
+    if wait > datetime.timedelta(0):
+        robot_enhancement_batch = (
+            await reference_service.wait_for_robot_enhancement_batch(
+                robot_id=robot_id,
+                limit=limit,
+                lease_duration=lease,
+                blob_repository=blob_repository,
+                access_control_service=access_control_service,
+                wait=wait,
+                listener=get_pending_enhancement_listener(),
+                compression=compression,
+            )
+        )
+    else:
+        robot_enhancement_batch = (
+            await reference_service.claim_and_create_robot_enhancement_batch(
+                robot_id=robot_id,
+                limit=limit,
+                lease_duration=lease,
+                blob_repository=blob_repository,
+                access_control_service=access_control_service,
+                compression=compression,
+            )
         )
-    )
 
     if not robot_enhancement_batch:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
+    if settings.prepared_robot_enhancement_batches:
+        # Build the robot's next batch while it works on this one. A poll that
+        # finds nothing prepared builds its own, so this is best-effort.
+        try:
+            await queue_task_with_trace(
+                prepare_robot_enhancement_batch,
+                robot_id=robot_id,
+                limit=limit,
+                compression=compression,
+                otel_enabled=settings.otel_enabled,
+            )
+        except Exception:
+            logger.exception(
+                "Failed to enqueue robot enhancement batch preparation",
+                robot_id=str(robot_id),
+            )
+
     return await anti_corruption_service.robot_enhancement_batch_to_sdk_robot(
         robot_enhancement_batch
     )
@@ -1,9 +1,18 @@
 """The service for interacting with and managing references."""
 
+import asyncio
 import contextlib
 import datetime
 from collections import defaultdict
-from collections.abc import Collection, Iterable, Sequence
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    Collection,
+    Iterable,
+    Mapping,
+    Sequence,
+)
+from functools import partial
 from uuid import UUID
 
 from opentelemetry.trace import get_tracer
@@ -14,6 +23,7 @@ from app.core.config import (
     get_settings,
 )
 from app.core.exceptions import (
+    DestinyRepositoryError,
     DuplicateEnhancementError,
     FullTextIngestionError,
     InvalidParentEnhancementError,
@@ -22,7 +32,7 @@ from app.core.exceptions import (
 )
 from app.core.telemetry.attributes import Attributes, trace_attribute
 from app.core.telemetry.logger import get_logger
-from app.core.telemetry.taskiq import queue_task_with_trace
+from app.core.telemetry.taskiq import TaskBatch, queue_task_with_trace
 from app.domain.references.models.models import (
     CandidateSelectionRequest,
     CandidateSelectionResult,
@@ -44,15 +54,19 @@ from app.domain.references.models.models import (
     Reference,
     ReferenceDuplicateDecision,
     ReferenceIds,
+    ReferenceSearchProjection,
     ReferenceWithChangeset,
     RobotAutomation,
     RobotAutomationPercolationResult,
     RobotEnhancementBatch,
     SearchQuery,
 )
+from app.domain.references.models.parquet import ParquetExportWriter, ParquetRecord
 from app.domain.references.models.projections import (
     DeduplicatedReferenceProjection,
+    ReferenceParquetProjection,
     ReferenceRisProjection,
+    ReferenceSearchFieldsProjection,
 )
 from app.domain.references.models.validators import ReferenceCreateResult
 from app.domain.references.repository import (
@@ -71,9 +85,16 @@ from app.domain.references.services.enhancement_service import (
     EnhancementService,
     ProcessedResults,
 )
+from app.domain.references.services.linked_data_projection_service import (
+    get_linked_data_projection_service,
+)
 from app.domain.references.services.linked_data_validation_service import (
     LinkedDataValidationService,
 )
+from app.domain.references.services.robot_automation_matcher import (
+    RobotAutomationMatcherCache,
+    get_robot_automation_matcher_cache,
+)
 from app.domain.references.services.search_service import SearchService
 from app.domain.references.services.synchronizer_service import (
     Synchronizer,
@@ -81,7 +102,7 @@ from app.domain.references.services.synchronizer_service import (
 from app.domain.robots.service import RobotService
 from app.domain.service import GenericService
 from app.external.vocabulary.client import get_vocabulary_artifact_client
-from app.persistence.blob.models import BlobStorageFile
+from app.persistence.blob.models import BlobStorageFile, ContentEncoding
 from app.persistence.blob.repository import BlobRepository
 from app.persistence.blob.stream import FileStream
 from app.persistence.es.persistence import (
@@ -91,11 +112,13 @@ from app.persistence.es.persistence import (
 )
 from app.persistence.es.uow import AsyncESUnitOfWork
 from app.persistence.es.uow import unit_of_work as es_unit_of_work
+from app.persistence.sql.notifications import NotificationListener
 from app.persistence.sql.uow import AsyncSqlUnitOfWork
+from app.persistence.sql.uow import generator_unit_of_work as sql_generator_unit_of_work
 from app.persistence.sql.uow import unit_of_work as sql_unit_of_work
 from app.utils.aio import prefetch
 from app.utils.lists import list_chunker
-from app.utils.time_and_date import apply_positive_timedelta
+from app.utils.time_and_date import apply_positive_timedelta, utc_now
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -110,9 +133,13 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         anti_corruption_service: ReferenceAntiCorruptionService,
         sql_uow: AsyncSqlUnitOfWork,
         es_uow: AsyncESUnitOfWork,
+        robot_automation_matcher_cache: RobotAutomationMatcherCache | None = None,
     ) -> None:
         """Initialize the service with a unit of work."""
         super().__init__(anti_corruption_service, sql_uow, es_uow)
+        self._robot_automation_matcher_cache = (
+            robot_automation_matcher_cache or get_robot_automation_matcher_cache()
+        )
         self._linked_data_validation_service = LinkedDataValidationService(
             vocab_client=get_vocabulary_artifact_client()
         )
@@ -123,7 +150,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             anti_corruption_service, sql_uow, es_uow
         )
         self._search_service = SearchService(anti_corruption_service, sql_uow, es_uow)
-        self._synchronizer = Synchronizer(sql_uow, es_uow)
+        self._synchronizer = Synchronizer(sql_uow, es_uow, anti_corruption_service)
 
     @sql_unit_of_work
     async def get_reference(self, reference_id: UUID) -> Reference:
@@ -207,6 +234,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         path: str,
         filename: str,
         chunk_size: int,
+        compression: ContentEncoding | None = None,
     ) -> tuple[BlobStorageFile, int]:
         """
         Stream deduplicated, redacted references to blob storage in the given format.
@@ -215,34 +243,133 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         undecorated), so the caller's ``@sql_unit_of_work`` method owns the
         transaction spanning the whole stream.
         """
-        file_stream = FileStream(
-            self._serialize_references,
-            [
-                {
-                    "reference_ids": chunk,
-                    "export_format": export_format,
-                    "access_control_service": access_control_service,
-                }
-                for chunk in list_chunker(reference_ids, chunk_size)
-            ],
-        )
-        result_file = await blob_repository.upload_file_to_blob_storage(
-            content=file_stream,
+
+        async def _chunks() -> AsyncGenerator[list[UUID], None]:
+            for chunk in list_chunker(reference_ids, chunk_size):
+                yield chunk
+
+        result_file, _ = await self.stream_reference_pages_to_blob(
+            reference_id_pages=_chunks(),
+            export_format=export_format,
+            access_control_service=access_control_service,
+            blob_repository=blob_repository,
             path=path,
             filename=filename,
+            compression=compression,
         )
         return result_file, len(reference_ids)
 
-    async def _serialize_references(
+    async def stream_reference_pages_to_blob(  # noqa: PLR0913
         self,
-        reference_ids: list[UUID],
+        *,
+        reference_id_pages: AsyncIterable[Sequence[UUID]],
         export_format: ExportFormat,
         access_control_service: ReferenceAccessControlService,
-    ) -> list[str]:
-        """Fetch, redact and serialize one chunk of references."""
+        blob_repository: BlobRepository,
+        path: str,
+        filename: str,
+        compression: ContentEncoding | None = None,
+    ) -> tuple[BlobStorageFile, int]:
+        """
+        Stream references to blob storage as their IDs arrive, a page at a time.
+
+        Hydrating, serializing and uploading run as a pipeline: while one page is
+        uploaded the next is serialized, and up to ``upload_file_prefetch_chunks``
+        pages beyond that are hydrated from the database. Output keeps the order
+        of the pages, and memory is bounded by the pipeline's depth rather than
+        the number of references. Like :meth:`stream_references_to_blob`, this
+        rides the caller's active SQL unit of work, which only the hydration stage
+        uses.
+
+        Parquet exports write each page as a row group, in a worker thread, and
+        finish the file with its footer once the pages are exhausted.
+
+        :param reference_id_pages: The reference IDs to export, in file order.
+        :type reference_id_pages: AsyncIterable[Sequence[UUID]]
+        :param compression: The compression to apply to the file, if any. The
+            uploaded file's name is suffixed with the encoding.
+        :type compression: ContentEncoding | None
+        :return: The uploaded file and the number of references streamed into it.
+        :rtype: tuple[BlobStorageFile, int]
+        """
+        n_references = 0
+
+        async def _hydrated_pages() -> AsyncGenerator[list[Reference], None]:
+            nonlocal n_references
+            async for reference_ids in reference_id_pages:
+                if not reference_ids:
+                    continue
+                n_references += len(reference_ids)
+                yield await self._get_deduplicated_references(
+                    reference_ids=list(reference_ids)
+                )
+
+        async def _serialized_pages() -> AsyncGenerator[list[str] | bytes, None]:
+            async with contextlib.aclosing(
+                prefetch(_hydrated_pages(), depth=settings.upload_file_prefetch_chunks)
+            ) as pages:
+                if export_format == ExportFormat.PARQUET:
+                    writer = ParquetExportWriter()
+                    async for references in pages:
+                        records = await self._project_parquet_records(
+                            references, access_control_service
+                        )
+                        yield await asyncio.to_thread(writer.write_row_group, records)
+                    yield await asyncio.to_thread(writer.close)
+                    return
+                async for references in pages:
+                    yield await self._serialize_references(
+                        references, export_format, access_control_service
+                    )
+
+        async with contextlib.aclosing(prefetch(_serialized_pages())) as serialized:
+            result_file = await blob_repository.upload_file_to_blob_storage(
+                content=FileStream(generator=serialized, compression=compression),
+                path=path,
+                filename=filename,
+            )
+        return result_file, n_references
+
+    async def serialize_reference_page(
+        self,
+        *,
+        reference_ids: Sequence[UUID],
+        export_format: ExportFormat,
+        access_control_service: ReferenceAccessControlService,
+    ) -> bytes:
+        """
+        Hydrate, redact and serialize one page of references into a file chunk.
+
+        Chunks of a concatenable format can be written independently and joined
+        into a file, e.g. to upload a file a resumable block at a time. Like
+        :meth:`stream_references_to_blob`, this rides the caller's active SQL
+        unit of work.
+
+        :param reference_ids: The references to serialize, in file order.
+        :type reference_ids: Sequence[UUID]
+        :param export_format: The format to serialize to. Must be concatenable.
+        :type export_format: ExportFormat
+        :return: The serialized chunk, one record per line.
+        :rtype: bytes
+        """
+        if not export_format.concatenable:
+            msg = f"Export format {export_format!r} cannot be written in chunks."
+            raise NotImplementedError(msg)
         references = await self._get_deduplicated_references(
-            reference_ids=reference_ids
+            reference_ids=list(reference_ids)
+        )
+        records = await self._serialize_references(
+            references, export_format, access_control_service
         )
+        return "".join(f"{record}\n" for record in records).encode("utf-8")
+
+    async def _serialize_references(
+        self,
+        references: list[Reference],
+        export_format: ExportFormat,
+        access_control_service: ReferenceAccessControlService,
+    ) -> list[str]:
+        """Redact and serialize one chunk of references."""
         return [
             await self._serialize_reference(
                 access_control_service.redact_reference(reference), export_format
@@ -250,6 +377,30 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             for reference in references
         ]
 
+    async def _project_parquet_records(
+        self,
+        references: list[Reference],
+        access_control_service: ReferenceAccessControlService,
+    ) -> list[ParquetRecord]:
+        """Redact and flatten one chunk of references into Parquet rows."""
+        records = []
+        for reference in references:
+            redacted = access_control_service.redact_reference(reference)
+            linked_data_content = ReferenceSearchFieldsProjection.get_from_reference(
+                redacted
+            ).linked_data_content
+            linked_data_projection = None
+            if linked_data_content is not None:
+                linked_data_projection = await (
+                    get_linked_data_projection_service().project(linked_data_content)
+                )
+            records.append(
+                ReferenceParquetProjection.get_from_reference(
+                    redacted, linked_data_projection
+                )
+            )
+        return records
+
     async def _serialize_reference(
         self, reference: RedactedReference, export_format: ExportFormat
     ) -> str:
@@ -418,54 +569,153 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         """Persist a reference."""
         return await self._merge_reference(reference)
 
-    async def _add_enhancement(self, enhancement: Enhancement) -> Reference:
+    async def _insert_enhancements(
+        self, enhancements: list[Enhancement]
+    ) -> list[DestinyRepositoryError | None]:
         """
-        Add an enhancement to a reference.
-
-        :param enhancement: The enhancement to add
-        :type enhancement: Enhancement
+        Add enhancements to their references in bulk.
+
+        The enhancements are inserted on their own rather than by merging the
+        reference aggregates, with exact duplicates detected by the database on
+        ``content_hash``. Each enhancement's outcome is returned rather than
+        raised so that one bad enhancement doesn't fail the others:
+
+        - ``SQLNotFoundError`` if the reference does not exist.
+        - ``InvalidParentEnhancementError`` if a parent enhancement does not exist
+          or belongs to another reference tree.
+        - ``DuplicateEnhancementError`` if an exact duplicate enhancement already
+          exists on the reference.
+
+        :param enhancements: The enhancements to add
+        :type enhancements: list[Enhancement]
+        :return: The error preventing each enhancement being added, or ``None``
+            if it was added, in the order given.
+        :rtype: list[DestinyRepositoryError | None]
         """
-        reference = await self.sql_uow.references.get_by_pk(
-            enhancement.reference_id,
-            preload=["enhancements", "identifiers", "duplicate_references"],
+        references = {
+            reference.id: reference
+            for reference in await self.sql_uow.references.get_by_pks(
+                {enhancement.reference_id for enhancement in enhancements},
+                preload=(
+                    ["duplicate_references"]
+                    if any(enhancement.derived_from for enhancement in enhancements)
+                    else None
+                ),
+                fail_on_missing=False,
+            )
+        }
+        parent_ids = {
+            parent_id
+            for enhancement in enhancements
+            for parent_id in enhancement.derived_from or []
+        }
+        parents = (
+            {
+                parent.id: parent
+                for parent in await self.sql_uow.enhancements.get_by_pks(
+                    parent_ids, fail_on_missing=False
+                )
+            }
+            if parent_ids
+            else {}
         )
-
-        incoming_enhancement_hash = enhancement.hash_data()
-        for existing_enhancement in reference.enhancements or []:
-            if existing_enhancement.hash_data() == incoming_enhancement_hash:
-                detail = (
-                    "An exact duplicate enhancement already exists on this reference."
+        # Enhancements stored before content hashes were recorded are compared here.
+        unhashed = (
+            {
+                (existing.reference_id, existing.content_hash)
+                for existing in (
+                    await self.sql_uow.enhancements.get_unhashed_by_reference_ids(
+                        list(references)
+                    )
                 )
-                raise DuplicateEnhancementError(detail)
+            }
+            if references
+            else set()
+        )
 
-        if enhancement.derived_from:
-            valid_derived_reference_ids = {
-                ref.id for ref in reference.duplicate_references or []
-            } | {reference.id}
-            try:
-                parent_enhancements = await self.sql_uow.enhancements.get_by_pks(
-                    enhancement.derived_from
+        duplicate_detail = (
+            "An exact duplicate enhancement already exists on this reference."
+        )
+        errors: list[DestinyRepositoryError | None] = []
+        for enhancement in enhancements:
+            reference = references.get(enhancement.reference_id)
+            if not reference:
+                errors.append(
+                    SQLNotFoundError(
+                        detail=(
+                            f"Unable to find Reference with pk "
+                            f"{enhancement.reference_id}"
+                        ),
+                        lookup_model="Reference",
+                        lookup_type="id",
+                        lookup_value=enhancement.reference_id,
+                    )
                 )
-                if not all(
-                    e.reference_id in valid_derived_reference_ids
-                    for e in parent_enhancements
-                ):
-                    detail = (
+            elif missing_parent_ids := [
+                parent_id
+                for parent_id in enhancement.derived_from or []
+                if parent_id not in parents
+            ]:
+                errors.append(
+                    InvalidParentEnhancementError(
+                        f"Enhancements with ids {missing_parent_ids} do not exist."
+                    )
+                )
+            elif not all(
+                parents[parent_id].reference_id
+                in {ref.id for ref in reference.duplicate_references or []}
+                | {reference.id}
+                for parent_id in enhancement.derived_from or []
+            ):
+                errors.append(
+                    InvalidParentEnhancementError(
                         "All parent enhancements must belong to the same reference "
                         "tree as the child enhancement."
                     )
-                    raise InvalidParentEnhancementError(detail)
-            except SQLNotFoundError as e:
-                detail = f"Enhancements with ids {e.lookup_value} do not exist."
-                raise InvalidParentEnhancementError(detail) from e
+                )
+            elif (enhancement.reference_id, enhancement.content_hash) in unhashed:
+                errors.append(DuplicateEnhancementError(duplicate_detail))
+            else:
+                errors.append(None)
+
+        to_insert = [
+            enhancement
+            for enhancement, error in zip(enhancements, errors, strict=True)
+            if error is None
+        ]
+        inserted_ids = (
+            await self.sql_uow.enhancements.add_bulk_ignore_duplicates(to_insert)
+            if to_insert
+            else set()
+        )
+        return [
+            DuplicateEnhancementError(duplicate_detail)
+            if error is None and enhancement.id not in inserted_ids
+            else error
+            for enhancement, error in zip(enhancements, errors, strict=True)
+        ]
+
+    async def _add_enhancement(self, enhancement: Enhancement) -> Enhancement:
+        """
+        Add an enhancement to a reference.
 
-        # This uses SQLAlchemy to treat References as an aggregate of enhancements.
-        # All considered this is a naive implementation, but it works for now.
-        reference.enhancements = [*(reference.enhancements or []), *[enhancement]]
-        return await self.sql_uow.references.merge(reference)
+        :param enhancement: The enhancement to add
+        :type enhancement: Enhancement
+        :raises SQLNotFoundError: if the reference does not exist.
+        :raises InvalidParentEnhancementError: if a parent enhancement does not
+            exist or belongs to another reference tree.
+        :raises DuplicateEnhancementError: if an exact duplicate enhancement
+            already exists on the reference.
+        :return: The added enhancement.
+        :rtype: Enhancement
+        """
+        (error,) = await self._insert_enhancements([enhancement])
+        if error:
+            raise error
+        return enhancement
 
     @sql_unit_of_work
-    async def add_enhancement(self, enhancement: Enhancement) -> Reference:
+    async def add_enhancement(self, enhancement: Enhancement) -> Enhancement:
         """Add an enhancement to a reference."""
         return await self._add_enhancement(enhancement)
 
@@ -536,6 +786,121 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         # Filter again in case multiple duplicates pointed to same canonical
         return list({reference.id: reference for reference in references}.values())
 
+    @sql_generator_unit_of_work
+    async def lookup_references_in_bulk(
+        self, identifiers: Sequence[IdentifierLookup], chunk_size: int
+    ) -> AsyncGenerator[tuple[IdentifierLookup, Reference | None], None]:
+        """
+        Look up the deduplicated canonical references for many identifiers.
+
+        External identifiers are all resolved to reference IDs by a single query;
+        the references themselves are then hydrated a chunk of identifiers at a
+        time, so results can be streamed out while later chunks are still loading.
+
+        :param identifiers: The identifiers to look up.
+        :type identifiers: Sequence[IdentifierLookup]
+        :param chunk_size: The number of identifiers to hydrate together.
+        :type chunk_size: int
+        :return: For each identifier, in order, one pair per distinct canonical
+            reference carrying it, or a single pair with ``None`` if no reference
+            does.
+        :rtype: AsyncGenerator[tuple[IdentifierLookup, Reference | None], None]
+        """
+        resolved = iter(
+            await self.sql_uow.references.resolve_identifiers(
+                [identifier for identifier in identifiers if identifier.identifier_type]
+            )
+        )
+        candidates = [
+            next(resolved)
+            if identifier.identifier_type
+            else [UUID(identifier.identifier)]
+            for identifier in identifiers
+        ]
+
+        for chunk in list_chunker(
+            list(zip(identifiers, candidates, strict=True)), chunk_size
+        ):
+            canonical_references = (
+                await self._get_deduplicated_canonical_references_by_id(
+                    {reference_id for _, ids in chunk for reference_id in ids}
+                )
+            )
+            for identifier, reference_ids in chunk:
+                references = {
+                    canonical_references[reference_id].id: canonical_references[
+                        reference_id
+                    ]
+                    for reference_id in reference_ids
+                    if reference_id in canonical_references
+                }
+                if not references:
+                    yield identifier, None
+                for reference in references.values():
+                    yield identifier, reference
+
+    async def _get_deduplicated_canonical_references_by_id(
+        self, reference_ids: Collection[UUID]
+    ) -> dict[UUID, Reference]:
+        """
+        Map reference IDs to the deduplicated views of their canonical references.
+
+        IDs that do not exist are omitted rather than raising.
+
+        :param reference_ids: The IDs of the references to resolve.
+        :type reference_ids: Collection[UUID]
+        :return: The deduplicated canonical reference for each existing ID.
+        :rtype: dict[UUID, Reference]
+        """
+        if not reference_ids:
+            return {}
+
+        references = await self.sql_uow.references.get_by_pks(
+            reference_ids,
+            preload=[
+                "identifiers",
+                "enhancements",
+                "duplicate_decision",
+                "duplicate_references",
+            ],
+            fail_on_missing=False,
+        )
+
+        canonical_ids: dict[UUID, UUID] = {}
+        for reference in references:
+            if reference.is_canonical_like:
+                canonical_ids[reference.id] = reference.id
+                continue
+            if (
+                not reference.duplicate_decision
+                or not reference.duplicate_decision.canonical_reference_id
+            ):
+                msg = (
+                    "Reference is not canonical but has no canonical reference id. "
+                    "This should not happen."
+                )
+                raise RuntimeError(msg)
+            canonical_ids[reference.id] = (
+                reference.duplicate_decision.canonical_reference_id
+            )
+
+        loaded = [reference for reference in references if reference.is_canonical_like]
+        deduplicated = (
+            await self._get_deduplicated_references(references=loaded) if loaded else []
+        )
+        unloaded = set(canonical_ids.values()) - {reference.id for reference in loaded}
+        if unloaded:
+            deduplicated += await self._get_deduplicated_references(
+                reference_ids=unloaded
+            )
+
+        by_id = {reference.id: reference for reference in deduplicated}
+        return {
+            reference_id: by_id[canonical_id]
+            for reference_id, canonical_id in canonical_ids.items()
+            if canonical_id in by_id
+        }
+
     @sql_unit_of_work
     @es_unit_of_work
     async def get_deduplication_candidates(
@@ -571,6 +936,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         """
         Copy every remote full-text enhancement into our blob storage.
 
+        Copies run concurrently, up to ``full_text_copy_concurrency`` at a time.
         FT enhancements that fail to store (fetch error, declared
         sha256/byte_size mismatch) are dropped from ``reference.enhancements``
         and a description of the failure is returned. The reference itself is
@@ -579,16 +945,18 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         if not reference.enhancements:
             return []
 
-        errors: list[str] = []
-        kept: list[Enhancement] = []
-        for enhancement in reference.enhancements:
+        semaphore = asyncio.Semaphore(settings.full_text_copy_concurrency)
+
+        async def store(enhancement: Enhancement) -> str | None:
             if enhancement.content.enhancement_type != EnhancementType.FULL_TEXT:
-                kept.append(enhancement)
-                continue
+                return None
             try:
-                await self._enhancement_service.store_full_text(
-                    enhancement, blob_repository
-                )
+                async with semaphore:
+                    await self._enhancement_service.store_full_text(
+                        enhancement,
+                        blob_repository,
+                        defer=settings.full_text_defer_copy,
+                    )
             except FullTextIngestionError as exc:
                 logger.warning(
                     "Failed to store full text enhancement.",
@@ -596,11 +964,107 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                     enhancement_id=str(enhancement.id),
                     exc=repr(exc),
                 )
-                errors.append(str(exc))
-                continue
-            kept.append(enhancement)
-        reference.enhancements = kept
-        return errors
+                return str(exc)
+            return None
+
+        outcomes = await asyncio.gather(
+            *(store(enhancement) for enhancement in reference.enhancements)
+        )
+        reference.enhancements = [
+            enhancement
+            for enhancement, error in zip(reference.enhancements, outcomes, strict=True)
+            if error is None
+        ]
+        return [error for error in outcomes if error is not None]
+
+    async def store_deferred_full_text(  # noqa: PLR0913
+        self,
+        enhancement_id: UUID,
+        reference_id: UUID,
+        source: BlobStorageFile,
+        destination: BlobStorageFile,
+        blob_repository: BlobRepository,
+        *,
+        mime_type: str,
+        sha256_checksum: str,
+        byte_size: int,
+    ) -> None:
+        """
+        Copy the content of a full-text enhancement whose storage was deferred.
+
+        The enhancement was persisted pointing at ``destination`` before its
+        content was copied there. If the copy fails, the enhancement is removed
+        so that it doesn't reference content we don't hold.
+        """
+        try:
+            await self._enhancement_service.copy_full_text(
+                source,
+                destination,
+                blob_repository,
+                mime_type=mime_type,
+                sha256_checksum=sha256_checksum,
+                byte_size=byte_size,
+            )
+        except FullTextIngestionError as exc:
+            logger.warning(
+                "Failed to store deferred full text enhancement.",
+                reference_id=str(reference_id),
+                enhancement_id=str(enhancement_id),
+                exc=repr(exc),
+            )
+            await self.remove_unstored_full_text(enhancement_id, reference_id)
+            return
+        logger.info(
+            "Stored deferred full text enhancement.",
+            reference_id=str(reference_id),
+            enhancement_id=str(enhancement_id),
+        )
+
+    @sql_unit_of_work
+    @es_unit_of_work
+    async def remove_unstored_full_text(
+        self,
+        enhancement_id: UUID,
+        reference_id: UUID,
+        remaining_retries: int | None = None,
+    ) -> None:
+        """
+        Remove a full-text enhancement whose content failed to store.
+
+        The copy may have been queued before the enhancement was committed, so if
+        the enhancement can't be found yet its removal is queued again, until it is
+        found or the retries run out.
+
+        :param remaining_retries: The number of times the removal may be queued
+            again. Defaults to ``full_text_removal_retries``.
+        :type remaining_retries: int | None
+        """
+        if remaining_retries is None:
+            remaining_retries = settings.full_text_removal_retries
+        try:
+            await self.sql_uow.enhancements.wait_for_pk(enhancement_id)
+        except SQLNotFoundError:
+            if not remaining_retries:
+                logger.info(
+                    "Unstored full text enhancement was never persisted.",
+                    enhancement_id=str(enhancement_id),
+                )
+                return
+            logger.info(
+                "Unstored full text enhancement not yet persisted, retrying removal.",
+                enhancement_id=str(enhancement_id),
+                remaining_retries=remaining_retries,
+            )
+            await queue_task_with_trace(
+                ("app.domain.references.tasks", "remove_unstored_full_text"),
+                enhancement_id=enhancement_id,
+                reference_id=reference_id,
+                remaining_retries=remaining_retries - 1,
+                otel_enabled=settings.otel_enabled,
+            )
+            return
+        await self.sql_uow.enhancements.delete_by_pk(enhancement_id)
+        await self.index_references([reference_id])
 
     @sql_unit_of_work
     @es_unit_of_work
@@ -648,6 +1112,16 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         reference_create_result.reference_id = reference.id
         trace_attribute(Attributes.REFERENCE_ID, str(reference.id))
 
+        if reference.enhancements:
+            # Exact duplicates on a reference are rejected by the database.
+            seen_hashes: set[str] = set()
+            unique_enhancements: list[Enhancement] = []
+            for domain_enhancement in reference.enhancements:
+                if domain_enhancement.content_hash not in seen_hashes:
+                    seen_hashes.add(domain_enhancement.content_hash)
+                    unique_enhancements.append(domain_enhancement)
+            reference.enhancements = unique_enhancements
+
         reference_create_result.errors.extend(
             await self._store_full_texts(reference, blob_repository)
         )
@@ -845,6 +1319,11 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         2. Creates new PendingEnhancements as replacements (if retry limit not reached)
         3. Populates the retry_of field to link to the expired enhancement
 
+        Works through the stale pending enhancements in batches of
+        ``pending_enhancement_expiry_batch_size``, committing each, so that a
+        backlog of expired leases never holds its locks for the whole sweep.
+        Concurrent sweeps skip each other's batches.
+
         Args:
             max_retry_count: Maximum number of retries allowed (default: 3)
 
@@ -852,41 +1331,42 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             Dictionary with counts of expired and replaced_with pending enhancements
 
         """
-        now = datetime.datetime.now(tz=datetime.UTC)
         repo = self.sql_uow.pending_enhancements
-        expired_enhancements = await repo.expire_pending_enhancements_past_expiry(
-            now=now,
-            statuses=[
-                PendingEnhancementStatus.PROCESSING,
-            ],
-        )
-
-        if not expired_enhancements:
-            logger.info("No stale pending enhancements found")
-            return {"expired": 0, "replaced_with": 0}
-
-        logger.info(
-            "Found stale pending enhancements",
-            count=len(expired_enhancements),
-        )
+        batch_size = settings.pending_enhancement_expiry_batch_size
+        expired_count = replaced_count = 0
+        while True:
+            expired_enhancements = await repo.expire_pending_enhancements_past_expiry(
+                now=utc_now(),
+                statuses=[
+                    PendingEnhancementStatus.PROCESSING,
+                ],
+                limit=batch_size,
+            )
+            if not expired_enhancements:
+                break
 
-        new_pending_enhancements = (
-            await self._enhancement_service.create_retry_pending_enhancements(
-                expired_enhancements,
-                max_retry_count,
+            new_pending_enhancements = (
+                await self._enhancement_service.create_retry_pending_enhancements(
+                    expired_enhancements,
+                    max_retry_count,
+                )
             )
-        )
+            await self.sql_uow.commit()
 
-        if new_pending_enhancements:
+            expired_count += len(expired_enhancements)
+            replaced_count += len(new_pending_enhancements)
             logger.info(
-                "Created new pending enhancements for retry",
-                count=len(new_pending_enhancements),
+                "Expired stale pending enhancements",
+                expired=len(expired_enhancements),
+                replaced_with=len(new_pending_enhancements),
             )
+            if len(expired_enhancements) < batch_size:
+                break
 
-        return {
-            "expired": len(expired_enhancements),
-            "replaced_with": len(new_pending_enhancements),
-        }
+        if not expired_count:
+            logger.info("No stale pending enhancements found")
+
+        return {"expired": expired_count, "replaced_with": replaced_count}
 
     @sql_unit_of_work
     async def get_enhancement_request(
@@ -930,40 +1410,114 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             enhancement_request_id, preload=["status"]
         )
 
-    async def handle_enhancement_result_entry(
+    async def handle_enhancement_result_entries(
         self,
-        enhancement: Enhancement,
-    ) -> tuple[PendingEnhancementStatus, str]:
-        """Handle the import of a single batch enhancement result entry."""
+        enhancements: list[Enhancement],
+    ) -> list[tuple[PendingEnhancementStatus, str]]:
+        """Handle the import of a chunk of batch enhancement result entries."""
         try:
-            await self._add_enhancement(enhancement)
-        except SQLNotFoundError:
-            return (
-                PendingEnhancementStatus.FAILED,
-                "Reference does not exist.",
-            )
-        except DuplicateEnhancementError:
-            return (
-                PendingEnhancementStatus.DISCARDED,
-                "Exact duplicate enhancement already exists on reference.",
-            )
+            errors = await self._insert_enhancements(enhancements)
         except Exception:
             logger.exception(
-                "Failed to add enhancement to reference.",
-                reference_id=enhancement.reference_id,
-                enhancement=enhancement,
+                "Failed to add enhancements to references.",
+                reference_ids=[str(e.reference_id) for e in enhancements],
             )
-            return (
-                PendingEnhancementStatus.FAILED,
-                "Failed to add enhancement to reference.",
+            return [
+                (
+                    PendingEnhancementStatus.FAILED,
+                    "Failed to add enhancement to reference.",
+                )
+            ] * len(enhancements)
+
+        outcomes: list[tuple[PendingEnhancementStatus, str]] = []
+        for enhancement, error in zip(enhancements, errors, strict=True):
+            if error is None:
+                outcomes.append(
+                    (PendingEnhancementStatus.COMPLETED, "Enhancement added.")
+                )
+            elif isinstance(error, SQLNotFoundError):
+                outcomes.append(
+                    (PendingEnhancementStatus.FAILED, "Reference does not exist.")
+                )
+            elif isinstance(error, DuplicateEnhancementError):
+                outcomes.append(
+                    (
+                        PendingEnhancementStatus.DISCARDED,
+                        "Exact duplicate enhancement already exists on reference.",
+                    )
+                )
+            else:
+                logger.warning(
+                    "Failed to add enhancement to reference.",
+                    reference_id=enhancement.reference_id,
+                    enhancement_id=enhancement.id,
+                    exc=repr(error),
+                )
+                outcomes.append(
+                    (
+                        PendingEnhancementStatus.FAILED,
+                        "Failed to add enhancement to reference.",
+                    )
+                )
+        return outcomes
+
+    async def commit_enhancement_result_chunk(
+        self,
+        results: ProcessedResults,
+        pending_enhancements: list[PendingEnhancement],
+    ) -> None:
+        """
+        Commit a chunk of an imported robot enhancement batch result.
+
+        The chunk's pending enhancements are moved on from processing and its
+        enhancements committed, then the references it enhanced are indexed so
+        that they are searchable before the rest of the result is imported.
+
+        :param results: The chunk's results.
+        :type results: ProcessedResults
+        :param pending_enhancements: The batch's pending enhancements.
+        :type pending_enhancements: list[PendingEnhancement]
+        """
+        for pending_enhancement_ids, status in (
+            (results.failed_pending_enhancement_ids, PendingEnhancementStatus.FAILED),
+            (
+                results.discarded_pending_enhancement_ids,
+                PendingEnhancementStatus.DISCARDED,
+            ),
+            (
+                results.successful_pending_enhancement_ids,
+                PendingEnhancementStatus.INDEXING,
+            ),
+        ):
+            if pending_enhancement_ids:
+                await self._enhancement_service.update_pending_enhancements_status(
+                    list(pending_enhancement_ids), status
+                )
+        await self.sql_uow.commit()
+
+        if not results.successful_pending_enhancement_ids:
+            return
+
+        try:
+            await self._synchronizer.references.bulk_sql_to_es(
+                [
+                    pe.reference_id
+                    for pe in pending_enhancements
+                    if pe.id in results.successful_pending_enhancement_ids
+                ]
             )
+            status = PendingEnhancementStatus.COMPLETED
+        except Exception:
+            logger.exception("Error indexing references in Elasticsearch")
+            status = PendingEnhancementStatus.INDEXING_FAILED
 
-        return (
-            PendingEnhancementStatus.COMPLETED,
-            "Enhancement added.",
+        await self._enhancement_service.update_pending_enhancements_status(
+            list(results.successful_pending_enhancement_ids), status
         )
+        await self.sql_uow.commit()
 
     @sql_unit_of_work
+    @es_unit_of_work
     async def validate_and_import_robot_enhancement_batch_result(
         self,
         robot_enhancement_batch: RobotEnhancementBatch,
@@ -975,7 +1529,8 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
 
         This process:
         - streams the result of the robot enhancement batch line-by-line
-        - adds the enhancement to the database
+        - adds the enhancements to the database a chunk at a time, committing and
+          indexing each chunk and updating its pending enhancements
         - streams the validation result to the blob storage service line-by-line
         - does some final validation of missing references and updates the request
 
@@ -1007,9 +1562,13 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                     blob_repository=blob_repository,
                     result_file=robot_enhancement_batch.result_file,
                     pending_enhancements=pending_enhancements,
-                    add_enhancement=self.handle_enhancement_result_entry,
+                    add_enhancements=self.handle_enhancement_result_entries,
                     results=results,
                     access_control_service=access_control_service,
+                    commit_chunk=partial(
+                        self.commit_enhancement_result_chunk,
+                        pending_enhancements=pending_enhancements,
+                    ),
                 )
             ),
             path="enhancement_result",
@@ -1119,31 +1678,60 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
 
     async def _detect_robot_automations(
         self,
-        reference: ReferenceWithChangeset | None = None,
+        references: Sequence[ReferenceWithChangeset] = (),
         enhancement_ids: Iterable[UUID] | None = None,
     ) -> list[RobotAutomationPercolationResult]:
-        """Detect and dispatch robot automations for an added reference/enhancement."""
+        """
+        Detect robot automations for added references/enhancements.
+
+        The references and the changesets of the enhancements are percolated
+        together, as many percolate queries per multi search request as settings
+        allow. Automations with simple queries are matched in process, and only
+        the remainder are percolated in Elasticsearch.
+        """
+        if not settings.feature_flags.enable_percolation:
+            return []
+        chunk_size = settings.es_percolation_chunk_size_override.get(
+            ESPercolationOperation.ROBOT_AUTOMATION,
+            settings.default_es_percolation_chunk_size,
+        )
+        request_size = chunk_size * settings.es_percolation_queries_per_request
         robot_automations: list[RobotAutomationPercolationResult] = []
+        matcher = await self._robot_automation_matcher_cache.get(
+            self.sql_uow.robot_automations.get_fingerprint,
+            self.sql_uow.robot_automations.get_all,
+        )
 
-        if reference:
-            robot_automations.extend(
-                await self.es_uow.robot_automations.percolate([reference])
-            )
-        if enhancement_ids:
-            for enhancement_id_chunk in list_chunker(
-                list(enhancement_ids),
-                settings.es_percolation_chunk_size_override.get(
-                    ESPercolationOperation.ROBOT_AUTOMATION,
-                    settings.default_es_percolation_chunk_size,
+        async def match(
+            percolatables: Sequence[ReferenceWithChangeset],
+        ) -> list[RobotAutomationPercolationResult]:
+            if matcher is None:
+                return await self.es_uow.robot_automations.percolate(
+                    percolatables, chunk_size=chunk_size
+                )
+            return [
+                *matcher.match(percolatables),
+                *await self.es_uow.robot_automations.percolate(
+                    percolatables,
+                    chunk_size=chunk_size,
+                    automation_ids=matcher.unsupported_automation_ids,
                 ),
-            ):
-                robot_automations.extend(
-                    await self.es_uow.robot_automations.percolate(
-                        await self._get_reference_changesets_from_enhancements(
-                            enhancement_id_chunk
-                        )
-                    )
+            ]
+
+        percolatables: list[ReferenceWithChangeset] = list(references)
+        for enhancement_id_chunk in list_chunker(
+            list(enhancement_ids or ()), request_size
+        ):
+            percolatables.extend(
+                await self._get_reference_changesets_from_enhancements(
+                    enhancement_id_chunk
                 )
+            )
+            if len(percolatables) >= request_size:
+                robot_automations.extend(await match(percolatables))
+                percolatables = []
+        if percolatables:
+            robot_automations.extend(await match(percolatables))
 
         # Merge robot_automations on robot_id
         robot_automations_dict: dict[UUID, set[UUID]] = defaultdict(set)
@@ -1175,21 +1763,73 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         ReferenceWithChangeset.
         """
         return await self._detect_robot_automations(
-            reference=reference, enhancement_ids=enhancement_ids
+            references=[reference] if reference else [],
+            enhancement_ids=enhancement_ids,
         )
 
+    @sql_unit_of_work
+    async def backfill_enhancement_content_hashes(
+        self, after_id: UUID | None, limit: int
+    ) -> UUID | None:
+        """
+        Record the content hashes of a page of enhancements stored without one.
+
+        An enhancement exactly duplicating another on its reference keeps a null
+        hash, as only one can hold it, and is still compared in the application.
+
+        :param after_id: The ID of the last enhancement of the previous page.
+        :type after_id: UUID | None
+        :param limit: The number of enhancements per page.
+        :type limit: int
+        :return: The ID to continue after, or None if this was the last page.
+        :rtype: UUID | None
+        """
+        enhancements = await self.sql_uow.enhancements.get_unhashed_page(
+            after_id=after_id, limit=limit
+        )
+        content_hashes: dict[UUID, str] = {}
+        seen: set[tuple[UUID, str]] = set()
+        for enhancement in enhancements:
+            key = (enhancement.reference_id, enhancement.content_hash)
+            if key not in seen:
+                seen.add(key)
+                content_hashes[enhancement.id] = enhancement.content_hash
+        hashed = await self.sql_uow.enhancements.set_content_hashes(content_hashes)
+        logger.info(
+            "Backfilled enhancement content hashes.",
+            enhancement_count=len(enhancements),
+            hashed_count=hashed,
+        )
+        if len(enhancements) < limit:
+            return None
+        return enhancements[-1].id
+
     @sql_unit_of_work
     @es_unit_of_work
     async def repopulate_robot_automation_percolation_index(
         self,
     ) -> None:
         """
-        Repopulate the robot automation percolation index.
+        Bring the robot automation percolation index up to date.
 
-        We assume the scale is small enough that we can do this naively.
+        Only automations revised since they were last indexed are written, so this
+        is cheap to run repeatedly once the index is in sync.
         """
-        for robot_automation in await self.sql_uow.robot_automations.get_all():
-            await self._synchronizer.robot_automations.sql_to_es(robot_automation.id)
+        indexed_revisions = await self.es_uow.robot_automations.get_revisions()
+        automations = await self.sql_uow.robot_automations.get_all()
+        for i, automation in enumerate(automations):
+            indexed_revision = indexed_revisions.get(automation.id, 0)
+            if indexed_revision > automation.revision:
+                # Indexed before revisions were tracked, so the document's version
+                # is ahead. Move past it so that the automation can be rewritten.
+                automations[i] = await self.sql_uow.robot_automations.advance_revision(
+                    automation.id, indexed_revision + 1
+                )
+
+        written = await self.es_uow.robot_automations.sync(
+            automations, indexed_revisions
+        )
+        logger.info("Synchronised robot automation percolation index.", written=written)
 
     @sql_unit_of_work
     async def get_robot_automations(self) -> list[RobotAutomation]:
@@ -1231,7 +1871,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         # We do the indexing inside the SQL UoW as the ES indexing actually provides
         # some handy validation against the index itself. This is caught with an API-
         # level exception handler, so we don't need to handle it here.
-        automation = await self.sql_uow.robot_automations.merge(automation)
+        automation = await self.sql_uow.robot_automations.revise(automation)
         return await self._synchronizer.robot_automations.sql_to_es(automation.id)
 
     @sql_unit_of_work
@@ -1249,12 +1889,19 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         reference_duplicate_decision: ReferenceDuplicateDecision,
         *,
         decision_changed: bool,
+        automation_triggers: list[tuple[ReferenceWithChangeset, str]] | None = None,
     ) -> ReferenceDuplicateDecision:
         """
         Apply side-effects of a reference duplicate decision.
 
         This reprojects the deduplicated reference to ES, and triggers any robot
         automations if the decision has changed.
+
+        :param automation_triggers: If given, the reference to trigger automations
+            for is appended here with its source instead, so that a batch of
+            decisions can be percolated together with
+            :meth:`_dispatch_duplicate_decision_robot_automations`.
+        :type automation_triggers: list[tuple[ReferenceWithChangeset, str]] | None
         """
         if reference_duplicate_decision.active_decision:
             await self._synchronizer.references.sql_to_es(
@@ -1264,12 +1911,35 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                 reference = await self._get_canonical_reference_with_implied_changeset(
                     reference_duplicate_decision.reference_id
                 )
-                await self._detect_and_dispatch_robot_automations(
-                    reference=reference,
-                    source_str=f"DuplicateDecision:{reference_duplicate_decision.id}",
+                trigger = (
+                    reference,
+                    f"DuplicateDecision:{reference_duplicate_decision.id}",
                 )
+                if automation_triggers is not None:
+                    automation_triggers.append(trigger)
+                else:
+                    await self._dispatch_duplicate_decision_robot_automations([trigger])
         return reference_duplicate_decision
 
+    async def _dispatch_duplicate_decision_robot_automations(
+        self, automation_triggers: Sequence[tuple[ReferenceWithChangeset, str]]
+    ) -> None:
+        """
+        Detect and dispatch robot automations for changed duplicate decisions.
+
+        The references are percolated together. Where several decisions trigger
+        the same reference, its pending enhancements are sourced from the first.
+        """
+        if not automation_triggers:
+            return
+        reference_sources: dict[UUID, str] = {}
+        for reference, source in automation_triggers:
+            reference_sources.setdefault(reference.id, source)
+        await self._detect_and_dispatch_robot_automations(
+            references=[reference for reference, _ in automation_triggers],
+            reference_sources=reference_sources,
+        )
+
     @sql_unit_of_work
     @es_unit_of_work
     async def process_reference_duplicate_decision(
@@ -1283,11 +1953,16 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                 settings.trusted_unique_identifier_types,
             )
             if shortcutted_decisions:
+                automation_triggers: list[tuple[ReferenceWithChangeset, str]] = []
                 for decision in shortcutted_decisions:
                     await self.apply_reference_duplicate_decision_side_effects(
                         decision,
                         decision_changed=True,
+                        automation_triggers=automation_triggers,
                     )
+                await self._dispatch_duplicate_decision_robot_automations(
+                    automation_triggers
+                )
                 return
 
         if settings.feature_flags.enable_canonical_candidate_search:
@@ -1323,18 +1998,21 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             decision_changed=decision_changed,
         )
 
-    @sql_unit_of_work
-    async def claim_and_create_robot_enhancement_batch(
+    async def _create_robot_enhancement_batch(  # noqa: PLR0913
         self,
         robot_id: UUID,
         limit: int,
-        lease_duration: datetime.timedelta,
         blob_repository: BlobRepository,
         access_control_service: ReferenceAccessControlService,
+        compression: ContentEncoding | None,
+        lease_duration: datetime.timedelta | None,
     ) -> RobotEnhancementBatch | None:
         """
-        Atomically claim pending enhancements and create a robot enhancement batch.
+        Create a robot enhancement batch from the robot's available enhancements.
 
+        With a ``lease_duration`` the batch is claimed, leasing its pending
+        enhancements to the robot. Without one the batch is prepared: its pending
+        enhancements are reserved for it but stay pending until a poll claims it.
         Returns None if no pending enhancements are available.
         """
         pending_enhancements = (
@@ -1357,18 +2035,26 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             {pe.reference_id: pe for pe in reversed(pending_enhancements)}.values()
         )
 
-        robot_enhancement_batch = RobotEnhancementBatch(robot_id=robot_id)
+        robot_enhancement_batch = RobotEnhancementBatch(
+            robot_id=robot_id,
+            claimed_at=utc_now() if lease_duration else None,
+        )
 
         await self.sql_uow.robot_enhancement_batches.add(robot_enhancement_batch)
 
-        pending_enhancement_ids = [pe.id for pe in pending_enhancements]
-        if pending_enhancement_ids:
-            await self.sql_uow.pending_enhancements.bulk_update(
-                pks=pending_enhancement_ids,
-                status=PendingEnhancementStatus.PROCESSING,
-                robot_enhancement_batch_id=robot_enhancement_batch.id,
-                expires_at=apply_positive_timedelta(lease_duration),
-            )
+        lease: dict[str, object] = (
+            {
+                "status": PendingEnhancementStatus.PROCESSING,
+                "expires_at": apply_positive_timedelta(lease_duration),
+            }
+            if lease_duration
+            else {}
+        )
+        await self.sql_uow.pending_enhancements.bulk_update(
+            pks=[pe.id for pe in pending_enhancements],
+            robot_enhancement_batch_id=robot_enhancement_batch.id,
+            **lease,
+        )
 
         reference_data_file, _ = await self.stream_references_to_blob(
             reference_ids=[pe.reference_id for pe in pending_enhancements],
@@ -1381,6 +2067,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                 UploadFile.ROBOT_ENHANCEMENT_REFERENCE_DATA,
                 settings.default_upload_file_chunk_size,
             ),
+            compression=compression,
         )
 
         return await self._enhancement_service.build_robot_enhancement_batch(
@@ -1389,6 +2076,202 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             reference_data_file=reference_data_file,
         )
 
+    async def _prepared_batch_suits_poll(
+        self,
+        robot_enhancement_batch: RobotEnhancementBatch,
+        limit: int,
+        access_control_service: ReferenceAccessControlService,
+        compression: ContentEncoding | None,
+    ) -> bool:
+        """
+        Check a prepared batch is what the poll would have built itself.
+
+        The batch must fit the poll's limit and compression, be fresh enough that
+        its reference data hasn't gone stale, and have been redacted as the
+        polling principal's would be.
+        """
+        pending_enhancements = robot_enhancement_batch.pending_enhancements or []
+        if not pending_enhancements or len(pending_enhancements) > limit:
+            return False
+        if (
+            not robot_enhancement_batch.reference_data_file
+            or robot_enhancement_batch.reference_data_file.content_encoding
+            != compression
+        ):
+            return False
+        if (
+            not robot_enhancement_batch.created_at
+            or utc_now() - robot_enhancement_batch.created_at
+            > settings.prepared_robot_enhancement_batch_max_age
+        ):
+            return False
+        # Prepared batches are redacted for the robot itself.
+        robot = await self.sql_uow.robots.get_by_pk(robot_enhancement_batch.robot_id)
+        return (
+            ReferenceAccessControlService(entitlements=robot.entitlements)
+        ).may_read_full_text == access_control_service.may_read_full_text
+
+    async def _claim_prepared_robot_enhancement_batch(
+        self,
+        robot_id: UUID,
+        limit: int,
+        lease_duration: datetime.timedelta,
+        access_control_service: ReferenceAccessControlService,
+        compression: ContentEncoding | None,
+    ) -> RobotEnhancementBatch | None:
+        """
+        Claim the robot's oldest prepared batch, if it suits the poll.
+
+        A prepared batch that doesn't suit the poll is released, returning its
+        pending enhancements to the pool for the poll to build a batch from.
+        """
+        robot_enhancement_batch = (
+            await self.sql_uow.robot_enhancement_batches.find_prepared_for_robot(
+                robot_id
+            )
+        )
+        if not robot_enhancement_batch:
+            return None
+
+        if not await self._prepared_batch_suits_poll(
+            robot_enhancement_batch, limit, access_control_service, compression
+        ):
+            logger.info(
+                "Releasing prepared robot enhancement batch unsuited to poll.",
+                robot_enhancement_batch_id=str(robot_enhancement_batch.id),
+            )
+            await self.sql_uow.pending_enhancements.bulk_update_by_filter(
+                filter_conditions={
+                    "robot_enhancement_batch_id": robot_enhancement_batch.id
+                },
+                robot_enhancement_batch_id=None,
+            )
+            await self.sql_uow.robot_enhancement_batches.delete_by_pk(
+                robot_enhancement_batch.id
+            )
+            return None
+
+        await self.sql_uow.pending_enhancements.bulk_update(
+            pks=[pe.id for pe in robot_enhancement_batch.pending_enhancements or []],
+            status=PendingEnhancementStatus.PROCESSING,
+            expires_at=apply_positive_timedelta(lease_duration),
+        )
+        return await self.sql_uow.robot_enhancement_batches.update_by_pk(
+            pk=robot_enhancement_batch.id,
+            claimed_at=utc_now(),
+        )
+
+    @sql_unit_of_work
+    async def claim_and_create_robot_enhancement_batch(  # noqa: PLR0913
+        self,
+        robot_id: UUID,
+        limit: int,
+        lease_duration: datetime.timedelta,
+        blob_repository: BlobRepository,
+        access_control_service: ReferenceAccessControlService,
+        compression: ContentEncoding | None = None,
+    ) -> RobotEnhancementBatch | None:
+        """
+        Atomically claim pending enhancements and create a robot enhancement batch.
+
+        A batch prepared ahead of the poll is claimed if one suits it, otherwise
+        the batch is built now. The batch's reference data file is compressed with
+        ``compression``, if given. Returns None if no pending enhancements are
+        available.
+        """
+        robot_enhancement_batch = await self._claim_prepared_robot_enhancement_batch(
+            robot_id=robot_id,
+            limit=limit,
+            lease_duration=lease_duration,
+            access_control_service=access_control_service,
+            compression=compression,
+        )
+        if robot_enhancement_batch:
+            return robot_enhancement_batch
+
+        return await self._create_robot_enhancement_batch(
+            robot_id=robot_id,
+            limit=limit,
+            blob_repository=blob_repository,
+            access_control_service=access_control_service,
+            compression=compression,
+            lease_duration=lease_duration,
+        )
+
+    async def wait_for_robot_enhancement_batch(  # noqa: PLR0913
+        self,
+        robot_id: UUID,
+        limit: int,
+        lease_duration: datetime.timedelta,
+        blob_repository: BlobRepository,
+        access_control_service: ReferenceAccessControlService,
+        wait: datetime.timedelta,
+        listener: NotificationListener,
+        compression: ContentEncoding | None = None,
+    ) -> RobotEnhancementBatch | None:
+        """
+        Claim a robot enhancement batch, waiting for one if none is available.
+
+        Each notification that pending enhancements were created for the robot
+        prompts another claim, until one succeeds or ``wait`` has passed. A last
+        claim is made at the deadline, so a missed notification costs latency
+        rather than work.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait.total_seconds()
+        with listener.subscribe(str(robot_id)) as notified:
+            while True:
+                notified.clear()
+                robot_enhancement_batch = (
+                    await self.claim_and_create_robot_enhancement_batch(
+                        robot_id=robot_id,
+                        limit=limit,
+                        lease_duration=lease_duration,
+                        blob_repository=blob_repository,
+                        access_control_service=access_control_service,
+                        compression=compression,
+                    )
+                )
+                remaining = deadline - loop.time()
+                if robot_enhancement_batch or remaining <= 0:
+                    return robot_enhancement_batch
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(notified.wait(), remaining)
+
+    @sql_unit_of_work
+    async def prepare_robot_enhancement_batch(
+        self,
+        robot_id: UUID,
+        limit: int,
+        blob_repository: BlobRepository,
+        access_control_service: ReferenceAccessControlService,
+        compression: ContentEncoding | None = None,
+    ) -> RobotEnhancementBatch | None:
+        """
+        Prepare a robot enhancement batch ahead of the robot's next poll.
+
+        The batch is selected as a poll would select it, and its reference data
+        file uploaded, so that the poll only has to claim it. Returns None if the
+        robot already has enough prepared batches or no pending enhancements are
+        available.
+        """
+        prepared = (
+            await self.sql_uow.robot_enhancement_batches.count_prepared_for_robot(
+                robot_id
+            )
+        )
+        if prepared >= settings.prepared_robot_enhancement_batches:
+            return None
+
+        return await self._create_robot_enhancement_batch(
+            robot_id=robot_id,
+            limit=limit,
+            blob_repository=blob_repository,
+            access_control_service=access_control_service,
+            compression=compression,
+            lease_duration=None,
+        )
+
     @sql_unit_of_work
     async def renew_robot_enhancement_batch_lease(
         self,
@@ -1439,12 +2322,19 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                 reference_ids,
             )
         )
-        for decision in reference_duplicate_decisions:
-            await queue_task_with_trace(
-                ("app.domain.references.tasks", "process_reference_duplicate_decision"),
-                reference_duplicate_decision_id=decision.id,
-                otel_enabled=settings.otel_enabled,
-            )
+        async with TaskBatch(
+            max_messages=settings.message_broker_batch_max_messages,
+            window=settings.message_broker_batch_window,
+            otel_enabled=settings.otel_enabled,
+        ) as tasks:
+            for decision in reference_duplicate_decisions:
+                await tasks.queue(
+                    (
+                        "app.domain.references.tasks",
+                        "process_reference_duplicate_decision",
+                    ),
+                    reference_duplicate_decision_id=decision.id,
+                )
 
     @es_unit_of_work
     async def search_references(
@@ -1453,6 +2343,8 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         page: int = 1,
         page_size: int = 20,
         sort: list[str] | None = None,
+        *,
+        with_payload: bool = False,
     ) -> ESSearchResult:
         """Search for references matching the given query specification."""
         return await self._search_service.search(
@@ -1460,8 +2352,57 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             page=page,
             page_size=page_size,
             sort=sort,
+            with_payload=with_payload,
         )
 
+    @sql_unit_of_work
+    async def render_search_hits(
+        self,
+        search_result: ESSearchResult,
+        access_control_service: ReferenceAccessControlService,
+    ) -> list[str]:
+        """
+        Render each search hit as SDK reference JSON, in hit order.
+
+        Hits are served from their indexed payload where it is complete for the
+        principal. The rest (no payload, or full text the principal may see) are
+        hydrated from the database in one round trip. As with hydration, hits whose
+        reference no longer exists are dropped.
+
+        :param search_result: A search result fetched ``with_payload``.
+        :type search_result: ESSearchResult
+        :param access_control_service: The principal's access control.
+        :type access_control_service: ReferenceAccessControlService
+        :return: The SDK JSON of each reference.
+        :rtype: list[str]
+        """
+        rendered: dict[UUID, str] = {}
+        to_hydrate: list[UUID] = []
+        for hit in search_result.hits:
+            document = hit.document
+            if (
+                isinstance(document, ReferenceSearchProjection)
+                and document.sdk_payload is not None
+                and not (
+                    document.has_full_text and access_control_service.may_read_full_text
+                )
+            ):
+                rendered[hit.id] = document.sdk_payload
+            else:
+                to_hydrate.append(hit.id)
+
+        trace_attribute(Attributes.SEARCH_HYDRATED_HITS, len(to_hydrate))
+        if to_hydrate:
+            for reference in await self._get_deduplicated_references(
+                reference_ids=to_hydrate
+            ):
+                sdk_reference = await self._anti_corruption_service.reference_to_sdk(
+                    access_control_service.redact_reference(reference)
+                )
+                rendered[reference.id] = sdk_reference.model_dump_json(by_alias=True)
+
+        return [rendered[hit.id] for hit in search_result.hits if hit.id in rendered]
+
     @es_unit_of_work
     async def aggregate_facets(
         self,
@@ -1489,10 +2430,11 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
     @tracer.start_as_current_span("Detect and dispatch robot automations")
     async def _detect_and_dispatch_robot_automations(
         self,
-        reference: ReferenceWithChangeset | None = None,
+        references: Sequence[ReferenceWithChangeset] = (),
         enhancement_ids: Iterable[UUID] | None = None,
         source_str: str | None = None,
         skip_robot_id: UUID | None = None,
+        reference_sources: Mapping[UUID, str] | None = None,
     ) -> None:
         """
         Request default enhancements for a set of references.
@@ -1502,13 +2444,18 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
 
         NB this is in a transient state, see comments in
         ReferenceService.detect_robot_automations.
+
+        :param reference_sources: The source of the pending enhancements of specific
+            references, in place of ``source_str``.
+        :type reference_sources: Mapping[UUID, str] | None
         """
+        reference_sources = reference_sources or {}
         robot_automations = await self._detect_robot_automations(
-            reference=reference,
+            references=references,
             enhancement_ids=enhancement_ids,
         )
         trace_attribute(Attributes.ROBOT_AUTOMATION_MATCH_COUNT, len(robot_automations))
-        pending_enhancement_count = 0
+        pending_enhancements: list[PendingEnhancement] = []
         for robot_automation in robot_automations:
             if robot_automation.robot_id == skip_robot_id:
                 logger.warning(
@@ -1518,12 +2465,20 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                     source=source_str,
                 )
                 continue
-            await self._create_pending_enhancements(
-                robot_id=robot_automation.robot_id,
-                reference_ids=robot_automation.reference_ids,
-                source=source_str,
+            pending_enhancements.extend(
+                PendingEnhancement(
+                    reference_id=reference_id,
+                    robot_id=robot_automation.robot_id,
+                    source=reference_sources.get(reference_id, source_str),
+                )
+                for reference_id in robot_automation.reference_ids
+            )
+        # One insert for every robot's pending enhancements.
+        if pending_enhancements:
+            await self.sql_uow.pending_enhancements.add_bulk_ignore_conflicts(
+                pending_enhancements
             )
-            pending_enhancement_count += len(robot_automation.reference_ids)
+        pending_enhancement_count = len(pending_enhancements)
 
         trace_attribute(
             Attributes.ROBOT_AUTOMATION_PENDING_ENHANCEMENT_COUNT,
@@ -1548,7 +2503,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
     ) -> None:
         """Detect and dispatch robot automations for an added reference/enhancement."""
         await self._detect_and_dispatch_robot_automations(
-            reference=reference,
+            references=[reference] if reference else [],
             enhancement_ids=enhancement_ids,
             source_str=source_str,
             skip_robot_id=skip_robot_id,
@@ -1568,6 +2523,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
         must appear first.
         """
         results: list[ReferenceDuplicateDecision] = []
+        automation_triggers: list[tuple[ReferenceWithChangeset, str]] = []
         for duplicate_decision in duplicate_decisions:
             (
                 reference_duplicate_decision,
@@ -1579,6 +2535,7 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
             await self.apply_reference_duplicate_decision_side_effects(
                 reference_duplicate_decision,
                 decision_changed=decision_changed,
+                automation_triggers=automation_triggers,
             )
             if (
                 old_decision
@@ -1599,6 +2556,8 @@ class ReferenceService(GenericService[ReferenceAntiCorruptionService]):
                     await self.apply_reference_duplicate_decision_side_effects(
                         old_canonical.duplicate_decision,
                         decision_changed=True,
+                        automation_triggers=automation_triggers,
                     )
             results.append(reference_duplicate_decision)
+        await self._dispatch_duplicate_decision_robot_automations(automation_triggers)
         return results
@@ -26,6 +26,11 @@ class ReferenceAccessControlService(GenericAccessControlService):
             )
         )
 
+    @property
+    def may_read_full_text(self) -> bool:
+        """Whether the principal may see full-text enhancements."""
+        return Entitlement.FULL_TEXT in self._entitlements
+
     @property
     def may_write_raw_enhancements(self) -> bool:
         """Whether the principal may contribute raw enhancements to a reference."""
@@ -33,7 +38,7 @@ class ReferenceAccessControlService(GenericAccessControlService):
 
     def _redact_full_text(self, enhancements: list[Enhancement]) -> list[Enhancement]:
         """Drop full-text enhancements unless the principal is entitled to them."""
-        if Entitlement.FULL_TEXT in self._entitlements:
+        if self.may_read_full_text:
             return enhancements
         return [
             enhancement
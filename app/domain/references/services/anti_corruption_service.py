@@ -4,7 +4,7 @@ from collections.abc import Sequence
 from uuid import UUID
 
 import destiny_sdk
-from pydantic import ValidationError
+from pydantic import HttpUrl, ValidationError
 
 from app.core.exceptions import DomainToSDKError, SDKToDomainError
 from app.domain.references.models.models import (
@@ -38,7 +38,7 @@ from app.domain.references.models.models import (
 from app.domain.references.services.access_control_service import RedactedReference
 from app.domain.service import GenericAntiCorruptionService
 from app.persistence.blob.models import BlobSignedUrlType, BlobStorageFile
-from app.persistence.blob.repository import URLSigner
+from app.persistence.blob.repository import BulkURLSigner, URLSigner
 from app.persistence.es.persistence import (
     ESFacetBucket,
     ESSearchResult,
@@ -53,16 +53,43 @@ _LINKED_DATA_TEXT_KEYS = frozenset({"name", "description", "supportingText", "@v
 class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
     """Anti-corruption service for translating between Reference domain and SDK."""
 
-    def __init__(self, sign_url: URLSigner) -> None:
+    def __init__(
+        self, sign_url: URLSigner, sign_urls: BulkURLSigner | None = None
+    ) -> None:
         """
         Initialize the anti-corruption service.
 
         :param sign_url: Callable that signs a blob storage file into a URL.
             Typically ``BlobRepository.get_signed_url``.
+        :param sign_urls: Optional callable that signs many files at once, used for
+            models carrying several URLs. Typically
+            ``BlobRepository.get_signed_urls``. Without it, files are signed one
+            by one with ``sign_url``.
         """
         self._sign_url = sign_url
+        self._sign_urls = sign_urls
         super().__init__()
 
+    async def _sign_many(
+        self,
+        requests: Sequence[tuple[BlobStorageFile | None, BlobSignedUrlType]],
+    ) -> list[HttpUrl | None]:
+        """Sign each file present in ``requests``, leaving ``None`` for the rest."""
+        present = [
+            (file, interaction_type)
+            for file, interaction_type in requests
+            if file is not None
+        ]
+        if self._sign_urls is not None:
+            signed = await self._sign_urls(present)
+        else:
+            signed = [
+                await self._sign_url(file, interaction_type)
+                for file, interaction_type in present
+            ]
+        urls = iter(signed)
+        return [next(urls) if file is not None else None for file, _ in requests]
+
     def reference_from_sdk_file_input(
         self,
         reference_in: destiny_sdk.references.ReferenceFileInput,
@@ -112,6 +139,28 @@ class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
         except ValidationError as exception:
             raise DomainToSDKError(errors=exception.errors()) from exception
 
+    async def reference_to_sdk_payload(self, reference: Reference) -> str:
+        """
+        Pre-render a reference's SDK JSON for serving search hits without hydration.
+
+        Full-text enhancements are omitted: whether they are visible depends on the
+        principal, and their download URLs are signed per request.
+        """
+        without_full_text = reference.model_copy(
+            update={
+                "enhancements": [
+                    enhancement
+                    for enhancement in reference.enhancements or []
+                    if enhancement.content.enhancement_type
+                    is not EnhancementType.FULL_TEXT
+                ]
+            }
+        )
+        sdk_reference = await self.reference_to_sdk(
+            RedactedReference(without_full_text)
+        )
+        return sdk_reference.model_dump_json(by_alias=True)
+
     def external_identifier_to_sdk(
         self, identifier: LinkedExternalIdentifier
     ) -> destiny_sdk.identifiers.LinkedExternalIdentifier:
@@ -263,27 +312,30 @@ class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
         enhancement_request: EnhancementRequest,
     ) -> destiny_sdk.robots.EnhancementRequestRead:
         """Convert the enhancement request to the SDK model."""
+        (
+            reference_data_url,
+            result_storage_url,
+            validation_result_url,
+        ) = await self._sign_many(
+            [
+                (
+                    enhancement_request.reference_data_file,
+                    BlobSignedUrlType.DOWNLOAD,
+                ),
+                (enhancement_request.result_file, BlobSignedUrlType.UPLOAD),
+                (
+                    enhancement_request.validation_result_file,
+                    BlobSignedUrlType.DOWNLOAD,
+                ),
+            ]
+        )
         try:
             return destiny_sdk.robots.EnhancementRequestRead.model_validate(
                 enhancement_request.model_dump()
                 | {
-                    "reference_data_url": await self._sign_url(
-                        enhancement_request.reference_data_file,
-                        BlobSignedUrlType.DOWNLOAD,
-                    )
-                    if enhancement_request.reference_data_file
-                    else None,
-                    "result_storage_url": await self._sign_url(
-                        enhancement_request.result_file, BlobSignedUrlType.UPLOAD
-                    )
-                    if enhancement_request.result_file
-                    else None,
-                    "validation_result_url": await self._sign_url(
-                        enhancement_request.validation_result_file,
-                        BlobSignedUrlType.DOWNLOAD,
-                    )
-                    if enhancement_request.validation_result_file
-                    else None,
+                    "reference_data_url": reference_data_url,
+                    "result_storage_url": result_storage_url,
+                    "validation_result_url": validation_result_url,
                 },
             )
         except ValidationError as exception:
@@ -378,19 +430,17 @@ class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
         enhancement_request: EnhancementRequest,
     ) -> destiny_sdk.robots.RobotRequest:
         """Convert the robot request to the SDK model."""
+        reference_storage_url, result_storage_url = await self._sign_many(
+            [
+                (enhancement_request.reference_data_file, BlobSignedUrlType.DOWNLOAD),
+                (enhancement_request.result_file, BlobSignedUrlType.UPLOAD),
+            ]
+        )
         try:
             return destiny_sdk.robots.RobotRequest(
                 id=enhancement_request.id,
-                reference_storage_url=await self._sign_url(
-                    enhancement_request.reference_data_file, BlobSignedUrlType.DOWNLOAD
-                )
-                if enhancement_request.reference_data_file
-                else None,
-                result_storage_url=await self._sign_url(
-                    enhancement_request.result_file, BlobSignedUrlType.UPLOAD
-                )
-                if enhancement_request.result_file
-                else None,
+                reference_storage_url=reference_storage_url,
+                result_storage_url=result_storage_url,
             )
         except ValidationError as exception:
             raise DomainToSDKError(errors=exception.errors()) from exception
@@ -400,27 +450,30 @@ class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
         robot_enhancement_batch: "RobotEnhancementBatch",
     ) -> destiny_sdk.robots.RobotEnhancementBatchRead:
         """Convert the robot enhancement batch to the SDK model."""
+        (
+            reference_data_url,
+            result_storage_url,
+            validation_result_url,
+        ) = await self._sign_many(
+            [
+                (
+                    robot_enhancement_batch.reference_data_file,
+                    BlobSignedUrlType.DOWNLOAD,
+                ),
+                (robot_enhancement_batch.result_file, BlobSignedUrlType.UPLOAD),
+                (
+                    robot_enhancement_batch.validation_result_file,
+                    BlobSignedUrlType.DOWNLOAD,
+                ),
+            ]
+        )
         try:
             return destiny_sdk.robots.RobotEnhancementBatchRead.model_validate(
                 robot_enhancement_batch.model_dump()
                 | {
-                    "reference_data_url": await self._sign_url(
-                        robot_enhancement_batch.reference_data_file,
-                        BlobSignedUrlType.DOWNLOAD,
-                    )
-                    if robot_enhancement_batch.reference_data_file
-                    else None,
-                    "result_storage_url": await self._sign_url(
-                        robot_enhancement_batch.result_file, BlobSignedUrlType.UPLOAD
-                    )
-                    if robot_enhancement_batch.result_file
-                    else None,
-                    "validation_result_url": await self._sign_url(
-                        robot_enhancement_batch.validation_result_file,
-                        BlobSignedUrlType.DOWNLOAD,
-                    )
-                    if robot_enhancement_batch.validation_result_file
-                    else None,
+                    "reference_data_url": reference_data_url,
+                    "result_storage_url": result_storage_url,
+                    "validation_result_url": validation_result_url,
                 },
             )
         except ValidationError as exception:
@@ -431,20 +484,20 @@ class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
         robot_enhancement_batch: "RobotEnhancementBatch",
     ) -> destiny_sdk.robots.RobotEnhancementBatch:
         """Convert robot enhancement batch to the new SDK RobotEnhancementBatch."""
+        reference_storage_url, result_storage_url = await self._sign_many(
+            [
+                (
+                    robot_enhancement_batch.reference_data_file,
+                    BlobSignedUrlType.DOWNLOAD,
+                ),
+                (robot_enhancement_batch.result_file, BlobSignedUrlType.UPLOAD),
+            ]
+        )
         try:
             return destiny_sdk.robots.RobotEnhancementBatch(
                 id=robot_enhancement_batch.id,
-                reference_storage_url=await self._sign_url(
-                    robot_enhancement_batch.reference_data_file,
-                    BlobSignedUrlType.DOWNLOAD,
-                )
-                if robot_enhancement_batch.reference_data_file
-                else None,
-                result_storage_url=await self._sign_url(
-                    robot_enhancement_batch.result_file, BlobSignedUrlType.UPLOAD
-                )
-                if robot_enhancement_batch.result_file
-                else None,
+                reference_storage_url=reference_storage_url,
+                result_storage_url=result_storage_url,
             )
         except ValidationError as exception:
             raise DomainToSDKError(errors=exception.errors()) from exception
@@ -502,6 +555,22 @@ class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
         except ValidationError as exception:
             raise SDKToDomainError(errors=exception.errors()) from exception
 
+    async def reference_lookup_result_to_sdk(
+        self,
+        identifier_lookup: IdentifierLookup,
+        reference: RedactedReference | None,
+    ) -> destiny_sdk.references.ReferenceLookupResult:
+        """Convert one result of a bulk identifier lookup to the SDK model."""
+        try:
+            return destiny_sdk.references.ReferenceLookupResult(
+                identifier=destiny_sdk.identifiers.IdentifierLookup.model_validate(
+                    identifier_lookup.model_dump()
+                ),
+                reference=await self.reference_to_sdk(reference) if reference else None,
+            )
+        except ValidationError as exception:
+            raise DomainToSDKError(errors=exception.errors()) from exception
+
     def facet_types_from_sdk(
         self,
         facets: Sequence[destiny_sdk.references.FacetType],
@@ -604,6 +673,31 @@ class ReferenceAntiCorruptionService(GenericAntiCorruptionService):
         except ValidationError as exception:
             raise DomainToSDKError(errors=exception.errors()) from exception
 
+    def reference_search_result_to_sdk_json(
+        self,
+        search_result: ESSearchResult,
+        reference_payloads: Sequence[str],
+    ) -> str:
+        """
+        Render a search result as SDK JSON around pre-rendered reference payloads.
+
+        The payloads are spliced in verbatim, in the order given, rather than being
+        parsed and re-serialised.
+        """
+        try:
+            envelope = destiny_sdk.references.ReferenceSearchResult(
+                total=self._search_total_to_sdk(search_result.total),
+                page={
+                    "count": len(search_result.hits),
+                    "number": search_result.page,
+                },
+                references=[],
+            )
+        except ValidationError as exception:
+            raise DomainToSDKError(errors=exception.errors()) from exception
+        head = envelope.model_dump_json(by_alias=True, exclude={"references"})
+        return f'{head[:-1]},"references":[{",".join(reference_payloads)}]}}'
+
     def reference_id_search_result_to_sdk(
         self,
         search_result: ESSearchResult,
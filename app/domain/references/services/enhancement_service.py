@@ -1,5 +1,6 @@
 """Service for managing batch enhancements."""
 
+import asyncio
 import mimetypes
 from collections.abc import AsyncGenerator, Awaitable, Callable
 from typing import NamedTuple
@@ -10,6 +11,7 @@ from opentelemetry import trace
 
 from app.core.config import get_settings
 from app.core.exceptions import (
+    BlobIntegrityError,
     BlobSizeExceededError,
     FullTextDownloadError,
     FullTextIngestionError,
@@ -21,6 +23,7 @@ from app.core.exceptions import (
 from app.core.telemetry.attributes import Attributes, trace_attribute
 from app.core.telemetry.logger import get_logger
 from app.core.telemetry.otel import new_linked_trace
+from app.core.telemetry.taskiq import queue_task_with_trace
 from app.domain.references.models.models import (
     Enhancement,
     EnhancementRequest,
@@ -47,6 +50,7 @@ from app.domain.references.services.linked_data_validation_service import (
 from app.domain.service import GenericService
 from app.persistence.blob.models import (
     BlobContainer,
+    BlobCopyResult,
     BlobStorageFile,
 )
 from app.persistence.blob.repository import BlobRepository
@@ -85,59 +89,72 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
         super().__init__(anti_corruption_service, sql_uow)
         self._linked_data_validation_service = linked_data_validation_service
 
-    async def store_full_text(
-        self,
-        enhancement: Enhancement,
-        blob_repository: BlobRepository,
-    ) -> None:
+    @staticmethod
+    def _full_text_destination(
+        enhancement: Enhancement, blob_repository: BlobRepository
+    ) -> BlobStorageFile:
         """
-        Copy a full-text enhancement's remote content into our blob storage.
-
-        Mutates ``enhancement.content`` in place: ``blob`` is swapped to the
-        owned location and ``byte_size`` / ``sha256_checksum`` are populated
-        from the copy result if they were not declared.
+        Return where a full-text enhancement's content is stored.
 
-        :raises ValueError: if ``enhancement`` is not a full-text enhancement.
-            Callers are expected to filter by type before calling.
-        :raises FullTextIngestionError: if the blob is not remote, the remote
-            fetch fails, or declared sha256/byte_size disagrees with the
-            computed value.
+        Content with a declared sha256 is addressed by it, so the same document
+        supplied for many references (or re-supplied by a retried robot) is
+        stored once.
         """
         content = enhancement.content
         if content.enhancement_type != EnhancementType.FULL_TEXT:
-            msg = (
-                f"store_full_text called with non-full-text enhancement "
-                f"{enhancement.id} (type {content.enhancement_type})"
-            )
+            msg = f"Enhancement {enhancement.id} is not a full-text enhancement."
             raise ValueError(msg)
-        if not content.blob.is_remote:
-            msg = (
-                f"store_full_text called with non-remote blob for enhancement "
-                f"{enhancement.id}: {content.blob.to_uri()}"
-            )
-            raise FullTextIngestionError(msg)
-
-        source = content.blob
         extension = mimetypes.guess_extension(content.mime_type) or ".bin"
-        destination = blob_repository.destination(
+        if content.sha256_checksum is not None:
+            return blob_repository.destination(
+                path=f"sha256/{content.sha256_checksum[:2]}",
+                filename=f"{content.sha256_checksum}{extension}",
+                container=BlobContainer.FULL_TEXTS,
+            )
+        return blob_repository.destination(
             path=str(enhancement.id),
             filename=f"{enhancement.reference_id}{extension}",
             container=BlobContainer.FULL_TEXTS,
         )
-        logger.info(
-            "Storing full text enhancement.",
-            reference_id=str(enhancement.reference_id),
-            enhancement_id=str(enhancement.id),
-            source_uri=source.to_uri(),
-            destination_uri=destination.to_uri(),
-        )
 
+    async def copy_full_text(  # noqa: PLR0913
+        self,
+        source: BlobStorageFile,
+        destination: BlobStorageFile,
+        blob_repository: BlobRepository,
+        *,
+        mime_type: str,
+        sha256_checksum: str | None = None,
+        byte_size: int | None = None,
+    ) -> BlobCopyResult:
+        """
+        Copy remote full-text content into our blob storage.
+
+        :param source: The remote content.
+        :type source: BlobStorageFile
+        :param destination: The owned location to copy to.
+        :type destination: BlobStorageFile
+        :param blob_repository: The blob repository to copy with.
+        :type blob_repository: BlobRepository
+        :param mime_type: The content's mime type.
+        :type mime_type: str
+        :param sha256_checksum: The declared sha256 of the content, if any. A
+            mismatching copy fails before it is committed.
+        :type sha256_checksum: str | None
+        :param byte_size: The declared size of the content, if any.
+        :type byte_size: int | None
+        :raises FullTextIngestionError: if the remote fetch fails, or the declared
+            sha256/byte_size disagrees with the content.
+        :return: The result of the copy.
+        :rtype: BlobCopyResult
+        """
         try:
             result = await blob_repository.copy(
                 source,
                 destination,
                 max_bytes=settings.full_text_max_byte_size,
-                content_type=content.mime_type,
+                content_type=mime_type,
+                expected_sha256=sha256_checksum,
             )
         except BlobSizeExceededError as exc:
             msg = (
@@ -145,27 +162,123 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
                 f"maximum of {settings.full_text_max_byte_size} bytes."
             )
             raise FullTextSizeExceededError(msg) from exc
+        except BlobIntegrityError as exc:
+            msg = f"sha256 mismatch for full text from {source.to_uri()}: {exc.detail}"
+            raise FullTextIntegrityError(msg) from exc
         except RemoteBlobStorageError as exc:
             msg = f"Failed to fetch full text from {source.to_uri()}: {exc.detail}"
             raise FullTextDownloadError(msg) from exc
 
-        if (
-            content.sha256_checksum is not None
-            and content.sha256_checksum != result.sha256_checksum
-        ):
+        if sha256_checksum is not None and sha256_checksum != result.sha256_checksum:
             msg = (
                 f"sha256 mismatch for full text from {source.to_uri()}: "
-                f"declared {content.sha256_checksum!r}, "
+                f"declared {sha256_checksum!r}, "
                 f"computed {result.sha256_checksum!r}"
             )
             raise FullTextIntegrityError(msg)
 
-        if content.byte_size is not None and content.byte_size != result.byte_size:
+        if byte_size is not None and byte_size != result.byte_size:
             msg = (
                 f"byte_size mismatch for full text from {source.to_uri()}: "
-                f"declared {content.byte_size}, computed {result.byte_size}"
+                f"declared {byte_size}, computed {result.byte_size}"
             )
             raise FullTextIntegrityError(msg)
+        return result
+
+    async def store_full_text(
+        self,
+        enhancement: Enhancement,
+        blob_repository: BlobRepository,
+        *,
+        defer: bool = False,
+    ) -> None:
+        """
+        Copy a full-text enhancement's remote content into our blob storage.
+
+        Mutates ``enhancement.content`` in place: ``blob`` is swapped to the
+        owned location and ``byte_size`` / ``sha256_checksum`` are populated
+        from the copy result if they were not declared.
+
+        Content with a declared sha256 that is already stored isn't copied again.
+
+        :param enhancement: The full-text enhancement to store.
+        :type enhancement: Enhancement
+        :param blob_repository: The blob repository to copy with.
+        :type blob_repository: BlobRepository
+        :param defer: Whether to queue the copy rather than wait for it. Only
+            content declaring both its sha256 and byte_size can be deferred, as
+            its owned location and metadata are known without fetching it; other
+            content is copied immediately. If a deferred copy fails, the
+            enhancement is removed.
+        :type defer: bool
+        :raises ValueError: if ``enhancement`` is not a full-text enhancement.
+            Callers are expected to filter by type before calling.
+        :raises FullTextIngestionError: if the blob is not remote, the remote
+            fetch fails, or declared sha256/byte_size disagrees with the
+            computed value.
+        """
+        content = enhancement.content
+        if content.enhancement_type != EnhancementType.FULL_TEXT:
+            msg = (
+                f"store_full_text called with non-full-text enhancement "
+                f"{enhancement.id} (type {content.enhancement_type})"
+            )
+            raise ValueError(msg)
+        if not content.blob.is_remote:
+            msg = (
+                f"store_full_text called with non-remote blob for enhancement "
+                f"{enhancement.id}: {content.blob.to_uri()}"
+            )
+            raise FullTextIngestionError(msg)
+
+        source = content.blob
+        destination = self._full_text_destination(enhancement, blob_repository)
+        log_context = {
+            "reference_id": str(enhancement.reference_id),
+            "enhancement_id": str(enhancement.id),
+            "source_uri": source.to_uri(),
+            "destination_uri": destination.to_uri(),
+        }
+
+        if content.sha256_checksum is not None:
+            stored_size = await blob_repository.get_file_size(destination)
+            if stored_size is not None:
+                if content.byte_size is not None and content.byte_size != stored_size:
+                    msg = (
+                        f"byte_size mismatch for full text from {source.to_uri()}: "
+                        f"declared {content.byte_size}, stored {stored_size}"
+                    )
+                    raise FullTextIntegrityError(msg)
+                content.blob = destination
+                content.byte_size = stored_size
+                logger.info("Full text enhancement already stored.", **log_context)
+                return
+
+        if defer and content.sha256_checksum is not None and content.byte_size:
+            content.blob = destination
+            logger.info("Deferring full text enhancement storage.", **log_context)
+            await queue_task_with_trace(
+                ("app.domain.references.tasks", "store_deferred_full_text"),
+                enhancement_id=enhancement.id,
+                reference_id=enhancement.reference_id,
+                source_uri=source.to_uri(),
+                destination_uri=destination.to_uri(),
+                mime_type=content.mime_type,
+                sha256_checksum=content.sha256_checksum,
+                byte_size=content.byte_size,
+                otel_enabled=settings.otel_enabled,
+            )
+            return
+
+        logger.info("Storing full text enhancement.", **log_context)
+        result = await self.copy_full_text(
+            source,
+            destination,
+            blob_repository,
+            mime_type=content.mime_type,
+            sha256_checksum=content.sha256_checksum,
+            byte_size=content.byte_size,
+        )
 
         content.blob = result.destination
         if content.sha256_checksum is None:
@@ -184,9 +297,21 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
     async def mark_robot_enhancement_batch_failed(
         self, robot_enhancement_batch_id: UUID, error: str
     ) -> RobotEnhancementBatch:
-        """Mark a robot enhancement batch as failed and supply error message."""
-        await self.update_pending_enhancements_status_for_robot_enhancement_batch(
-            robot_enhancement_batch_id,
+        """
+        Mark a robot enhancement batch as failed and supply error message.
+
+        Pending enhancements already settled by an imported chunk of the batch's
+        result keep their status.
+        """
+        pending_enhancements = await self.sql_uow.pending_enhancements.find(
+            robot_enhancement_batch_id=robot_enhancement_batch_id
+        )
+        await self.update_pending_enhancements_status(
+            [
+                pe.id
+                for pe in pending_enhancements
+                if pe.status.can_transition_to(PendingEnhancementStatus.FAILED)
+            ],
             PendingEnhancementStatus.FAILED,
         )
 
@@ -244,14 +369,10 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
             List of newly created retry pending enhancements
 
         """
-        retry_depths = await self.sql_uow.pending_enhancements.get_retry_depths(
-            [expired.id for expired in expired_enhancements]
-        )
-
         enhancements_to_retry = []
 
         for expired_enhancement in expired_enhancements:
-            retry_depth = retry_depths.get(expired_enhancement.id, 0)
+            retry_depth = expired_enhancement.retry_depth
 
             if retry_depth < max_retry_count:
                 new_pending_enhancement = PendingEnhancement(
@@ -260,6 +381,7 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
                     enhancement_request_id=expired_enhancement.enhancement_request_id,
                     source=expired_enhancement.source,
                     retry_of=expired_enhancement.id,
+                    retry_depth=retry_depth + 1,
                     status=PendingEnhancementStatus.PENDING,
                 )
                 enhancements_to_retry.append(new_pending_enhancement)
@@ -434,20 +556,18 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
             )
         ).to_jsonl()
 
-    async def _process_enhancement_line(  # noqa: PLR0913
+    async def _prepare_enhancement_line(
         self,
         enhancement_to_add: destiny_sdk.enhancements.Enhancement,
-        add_enhancement: Callable[
-            [Enhancement], Awaitable[tuple[PendingEnhancementStatus, str]]
-        ],
         blob_repository: BlobRepository,
         line_no: int,
         attempted_reference_ids: set[UUID],
-        results: ProcessedResults,
-        successful_reference_ids: set[UUID],
-        discarded_enhancement_reference_ids: set[UUID],
-    ) -> str:
-        """Process a line containing an enhancement to add."""
+    ) -> Enhancement | str:
+        """
+        Prepare a line containing an enhancement to add.
+
+        Returns the enhancement to add, or the line's result entry if it can't be.
+        """
         trace_attribute(
             Attributes.REFERENCE_ID,
             str(enhancement_to_add.reference_id),
@@ -464,7 +584,11 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
         # Store remote FT blobs before they reach the persistence boundary.
         if enhancement.content.enhancement_type == EnhancementType.FULL_TEXT:
             try:
-                await self.store_full_text(enhancement, blob_repository)
+                await self.store_full_text(
+                    enhancement,
+                    blob_repository,
+                    defer=settings.full_text_defer_copy,
+                )
             except FullTextIngestionError as exc:
                 logger.warning(
                     "Failed to store full text enhancement from robot result.",
@@ -482,20 +606,31 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
                     ).to_jsonl()
                 )
 
-        status, message = await add_enhancement(enhancement)
+        return enhancement
 
+    def _process_added_enhancement(  # noqa: PLR0913
+        self,
+        enhancement: Enhancement,
+        status: PendingEnhancementStatus,
+        message: str,
+        line_no: int,
+        results: ProcessedResults,
+        successful_reference_ids: set[UUID],
+        discarded_enhancement_reference_ids: set[UUID],
+    ) -> str:
+        """Record the outcome of adding an enhancement and return its result entry."""
         if status == PendingEnhancementStatus.COMPLETED:
             results.imported_enhancement_ids.add(enhancement.id)
-            successful_reference_ids.add(enhancement_to_add.reference_id)
+            successful_reference_ids.add(enhancement.reference_id)
 
             return self._anti_corruption_service.robot_result_validation_entry_to_sdk(
                 RobotResultValidationEntry(
-                    reference_id=enhancement_to_add.reference_id,
+                    reference_id=enhancement.reference_id,
                 )
             ).to_jsonl()
 
         if status == PendingEnhancementStatus.DISCARDED:
-            discarded_enhancement_reference_ids.add(enhancement_to_add.reference_id)
+            discarded_enhancement_reference_ids.add(enhancement.reference_id)
 
         logger.warning(
             "Failed to add enhancement",
@@ -507,7 +642,7 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
 
         return self._anti_corruption_service.robot_result_validation_entry_to_sdk(
             RobotResultValidationEntry(
-                reference_id=enhancement_to_add.reference_id,
+                reference_id=enhancement.reference_id,
                 error=message,
             )
         ).to_jsonl()
@@ -530,17 +665,185 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
             else:
                 results.failed_pending_enhancement_ids.add(pending_enhancement.id)
 
+    async def _process_result_line(  # noqa: PLR0913
+        self,
+        validated_result: EnhancementResultValidator,
+        line_no: int,
+        robot_enhancement_batch_id: UUID,
+        blob_repository: BlobRepository,
+        attempted_reference_ids: set[UUID],
+        semaphore: asyncio.Semaphore,
+    ) -> Enhancement | str:
+        """
+        Validate a parsed result line.
+
+        Returns the enhancement to add, or the line's result entry if there is
+        nothing to add.
+        """
+        async with semaphore:
+            with new_linked_trace(
+                "Import enhancement",
+                attributes={
+                    Attributes.FILE_LINE_NO: line_no,
+                    Attributes.ROBOT_ENHANCEMENT_BATCH_ID: str(
+                        robot_enhancement_batch_id
+                    ),
+                },
+            ):
+                if validated_result.robot_error:
+                    return await self._process_robot_error_line(
+                        validated_result.robot_error,
+                        attempted_reference_ids,
+                    )
+                if validated_result.parse_failure:
+                    return await self._process_parse_failure_line(
+                        validated_result.parse_failure,
+                        line_no,
+                    )
+                if not validated_result.enhancement_to_add:
+                    return ""
+
+                # Validate LinkedDataEnhancements against ontology
+                if (
+                    validated_result.enhancement_to_add.content.enhancement_type
+                    == EnhancementType.LINKED_DATA
+                ) and (
+                    ld_error := await self._validate_linked_data_enhancement(
+                        validated_result.enhancement_to_add,
+                    )
+                ):
+                    return await self._process_robot_error_line(
+                        ld_error,
+                        attempted_reference_ids,
+                    )
+                return await self._prepare_enhancement_line(
+                    validated_result.enhancement_to_add,
+                    blob_repository,
+                    line_no,
+                    attempted_reference_ids,
+                )
+
+    async def _process_result_chunk(  # noqa: PLR0913
+        self,
+        chunk: list[tuple[int, EnhancementResultValidator]],
+        robot_enhancement_batch_id: UUID,
+        blob_repository: BlobRepository,
+        pending_enhancements: list[PendingEnhancement],
+        add_enhancements: Callable[
+            [list[Enhancement]], Awaitable[list[tuple[PendingEnhancementStatus, str]]]
+        ],
+        commit_chunk: Callable[[ProcessedResults], Awaitable[None]] | None,
+        attempted_reference_ids: set[UUID],
+        results: ProcessedResults,
+    ) -> list[str]:
+        """
+        Import a chunk of parsed result lines.
+
+        Lines are validated concurrently, their enhancements added together, and
+        the pending enhancements of the references first attempted in this chunk
+        categorized and committed.
+
+        :return: The chunk's result entries, in line order.
+        :rtype: list[str]
+        """
+        chunk_attempted_reference_ids: set[UUID] = set()
+        successful_reference_ids: set[UUID] = set()
+        discarded_enhancement_reference_ids: set[UUID] = set()
+        semaphore = asyncio.Semaphore(settings.robot_result_concurrency)
+
+        processed_lines = await asyncio.gather(
+            *(
+                self._process_result_line(
+                    validated_result,
+                    line_no,
+                    robot_enhancement_batch_id,
+                    blob_repository,
+                    chunk_attempted_reference_ids,
+                    semaphore,
+                )
+                for line_no, validated_result in chunk
+            )
+        )
+
+        to_add = [line for line in processed_lines if isinstance(line, Enhancement)]
+        outcomes = (
+            dict(
+                zip(
+                    (enhancement.id for enhancement in to_add),
+                    await add_enhancements(to_add),
+                    strict=True,
+                )
+            )
+            if to_add
+            else {}
+        )
+
+        chunk_results = ProcessedResults(
+            imported_enhancement_ids=set(),
+            successful_pending_enhancement_ids=set(),
+            failed_pending_enhancement_ids=set(),
+            discarded_pending_enhancement_ids=set(),
+        )
+        result_entries: list[str] = []
+        for (line_no, _), processed_line in zip(chunk, processed_lines, strict=True):
+            if isinstance(processed_line, Enhancement):
+                status, message = outcomes[processed_line.id]
+                result_entries.append(
+                    self._process_added_enhancement(
+                        processed_line,
+                        status,
+                        message,
+                        line_no,
+                        chunk_results,
+                        successful_reference_ids,
+                        discarded_enhancement_reference_ids,
+                    )
+                )
+            elif processed_line:  # Only yield non-empty results
+                result_entries.append(processed_line)
+
+        # A reference's outcome is settled by the first line naming it.
+        newly_attempted_reference_ids = (
+            chunk_attempted_reference_ids - attempted_reference_ids
+        )
+        attempted_reference_ids |= chunk_attempted_reference_ids
+        self._categorize_pending_enhancements(
+            [
+                pe
+                for pe in pending_enhancements
+                if pe.reference_id in newly_attempted_reference_ids
+            ],
+            successful_reference_ids,
+            discarded_enhancement_reference_ids,
+            chunk_results,
+        )
+        await self._commit_result_chunk(chunk_results, commit_chunk, results)
+        return result_entries
+
+    @staticmethod
+    async def _commit_result_chunk(
+        chunk_results: ProcessedResults,
+        commit_chunk: Callable[[ProcessedResults], Awaitable[None]] | None,
+        results: ProcessedResults,
+    ) -> None:
+        """Commit a chunk's results and fold them into the batch's results."""
+        if commit_chunk:
+            await commit_chunk(chunk_results)
+        for total, chunk in zip(results, chunk_results, strict=True):
+            total.update(chunk)
+
     async def process_robot_enhancement_batch_result(  # noqa: PLR0913
         self,
         robot_enhancement_batch_id: UUID,
         blob_repository: BlobRepository,
         result_file: BlobStorageFile,
         pending_enhancements: list[PendingEnhancement],
-        add_enhancement: Callable[
-            [Enhancement], Awaitable[tuple[PendingEnhancementStatus, str]]
+        add_enhancements: Callable[
+            [list[Enhancement]], Awaitable[list[tuple[PendingEnhancementStatus, str]]]
         ],
         results: ProcessedResults,
         access_control_service: ReferenceAccessControlService,
+        commit_chunk: Callable[[ProcessedResults], Awaitable[None]] | None = None,
     ) -> AsyncGenerator[str, None]:
         """
         Validate the result of a robot enhancement batch.
@@ -548,94 +851,74 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
         This generator yields validation messages which are streamed into the
         result file of the robot enhancement batch.
 
+        Lines are imported in chunks of ``robot_result_chunk_size``: a chunk's
+        lines are validated concurrently, its enhancements are added with a single
+        call to ``add_enhancements`` (returning a status and message for each),
+        and ``commit_chunk`` is called with the chunk's results before its
+        validation messages are yielded. ``results`` accumulates every chunk's.
+
         ``access_control_service`` carries the entitlements of the robot that
         produced the result.
         """
         expected_reference_ids = {pe.reference_id for pe in pending_enhancements}
-        successful_reference_ids: set[UUID] = set()
         attempted_reference_ids: set[UUID] = set()
-        discarded_enhancement_reference_ids: set[UUID] = set()
         # Track processed IDs for duplicate validation
         processed_reference_ids: set[UUID] = set()
 
+        async def import_chunk(
+            chunk: list[tuple[int, EnhancementResultValidator]],
+        ) -> list[str]:
+            return await self._process_result_chunk(
+                chunk,
+                robot_enhancement_batch_id,
+                blob_repository,
+                pending_enhancements,
+                add_enhancements,
+                commit_chunk,
+                attempted_reference_ids,
+                results,
+            )
+
         with tracer.start_as_current_span("Ingest robot enhancement batch result file"):
             async with blob_repository.stream_file_from_blob_storage(
                 result_file,
             ) as file_stream:
-                # Read the file stream and validate the content
+                # Read the file stream, parsing lines in order so that duplicate
+                # references are detected, and import them a chunk at a time.
+                chunk: list[tuple[int, EnhancementResultValidator]] = []
                 line_no = 1
                 async for line in file_stream:
-                    with new_linked_trace(
-                        "Import enhancement",
-                        attributes={
-                            Attributes.FILE_LINE_NO: line_no,
-                            Attributes.ROBOT_ENHANCEMENT_BATCH_ID: str(
-                                robot_enhancement_batch_id
-                            ),
-                        },
-                    ):
-                        if not line.strip():
-                            continue
-
-                        validated_result = EnhancementResultValidator.from_raw(
-                            line,
-                            line_no,
-                            expected_reference_ids,
-                            processed_reference_ids,
-                            allow_raw_enhancements=access_control_service.may_write_raw_enhancements,
+                    if not line.strip():
+                        continue
+
+                    validated_result = EnhancementResultValidator.from_raw(
+                        line,
+                        line_no,
+                        expected_reference_ids,
+                        processed_reference_ids,
+                        allow_raw_enhancements=access_control_service.may_write_raw_enhancements,
+                    )
+                    line_no += 1
+
+                    # Track processed IDs here for clarity
+                    if validated_result.robot_error:
+                        ref_id = validated_result.robot_error.reference_id
+                        if ref_id in expected_reference_ids:
+                            processed_reference_ids.add(ref_id)
+                    elif validated_result.enhancement_to_add:
+                        processed_reference_ids.add(
+                            validated_result.enhancement_to_add.reference_id
                         )
-                        line_no += 1
-
-                        # Process the validated result line
-                        result_entry = ""
-                        if validated_result.robot_error:
-                            # Track processed IDs here for clarity
-                            ref_id = validated_result.robot_error.reference_id
-                            if ref_id in expected_reference_ids:
-                                processed_reference_ids.add(ref_id)
-                            result_entry = await self._process_robot_error_line(
-                                validated_result.robot_error,
-                                attempted_reference_ids,
-                            )
-                        elif validated_result.parse_failure:
-                            result_entry = await self._process_parse_failure_line(
-                                validated_result.parse_failure,
-                                line_no,
-                            )
-                        elif validated_result.enhancement_to_add:
-                            # Track processed IDs here for clarity
-                            processed_reference_ids.add(
-                                validated_result.enhancement_to_add.reference_id
-                            )
-
-                            # Validate LinkedDataEnhancements against ontology
-                            if (
-                                validated_result.enhancement_to_add.content.enhancement_type
-                                == EnhancementType.LINKED_DATA
-                            ) and (
-                                ld_error
-                                := await self._validate_linked_data_enhancement(
-                                    validated_result.enhancement_to_add,
-                                )
-                            ):
-                                result_entry = await self._process_robot_error_line(
-                                    ld_error,
-                                    attempted_reference_ids,
-                                )
-                            else:
-                                result_entry = await self._process_enhancement_line(
-                                    validated_result.enhancement_to_add,
-                                    add_enhancement,
-                                    blob_repository,
-                                    line_no,
-                                    attempted_reference_ids,
-                                    results,
-                                    successful_reference_ids,
-                                    discarded_enhancement_reference_ids,
-                                )
-
-                        if result_entry:  # Only yield non-empty results
+
+                    chunk.append((line_no, validated_result))
+                    if len(chunk) >= settings.robot_result_chunk_size:
+                        for result_entry in await import_chunk(chunk):
                             yield result_entry
+                        chunk = []
+
+                if chunk:
+                    for result_entry in await import_chunk(chunk):
+                        yield result_entry
 
         # Generate entries for missing references
         if missing_reference_ids := (expected_reference_ids - attempted_reference_ids):
@@ -649,13 +932,17 @@ class EnhancementService(GenericService[ReferenceAntiCorruptionService]):
                     ).to_jsonl()
                 )
 
-        # Categorize pending enhancements
-        self._categorize_pending_enhancements(
-            pending_enhancements,
-            successful_reference_ids,
-            discarded_enhancement_reference_ids,
-            results,
-        )
+            missing_results = ProcessedResults(
+                imported_enhancement_ids=set(),
+                successful_pending_enhancement_ids=set(),
+                failed_pending_enhancement_ids={
+                    pe.id
+                    for pe in pending_enhancements
+                    if pe.reference_id in missing_reference_ids
+                },
+                discarded_pending_enhancement_ids=set(),
+            )
+            await self._commit_result_chunk(missing_results, commit_chunk, results)
 
     @sql_unit_of_work
     async def register_search_enhancement_request(
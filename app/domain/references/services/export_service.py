@@ -1,12 +1,16 @@
 """Services for the lifecycle of reference export jobs."""
 
+import asyncio
+import contextlib
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TypeVar
+from collections.abc import AsyncGenerator, AsyncIterable
+from typing import Any, ClassVar, Generic, TypeVar
 from uuid import UUID
 
 from opentelemetry import trace
 
 from app.core.config import UploadFile, get_settings
+from app.core.exceptions import ExportSupersededError, SQLNotFoundError
 from app.core.telemetry.logger import get_logger
 from app.domain.references.models.models import (
     Export,
@@ -25,13 +29,16 @@ from app.domain.references.services.anti_corruption_service import (
 )
 from app.domain.references.services.search_service import SearchService
 from app.domain.service import GenericService
-from app.persistence.blob.models import BlobStorageFile
+from app.persistence.blob.compression import compress_bytes
+from app.persistence.blob.models import BlobStorageFile, ContentEncoding
 from app.persistence.blob.repository import BlobRepository
 from app.persistence.es.uow import AsyncESUnitOfWork
-from app.persistence.es.uow import unit_of_work as es_unit_of_work
+from app.persistence.es.uow import generator_unit_of_work as es_generator_unit_of_work
 from app.persistence.sql.repository import GenericAsyncSqlRepository
 from app.persistence.sql.uow import AsyncSqlUnitOfWork
 from app.persistence.sql.uow import unit_of_work as sql_unit_of_work
+from app.utils.aio import prefetch
+from app.utils.lists import list_chunker
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -40,10 +47,34 @@ tracer = trace.get_tracer(__name__)
 ExportT = TypeVar("ExportT", bound=Export)
 
 
+async def _skip_references(
+    pages: AsyncIterable[list[UUID]], n_references: int
+) -> AsyncGenerator[list[UUID], None]:
+    """Drop the first ``n_references`` ids from a stream of pages."""
+    async for page in pages:
+        if n_references >= len(page):
+            n_references -= len(page)
+            continue
+        yield page[n_references:]
+        n_references = 0
+
+
 class ExportServiceBase(
     GenericService[ReferenceAntiCorruptionService], Generic[ExportT], ABC
 ):
-    """Shared lifecycle for export jobs."""
+    """
+    Shared lifecycle for export jobs.
+
+    Exports of a resumable kind, in a concatenable format, are checkpointed: the
+    file is uploaded a block per page, and each staged block is recorded on the
+    export row. A task redelivered after its worker died reclaims the running
+    export and continues from the last checkpoint, redoing at most one page.
+    """
+
+    _resumable: ClassVar[bool] = False
+    """Whether a running export of this kind can be reclaimed and resumed. Its
+    pages must be reproducible, so that a resumed export skips exactly the
+    references already written."""
 
     def __init__(
         self,
@@ -69,16 +100,22 @@ class ExportServiceBase(
         """The blob storage subdirectory produced files are written to."""
 
     @abstractmethod
-    async def _resolve_reference_ids(
-        self, export: ExportT
-    ) -> tuple[list[UUID], dict[str, object]]:
+    def _reference_id_pages(self, export: ExportT) -> AsyncGenerator[list[UUID], None]:
         """
-        Resolve a claimed export row to its reference ids and completion extras.
+        Yield a claimed export's reference ids a page at a time, in file order.
 
-        Returns the ids to stream and any extra fields to persist on completion
-        (e.g. a search export's `truncated` flag).
+        Pages are pulled as the file is written, so implementations should produce
+        them lazily rather than resolving every id up front.
         """
 
+    @property
+    def _page_size(self) -> int:
+        """The number of references resolved, hydrated and written together."""
+        return settings.upload_file_chunk_size_override.get(
+            UploadFile.SEARCH_EXPORT,
+            settings.default_upload_file_chunk_size,
+        )
+
     @sql_unit_of_work
     async def get(self, export_id: UUID) -> ExportT:
         """Get an export job by id."""
@@ -98,17 +135,71 @@ class ExportServiceBase(
         """
         Atomically transition pending → running, returning the claimed row.
 
-        Returns ``None`` if the row was not in `pending`. The fetch happens in
-        the same UoW as the update so the caller can't see a row that has
-        since been mutated by another transaction.
+        Resumable exports can also be reclaimed while running, by a redelivered
+        task whose previous attempt died. Every claim bumps the row's attempt,
+        which fences out any earlier attempt still running (see
+        :meth:`_checkpoint`).
+
+        Returns ``None`` if the row does not exist or was not claimable, or
+        another claim won the race. The update is conditional on the row being
+        unchanged since it was read, so the caller can't see a row that has since
+        been mutated by another transaction.
         """
+        try:
+            export = await self._repository.get_by_pk(export_id)
+        except SQLNotFoundError:
+            return None
+        claimable = {ExportStatus.PENDING}
+        if self._resumable:
+            claimable.add(ExportStatus.RUNNING)
+        if export.status not in claimable:
+            return None
         updated = await self._repository.bulk_update_by_filter(
-            filter_conditions={"id": export_id, "status": ExportStatus.PENDING},
+            filter_conditions={
+                "id": export_id,
+                "status": export.status,
+                "attempt": export.attempt,
+            },
             status=ExportStatus.RUNNING,
+            attempt=export.attempt + 1,
         )
         if updated == 0:
             return None
-        return await self._repository.get_by_pk(export_id)
+        return export.model_copy(
+            update={"status": ExportStatus.RUNNING, "attempt": export.attempt + 1}
+        )
+
+    @sql_unit_of_work
+    async def _checkpoint(
+        self, export: ExportT, committed_chunks: int, committed_references: int
+    ) -> None:
+        """
+        Record the chunks of a claimed export that are staged in blob storage.
+
+        :raises ExportSupersededError: If a later attempt has reclaimed the export,
+            or it is no longer running.
+        """
+        updated = await self._repository.bulk_update_by_filter(
+            filter_conditions={
+                "id": export.id,
+                "status": ExportStatus.RUNNING,
+                "attempt": export.attempt,
+            },
+            committed_chunks=committed_chunks,
+            committed_references=committed_references,
+        )
+        if updated == 0:
+            msg = f"Export {export.id} attempt {export.attempt} has been superseded."
+            raise ExportSupersededError(msg)
+
+    @sql_unit_of_work
+    async def _fail_attempt(self, export: ExportT, error: str) -> None:
+        """Mark a claimed export as failed, unless a later attempt has reclaimed it."""
+        await self._repository.bulk_update_by_filter(
+            filter_conditions={"id": export.id, "attempt": export.attempt},
+            status=ExportStatus.FAILED,
+            error=error,
+        )
 
     @sql_unit_of_work
     async def _complete(
@@ -116,7 +207,6 @@ class ExportServiceBase(
         export_id: UUID,
         result_file: BlobStorageFile,
         n_references: int,
-        **extra: object,
     ) -> ExportT:
         """Mark an export as completed."""
         return await self._repository.update_by_pk(
@@ -124,7 +214,6 @@ class ExportServiceBase(
             status=ExportStatus.COMPLETED,
             result_file=result_file.to_uri(),
             n_references=n_references,
-            **extra,
         )
 
     @sql_unit_of_work
@@ -132,60 +221,153 @@ class ExportServiceBase(
         self,
         *,
         export_id: UUID,
-        reference_ids: list[UUID],
+        reference_id_pages: AsyncGenerator[list[UUID], None],
         export_format: ExportFormat,
         blob_repository: BlobRepository,
+        compression: ContentEncoding | None = None,
     ) -> tuple[BlobStorageFile, int]:
         """Stream references to blob storage in the given format, returning the file."""
-        chunk_size = settings.upload_file_chunk_size_override.get(
-            UploadFile.SEARCH_EXPORT,
-            settings.default_upload_file_chunk_size,
-        )
-        return await self._reference_service.stream_references_to_blob(
+        async with contextlib.aclosing(reference_id_pages) as pages:
+            return await self._reference_service.stream_reference_pages_to_blob(
+                reference_id_pages=pages,
+                export_format=export_format,
+                access_control_service=self._access_control_service,
+                blob_repository=blob_repository,
+                path=self._blob_path,
+                filename=f"{export_id}.{export_format.extension}",
+                compression=compression,
+            )
+
+    @sql_unit_of_work
+    async def _serialize_chunk(
+        self, export: ExportT, reference_ids: list[UUID]
+    ) -> bytes:
+        """Serialize one page of a checkpointed export in its own transaction."""
+        return await self._reference_service.serialize_reference_page(
             reference_ids=reference_ids,
-            export_format=export_format,
+            export_format=export.export_format,
             access_control_service=self._access_control_service,
-            blob_repository=blob_repository,
-            path=self._blob_path,
-            filename=f"{export_id}.{export_format.extension}",
-            chunk_size=chunk_size,
         )
 
+    async def stream_checkpointed_export_file(
+        self,
+        *,
+        export: ExportT,
+        blob_repository: BlobRepository,
+    ) -> tuple[BlobStorageFile, int]:
+        """
+        Upload a claimed export a block per page, checkpointing each block.
+
+        Continues from the export's last checkpoint. Each page is hydrated and
+        serialized in its own transaction, and its block (compressed as a whole
+        stream, so blocks concatenate) is staged while the next page is
+        hydrated. The file is assembled from its blocks once every page is
+        staged.
+
+        :param export: The claimed export. Its format must be concatenable.
+        :type export: ExportT
+        :raises ExportSupersededError: If a later attempt reclaims the export.
+        :return: The uploaded file and the number of references in it.
+        :rtype: tuple[BlobStorageFile, int]
+        """
+        filename = f"{export.id}.{export.export_format.extension}"
+        if export.compression:
+            filename = f"{filename}.{export.compression.extension}"
+        file = blob_repository.destination(path=self._blob_path, filename=filename)
+
+        async def _stage(index: int, data: bytes, n_references: int) -> tuple[int, int]:
+            if export.compression:
+                data = await compress_bytes(data, export.compression)
+            await blob_repository.stage_block(file, index, data)
+            return index + 1, n_references
+
+        n_chunks, n_references = export.committed_chunks, export.committed_references
+        staging: asyncio.Task[tuple[int, int]] | None = None
+        try:
+            async with contextlib.aclosing(
+                _skip_references(self._reference_id_pages(export), n_references)
+            ) as pages:
+                async for reference_ids in pages:
+                    if not reference_ids:
+                        continue
+                    data = await self._serialize_chunk(export, reference_ids)
+                    if staging is not None:
+                        await self._checkpoint(export, *await staging)
+                    n_references += len(reference_ids)
+                    staging = asyncio.create_task(_stage(n_chunks, data, n_references))
+                    n_chunks += 1
+            if staging is not None:
+                await self._checkpoint(export, *await staging)
+        finally:
+            if staging is not None and not staging.done():
+                staging.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await staging
+
+        if n_chunks == 0 and export.compression:
+            # An empty file isn't a valid compressed stream, so stage an empty
+            # member to give decoders a header and trailer to read.
+            n_chunks, _ = await _stage(0, b"", 0)
+        await blob_repository.commit_blocks(file, n_chunks)
+        return file, n_references
+
     async def run(
         self,
         export_id: UUID,
         blob_repository: BlobRepository,
     ) -> None:
-        """Run a queued export job end-to-end."""
+        """Run a queued export job end-to-end, resuming it if it is checkpointed."""
         export = await self._claim(export_id)
         if export is None:
             logger.info(
-                "Skipping export — not in pending state",
+                "Skipping export — not claimable",
                 export_id=str(export_id),
                 export_kind=type(self).__name__,
             )
             return
         try:
-            reference_ids, extra = await self._resolve_reference_ids(export)
-            result_file, n_references = await self.stream_export_file(
-                export_id=export.id,
-                reference_ids=reference_ids,
-                export_format=export.export_format,
-                blob_repository=blob_repository,
+            if self._resumable and export.export_format.concatenable:
+                if export.committed_chunks:
+                    logger.info(
+                        "Resuming export from checkpoint",
+                        export_id=str(export_id),
+                        export_kind=type(self).__name__,
+                        committed_chunks=export.committed_chunks,
+                        committed_references=export.committed_references,
+                    )
+                result_file, n_references = await self.stream_checkpointed_export_file(
+                    export=export, blob_repository=blob_repository
+                )
+            else:
+                result_file, n_references = await self.stream_export_file(
+                    export_id=export.id,
+                    reference_id_pages=self._reference_id_pages(export),
+                    export_format=export.export_format,
+                    blob_repository=blob_repository,
+                    compression=export.compression,
+                )
+            await self._complete(export_id, result_file, n_references)
+        except ExportSupersededError:
+            logger.info(
+                "Abandoning export — reclaimed by a later attempt",
+                export_id=str(export_id),
+                export_kind=type(self).__name__,
             )
-            await self._complete(export_id, result_file, n_references, **extra)
         except Exception as exc:
             logger.exception(
                 "Export job failed",
                 export_id=str(export_id),
                 export_kind=type(self).__name__,
             )
-            await self.fail(export_id, f"Failed to run export task: {exc}")
+            await self._fail_attempt(export, f"Failed to run export task: {exc}")
 
 
 class ReferenceExportService(ExportServiceBase[ReferenceExport]):
     """Export an explicit list of reference ids to a file."""
 
+    # The stored id list reproduces the same pages on every attempt.
+    _resumable = True
+
     @property
     def _repository(self) -> GenericAsyncSqlRepository[ReferenceExport, Any, Any]:
         return self.sql_uow.reference_exports
@@ -194,17 +376,19 @@ class ReferenceExportService(ExportServiceBase[ReferenceExport]):
     def _blob_path(self) -> str:
         return "reference_exports"
 
-    async def _resolve_reference_ids(
+    async def _reference_id_pages(
         self, export: ReferenceExport
-    ) -> tuple[list[UUID], dict[str, object]]:
-        """Return the ids the reference export already carries."""
-        return export.reference_ids, {}
+    ) -> AsyncGenerator[list[UUID], None]:
+        """Page through the ids the reference export already carries."""
+        for page in list_chunker(export.reference_ids, self._page_size):
+            yield page
 
     @sql_unit_of_work
     async def request_reference_export(
         self,
         reference_ids: list[UUID],
         export_format: ExportFormat = ExportFormat.JSONL,
+        compression: ContentEncoding | None = None,
     ) -> ReferenceExport:
         """
         Create a pending reference export job.
@@ -215,7 +399,9 @@ class ReferenceExportService(ExportServiceBase[ReferenceExport]):
         reference_ids = list(dict.fromkeys(reference_ids))
         await self.sql_uow.references.verify_pk_existence(reference_ids)
         reference_export = ReferenceExport(
-            reference_ids=reference_ids, export_format=export_format
+            reference_ids=reference_ids,
+            export_format=export_format,
+            compression=compression,
         )
         await self.sql_uow.reference_exports.add(reference_export)
         return reference_export
@@ -224,6 +410,10 @@ class ReferenceExportService(ExportServiceBase[ReferenceExport]):
 class SearchExportService(ExportServiceBase[SearchExport]):
     """Export the references matching a search query to a file."""
 
+    # A retried scan opens a new point in time, which needn't match the snapshot
+    # the earlier attempt's pages came from, so search exports restart instead.
+    _resumable = False
+
     def __init__(
         self,
         anti_corruption_service: ReferenceAntiCorruptionService,
@@ -250,12 +440,26 @@ class SearchExportService(ExportServiceBase[SearchExport]):
     def _blob_path(self) -> str:
         return "search_exports"
 
-    async def _resolve_reference_ids(
+    @es_generator_unit_of_work
+    async def _reference_id_pages(
         self, export: SearchExport
-    ) -> tuple[list[UUID], dict[str, object]]:
-        """Run the search once and carry `truncated` through to completion."""
-        reference_ids, truncated = await self._collect_search_export_ids(export)
-        return reference_ids, {"truncated": truncated}
+    ) -> AsyncGenerator[list[UUID], None]:
+        """
+        Scan every match of the export's search, a page at a time.
+
+        The scan holds a point in time open, so the export is a consistent snapshot
+        of the matches with no result-window cap. Pages are prefetched: the next is
+        fetched from Elasticsearch while the current one is hydrated and written.
+        """
+        async with contextlib.aclosing(
+            prefetch(
+                self._search_service.scan(
+                    export.query, sort=export.sort, page_size=self._page_size
+                )
+            )
+        ) as pages:
+            async for page in pages:
+                yield [hit.id for hit in page.hits]
 
     @sql_unit_of_work
     async def request_search_export(
@@ -263,37 +467,14 @@ class SearchExportService(ExportServiceBase[SearchExport]):
         query: SearchQuery,
         sort: list[str] | None,
         export_format: ExportFormat = ExportFormat.JSONL,
+        compression: ContentEncoding | None = None,
     ) -> SearchExport:
         """Create a pending search export job."""
         search_export = SearchExport(
-            query=query, sort=sort, export_format=export_format
+            query=query,
+            sort=sort,
+            export_format=export_format,
+            compression=compression,
         )
         await self.sql_uow.search_exports.add(search_export)
         return search_export
-
-    @es_unit_of_work
-    async def _collect_search_export_ids(
-        self, search_export: SearchExport
-    ) -> tuple[list[UUID], bool]:
-        """
-        Run the matching search once at the full result window.
-
-        Returns the list of reference IDs and a flag indicating whether the
-        matching set exceeded the server's result-window cap (in which case
-        only the first window's worth of matches is included). Deep
-        pagination beyond the cap will be addressed by #661.
-        """
-        search_result = await self._search_service.search(
-            search_export.query,
-            page=1,
-            page_size=SearchService.MAX_RESULT_WINDOW,
-            sort=search_export.sort,
-        )
-        # `relation == "gte"` is the common case (ES stopped counting at the
-        # track_total_hits threshold); `value > window` covers a server that
-        # tracks exact totals beyond our cap.
-        total = search_result.total
-        truncated = (
-            total.relation == "gte" or total.value > SearchService.MAX_RESULT_WINDOW
-        )
-        return [hit.id for hit in search_result.hits], truncated
@@ -1,6 +1,7 @@
 """Projection of LinkedDataEnhancement data into flat searchable fields."""
 
 import json
+from functools import cache
 
 from destiny_sdk.enhancements import LinkedDataEnhancement
 from rdflib import Graph, Literal, Namespace, URIRef
@@ -8,7 +9,10 @@ from rdflib.namespace import RDF, SKOS
 
 from app.domain.references.models.models import LinkedDataProjection
 from app.domain.references.services.world_bank_regions import regions_for
-from app.external.vocabulary.client import VocabularyArtifactClient
+from app.external.vocabulary.client import (
+    VocabularyArtifactClient,
+    get_vocabulary_artifact_client,
+)
 
 EVREPO = Namespace("https://vocab.evidence-repository.org/")
 ESEA = Namespace("https://vocab.esea.education/")
@@ -241,3 +245,9 @@ class LinkedDataProjectionService:
             """
         )
         return {str(row.prop) for row in results}
+
+
+@cache
+def get_linked_data_projection_service() -> LinkedDataProjectionService:
+    """Singleton LinkedDataProjectionService with internal vocabulary caching."""
+    return LinkedDataProjectionService(get_vocabulary_artifact_client())
@@ -0,0 +1,402 @@
+"""
+In-process matching of robot automations against percolatable documents.
+
+Most robot automation queries are simple ``term``, ``terms`` and ``exists`` filters
+combined with ``bool`` and ``nested``. Those are compiled into Python predicates and
+evaluated against the same document Elasticsearch would percolate, so that only
+automations using anything else need an Elasticsearch round trip.
+
+A query is only compiled if every construct in it is understood, including the
+mapping of every field it references. Anything else - full text queries, ranges,
+dynamically mapped enhancement content, fields referenced outside of their nested
+scope - is left to Elasticsearch.
+"""
+
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Mapping, Sequence
+from enum import Enum
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import get_settings
+from app.domain.references.models.es import RobotAutomationPercolationDocument
+from app.domain.references.models.models import (
+    ReferenceWithChangeset,
+    RobotAutomation,
+    RobotAutomationPercolationResult,
+)
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+Predicate = Callable[[Mapping[str, Any]], bool]
+
+# Keys accepted on any query without changing which documents it matches.
+_IGNORED_KEYS = frozenset({"boost", "_name"})
+_COMPILED_FIELD_TYPES = frozenset({"keyword", "boolean"})
+_BOOLEAN_STRINGS = {"true": True, "false": False}
+
+
+class _UnsupportedQueryError(Exception):
+    """A query uses a construct that is not compiled locally."""
+
+
+def _mapped_fields(
+    properties: Mapping[str, Any], prefix: str = ""
+) -> Iterator[tuple[str, Mapping[str, Any]]]:
+    """Yield the full path and mapping of every field, depth first."""
+    for name, field in properties.items():
+        path = f"{prefix}{name}"
+        yield path, field
+        yield from _mapped_fields(field.get("properties", {}), f"{path}.")
+
+
+_MAPPING = dict(
+    _mapped_fields(
+        RobotAutomationPercolationDocument._index.to_dict()["mappings"]["properties"]  # noqa: SLF001
+    )
+)
+_NESTED_PATHS = frozenset(
+    path for path, field in _MAPPING.items() if field.get("type") == "nested"
+)
+
+
+def _is_within(path: str, scope: str) -> bool:
+    """Whether ``path`` lies beneath the nested ``scope`` ("" being the root)."""
+    return not scope or path.startswith(f"{scope}.")
+
+
+def _relative(path: str, scope: str) -> list[str]:
+    """Split ``path`` into its parts beneath ``scope``."""
+    return path[len(scope) + 1 if scope else 0 :].split(".")
+
+
+def _nested_scope(path: str) -> str:
+    """Return the innermost nested path containing ``path``."""
+    return max(
+        (nested for nested in _NESTED_PATHS if path.startswith(f"{nested}.")),
+        key=len,
+        default="",
+    )
+
+
+def _values(node: Mapping[str, Any], parts: Sequence[str]) -> list[Any]:
+    """Collect the non-null values at ``parts`` beneath ``node``, flattening lists."""
+    values: list[Any] = [node]
+    for part in parts:
+        children: list[Any] = []
+        for value in values:
+            if isinstance(value, Mapping) and part in value:
+                child = value[part]
+                children.extend(child if isinstance(child, list) else [child])
+        values = children
+    return [value for value in values if value is not None]
+
+
+def _check_keys(
+    body: Mapping[str, Any], allowed: Iterable[str], required: Iterable[str] = ()
+) -> None:
+    if not set(body) <= _IGNORED_KEYS | set(allowed) or not set(required) <= set(body):
+        raise _UnsupportedQueryError
+
+
+def _field(path: object, scope: str) -> tuple[list[str], str]:
+    """Resolve a leaf field referenced from ``scope`` to its parts and type."""
+    if not isinstance(path, str) or path not in _MAPPING:
+        raise _UnsupportedQueryError
+    field = _MAPPING[path]
+    # Fields in another nested scope never match in Elasticsearch; leave that (and
+    # anything unindexed) to it rather than reproducing the edge case.
+    if (
+        field.get("type") not in _COMPILED_FIELD_TYPES
+        or field.get("index") is False
+        or _nested_scope(path) != scope
+    ):
+        raise _UnsupportedQueryError
+    return _relative(path, scope), field["type"]
+
+
+def _normalise(value: object, field_type: str) -> object:
+    """Normalise a document value as Elasticsearch would index it for a field type."""
+    if isinstance(value, Enum):
+        value = value.value
+    if field_type == "boolean":
+        if isinstance(value, str):
+            return _BOOLEAN_STRINGS.get(value)
+        return value if isinstance(value, bool) else None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _query_value(value: object, field_type: str) -> object:
+    """Validate a term in a query against the field type it is matched on."""
+    if field_type == "boolean" and isinstance(value, str):
+        value = _BOOLEAN_STRINGS.get(value)
+    if (field_type == "boolean" and isinstance(value, bool)) or (
+        field_type == "keyword" and isinstance(value, str)
+    ):
+        return value
+    raise _UnsupportedQueryError
+
+
+def _leaf_predicate(
+    parts: Sequence[str], field_type: str, terms: set[object]
+) -> Predicate:
+    def predicate(node: Mapping[str, Any]) -> bool:
+        return any(
+            _normalise(value, field_type) in terms for value in _values(node, parts)
+        )
+
+    return predicate
+
+
+def _single_field(body: Mapping[str, Any]) -> tuple[str, Any]:
+    fields = [key for key in body if key not in _IGNORED_KEYS]
+    if len(fields) != 1:
+        raise _UnsupportedQueryError
+    return fields[0], body[fields[0]]
+
+
+def _compile_term(body: Mapping[str, Any], scope: str) -> Predicate:
+    if len(body) != 1:
+        raise _UnsupportedQueryError
+    path, value = next(iter(body.items()))
+    if isinstance(value, Mapping):
+        _check_keys(value, {"value", "case_insensitive"}, required={"value"})
+        if value.get("case_insensitive"):
+            raise _UnsupportedQueryError
+        value = value["value"]
+    parts, field_type = _field(path, scope)
+    return _leaf_predicate(parts, field_type, {_query_value(value, field_type)})
+
+
+def _compile_terms(body: Mapping[str, Any], scope: str) -> Predicate:
+    path, values = _single_field(body)
+    if not isinstance(values, list):
+        # A terms lookup document.
+        raise _UnsupportedQueryError
+    parts, field_type = _field(path, scope)
+    return _leaf_predicate(
+        parts, field_type, {_query_value(value, field_type) for value in values}
+    )
+
+
+def _compile_exists(body: Mapping[str, Any], scope: str) -> Predicate:
+    _check_keys(body, {"field"}, required={"field"})
+    parts, _ = _field(body["field"], scope)
+
+    def predicate(node: Mapping[str, Any]) -> bool:
+        return bool(_values(node, parts))
+
+    return predicate
+
+
+def _compile_match_all(body: Mapping[str, Any], _scope: str) -> Predicate:
+    _check_keys(body, ())
+    return lambda _node: True
+
+
+def _compile_match_none(body: Mapping[str, Any], _scope: str) -> Predicate:
+    _check_keys(body, ())
+    return lambda _node: False
+
+
+def _minimum_should_match(value: object) -> int:
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise _UnsupportedQueryError
+    return value
+
+
+def _compile_bool(body: Mapping[str, Any], scope: str) -> Predicate:
+    _check_keys(body, {"must", "filter", "should", "must_not", "minimum_should_match"})
+
+    def clauses(occur: str) -> list[Predicate]:
+        queries = body.get(occur, [])
+        if isinstance(queries, Mapping):
+            queries = [queries]
+        if not isinstance(queries, list):
+            raise _UnsupportedQueryError
+        return [_compile(query, scope) for query in queries]
+
+    required = clauses("must") + clauses("filter")
+    should = clauses("should")
+    must_not = clauses("must_not")
+    minimum_should_match = (
+        _minimum_should_match(body["minimum_should_match"])
+        if "minimum_should_match" in body
+        else int(bool(should) and not required)
+    )
+
+    def predicate(node: Mapping[str, Any]) -> bool:
+        return (
+            all(clause(node) for clause in required)
+            and not any(clause(node) for clause in must_not)
+            and sum(clause(node) for clause in should) >= minimum_should_match
+        )
+
+    return predicate
+
+
+def _compile_nested(body: Mapping[str, Any], scope: str) -> Predicate:
+    _check_keys(
+        body, {"path", "query", "score_mode", "ignore_unmapped"}, {"path", "query"}
+    )
+    path = body["path"]
+    if path not in _NESTED_PATHS or path == scope or not _is_within(path, scope):
+        raise _UnsupportedQueryError
+    inner = _compile(body["query"], path)
+    parts = _relative(path, scope)
+
+    def predicate(node: Mapping[str, Any]) -> bool:
+        return any(inner(child) for child in _values(node, parts))
+
+    return predicate
+
+
+_COMPILERS: dict[str, Callable[[Mapping[str, Any], str], Predicate]] = {
+    "bool": _compile_bool,
+    "exists": _compile_exists,
+    "match_all": _compile_match_all,
+    "match_none": _compile_match_none,
+    "nested": _compile_nested,
+    "term": _compile_term,
+    "terms": _compile_terms,
+}
+
+
+def _compile(query: object, scope: str) -> Predicate:
+    if not isinstance(query, Mapping) or len(query) != 1:
+        raise _UnsupportedQueryError
+    kind, body = next(iter(query.items()))
+    if kind not in _COMPILERS or not isinstance(body, Mapping):
+        raise _UnsupportedQueryError
+    return _COMPILERS[kind](body, scope)
+
+
+def compile_automation_query(query: Mapping[str, Any]) -> Predicate | None:
+    """
+    Compile a robot automation query into a predicate on percolatable documents.
+
+    :param query: The automation's percolator query.
+    :type query: Mapping[str, Any]
+    :return: A predicate taking a percolatable document, as produced by
+        :meth:`RobotAutomationPercolationDocument.to_dict`, or None if the query
+        uses anything that must be evaluated by Elasticsearch.
+    :rtype: Predicate | None
+    """
+    try:
+        return _compile(query, "")
+    except _UnsupportedQueryError:
+        return None
+
+
+class RobotAutomationMatcher:
+    """
+    Matches percolatable documents against a set of robot automations.
+
+    Automations whose queries compile are matched in process. The remainder are
+    listed in ``unsupported_automation_ids``, to be percolated in Elasticsearch.
+    """
+
+    def __init__(self, automations: Iterable[RobotAutomation]) -> None:
+        """
+        Compile every automation that can be matched locally.
+
+        :param automations: All robot automations.
+        :type automations: Iterable[RobotAutomation]
+        """
+        self._predicates: list[tuple[UUID, Predicate]] = []
+        self.unsupported_automation_ids: list[UUID] = []
+        for automation in automations:
+            predicate = compile_automation_query(automation.query)
+            if predicate is None:
+                self.unsupported_automation_ids.append(automation.id)
+            else:
+                self._predicates.append((automation.robot_id, predicate))
+
+    def match(
+        self, percolatables: Sequence[ReferenceWithChangeset]
+    ) -> list[RobotAutomationPercolationResult]:
+        """
+        Match documents against the locally compiled automations.
+
+        :param percolatables: The documents to match.
+        :type percolatables: Sequence[ReferenceWithChangeset]
+        :return: The results of the match, one per matching robot.
+        :rtype: list[RobotAutomationPercolationResult]
+        """
+        if not self._predicates or not percolatables:
+            return []
+        documents = [
+            RobotAutomationPercolationDocument.percolatable_document_from_domain(
+                percolatable
+            ).to_dict()
+            for percolatable in percolatables
+        ]
+        reference_ids_by_robot: dict[UUID, set[UUID]] = defaultdict(set)
+        for robot_id, predicate in self._predicates:
+            reference_ids_by_robot[robot_id].update(
+                percolatable.id
+                for percolatable, document in zip(percolatables, documents, strict=True)
+                if predicate(document)
+            )
+        return [
+            RobotAutomationPercolationResult(robot_id=robot_id, reference_ids=ids)
+            for robot_id, ids in reference_ids_by_robot.items()
+            if ids
+        ]
+
+
+class RobotAutomationMatcherCache:
+    """
+    Holds the compiled robot automation matcher for a process.
+
+    The matcher is keyed on a fingerprint of the stored automations, which is
+    checked before each use, so automations written by any process are matched
+    from the next use onwards.
+    """
+
+    def __init__(self, *, enabled: bool) -> None:
+        """Initialise an empty cache."""
+        self.enabled = enabled
+        self._fingerprint: str | None = None
+        self._matcher: RobotAutomationMatcher | None = None
+
+    async def get(
+        self,
+        fingerprint: Callable[[], Awaitable[str]],
+        load: Callable[[], Awaitable[Iterable[RobotAutomation]]],
+    ) -> RobotAutomationMatcher | None:
+        """
+        Return the current matcher, compiling it from ``load`` if stale.
+
+        :param fingerprint: Gets the fingerprint of the stored automations.
+        :type fingerprint: Callable[[], Awaitable[str]]
+        :param load: Loads every robot automation.
+        :type load: Callable[[], Awaitable[Iterable[RobotAutomation]]]
+        :return: The matcher, or None if automations are not matched in process.
+        :rtype: RobotAutomationMatcher | None
+        """
+        if not self.enabled:
+            return None
+        current = await fingerprint()
+        if self._matcher is None or current != self._fingerprint:
+            self._matcher = RobotAutomationMatcher(await load())
+            self._fingerprint = current
+        return self._matcher
+
+    def clear(self) -> None:
+        """Drop the cached matcher."""
+        self._fingerprint = None
+        self._matcher = None
+
+
+@lru_cache(maxsize=1)
+def get_robot_automation_matcher_cache() -> RobotAutomationMatcherCache:
+    """Return the process-wide robot automation matcher cache."""
+    return RobotAutomationMatcherCache(
+        enabled=get_settings().robot_automation_matcher.enabled
+    )
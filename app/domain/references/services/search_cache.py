@@ -0,0 +1,307 @@
+"""Caching and coalescing of search results and facet responses."""
+
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from functools import lru_cache
+from typing import Any, NamedTuple, TypeVar
+
+from cachetools import TTLCache
+from pydantic import BaseModel, Field
+
+from app.core.config import get_settings
+from app.core.telemetry.attributes import Attributes, trace_attribute
+from app.domain.references.models.es import ReferenceDocument
+from app.domain.references.models.models import SearchQuery
+from app.persistence.es.generation import IndexGenerations, get_index_generations
+
+T = TypeVar("T")
+
+
+class SearchCacheStats(BaseModel):
+    """A snapshot of the search result cache's effectiveness."""
+
+    enabled: bool = Field(description="Whether the cache is enabled.")
+    entries: int = Field(description="The number of results currently cached.")
+    hits: int = Field(description="Lookups served from the cache.")
+    misses: int = Field(description="Lookups that had to query Elasticsearch.")
+    hit_rate: float = Field(description="The fraction of lookups that were hits.")
+    saved_seconds: float = Field(
+        description=(
+            "Elasticsearch time saved by the cache: for every hit, the time it took "
+            "to compute the entry that served it."
+        ),
+    )
+
+
+class SearchCoalescingStats(BaseModel):
+    """A snapshot of how many aggregation requests shared another's result."""
+
+    enabled: bool = Field(description="Whether coalescing is enabled.")
+    in_flight: int = Field(description="Aggregations currently running.")
+    executed: int = Field(description="Requests that ran their own aggregation.")
+    coalesced: int = Field(
+        description="Requests that joined an identical aggregation already running.",
+    )
+    fresh: int = Field(
+        description=(
+            "Requests served by an identical aggregation that had just completed, "
+            "within the freshness window."
+        ),
+    )
+
+
+class _CacheEntry(NamedTuple):
+    """A cached result and the time it took to compute."""
+
+    value: Any
+    cost_seconds: float
+
+
+def search_query_cache_key(query: SearchQuery) -> dict[str, Any]:
+    """
+    Normalise a search query into a cache key.
+
+    Whitespace in the query string is collapsed, and filters that are combined
+    commutatively (AND between filters, OR within one) are sorted, so queries
+    differing only in those respects share an entry.
+    """
+    return {
+        "query_string": " ".join(query.query_string.split()),
+        "annotation_filters": sorted(
+            annotation_filter.model_dump_json()
+            for annotation_filter in query.annotation_filters
+        ),
+        "publication_year_range": query.publication_year_range.model_dump(mode="json")
+        if query.publication_year_range
+        else None,
+        "linked_data_concept_filters": sorted(
+            sorted(concept_filter.concept_uris)
+            for concept_filter in query.linked_data_concept_filters
+        ),
+        "linked_data_country_filters": sorted(
+            sorted(country_filter.country_codes)
+            for country_filter in query.linked_data_country_filters
+        ),
+        "linked_data_country_wb_region_filters": sorted(
+            sorted(region_filter.region_ids)
+            for region_filter in query.linked_data_country_wb_region_filters
+        ),
+    }
+
+
+def _serialise_key(key: Mapping[str, Any]) -> str:
+    """Serialise request parameters into a stable, hashable key."""
+    return json.dumps(key, sort_keys=True, default=str)
+
+
+class SearchResultCache:
+    """
+    A bounded, in-process cache of search results keyed on the normalised request.
+
+    Each entry is keyed on the reference index's generation at the time it was
+    computed, so any write to the index or switch of its alias made by this process
+    invalidates every entry. Writes made by other processes are only picked up
+    once an entry's TTL expires.
+
+    Results are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        max_entries: int,
+        ttl_seconds: float,
+        generations: IndexGenerations | None = None,
+    ) -> None:
+        """Initialise an empty cache."""
+        self.enabled = enabled
+        self._entries: TTLCache[tuple[str, int, str], _CacheEntry] = TTLCache(
+            maxsize=max_entries, ttl=ttl_seconds
+        )
+        self._generations = generations or get_index_generations()
+        self._alias = ReferenceDocument.Index.name
+        self._hits = 0
+        self._misses = 0
+        self._saved_seconds = 0.0
+
+    async def get_or_compute(
+        self,
+        operation: str,
+        key: Mapping[str, Any],
+        compute: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Return the cached result for ``key``, computing and caching it on a miss.
+
+        :param operation: The name of the cached operation, namespacing ``key``.
+        :type operation: str
+        :param key: JSON-serialisable parameters that fully determine the result.
+        :type key: Mapping[str, Any]
+        :param compute: Computes the result on a miss. Exceptions are not cached.
+        :type compute: Callable[[], Awaitable[T]]
+        :return: The cached or freshly computed result.
+        :rtype: T
+        """
+        if not self.enabled:
+            return await compute()
+
+        cache_key = (
+            operation,
+            self._generations.get(self._alias),
+            _serialise_key(key),
+        )
+        entry = self._entries.get(cache_key)
+        trace_attribute(Attributes.SEARCH_CACHE_HIT, entry is not None)
+        if entry is not None:
+            self._hits += 1
+            self._saved_seconds += entry.cost_seconds
+            return entry.value
+
+        self._misses += 1
+        started = time.perf_counter()
+        value = await compute()
+        # Stored under the generation read before computing, so a write racing the
+        # computation leaves the entry unreachable rather than stale.
+        self._entries[cache_key] = _CacheEntry(value, time.perf_counter() - started)
+        return value
+
+    def stats(self) -> SearchCacheStats:
+        """Return a snapshot of the cache's counters."""
+        lookups = self._hits + self._misses
+        self._entries.expire()
+        return SearchCacheStats(
+            enabled=self.enabled,
+            entries=len(self._entries),
+            hits=self._hits,
+            misses=self._misses,
+            hit_rate=self._hits / lookups if lookups else 0.0,
+            saved_seconds=self._saved_seconds,
+        )
+
+    def clear(self) -> None:
+        """Drop every cached result. Counters are preserved."""
+        self._entries.clear()
+
+
+class RequestCoalescer:
+    """
+    Shares one execution between identical concurrent requests.
+
+    The first request for a key runs the computation; identical requests arriving
+    while it runs await the same result rather than starting their own. A
+    completed result can also be handed out for a short freshness window, which
+    absorbs a burst of requests arriving just after the first completes.
+
+    The computation runs in its own task, so a requester that is cancelled (e.g.
+    a disconnected client) does not cancel it for the others. Like the result
+    cache, keys include the reference index generation, and results are shared
+    between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        freshness_seconds: float,
+        max_fresh_entries: int,
+        generations: IndexGenerations | None = None,
+    ) -> None:
+        """Initialise a coalescer with nothing in flight."""
+        self.enabled = enabled
+        self._in_flight: dict[tuple[str, int, str], asyncio.Task[Any]] = {}
+        self._fresh: TTLCache[tuple[str, int, str], Any] | None = (
+            TTLCache(maxsize=max_fresh_entries, ttl=freshness_seconds)
+            if freshness_seconds > 0
+            else None
+        )
+        self._generations = generations or get_index_generations()
+        self._alias = ReferenceDocument.Index.name
+        self._executed = 0
+        self._coalesced = 0
+        self._fresh_served = 0
+
+    async def run(
+        self,
+        operation: str,
+        key: Mapping[str, Any],
+        compute: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Return the result of ``compute``, sharing it with identical requests.
+
+        :param operation: The name of the coalesced operation, namespacing ``key``.
+        :type operation: str
+        :param key: JSON-serialisable parameters that fully determine the result.
+        :type key: Mapping[str, Any]
+        :param compute: Computes the result. An exception is raised to every request
+            sharing the execution.
+        :type compute: Callable[[], Awaitable[T]]
+        :return: The shared result.
+        :rtype: T
+        """
+        if not self.enabled:
+            return await compute()
+
+        coalescing_key = (
+            operation,
+            self._generations.get(self._alias),
+            _serialise_key(key),
+        )
+        if self._fresh is not None and coalescing_key in self._fresh:
+            self._fresh_served += 1
+            return self._fresh[coalescing_key]
+
+        task = self._in_flight.get(coalescing_key)
+        if task is not None:
+            self._coalesced += 1
+        else:
+            self._executed += 1
+            task = asyncio.ensure_future(compute())
+            self._in_flight[coalescing_key] = task
+            task.add_done_callback(lambda done: self._complete(coalescing_key, done))
+        return await asyncio.shield(task)
+
+    def _complete(
+        self, coalescing_key: tuple[str, int, str], task: asyncio.Task[Any]
+    ) -> None:
+        """Retire a finished execution, keeping a successful result while fresh."""
+        self._in_flight.pop(coalescing_key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self._fresh is not None:
+            self._fresh[coalescing_key] = task.result()
+
+    def stats(self) -> SearchCoalescingStats:
+        """Return a snapshot of the coalescer's counters."""
+        return SearchCoalescingStats(
+            enabled=self.enabled,
+            in_flight=len(self._in_flight),
+            executed=self._executed,
+            coalesced=self._coalesced,
+            fresh=self._fresh_served,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_search_result_cache() -> SearchResultCache:
+    """Return the process-wide search result cache."""
+    config = get_settings().search_cache
+    return SearchResultCache(
+        enabled=config.enabled,
+        max_entries=config.max_entries,
+        ttl_seconds=config.ttl_seconds,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_search_request_coalescer() -> RequestCoalescer:
+    """Return the process-wide coalescer for search aggregations."""
+    config = get_settings().search_coalescing
+    return RequestCoalescer(
+        enabled=config.enabled,
+        freshness_seconds=config.freshness_seconds,
+        max_fresh_entries=config.max_fresh_entries,
+    )
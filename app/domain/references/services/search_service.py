@@ -19,6 +19,13 @@ from app.domain.references.models.models import (
 from app.domain.references.services.anti_corruption_service import (
     ReferenceAntiCorruptionService,
 )
+from app.domain.references.services.search_cache import (
+    RequestCoalescer,
+    SearchResultCache,
+    get_search_request_coalescer,
+    get_search_result_cache,
+    search_query_cache_key,
+)
 from app.domain.references.services.world_bank_regions import WORLD_BANK_REGIONS
 from app.domain.service import GenericService
 from app.external.vocabulary.client import (
@@ -53,16 +60,20 @@ class SearchService(GenericService[ReferenceAntiCorruptionService]):
         FacetType.COUNTRY_WB_REGIONS: len(WORLD_BANK_REGIONS),
     }
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         anti_corruption_service: ReferenceAntiCorruptionService,
         sql_uow: AsyncSqlUnitOfWork,
         es_uow: AsyncESUnitOfWork,
         vocab_client: VocabularyArtifactClient | None = None,
+        result_cache: SearchResultCache | None = None,
+        coalescer: RequestCoalescer | None = None,
     ) -> None:
         """Initialize the service with a unit of work."""
         super().__init__(anti_corruption_service, sql_uow, es_uow)
         self._vocab_client = vocab_client or get_vocabulary_artifact_client()
+        self._result_cache = result_cache or get_search_result_cache()
+        self._coalescer = coalescer or get_search_request_coalescer()
 
     async def search(
         self,
@@ -70,13 +81,26 @@ class SearchService(GenericService[ReferenceAntiCorruptionService]):
         page: int = 1,
         page_size: int = 20,
         sort: list[str] | None = None,
+        *,
+        with_payload: bool = False,
     ) -> ESSearchResult:
         """Search for references matching the given query specification."""
-        return await self.es_uow.references.search(
-            query,
-            page=page,
-            page_size=page_size,
-            sort=sort,
+        return await self._result_cache.get_or_compute(
+            "search",
+            {
+                "query": search_query_cache_key(query),
+                "page": page,
+                "page_size": page_size,
+                "sort": sort,
+                "with_payload": with_payload,
+            },
+            lambda: self.es_uow.references.search(
+                query,
+                page=page,
+                page_size=page_size,
+                sort=sort,
+                with_payload=with_payload,
+            ),
         )
 
     async def scan(
@@ -105,6 +129,28 @@ class SearchService(GenericService[ReferenceAntiCorruptionService]):
         vocabulary_uri: str | None,
     ) -> dict[FacetType, list[ESFacetBucket]]:
         """Count occurrences per facet over references matching ``query``."""
+        key = {
+            "query": search_query_cache_key(query),
+            "facets": sorted(set(facets)),
+            "vocabulary_uri": vocabulary_uri,
+        }
+        return await self._result_cache.get_or_compute(
+            "aggregate_facets",
+            key,
+            lambda: self._coalescer.run(
+                "aggregate_facets",
+                key,
+                lambda: self._aggregate_facets(query, facets, vocabulary_uri),
+            ),
+        )
+
+    async def _aggregate_facets(
+        self,
+        query: SearchQuery,
+        facets: Sequence[FacetType],
+        vocabulary_uri: str | None,
+    ) -> dict[FacetType, list[ESFacetBucket]]:
+        """Count occurrences per facet, bypassing the result cache."""
         max_buckets = settings.es_aggregation_max_buckets
         sibling_groups_by_facet: dict[FacetType, tuple[SiblingGroup, ...]] = {}
         if query.linked_data_concept_filters and FacetType.CONCEPTS in facets:
@@ -155,6 +201,28 @@ class SearchService(GenericService[ReferenceAntiCorruptionService]):
         via ``vocabulary_uri``). Cells are reported in the given axis order. Returns
         the non-zero cells and both exact totals.
         """
+        key = {
+            "query": search_query_cache_key(query),
+            "axes": axes,
+            "vocabulary_uri": vocabulary_uri,
+        }
+        return await self._result_cache.get_or_compute(
+            "aggregate_cross_facet",
+            key,
+            lambda: self._coalescer.run(
+                "aggregate_cross_facet",
+                key,
+                lambda: self._aggregate_cross_facet(query, axes, vocabulary_uri),
+            ),
+        )
+
+    async def _aggregate_cross_facet(
+        self,
+        query: SearchQuery,
+        axes: tuple[str, str],
+        vocabulary_uri: str | None,
+    ) -> CrossFacetResult:
+        """Cross-tabulate two axes, bypassing the result cache."""
         scheme_members: dict[str, frozenset[str]] | None = None
         if vocabulary_uri and any(self._is_concept_scheme(token) for token in axes):
             scheme_members = await self._vocab_client.get_scheme_members(vocabulary_uri)
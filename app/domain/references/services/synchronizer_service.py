@@ -1,7 +1,6 @@
 """Service to synchronize Reference models between persistence implementations."""
 
 from collections.abc import AsyncGenerator, Iterable
-from functools import cache
 from typing import ClassVar
 from uuid import UUID
 
@@ -11,6 +10,7 @@ from app.core.config import ESIndexingOperation, get_settings
 from app.core.telemetry.attributes import Attributes, trace_attribute
 from app.core.telemetry.logger import get_logger
 from app.domain.references.models.models import (
+    EnhancementType,
     Reference,
     ReferenceSearchProjection,
     RobotAutomation,
@@ -19,22 +19,17 @@ from app.domain.references.models.projections import (
     DeduplicatedReferenceProjection,
     ReferenceSearchFieldsProjection,
 )
+from app.domain.references.services.anti_corruption_service import (
+    ReferenceAntiCorruptionService,
+)
 from app.domain.references.services.linked_data_projection_service import (
-    LinkedDataProjectionService,
+    get_linked_data_projection_service,
 )
 from app.domain.service import GenericSynchronizer
-from app.external.vocabulary.client import get_vocabulary_artifact_client
 from app.persistence.es.uow import AsyncESUnitOfWork
 from app.persistence.sql.uow import AsyncSqlUnitOfWork
 from app.utils.lists import list_chunker
 
-
-@cache
-def _get_linked_data_projection_service() -> LinkedDataProjectionService:
-    """Singleton LinkedDataProjectionService with internal vocabulary caching."""
-    return LinkedDataProjectionService(get_vocabulary_artifact_client())
-
-
 tracer = get_tracer(__name__)
 settings = get_settings()
 logger = get_logger(__name__)
@@ -50,18 +45,32 @@ class ReferenceSynchronizer(GenericSynchronizer[Reference]):
         "duplicate_decision",
     ]
 
-    @staticmethod
-    async def _to_indexable(reference: Reference) -> ReferenceSearchProjection:
+    def __init__(
+        self,
+        sql_uow: AsyncSqlUnitOfWork,
+        es_uow: AsyncESUnitOfWork,
+        anti_corruption_service: ReferenceAntiCorruptionService | None = None,
+    ) -> None:
+        """
+        Initialize the synchronizer.
+
+        :param anti_corruption_service: Renders the SDK payload stored alongside each
+            indexed reference. Without one, no payload is stored and search hydrates
+            those references from the database.
+        :type anti_corruption_service: ReferenceAntiCorruptionService | None
+        """
+        super().__init__(sql_uow, es_uow)
+        self._anti_corruption_service = anti_corruption_service
+
+    async def _to_indexable(self, reference: Reference) -> ReferenceSearchProjection:
         """Deduplicate a Reference and project its search fields for ES indexing."""
         deduped = DeduplicatedReferenceProjection.get_from_reference(reference)
         search_fields = ReferenceSearchFieldsProjection.get_from_reference(deduped)
 
         linked_data_projection = None
         if search_fields.linked_data_content is not None:
-            linked_data_projection = await (
-                _get_linked_data_projection_service().project(
-                    search_fields.linked_data_content
-                )
+            linked_data_projection = await get_linked_data_projection_service().project(
+                search_fields.linked_data_content
             )
 
         return ReferenceSearchProjection(
@@ -74,6 +83,15 @@ class ReferenceSynchronizer(GenericSynchronizer[Reference]):
             ),
             search_fields=search_fields,
             linked_data_projection=linked_data_projection,
+            sdk_payload=await self._anti_corruption_service.reference_to_sdk_payload(
+                deduped
+            )
+            if self._anti_corruption_service
+            else None,
+            has_full_text=any(
+                enhancement.content.enhancement_type is EnhancementType.FULL_TEXT
+                for enhancement in deduped.enhancements or []
+            ),
         )
 
     @tracer.start_as_current_span("Sync Reference SQL->ES")
@@ -162,7 +180,14 @@ class RobotAutomationSynchronizer(GenericSynchronizer[RobotAutomation]):
 class Synchronizer:
     """Service to synchronize models between persistences."""
 
-    def __init__(self, sql_uow: AsyncSqlUnitOfWork, es_uow: AsyncESUnitOfWork) -> None:
+    def __init__(
+        self,
+        sql_uow: AsyncSqlUnitOfWork,
+        es_uow: AsyncESUnitOfWork,
+        anti_corruption_service: ReferenceAntiCorruptionService | None = None,
+    ) -> None:
         """Initialize the synchronizer service."""
-        self.references = ReferenceSynchronizer(sql_uow, es_uow)
+        self.references = ReferenceSynchronizer(
+            sql_uow, es_uow, anti_corruption_service
+        )
         self.robot_automations = RobotAutomationSynchronizer(sql_uow, es_uow)
@@ -7,7 +7,7 @@ from uuid import UUID
 from opentelemetry import trace
 from structlog.contextvars import bound_contextvars
 
-from app.core.config import Environment, get_settings
+from app.core.config import Environment, TaskFamily, get_settings
 from app.core.entitlements import Entitlement
 from app.core.exceptions import SQLIntegrityError
 from app.core.telemetry.attributes import (
@@ -21,7 +21,6 @@ from app.core.telemetry.otel import new_linked_trace
 from app.core.telemetry.taskiq import queue_task_with_trace
 from app.domain.references.models.models import (
     DuplicateDetermination,
-    PendingEnhancementStatus,
 )
 from app.domain.references.service import ReferenceService
 from app.domain.references.services.access_control_service import (
@@ -38,6 +37,7 @@ from app.domain.robots.service import RobotService
 from app.domain.robots.services.anti_corruption_service import (
     RobotAntiCorruptionService,
 )
+from app.persistence.blob.models import BlobStorageFile, ContentEncoding
 from app.persistence.blob.repository import BlobRepository
 from app.persistence.es.client import es_manager
 from app.persistence.es.uow import AsyncESUnitOfWork
@@ -93,7 +93,7 @@ async def get_blob_repository() -> BlobRepository:
     return BlobRepository()
 
 
-@broker.task
+@broker.task(family=TaskFamily.ROBOT)
 async def validate_and_import_robot_enhancement_batch_result(
     robot_enhancement_batch_id: UUID,
 ) -> None:
@@ -144,53 +144,108 @@ async def validate_and_import_robot_enhancement_batch_result(
             )
             return
 
-        await reference_service.update_pending_enhancements_status(
-            pending_enhancement_ids=list(results.failed_pending_enhancement_ids),
-            status=PendingEnhancementStatus.FAILED,
+        # Perform robot automations
+        await reference_service.detect_and_dispatch_robot_automations(
+            enhancement_ids=results.imported_enhancement_ids,
+            source_str=f"RobotEnhancementBatch:{robot_enhancement_batch.id}",
+            skip_robot_id=robot_enhancement_batch.robot_id,
         )
 
-        await reference_service.update_pending_enhancements_status(
-            pending_enhancement_ids=list(results.discarded_pending_enhancement_ids),
-            status=PendingEnhancementStatus.DISCARDED,
-        )
 
-        await reference_service.update_pending_enhancements_status(
-            pending_enhancement_ids=list(results.successful_pending_enhancement_ids),
-            status=PendingEnhancementStatus.INDEXING,
+@broker.task(family=TaskFamily.ROBOT)
+async def prepare_robot_enhancement_batch(
+    robot_id: UUID,
+    limit: int,
+    compression: ContentEncoding | None = None,
+) -> None:
+    """Prepare a robot's next enhancement batch ahead of its poll."""
+    name_span("Prepare robot enhancement batch")
+    trace_attribute(Attributes.ROBOT_ID, str(robot_id))
+    async with get_sql_unit_of_work() as sql_uow, get_es_unit_of_work() as es_uow:
+        blob_repository = await get_blob_repository()
+        reference_service = await get_reference_service(
+            ReferenceAntiCorruptionService(sign_url=blob_repository.get_signed_url),
+            sql_uow,
+            es_uow,
         )
-
-        try:
-            await reference_service.index_references(
-                reference_ids=[
-                    pe.reference_id
-                    for pe in (robot_enhancement_batch.pending_enhancements or [])
-                ],
-            )
-
-            await reference_service.update_pending_enhancements_status(
-                pending_enhancement_ids=list(
-                    results.successful_pending_enhancement_ids
+        robot_service = await get_robot_service(RobotAntiCorruptionService(), sql_uow)
+        robot = await robot_service.get_robot_standalone(robot_id)
+
+        robot_enhancement_batch = (
+            await reference_service.prepare_robot_enhancement_batch(
+                robot_id=robot_id,
+                limit=limit,
+                blob_repository=blob_repository,
+                access_control_service=ReferenceAccessControlService(
+                    entitlements=robot.entitlements
                 ),
-                status=PendingEnhancementStatus.COMPLETED,
+                compression=compression,
             )
-        except Exception:
-            logger.exception("Error indexing references in Elasticsearch")
-            await reference_service.update_pending_enhancements_status(
-                pending_enhancement_ids=list(
-                    results.successful_pending_enhancement_ids
-                ),
-                status=PendingEnhancementStatus.INDEXING_FAILED,
+        )
+        if robot_enhancement_batch:
+            logger.info(
+                "Prepared robot enhancement batch",
+                robot_enhancement_batch_id=str(robot_enhancement_batch.id),
             )
 
-        # Perform robot automations
-        await reference_service.detect_and_dispatch_robot_automations(
-            enhancement_ids=results.imported_enhancement_ids,
-            source_str=f"RobotEnhancementBatch:{robot_enhancement_batch.id}",
-            skip_robot_id=robot_enhancement_batch.robot_id,
+
+@broker.task(family=TaskFamily.ROBOT)
+async def store_deferred_full_text(  # noqa: PLR0913
+    enhancement_id: UUID,
+    reference_id: UUID,
+    source_uri: str,
+    destination_uri: str,
+    mime_type: str,
+    sha256_checksum: str,
+    byte_size: int,
+) -> None:
+    """Copy a full-text enhancement's content whose storage was deferred."""
+    name_span("Store deferred full text")
+    trace_attribute(Attributes.ENHANCEMENT_ID, str(enhancement_id))
+    trace_attribute(Attributes.REFERENCE_ID, str(reference_id))
+    async with get_sql_unit_of_work() as sql_uow, get_es_unit_of_work() as es_uow:
+        blob_repository = await get_blob_repository()
+        reference_anti_corruption_service = ReferenceAntiCorruptionService(
+            sign_url=blob_repository.get_signed_url
+        )
+        reference_service = await get_reference_service(
+            reference_anti_corruption_service, sql_uow, es_uow
+        )
+        await reference_service.store_deferred_full_text(
+            enhancement_id,
+            reference_id,
+            BlobStorageFile.from_uri(source_uri),
+            BlobStorageFile.from_uri(destination_uri),
+            blob_repository,
+            mime_type=mime_type,
+            sha256_checksum=sha256_checksum,
+            byte_size=byte_size,
         )
 
 
-@broker.task
+@broker.task(family=TaskFamily.ROBOT)
+async def remove_unstored_full_text(
+    enhancement_id: UUID, reference_id: UUID, remaining_retries: int
+) -> None:
+    """Remove a full-text enhancement whose deferred copy failed."""
+    name_span("Remove unstored full text")
+    trace_attribute(Attributes.ENHANCEMENT_ID, str(enhancement_id))
+    trace_attribute(Attributes.REFERENCE_ID, str(reference_id))
+    trace_attribute(Attributes.MESSAGING_RETRIES_REMAINING, remaining_retries)
+    async with get_sql_unit_of_work() as sql_uow, get_es_unit_of_work() as es_uow:
+        blob_repository = await get_blob_repository()
+        reference_anti_corruption_service = ReferenceAntiCorruptionService(
+            sign_url=blob_repository.get_signed_url
+        )
+        reference_service = await get_reference_service(
+            reference_anti_corruption_service, sql_uow, es_uow
+        )
+        await reference_service.remove_unstored_full_text(
+            enhancement_id, reference_id, remaining_retries=remaining_retries
+        )
+
+
+@broker.task(family=TaskFamily.ROBOT)
 async def run_search_enhancement_request_task(enhancement_request_id: UUID) -> None:
     """Scan a search request's query and create pending enhancements for the matches."""
     name_span("Run search enhancement request")
@@ -212,7 +267,7 @@ async def run_search_enhancement_request_task(enhancement_request_id: UUID) -> N
         )
 
 
-@broker.task
+@broker.task(family=TaskFamily.EXPORT)
 async def run_search_export_task(
     search_export_id: UUID, entitlements: list[str]
 ) -> None:
@@ -249,7 +304,7 @@ async def run_search_export_task(
         await search_export_service.run(search_export_id, blob_repository)
 
 
-@broker.task
+@broker.task(family=TaskFamily.EXPORT)
 async def run_reference_export_task(
     reference_export_id: UUID, entitlements: list[str]
 ) -> None:
@@ -286,7 +341,7 @@ async def run_reference_export_task(
         await reference_export_service.run(reference_export_id, blob_repository)
 
 
-@broker.task
+@broker.task(family=TaskFamily.INDEX)
 async def repair_reference_index() -> None:
     """Async logic for repairing the reference index."""
     name_span("Repair index")
@@ -318,7 +373,7 @@ async def repair_reference_index() -> None:
                 )
 
 
-@broker.task
+@broker.task(family=TaskFamily.INDEX)
 async def repair_reference_index_for_chunk(
     min_id: UUID, max_id: UUID, index: int, total: int
 ) -> None:
@@ -352,7 +407,7 @@ async def repair_reference_index_for_chunk(
         await reference_service.index_references(reference_ids)
 
 
-@broker.task
+@broker.task(family=TaskFamily.INDEX)
 async def repair_reference_index_subset(reference_ids: list[UUID]) -> None:
     """Re-index a caller-supplied subset of references."""
     name_span("Repair index subset")
@@ -373,7 +428,14 @@ async def repair_reference_index_subset(reference_ids: list[UUID]) -> None:
         await reference_service.index_references(reference_ids)
 
 
-@broker.task
+@broker.task(
+    family=TaskFamily.INDEX,
+    schedule=(
+        [{"cron": "*/5 * * * *"}]  # Every five minutes
+        if settings.env == Environment.LOCAL
+        else None
+    ),
+)
 async def repair_robot_automation_percolation_index() -> None:
     """Async logic for repairing the robot automation percolation index."""
     name_span("Repair index")
@@ -391,7 +453,35 @@ async def repair_robot_automation_percolation_index() -> None:
         await reference_service.repopulate_robot_automation_percolation_index()
 
 
-@broker.task
+@broker.task(family=TaskFamily.INDEX)
+async def backfill_enhancement_content_hashes(after_id: UUID | None = None) -> None:
+    """Record content hashes of enhancements stored without one, a page per task."""
+    name_span("Backfill enhancement content hashes")
+    logger.info(
+        "Backfilling enhancement content hashes",
+        after_id=str(after_id) if after_id else None,
+    )
+    async with get_sql_unit_of_work() as sql_uow, get_es_unit_of_work() as es_uow:
+        blob_repository = await get_blob_repository()
+        reference_anti_corruption_service = ReferenceAntiCorruptionService(
+            sign_url=blob_repository.get_signed_url
+        )
+        reference_service = await get_reference_service(
+            reference_anti_corruption_service, sql_uow, es_uow
+        )
+        next_after_id = await reference_service.backfill_enhancement_content_hashes(
+            after_id=after_id,
+            limit=settings.enhancement_content_hash_backfill_batch_size,
+        )
+    if next_after_id:
+        await queue_task_with_trace(
+            backfill_enhancement_content_hashes,
+            next_after_id,
+            otel_enabled=settings.otel_enabled,
+        )
+
+
+@broker.task(family=TaskFamily.DEDUP)
 async def process_reference_duplicate_decision(
     reference_duplicate_decision_id: UUID,
     remaining_retries: int = 1,
@@ -483,11 +573,12 @@ async def process_reference_duplicate_decision(
 
 
 @broker.task(
+    family=TaskFamily.ROBOT,
     schedule=(
         [{"cron": "* * * * *"}]  # Every minute
         if settings.env == Environment.LOCAL
         else None
-    )
+    ),
 )
 async def expire_and_replace_stale_pending_enhancements() -> None:
     """Expire stale pending enhancements and create replacements."""
@@ -11,6 +11,7 @@ from app.core.telemetry.logger import get_logger, logger_configurer
 from app.core.telemetry.otel import configure_otel
 from app.persistence.blob.repository import close_blob_clients
 from app.persistence.es.client import es_manager
+from app.persistence.sql.notifications import get_pending_enhancement_listener
 from app.persistence.sql.session import db_manager
 from app.tasks import broker
 
@@ -36,9 +37,11 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     db_manager.init(settings.db_config, settings.app_name)
     await es_manager.init(settings.es_config)
     await broker.startup()
+    get_pending_enhancement_listener().start(db_manager)
 
     yield
 
+    await get_pending_enhancement_listener().stop()
     await broker.shutdown()
     await db_manager.close()
     await es_manager.close()
@@ -1,6 +1,5 @@
 """Generic class for a blob storage client."""
 
-import codecs
 from abc import ABC, abstractmethod
 from collections.abc import AsyncGenerator, AsyncIterator
 from io import BytesIO
@@ -8,12 +7,15 @@ from io import BytesIO
 from opentelemetry import trace
 
 from app.core.config import get_settings
+from app.core.exceptions import BlobStorageError
 from app.core.telemetry.blob import (
     trace_blob_client_generator,
     trace_blob_client_method,
 )
+from app.persistence.blob.compression import decompress_chunks
 from app.persistence.blob.models import BlobSignedUrlType, BlobStorageFile
 from app.persistence.blob.stream import FileStream
+from app.utils.aio import decode_lines
 
 settings = get_settings()
 tracer = trace.get_tracer(__name__)
@@ -74,21 +76,87 @@ class GenericBlobStorageClient(ABC):
         """
         Stream a file line-by-line from the blob storage.
 
+        Compressed content is detected and decompressed as it streams.
+
         :param file: The file to stream.
         :type file: BlobStorageFile
         :return: An async generator that yields lines from the file.
         :rtype: AsyncGenerator[str, None]
         """
-        decoder = codecs.getincrementaldecoder("utf-8")()
-        buffer = ""
-        async for chunk in self.stream_chunks(file):
-            buffer += decoder.decode(chunk)  # carries partial char across chunks
-            while "\n" in buffer:
-                line, buffer = buffer.split("\n", 1)
-                yield line
-        buffer += decoder.decode(b"", final=True)
-        if buffer:
-            yield buffer
+        async for line in decode_lines(decompress_chunks(self.stream_chunks(file))):
+            yield line
+
+    @trace_blob_client_method(tracer)
+    async def stage_block(
+        self,
+        file: BlobStorageFile,
+        index: int,
+        data: bytes,
+    ) -> None:
+        """
+        Durably stage one block of a file, to be assembled by :meth:`commit_blocks`.
+
+        Staged blocks survive the process that staged them, so an interrupted
+        upload can be resumed. Staging an index again replaces its block.
+
+        :param file: The file the block belongs to.
+        :type file: BlobStorageFile
+        :param index: The block's zero-based position in the file.
+        :type index: int
+        :param data: The block's content.
+        :type data: bytes
+        """
+        del file, index, data
+        msg = f"{type(self).__name__} does not support staged uploads."
+        raise BlobStorageError(msg)
+
+    @trace_blob_client_method(tracer)
+    async def commit_blocks(
+        self,
+        file: BlobStorageFile,
+        n_blocks: int,
+        content_type: str | None = None,
+    ) -> None:
+        """
+        Assemble a file from its first ``n_blocks`` staged blocks, in order.
+
+        :param file: The file to assemble.
+        :type file: BlobStorageFile
+        :param n_blocks: The number of blocks in the file.
+        :type n_blocks: int
+        :param content_type: Optional MIME type to attach to the file. If not
+            provided, implementations infer it from ``file.filename``.
+        :type content_type: str | None
+        """
+        del file, n_blocks, content_type
+        msg = f"{type(self).__name__} does not support staged uploads."
+        raise BlobStorageError(msg)
+
+    @trace_blob_client_method(tracer)
+    async def get_file_size(self, file: BlobStorageFile) -> int | None:
+        """
+        Return the size of a file in blob storage, or ``None`` if it doesn't exist.
+
+        :param file: The file to look up.
+        :type file: BlobStorageFile
+        :return: The file's size in bytes, or ``None`` if there is no such file.
+        :rtype: int | None
+        """
+        del file
+        msg = f"{type(self).__name__} does not support file lookups."
+        raise BlobStorageError(msg)
+
+    @trace_blob_client_method(tracer)
+    async def delete_file(self, file: BlobStorageFile) -> None:
+        """
+        Delete a file from blob storage, if it exists.
+
+        :param file: The file to delete.
+        :type file: BlobStorageFile
+        """
+        del file
+        msg = f"{type(self).__name__} does not support deleting files."
+        raise BlobStorageError(msg)
 
     @trace_blob_client_method(tracer)
     @abstractmethod
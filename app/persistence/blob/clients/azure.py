@@ -5,14 +5,22 @@ import datetime
 from collections.abc import AsyncGenerator, AsyncIterator
 from io import BytesIO
 
+import tenacity
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceNotFoundError,
+    ServiceRequestError,
+    ServiceResponseError,
+)
 from azure.identity.aio import DefaultAzureCredential
 from azure.storage.blob import (
+    BlobBlock,
     BlobSasPermissions,
     ContentSettings,
     UserDelegationKey,
     generate_blob_sas,
 )
-from azure.storage.blob.aio import BlobServiceClient
+from azure.storage.blob.aio import BlobClient, BlobServiceClient
 from cachetools import TTLCache
 from opentelemetry import trace
 
@@ -35,6 +43,43 @@ logger = get_logger(__name__)
 tracer = trace.get_tracer(__name__)
 
 
+def _block_id(index: int) -> str:
+    """
+    Name a staged block by its position in the blob.
+
+    Azure requires every block id in a blob to be the same length; the SDK
+    base64-encodes them.
+    """
+    return f"{index:010d}"
+
+
+# Backoff between attempts to stage a block.
+_BLOCK_RETRY_WAIT = tenacity.wait_exponential(multiplier=0.5, max=10)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Whether a failed request to Azure Blob Storage is worth repeating."""
+    if isinstance(exc, ServiceRequestError | ServiceResponseError):
+        return True
+    return isinstance(exc, HttpResponseError) and (
+        exc.status_code in (408, 429) or (exc.status_code or 0) >= 500  # noqa: PLR2004
+    )
+
+
+async def _blocks(
+    chunks: AsyncIterator[bytes], block_size: int
+) -> AsyncGenerator[bytes, None]:
+    """Regroup a stream of chunks into blocks of ``block_size``, the last shorter."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= block_size:
+            yield bytes(buffer[:block_size])
+            del buffer[:block_size]
+    if buffer:
+        yield bytes(buffer)
+
+
 class AzureBlobStorageClient(GenericBlobStorageClient):
     """
     Azure implementation of GenericBlobStorageClient for managing files in Azure.
@@ -57,6 +102,9 @@ class AzureBlobStorageClient(GenericBlobStorageClient):
         self.presigned_url_expiry_seconds = presigned_url_expiry_seconds
         self.uses_managed_identity = config.uses_managed_identity
         self.user_delegation_key_duration = config.user_delegation_key_duration
+        self.upload_block_size = config.upload_block_size
+        self.upload_max_concurrency = config.upload_max_concurrency
+        self.upload_block_attempts = config.upload_block_attempts
         # Hold the aio credential explicitly so aclose() can release it; the
         # azure SDK's close() doesn't propagate to externally-constructed
         # credentials, so without this its httpx clients leak.
@@ -87,7 +135,12 @@ class AzureBlobStorageClient(GenericBlobStorageClient):
         file: BlobStorageFile,
         content_type: str | None = None,
     ) -> None:
-        """Upload a file to Azure Blob Storage using async streaming."""
+        """
+        Upload a file to Azure Blob Storage.
+
+        Streamed content is staged as blocks, several at a time, while it is
+        produced, and the block list committed once the stream ends.
+        """
         blob_client = self.blob_service_client.get_blob_client(
             container=file.container, blob=f"{file.path}/{file.filename}"
         )
@@ -95,13 +148,172 @@ class AzureBlobStorageClient(GenericBlobStorageClient):
             content_type=content_type or infer_content_type(file.filename)
         )
         try:
+            if isinstance(content, BytesIO):
+                await blob_client.upload_blob(
+                    content,
+                    overwrite=True,
+                    content_settings=content_settings,
+                    max_concurrency=self.upload_max_concurrency,
+                )
+            else:
+                await self._upload_stream(
+                    blob_client,
+                    content.stream() if isinstance(content, FileStream) else content,
+                    content_settings,
+                )
+        except Exception as e:
+            msg = f"Failed to upload file to Azure Blob Storage: {e}"
+            raise AzureBlobStorageError(msg) from e
+
+    async def _upload_stream(
+        self,
+        blob_client: BlobClient,
+        chunks: AsyncIterator[bytes],
+        content_settings: ContentSettings,
+    ) -> None:
+        """
+        Stage a stream as concurrent blocks, then commit them as the blob.
+
+        At most ``upload_max_concurrency`` blocks are staged at once, so producing
+        the stream is only paused while that many are in flight. A stream that fits
+        in a single block is uploaded in one request.
+        """
+        blocks = _blocks(chunks, self.upload_block_size)
+        first = await anext(blocks, b"")
+        second = await anext(blocks, None)
+        if second is None:
             await blob_client.upload_blob(
-                content.stream() if isinstance(content, FileStream) else content,
-                overwrite=True,
+                first, overwrite=True, content_settings=content_settings
+            )
+            return
+
+        async def _all_blocks() -> AsyncGenerator[bytes, None]:
+            yield first
+            yield second
+            async for block in blocks:
+                yield block
+
+        in_flight: set[asyncio.Task[None]] = set()
+        n_blocks = 0
+        try:
+            async for block in _all_blocks():
+                if len(in_flight) >= self.upload_max_concurrency:
+                    done, in_flight = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    await asyncio.gather(*done)
+                in_flight.add(
+                    asyncio.create_task(self._stage_block(blob_client, n_blocks, block))
+                )
+                n_blocks += 1
+            await asyncio.gather(*in_flight)
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+        await blob_client.commit_block_list(
+            [BlobBlock(block_id=_block_id(index)) for index in range(n_blocks)],
+            content_settings=content_settings,
+        )
+
+    async def _stage_block(
+        self, blob_client: BlobClient, index: int, data: bytes
+    ) -> None:
+        """
+        Stage a block, repeating it alone if it fails transiently.
+
+        Restaging a block under the same id replaces it, and blocks already staged
+        are kept, so the upload resumes rather than restarting.
+        """
+        async for attempt in tenacity.AsyncRetrying(
+            retry=tenacity.retry_if_exception(_is_transient),
+            before_sleep=lambda rs: logger.warning(
+                "Retrying block upload",
+                blob=blob_client.blob_name,
+                block=index,
+                attempt=rs.attempt_number,
+                exc=repr(rs.outcome.exception()) if rs.outcome else None,
+            ),
+            wait=_BLOCK_RETRY_WAIT,
+            stop=tenacity.stop_after_attempt(self.upload_block_attempts),
+            reraise=True,
+        ):
+            with attempt:
+                await blob_client.stage_block(block_id=_block_id(index), data=data)
+
+    @trace_blob_client_method(tracer)
+    async def stage_block(
+        self,
+        file: BlobStorageFile,
+        index: int,
+        data: bytes,
+    ) -> None:
+        """Stage an uncommitted block of a block blob in Azure Blob Storage."""
+        blob_client = self.blob_service_client.get_blob_client(
+            container=file.container, blob=f"{file.path}/{file.filename}"
+        )
+        try:
+            await self._stage_block(blob_client, index, data)
+        except Exception as e:
+            msg = f"Failed to stage block to Azure Blob Storage: {e}"
+            raise AzureBlobStorageError(msg) from e
+
+    @trace_blob_client_method(tracer)
+    async def commit_blocks(
+        self,
+        file: BlobStorageFile,
+        n_blocks: int,
+        content_type: str | None = None,
+    ) -> None:
+        """
+        Commit a block blob's staged blocks in Azure Blob Storage.
+
+        Azure keeps uncommitted blocks for a week, so an upload can be resumed
+        within that window.
+        """
+        blob_client = self.blob_service_client.get_blob_client(
+            container=file.container, blob=f"{file.path}/{file.filename}"
+        )
+        content_settings = ContentSettings(
+            content_type=content_type or infer_content_type(file.filename)
+        )
+        try:
+            await blob_client.commit_block_list(
+                [BlobBlock(block_id=_block_id(index)) for index in range(n_blocks)],
                 content_settings=content_settings,
             )
         except Exception as e:
-            msg = f"Failed to upload file to Azure Blob Storage: {e}"
+            msg = f"Failed to commit blocks to Azure Blob Storage: {e}"
+            raise AzureBlobStorageError(msg) from e
+
+    @trace_blob_client_method(tracer)
+    async def get_file_size(self, file: BlobStorageFile) -> int | None:
+        """Return the size of a blob in Azure Blob Storage, if it exists."""
+        blob_client = self.blob_service_client.get_blob_client(
+            container=file.container, blob=f"{file.path}/{file.filename}"
+        )
+        try:
+            properties = await blob_client.get_blob_properties()
+        except ResourceNotFoundError:
+            return None
+        except Exception as e:
+            msg = f"Failed to look up file in Azure Blob Storage: {e}"
+            raise AzureBlobStorageError(msg) from e
+        return properties.size
+
+    @trace_blob_client_method(tracer)
+    async def delete_file(self, file: BlobStorageFile) -> None:
+        """Delete a blob from Azure Blob Storage, if it exists."""
+        blob_client = self.blob_service_client.get_blob_client(
+            container=file.container, blob=f"{file.path}/{file.filename}"
+        )
+        try:
+            await blob_client.delete_blob()
+        except ResourceNotFoundError:
+            return
+        except Exception as e:
+            msg = f"Failed to delete file from Azure Blob Storage: {e}"
             raise AzureBlobStorageError(msg) from e
 
     @trace_blob_client_generator(tracer)
@@ -1,8 +1,10 @@
 """Minio implementations for blob storage operations."""
 
+import asyncio
 import datetime
-from collections.abc import AsyncGenerator, AsyncIterator
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Generator
 from io import BytesIO
+from typing import BinaryIO, cast
 
 from minio import Minio
 from minio.error import S3Error
@@ -24,6 +26,67 @@ from app.persistence.blob.stream import FileStream
 
 tracer = trace.get_tracer(__name__)
 
+# The size of chunks read from MinIO when streaming a file.
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _block_object_name(file: BlobStorageFile, index: int) -> str:
+    """Name the object a staged block of ``file`` is held in until committed."""
+    return f"{file.path}/{file.filename}.blocks/{index:010d}"
+
+
+class _ChunkReader:
+    """
+    A blocking, file-like reader over a source of byte chunks.
+
+    The MinIO SDK reads an upload's body synchronously, a part at a time, so this
+    lets it upload a stream while holding only about one part of it in memory.
+    """
+
+    def __init__(self, next_chunk: Callable[[], bytes | None]) -> None:
+        """
+        Initialise the reader.
+
+        :param next_chunk: Returns the next chunk of the stream, or ``None`` once
+            it is exhausted.
+        :type next_chunk: Callable[[], bytes | None]
+        """
+        self._next_chunk = next_chunk
+        self._pending = bytearray()
+        self._exhausted = False
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes, or the rest of the stream if negative."""
+        while not self._exhausted and (size < 0 or len(self._pending) < size):
+            chunk = self._next_chunk()
+            if chunk is None:
+                self._exhausted = True
+            else:
+                self._pending += chunk
+        if size < 0:
+            size = len(self._pending)
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+
+
+def _async_chunk_reader(
+    chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop
+) -> _ChunkReader:
+    """
+    Read an async stream from a worker thread.
+
+    Each chunk is pulled on ``loop``, so the stream's producer keeps running on the
+    event loop while the upload blocks only the worker thread.
+    """
+
+    async def _next() -> bytes | None:
+        return await anext(chunks, None)
+
+    return _ChunkReader(
+        lambda: asyncio.run_coroutine_threadsafe(_next(), loop).result()
+    )
+
 
 class MinioBlobStorageClient(GenericBlobStorageClient):
     """
@@ -43,6 +106,7 @@ class MinioBlobStorageClient(GenericBlobStorageClient):
         self.access_key = config.access_key
         self.secret_key = config.secret_key
         self.presigned_url_expiry_seconds = presigned_url_expiry_seconds
+        self.upload_part_size = config.upload_part_size
         self.client = Minio(
             self.host,
             access_key=self.access_key,
@@ -65,6 +129,30 @@ class MinioBlobStorageClient(GenericBlobStorageClient):
             else self.client
         )
 
+    def _put_stream(
+        self,
+        file: BlobStorageFile,
+        reader: _ChunkReader,
+        content_type: str | None,
+    ) -> None:
+        """
+        Upload a stream of unknown length to MinIO, one part at a time.
+
+        Blocking: run in a worker thread. Streams shorter than a part are uploaded
+        in a single request; a failed multipart upload is aborted by the SDK.
+        """
+        self.client.put_object(
+            bucket_name=file.container,
+            object_name=f"{file.path}/{file.filename}",
+            # The SDK only ever calls read().
+            data=cast(BinaryIO, reader),
+            length=-1,
+            part_size=self.upload_part_size,
+            # Parts are uploaded in turn, so only one is held in memory.
+            num_parallel_uploads=1,
+            content_type=content_type or infer_content_type(file.filename),
+        )
+
     @trace_blob_client_method(tracer)
     async def upload_file(
         self,
@@ -72,28 +160,130 @@ class MinioBlobStorageClient(GenericBlobStorageClient):
         file: BlobStorageFile,
         content_type: str | None = None,
     ) -> None:
-        """Upload a file to MinIO."""
+        """
+        Upload a file to MinIO.
+
+        Streamed content is uploaded as multipart parts while it is produced, with
+        the SDK's blocking calls made in a worker thread.
+        """
         try:
-            if isinstance(content, FileStream):
-                buffer = await content.read()
-            elif isinstance(content, BytesIO):
-                buffer = content
-            else:
-                # Async iterator of bytes: buffer in memory. MinIO is dev/test only,
-                # so memory pressure is acceptable.
-                buffer = BytesIO()
-                async for chunk in content:
-                    buffer.write(chunk)
-                buffer.seek(0)
-            self.client.put_object(
+            if isinstance(content, BytesIO):
+                await asyncio.to_thread(
+                    self.client.put_object,
+                    bucket_name=file.container,
+                    object_name=f"{file.path}/{file.filename}",
+                    data=content,
+                    length=content.getbuffer().nbytes,
+                    content_type=content_type or infer_content_type(file.filename),
+                )
+                return
+            chunks = content.stream() if isinstance(content, FileStream) else content
+            reader = _async_chunk_reader(chunks, asyncio.get_running_loop())
+            await asyncio.to_thread(self._put_stream, file, reader, content_type)
+        except S3Error as e:
+            msg = f"Failed to upload file to MinIO: {e}"
+            raise MinioBlobStorageError(msg) from e
+
+    @trace_blob_client_method(tracer)
+    async def stage_block(
+        self,
+        file: BlobStorageFile,
+        index: int,
+        data: bytes,
+    ) -> None:
+        """Stage a block of a file in MinIO as an object of its own."""
+        try:
+            await asyncio.to_thread(
+                self.client.put_object,
+                bucket_name=file.container,
+                object_name=_block_object_name(file, index),
+                data=BytesIO(data),
+                length=len(data),
+            )
+        except S3Error as e:
+            msg = f"Failed to stage block to MinIO: {e}"
+            raise MinioBlobStorageError(msg) from e
+
+    def _commit_blocks(
+        self,
+        file: BlobStorageFile,
+        n_blocks: int,
+        content_type: str | None,
+    ) -> None:
+        """Assemble a file from its staged block objects. Blocking."""
+
+        def _blocks() -> Generator[bytes, None, None]:
+            for index in range(n_blocks):
+                response = self.client.get_object(
+                    bucket_name=file.container,
+                    object_name=_block_object_name(file, index),
+                )
+                try:
+                    yield from response.stream(_STREAM_CHUNK_SIZE)
+                finally:
+                    response.close()
+                    response.release_conn()
+
+        blocks = _blocks()
+        try:
+            self._put_stream(
+                file, _ChunkReader(lambda: next(blocks, None)), content_type
+            )
+        finally:
+            blocks.close()
+        for index in range(n_blocks):
+            self.client.remove_object(
+                bucket_name=file.container,
+                object_name=_block_object_name(file, index),
+            )
+
+    @trace_blob_client_method(tracer)
+    async def commit_blocks(
+        self,
+        file: BlobStorageFile,
+        n_blocks: int,
+        content_type: str | None = None,
+    ) -> None:
+        """
+        Assemble a file in MinIO from its staged block objects, then remove them.
+
+        S3 multipart uploads need parts of at least 5MiB, which export chunks
+        needn't be, so the blocks are streamed back and re-uploaded as parts of
+        the configured size instead of being used as parts directly.
+        """
+        try:
+            await asyncio.to_thread(self._commit_blocks, file, n_blocks, content_type)
+        except S3Error as e:
+            msg = f"Failed to commit blocks to MinIO: {e}"
+            raise MinioBlobStorageError(msg) from e
+
+    @trace_blob_client_method(tracer)
+    async def get_file_size(self, file: BlobStorageFile) -> int | None:
+        """Return the size of an object in MinIO, if it exists."""
+        try:
+            stat = await asyncio.to_thread(
+                self.client.stat_object,
                 bucket_name=file.container,
                 object_name=f"{file.path}/{file.filename}",
-                data=buffer,
-                length=buffer.getbuffer().nbytes,
-                content_type=content_type or infer_content_type(file.filename),
             )
         except S3Error as e:
-            msg = f"Failed to upload file to MinIO: {e}"
+            if e.code == "NoSuchKey":
+                return None
+            msg = f"Failed to look up file in MinIO: {e}"
+            raise MinioBlobStorageError(msg) from e
+        return stat.size
+
+    @trace_blob_client_method(tracer)
+    async def delete_file(self, file: BlobStorageFile) -> None:
+        """Delete an object from MinIO, if it exists."""
+        try:
+            await asyncio.to_thread(
+                self.client.remove_object,
+                bucket_name=file.container,
+                object_name=f"{file.path}/{file.filename}",
+            )
+        except S3Error as e:
+            msg = f"Failed to delete file from MinIO: {e}"
             raise MinioBlobStorageError(msg) from e
 
     @trace_blob_client_generator(tracer)
@@ -101,14 +291,20 @@ class MinioBlobStorageClient(GenericBlobStorageClient):
         self,
         file: BlobStorageFile,
     ) -> AsyncGenerator[bytes, None]:
-        """Yield raw byte chunks from a file in MinIO."""
+        """Yield raw byte chunks from a file in MinIO, read in a worker thread."""
         try:
-            response = self.client.get_object(
+            response = await asyncio.to_thread(
+                self.client.get_object,
                 bucket_name=file.container,
                 object_name=f"{file.path}/{file.filename}",
             )
-            for chunk in response.stream(1024):
-                yield chunk
+            try:
+                chunks = response.stream(_STREAM_CHUNK_SIZE)
+                while chunk := await asyncio.to_thread(next, chunks, None):
+                    yield chunk
+            finally:
+                response.close()
+                response.release_conn()
         except S3Error as e:
             msg = f"Failed to get file from MinIO: {e}"
             raise MinioBlobStorageError(msg) from e
@@ -0,0 +1,178 @@
+"""Streaming compression and decompression of blob content."""
+
+import asyncio
+import zlib
+from collections.abc import AsyncGenerator, AsyncIterable
+from types import ModuleType
+from typing import Protocol
+
+from app.core.exceptions import BlobStorageError
+from app.persistence.blob.models import ContentEncoding
+
+# gzip's header, and the zstd frame magic number (0xFD2FB528, little-endian).
+_MAGIC_BYTES: dict[ContentEncoding, bytes] = {
+    ContentEncoding.GZIP: b"\x1f\x8b",
+    ContentEncoding.ZSTD: b"\x28\xb5\x2f\xfd",
+}
+_SNIFF_LENGTH = max(len(magic) for magic in _MAGIC_BYTES.values())
+# zlib's window bits for a gzip wrapper rather than a raw or zlib stream.
+_GZIP_WBITS = 31
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes, /) -> bytes: ...
+    def flush(self) -> bytes: ...
+
+
+class _Decompressor(Protocol):
+    @property
+    def eof(self) -> bool: ...
+    @property
+    def unused_data(self) -> bytes: ...
+    def decompress(self, data: bytes, /) -> bytes: ...
+
+
+def _zstd() -> ModuleType:
+    """
+    Import the standard library's zstd support.
+
+    Imported on first use so that gzip remains available on interpreters built
+    without zstd.
+    """
+    try:
+        from compression import zstd
+    except ImportError as exc:
+        msg = "zstd compression is not supported by this Python interpreter."
+        raise BlobStorageError(msg) from exc
+    return zstd
+
+
+def _compressor(encoding: ContentEncoding) -> _Compressor:
+    """Return a fresh compressor producing a single ``encoding`` stream."""
+    match encoding:
+        case ContentEncoding.GZIP:
+            return zlib.compressobj(wbits=_GZIP_WBITS)
+        case ContentEncoding.ZSTD:
+            return _zstd().ZstdCompressor()
+
+
+def _decompressor(encoding: ContentEncoding) -> _Decompressor:
+    """Return a fresh decompressor for one ``encoding`` stream."""
+    match encoding:
+        case ContentEncoding.GZIP:
+            return zlib.decompressobj(wbits=_GZIP_WBITS)
+        case ContentEncoding.ZSTD:
+            return _zstd().ZstdDecompressor()
+
+
+def sniff_content_encoding(head: bytes) -> ContentEncoding | None:
+    """
+    Detect the compression of content from its leading bytes.
+
+    :param head: The first bytes of the content.
+    :type head: bytes
+    :return: The encoding the content is compressed with, or ``None`` if it is not
+        compressed in a supported encoding.
+    :rtype: ContentEncoding | None
+    """
+    for encoding, magic in _MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return encoding
+    return None
+
+
+async def compress_chunks(
+    chunks: AsyncIterable[bytes], encoding: ContentEncoding
+) -> AsyncGenerator[bytes, None]:
+    """
+    Compress a stream of byte chunks as it is consumed.
+
+    Each chunk is compressed in a worker thread (both codecs release the GIL), so
+    the event loop stays responsive and compression overlaps with whatever is
+    producing the next chunk.
+
+    :param chunks: The uncompressed content.
+    :type chunks: AsyncIterable[bytes]
+    :param encoding: The compression to apply.
+    :type encoding: ContentEncoding
+    :return: An async generator yielding compressed chunks.
+    :rtype: AsyncGenerator[bytes, None]
+    """
+    compressor = _compressor(encoding)
+    async for chunk in chunks:
+        if compressed := await asyncio.to_thread(compressor.compress, chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+async def compress_bytes(data: bytes, encoding: ContentEncoding) -> bytes:
+    """
+    Compress ``data`` as a single, complete stream in a worker thread.
+
+    Complete streams can be concatenated and still decompress as one file (see
+    :func:`decompress_chunks`), so a file can be compressed a block at a time.
+
+    :param data: The uncompressed content.
+    :type data: bytes
+    :param encoding: The compression to apply.
+    :type encoding: ContentEncoding
+    :return: The compressed content.
+    :rtype: bytes
+    """
+
+    def _compress() -> bytes:
+        compressor = _compressor(encoding)
+        return compressor.compress(data) + compressor.flush()
+
+    return await asyncio.to_thread(_compress)
+
+
+async def decompress_chunks(
+    chunks: AsyncIterable[bytes],
+) -> AsyncGenerator[bytes, None]:
+    """
+    Transparently decompress a stream of byte chunks.
+
+    The encoding is sniffed from the content's leading bytes, so uncompressed
+    content passes through unchanged and a file's name needn't reflect how it was
+    compressed (e.g. a robot compressing its results before upload).
+    Concatenated streams, as produced by appending to a gzip file or writing zstd
+    frames independently, are decompressed in turn.
+
+    :param chunks: The possibly-compressed content.
+    :type chunks: AsyncIterable[bytes]
+    :return: An async generator yielding uncompressed chunks.
+    :rtype: AsyncGenerator[bytes, None]
+    """
+    iterator = aiter(chunks)
+    head = b""
+    async for chunk in iterator:
+        head += chunk
+        if len(head) >= _SNIFF_LENGTH:
+            break
+
+    encoding = sniff_content_encoding(head)
+    if encoding is None:
+        if head:
+            yield head
+        async for chunk in iterator:
+            yield chunk
+        return
+
+    decompressor = _decompressor(encoding)
+    pending = head
+    while True:
+        while pending:
+            if decompressor.eof:
+                decompressor = _decompressor(encoding)
+            if data := decompressor.decompress(pending):
+                yield data
+            pending = decompressor.unused_data if decompressor.eof else b""
+        try:
+            pending = await anext(iterator)
+        except StopAsyncIteration:
+            break
+
+    if not decompressor.eof:
+        msg = f"Compressed {encoding} stream ended before it was complete."
+        raise BlobStorageError(msg)
@@ -42,15 +42,52 @@ class BlobContainer(StrEnum):
     FULL_TEXTS = auto()
 
 
+class ContentEncoding(StrEnum):
+    """
+    Compression applied to a file's content.
+
+    A compressed file's encoding is recorded as a suffix on its filename (e.g.
+    ``export.jsonl.gz``), so it survives the file's URI representation.
+    """
+
+    GZIP = auto()
+    """gzip: universally supported, moderate ratio and speed."""
+    ZSTD = auto()
+    """Zstandard: a better ratio than gzip at several times the speed."""
+
+    @property
+    def extension(self) -> str:
+        """The filename suffix for this encoding."""
+        return _EXTENSION_BY_CONTENT_ENCODING[self]
+
+    @classmethod
+    def from_filename(cls, filename: str) -> "ContentEncoding | None":
+        """Return the encoding recorded in ``filename``'s suffix, if any."""
+        extension = filename.rsplit(".", 1)[-1].casefold() if "." in filename else ""
+        for encoding, encoding_extension in _EXTENSION_BY_CONTENT_ENCODING.items():
+            if extension == encoding_extension:
+                return encoding
+        return None
+
+
+_EXTENSION_BY_CONTENT_ENCODING: dict[ContentEncoding, str] = {
+    ContentEncoding.GZIP: "gz",
+    ContentEncoding.ZSTD: "zst",
+}
+
+
 _CONTENT_TYPE_BY_EXTENSION: dict[str, str] = {
     "jsonl": "application/jsonl",
     "ris": "application/x-research-info-systems",
+    "parquet": "application/vnd.apache.parquet",
     "json": "application/json",
     "csv": "text/csv",
     "txt": "text/plain",
     "pdf": "application/pdf",
     "xml": "application/xml",
     "html": "text/html",
+    "gz": "application/gzip",
+    "zst": "application/zstd",
 }
 
 
@@ -87,6 +124,11 @@ class BlobStorageFile(BaseModel):
         """Whether this blob lives at a URL we don't own (http/https)."""
         return self.location in BlobStorageLocation.remote()
 
+    @property
+    def content_encoding(self) -> ContentEncoding | None:
+        """The compression applied to the file, as recorded in its filename."""
+        return ContentEncoding.from_filename(self.filename)
+
     @model_validator(mode="before")
     @classmethod
     def _coerce_from_uri(cls, value: object) -> object:
@@ -2,7 +2,7 @@
 
 import asyncio
 import hashlib
-from collections.abc import AsyncGenerator, AsyncIterator
+from collections.abc import AsyncGenerator, AsyncIterator, Sequence
 from contextlib import asynccontextmanager
 from functools import cached_property
 from io import BytesIO
@@ -18,6 +18,7 @@ from app.core.config import (
 )
 from app.core.exceptions import (
     AzureBlobStorageError,
+    BlobIntegrityError,
     BlobSizeExceededError,
     BlobStorageError,
     MinioBlobStorageError,
@@ -34,6 +35,7 @@ from app.persistence.blob.models import (
     BlobStorageFile,
     BlobStorageLocation,
 )
+from app.persistence.blob.signed_url_cache import get_signed_url_cache
 from app.persistence.blob.stream import FileStream
 
 settings = get_settings()
@@ -53,6 +55,18 @@ class URLSigner(Protocol):
         ...
 
 
+class BulkURLSigner(Protocol):
+    """Callable signature for signing many blob storage files at once."""
+
+    async def __call__(
+        self,
+        requests: Sequence[tuple[BlobStorageFile, BlobSignedUrlType]],
+        content_disposition: str | None = "attachment",
+    ) -> list[HttpUrl]:
+        """Sign each ``(file, interaction_type)``, returning URLs in order."""
+        ...
+
+
 class _BlobClientRegistry:
     """
     Process-wide owner of concrete blob backend clients.
@@ -178,7 +192,9 @@ class BlobRepository:
         Upload a file to Blob Storage.
 
         See :class:`app.persistence.blob.stream.FileStream` for
-        examples of how to create and use a ``FileStream`` object.
+        examples of how to create and use a ``FileStream`` object. If the stream
+        is compressed, ``filename`` is suffixed with its encoding so that the
+        returned file records it.
 
         :param content: The content of the file to upload.
         :type content: FileStream | BytesIO
@@ -195,11 +211,90 @@ class BlobRepository:
         :return: The information of the uploaded file.
         :rtype: BlobStorageFile
         """
+        if isinstance(content, FileStream) and content.compression:
+            filename = f"{filename}.{content.compression.extension}"
         file = self.destination(path=path, filename=filename, container=container)
         client = await self._preload_config(file)
         await client.upload_file(content, file, content_type=content_type)
         return file
 
+    async def stage_block(
+        self,
+        file: BlobStorageFile,
+        index: int,
+        data: bytes,
+    ) -> None:
+        """
+        Durably stage one block of a file that is uploaded a block at a time.
+
+        Blocks are invisible until :meth:`commit_blocks` assembles the file, but
+        survive the process that staged them, so an interrupted upload can be
+        resumed from its last staged block. Staging an index again replaces it.
+
+        :param file: The file the block belongs to, e.g. from :meth:`destination`.
+        :type file: BlobStorageFile
+        :param index: The block's zero-based position in the file.
+        :type index: int
+        :param data: The block's content.
+        :type data: bytes
+        """
+        client = await self._preload_config(file)
+        await client.stage_block(file, index, data)
+
+    async def commit_blocks(
+        self,
+        file: BlobStorageFile,
+        n_blocks: int,
+        content_type: str | None = None,
+    ) -> None:
+        """
+        Assemble a file from its first ``n_blocks`` staged blocks, in order.
+
+        :param file: The file to assemble.
+        :type file: BlobStorageFile
+        :param n_blocks: The number of blocks in the file.
+        :type n_blocks: int
+        :param content_type: Optional MIME type to attach to the file. If not
+            provided, it is inferred from the filename.
+        :type content_type: str | None
+        """
+        client = await self._preload_config(file)
+        await client.commit_blocks(file, n_blocks, content_type=content_type)
+
+    async def get_file_size(self, file: BlobStorageFile) -> int | None:
+        """
+        Return the size of a file in Blob Storage, or ``None`` if it doesn't exist.
+
+        :param file: The file to look up.
+        :type file: BlobStorageFile
+        :return: The file's size in bytes, or ``None`` if there is no such file.
+        :rtype: int | None
+        """
+        client = await self._preload_config(file)
+        return await client.get_file_size(file)
+
+    async def read_file(self, file: BlobStorageFile) -> bytes:
+        """
+        Read a small file from Blob Storage into memory, as stored.
+
+        :param file: The file to read.
+        :type file: BlobStorageFile
+        :return: The file's raw content.
+        :rtype: bytes
+        """
+        client = await self._preload_config(file)
+        return b"".join([chunk async for chunk in client.stream_chunks(file)])
+
+    async def delete_file(self, file: BlobStorageFile) -> None:
+        """
+        Delete a file from Blob Storage. Deleting a missing file is a no-op.
+
+        :param file: The file to delete.
+        :type file: BlobStorageFile
+        """
+        client = await self._preload_config(file)
+        await client.delete_file(file)
+
     @asynccontextmanager
     async def stream_file_from_blob_storage(
         self,
@@ -208,6 +303,9 @@ class BlobRepository:
         """
         Stream a file line-by-line from Blob Storage.
 
+        Compressed files are decompressed transparently, whether or not their
+        filename records the compression.
+
         Usage:
 
         .. code-block:: python
@@ -235,6 +333,10 @@ class BlobRepository:
         """
         Generate a signed URL for a file in Blob Storage.
 
+        URLs are cached per process until shortly before they expire (see
+        :class:`~app.persistence.blob.signed_url_cache.SignedUrlCache`), so
+        repeated requests for the same file and interaction aren't re-signed.
+
         :param file: The file for which to generate the signed URL.
         :type file: BlobStorageFile
         :param interaction_type: The type of interaction (upload or download).
@@ -247,12 +349,53 @@ class BlobRepository:
         :return: The signed URL for the file.
         :rtype: HttpUrl
         """
+        cache = get_signed_url_cache()
+        key = cache.key(file, interaction_type, content_disposition)
+        if (url := cache.get(key)) is not None:
+            return url
         client = await self._preload_config(file)
-        return HttpUrl(
+        url = HttpUrl(
             await client.generate_signed_url(
                 file, interaction_type, content_disposition
             )
         )
+        cache.put(key, url)
+        return url
+
+    async def get_signed_urls(
+        self,
+        requests: Sequence[tuple[BlobStorageFile, BlobSignedUrlType]],
+        content_disposition: str | None = "attachment",
+    ) -> list[HttpUrl]:
+        """
+        Generate signed URLs for many files, e.g. for a batch response.
+
+        Duplicate requests are signed once, cached URLs are reused, and the rest
+        are signed concurrently.
+
+        :param requests: The files to sign, each with its interaction type.
+        :type requests: Sequence[tuple[BlobStorageFile, BlobSignedUrlType]]
+        :param content_disposition: As for :meth:`get_signed_url`, applied to
+            every download.
+        :type content_disposition: str | None
+        :return: The signed URLs, in the order of ``requests``.
+        :rtype: list[HttpUrl]
+        """
+        unique = {
+            (file.to_uri(), interaction_type): (file, interaction_type)
+            for file, interaction_type in requests
+        }
+        urls = await asyncio.gather(
+            *(
+                self.get_signed_url(file, interaction_type, content_disposition)
+                for file, interaction_type in unique.values()
+            )
+        )
+        signed = dict(zip(unique, urls, strict=True))
+        return [
+            signed[file.to_uri(), interaction_type]
+            for file, interaction_type in requests
+        ]
 
     async def copy(
         self,
@@ -260,6 +403,7 @@ class BlobRepository:
         destination: BlobStorageFile,
         max_bytes: int | None = None,
         content_type: str | None = None,
+        expected_sha256: str | None = None,
     ) -> BlobCopyResult:
         """
         Stream a file from source to destination, computing sha256 and size.
@@ -279,8 +423,14 @@ class BlobRepository:
             re-derived from the destination filename. Defaults to ``None``,
             which lets the backend infer from ``destination.filename``.
         :type content_type: str | None
+        :param expected_sha256: Optional sha256 hex digest the source must have.
+            It is checked before the last chunk is handed to the destination, so
+            a mismatching copy fails without its content ever being committed.
+        :type expected_sha256: str | None
         :raises BlobSizeExceededError: if ``max_bytes`` is set and the source
             yields more bytes than allowed.
+        :raises BlobIntegrityError: if ``expected_sha256`` is set and the source
+            doesn't match it.
         """
         if destination.location != self._write_backend.location:
             msg = (
@@ -297,6 +447,8 @@ class BlobRepository:
 
         async def hashed_chunks() -> AsyncIterator[bytes]:
             nonlocal size
+            # The last chunk is held back until the digest is checked.
+            pending: bytes | None = None
             async for chunk in src_client.stream_chunks(source):
                 hasher.update(chunk)
                 size += len(chunk)
@@ -306,7 +458,17 @@ class BlobRepository:
                         f"(streamed at least {size} bytes before abort)."
                     )
                     raise BlobSizeExceededError(msg)
-                yield chunk
+                if pending is not None:
+                    yield pending
+                pending = chunk
+            if expected_sha256 is not None and hasher.hexdigest() != expected_sha256:
+                msg = (
+                    f"Source {source.to_uri()} has sha256 {hasher.hexdigest()!r}, "
+                    f"expected {expected_sha256!r}."
+                )
+                raise BlobIntegrityError(msg)
+            if pending is not None:
+                yield pending
 
         await dest_client.upload_file(
             hashed_chunks(), destination, content_type=content_type
@@ -0,0 +1,85 @@
+"""Caching of signed blob storage URLs."""
+
+from functools import lru_cache
+
+from cachetools import TTLCache
+from pydantic import HttpUrl
+
+from app.core.config import get_settings
+from app.persistence.blob.models import BlobSignedUrlType, BlobStorageFile
+
+_CacheKey = tuple[str, BlobSignedUrlType, str | None]
+
+
+class SignedUrlCache:
+    """
+    A bounded, in-process cache of signed URLs.
+
+    Signed URLs are requested repeatedly for the same files, e.g. by robots polling
+    their batches. An entry is kept until ``min_remaining_seconds`` before the URL
+    it holds expires, so a URL served from the cache is always usable for at least
+    that long.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        max_entries: int,
+        expiry_seconds: int,
+        min_remaining_seconds: int,
+    ) -> None:
+        """
+        Initialise an empty cache.
+
+        :param enabled: Whether to cache at all.
+        :type enabled: bool
+        :param max_entries: The maximum number of URLs held.
+        :type max_entries: int
+        :param expiry_seconds: How long a signed URL is valid for.
+        :type expiry_seconds: int
+        :param min_remaining_seconds: The validity a URL must have left to be
+            served. Caching is disabled if this leaves no time to cache for.
+        :type min_remaining_seconds: int
+        """
+        ttl_seconds = expiry_seconds - min_remaining_seconds
+        self.enabled = enabled and ttl_seconds > 0
+        self._entries: TTLCache[_CacheKey, HttpUrl] = TTLCache(
+            maxsize=max_entries, ttl=max(ttl_seconds, 1)
+        )
+
+    @staticmethod
+    def key(
+        file: BlobStorageFile,
+        interaction_type: BlobSignedUrlType,
+        content_disposition: str | None,
+    ) -> _CacheKey:
+        """Key a signing request on everything that changes the signed URL."""
+        return (file.to_uri(), interaction_type, content_disposition)
+
+    def get(self, key: _CacheKey) -> HttpUrl | None:
+        """Return the cached URL for ``key``, if any."""
+        if not self.enabled:
+            return None
+        return self._entries.get(key)
+
+    def put(self, key: _CacheKey, url: HttpUrl) -> None:
+        """Cache a freshly signed URL."""
+        if self.enabled:
+            self._entries[key] = url
+
+    def clear(self) -> None:
+        """Drop every cached URL."""
+        self._entries.clear()
+
+
+@lru_cache(maxsize=1)
+def get_signed_url_cache() -> SignedUrlCache:
+    """Return the process-wide signed URL cache."""
+    settings = get_settings()
+    return SignedUrlCache(
+        enabled=settings.signed_url_cache.enabled,
+        max_entries=settings.signed_url_cache.max_entries,
+        expiry_seconds=settings.presigned_url_expiry_seconds,
+        min_remaining_seconds=settings.signed_url_cache.min_remaining_seconds,
+    )
@@ -9,8 +9,10 @@ from opentelemetry import trace
 
 from app.core.exceptions import BlobStorageError
 from app.core.telemetry.attributes import Attributes, trace_attribute
+from app.persistence.blob.compression import compress_chunks
+from app.persistence.blob.models import ContentEncoding
 
-Streamable = TypeVar("Streamable", bound=str | list[str])
+Streamable = TypeVar("Streamable", bound=str | list[str] | bytes)
 tracer = trace.get_tracer(__name__)
 
 
@@ -19,7 +21,8 @@ class FileStream:
     A helper class to convert a service function or generator into an async file stream.
 
     This allows memory-efficient streaming of data from a function that returns a string
-    or list of strings.
+    or list of strings, each written as a line, or bytes, written as they are (e.g. a
+    binary file produced incrementally).
 
     Example usage:
 
@@ -37,6 +40,9 @@ class FileStream:
             path="path/to/file.jsonl",
             filename="file.jsonl",
         )
+
+    Passing ``compression`` compresses the stream as it is produced; the uploaded
+    file's name is suffixed with the encoding (e.g. ``file.jsonl.gz``).
     """
 
     def __init__(
@@ -44,6 +50,7 @@ class FileStream:
         fn: Callable[..., Awaitable[Streamable]] | None = None,
         fn_kwargs: Sequence[dict[str, Any]] | None = None,
         generator: AsyncGenerator[Streamable, None] | None = None,
+        compression: ContentEncoding | None = None,
     ) -> None:
         """
         Initialize the FileStream with a function and its arguments or a generator.
@@ -56,6 +63,8 @@ class FileStream:
         :type fn_kwargs: Sequence[dict[str, Any]]
         :param generator: An async generator yielding Streamable.
         :type generator: AsyncGenerator[Streamable, None] | None
+        :param compression: The compression to apply to the streamed bytes, if any.
+        :type compression: ContentEncoding | None
         """
         if (fn is None) == (generator is None):
             msg = "Either a function or a generator must be provided, but not both."
@@ -64,13 +73,14 @@ class FileStream:
         self.fn = fn
         self.fn_kwargs = fn_kwargs or []
         self.generator = generator
+        self.compression = compression
 
-    async def _to_str(self, data: Streamable) -> str:
+    async def _to_str(self, data: str | list[str]) -> str:
         """
-        Convert a Streamable object to a string.
+        Convert a textual Streamable object to a string.
 
         :param data: The Streamable object to convert.
-        :type data: Streamable
+        :type data: str | list[str]
         :return: The string representation of the Streamable object.
         :rtype: str
         """
@@ -87,6 +97,8 @@ class FileStream:
         :return: The byte representation of the Streamable object.
         :rtype: bytes
         """
+        if isinstance(data, bytes):
+            return data
         b = await self._to_str(data)
         return b.encode("utf-8")
 
@@ -95,11 +107,21 @@ class FileStream:
         """
         Stream data from the FileStream's function or generator.
 
-        :return: An async generator yielding bytes.
+        :return: An async generator yielding bytes, compressed if the stream was
+            created with ``compression``.
         :rtype: AsyncGenerator[bytes, None]
         :yield: The next chunk of data.
         :rtype: Iterator[AsyncGenerator[bytes, None]]
         """
+        if self.compression:
+            async for chunk in compress_chunks(self._stream(), self.compression):
+                yield chunk
+        else:
+            async for chunk in self._stream():
+                yield chunk
+
+    async def _stream(self) -> AsyncGenerator[bytes, None]:
+        """Stream the uncompressed bytes of the function or generator's output."""
         if self.generator:
             trace_attribute(Attributes.CODE_FUNCTION_NAME, "Anonymous generator")
             async for chunk in self.generator:
@@ -114,10 +136,8 @@ class FileStream:
         """
         Read all data from the FileStream into memory and return as a file-like object.
 
-        For implementations where async generators are not supported we read all data
-        into memory and return a BytesIO object. Currently this applies only to MinIO
-        which is only used for local and testing purposes. If this becomes a problem
-        we can also look into composing blobs: https://min.io/docs/minio/linux/developers/python/API.html#compose_object
+        Every blob backend uploads :meth:`stream` directly; this is for callers that
+        need the whole file at once. Memory use is proportional to the file's size.
 
         :return: A BytesIO object containing all the data.
         :rtype: BytesIO
@@ -0,0 +1,37 @@
+"""Index generation counters, for invalidating caches derived from an index."""
+
+from collections import defaultdict
+from functools import lru_cache
+
+
+class IndexGenerations:
+    """
+    Per-alias generation counters for Elasticsearch indices.
+
+    A generation is bumped whenever this process writes to an index or switches the
+    index behind its alias. Anything derived from an index (e.g. a cached search
+    result) can record the generation it was computed at, and is stale once the
+    generation moves on.
+
+    Counters are in-process: writes made by other processes are not observed, so
+    consumers must still bound staleness by other means (e.g. a TTL).
+    """
+
+    def __init__(self) -> None:
+        """Initialise all generations at zero."""
+        self._generations: defaultdict[str, int] = defaultdict(int)
+
+    def get(self, alias: str) -> int:
+        """Return the current generation of ``alias``."""
+        return self._generations[alias]
+
+    def bump(self, alias: str) -> int:
+        """Advance the generation of ``alias``, returning the new generation."""
+        self._generations[alias] += 1
+        return self._generations[alias]
+
+
+@lru_cache(maxsize=1)
+def get_index_generations() -> IndexGenerations:
+    """Return the process-wide index generation counters."""
+    return IndexGenerations()
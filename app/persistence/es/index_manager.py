@@ -19,6 +19,7 @@ from app.core.telemetry.attributes import (
 )
 from app.core.telemetry.logger import get_logger
 from app.core.telemetry.taskiq import queue_task_with_trace
+from app.persistence.es.generation import get_index_generations
 
 logger = get_logger(__name__)
 tracer = trace.get_tracer(__name__)
@@ -153,6 +154,7 @@ class IndexManager:
         await self.client.indices.put_alias(
             index=current_index_name, name=self.alias_name
         )
+        get_index_generations().bump(self.alias_name)
 
         await self.repair_index()
 
@@ -432,6 +434,7 @@ class IndexManager:
         ]
 
         await self.client.indices.update_aliases(body={"actions": actions})
+        get_index_generations().bump(self.alias_name)
         logger.info(
             "Switched alias %s from %s to %s", self.alias_name, old_index, new_index
         )
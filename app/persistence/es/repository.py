@@ -26,6 +26,7 @@ from app.core.telemetry.repository import (
     trace_repository_generator,
     trace_repository_method,
 )
+from app.persistence.es.generation import get_index_generations
 from app.persistence.es.generics import GenericESPersistenceType
 from app.persistence.es.persistence import (
     ESFacetBucket,
@@ -125,6 +126,7 @@ class GenericAsyncESRepository(
             # we raise it more generally.
             msg = f"Malformed Elasticsearch document: {record}. Error: {exc}."
             raise ESMalformedDocumentError(msg) from exc
+        self._bump_generation()
         return record
 
     @trace_repository_method(tracer)
@@ -146,9 +148,13 @@ class GenericAsyncESRepository(
             async for record in get_records:
                 yield self._persistence_cls.from_domain(record)
 
-        added, _ = await self._persistence_cls.bulk(
-            es_record_translation_generator(), using=self._client
-        )
+        try:
+            added, _ = await self._persistence_cls.bulk(
+                es_record_translation_generator(), using=self._client
+            )
+        finally:
+            # A failed bulk may still have written some documents.
+            self._bump_generation()
         return added
 
     @trace_repository_method(tracer)
@@ -173,6 +179,7 @@ class GenericAsyncESRepository(
 
         if record:
             await record.delete(using=self._client)
+            self._bump_generation()
             return
 
         if fail_hard:
@@ -184,6 +191,10 @@ class GenericAsyncESRepository(
                 lookup_value=pk,
             )
 
+    def _bump_generation(self) -> None:
+        """Mark anything derived from this repository's index as stale."""
+        get_index_generations().bump(self._persistence_cls.Index.name)
+
     def _parse_search_result(
         self, response: Response[Hit], page: int, *, parse_document: bool = False
     ) -> ESSearchResult:
@@ -237,6 +248,7 @@ class GenericAsyncESRepository(
         filter_clauses: Sequence[Query] | None = None,
         *,
         parse_document: bool = False,
+        source_includes: Sequence[str] | None = None,
     ) -> ESSearchResult:
         """
         Search for records using a query string with optional structured filters.
@@ -259,6 +271,9 @@ class GenericAsyncESRepository(
         :param parse_document: Whether to retrieve the documents and include them in the
             hits as domain models.
         :type parse_document: bool
+        :param source_includes: When parsing documents, retrieve only these source
+            fields. ``None`` retrieves the whole document.
+        :type source_includes: Sequence[str] | None
         :return: A list of matching records.
         :rtype: ESSearchResult
         """
@@ -272,6 +287,8 @@ class GenericAsyncESRepository(
             search = search.sort(*sort)
         if not parse_document:
             search = search.source(includes=[])
+        elif source_includes is not None:
+            search = search.source(includes=list(source_includes))
         response = await self._execute_search(search)
         return self._parse_search_result(response, page, parse_document=parse_document)
 
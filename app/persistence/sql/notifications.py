@@ -0,0 +1,145 @@
+"""Postgres notifications (LISTEN/NOTIFY) between application processes."""
+
+import asyncio
+import contextlib
+from collections import defaultdict
+from collections.abc import Collection, Iterator
+from functools import lru_cache
+
+from sqlalchemy import ARRAY, String, bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.telemetry.logger import get_logger
+from app.persistence.sql.session import AsyncDatabaseSessionManager
+
+logger = get_logger(__name__)
+
+PENDING_ENHANCEMENT_CREATED_CHANNEL = "pending_enhancement_created"
+_RECONNECT_DELAY_SECONDS = 5.0
+
+
+async def notify(
+    session: AsyncSession, channel: str, payloads: Collection[str]
+) -> None:
+    """
+    Notify listeners on ``channel`` once per payload, in a single statement.
+
+    Notifications are transactional: they are delivered when the session's
+    transaction commits, and dropped if it rolls back. Postgres also folds
+    identical notifications raised in the same transaction into one.
+
+    :param session: The session whose transaction to notify in.
+    :type session: AsyncSession
+    :param channel: The channel to notify.
+    :type channel: str
+    :param payloads: The payloads to send, e.g. the keys that have changed.
+    :type payloads: Collection[str]
+    """
+    if not payloads:
+        return
+    # One round trip however many payloads there are.
+    await session.execute(
+        select(
+            func.pg_notify(
+                channel,
+                func.unnest(bindparam("payloads", list(payloads), ARRAY(String))),
+            )
+        )
+    )
+
+
+class NotificationListener:
+    """
+    Listens on a notification channel and wakes tasks waiting on its payloads.
+
+    A single connection per process listens for the channel, however many tasks
+    wait on it. If that connection is lost it is re-established, and every waiter
+    is woken in case a notification was missed meanwhile, so waiters must treat
+    a wake-up as a hint to check for work rather than a guarantee of it.
+    """
+
+    def __init__(self, channel: str) -> None:
+        """
+        Initialise a listener which has not started listening.
+
+        :param channel: The channel to listen on.
+        :type channel: str
+        """
+        self.channel = channel
+        self._waiters: defaultdict[str, set[asyncio.Event]] = defaultdict(set)
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self, session_manager: AsyncDatabaseSessionManager) -> None:
+        """Start listening in the background on a dedicated connection."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(session_manager))
+
+    async def stop(self) -> None:
+        """Stop listening and close the connection."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    @contextlib.contextmanager
+    def subscribe(self, payload: str) -> Iterator[asyncio.Event]:
+        """
+        Subscribe to notifications carrying ``payload``.
+
+        The yielded event is set by each matching notification. Clear it before
+        checking for work and then wait on it, so that a notification arriving
+        in between is not missed.
+
+        :param payload: The payload to wait for.
+        :type payload: str
+        :return: An event set when a matching notification arrives.
+        :rtype: Iterator[asyncio.Event]
+        """
+        event = asyncio.Event()
+        self._waiters[payload].add(event)
+        try:
+            yield event
+        finally:
+            waiters = self._waiters[payload]
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[payload]
+
+    def _on_notification(
+        self, _connection: object, _pid: int, _channel: str, payload: str
+    ) -> None:
+        for event in self._waiters.get(payload, ()):
+            event.set()
+
+    def _wake_all(self) -> None:
+        for waiters in self._waiters.values():
+            for event in waiters:
+                event.set()
+
+    async def _listen(self, session_manager: AsyncDatabaseSessionManager) -> None:
+        terminated = asyncio.Event()
+        while True:
+            terminated.clear()
+            try:
+                async with session_manager.driver_connection() as connection:
+                    connection.add_termination_listener(
+                        lambda _connection: terminated.set()
+                    )
+                    await connection.add_listener(self.channel, self._on_notification)
+                    logger.info("Listening for notifications", channel=self.channel)
+                    await terminated.wait()
+                logger.warning("Notification connection lost", channel=self.channel)
+            except Exception:
+                logger.exception(
+                    "Failed to listen for notifications", channel=self.channel
+                )
+            self._wake_all()
+            await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+
+
+@lru_cache(maxsize=1)
+def get_pending_enhancement_listener() -> NotificationListener:
+    """Return the process-wide listener for newly created pending enhancements."""
+    return NotificationListener(PENDING_ENHANCEMENT_CREATED_CHANNEL)
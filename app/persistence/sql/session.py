@@ -126,6 +126,25 @@ class AsyncDatabaseSessionManager:
                 await connection.rollback()
                 raise
 
+    @contextlib.asynccontextmanager
+    async def driver_connection(self) -> AsyncIterator[Any]:
+        """
+        Yield the driver's connection underlying a pooled connection.
+
+        This is for driver features SQLAlchemy doesn't expose, such as asyncpg's
+        notification listeners. The connection is discarded rather than returned
+        to the pool afterwards, as such features leave state on it.
+        """
+        if self._engine is None:
+            msg = "AsyncDatabaseSessionManager is not initialized"
+            raise UOWError(msg)
+        async with self._engine.connect() as connection:
+            try:
+                raw_connection = await connection.get_raw_connection()
+                yield raw_connection.driver_connection
+            finally:
+                await connection.invalidate()
+
 
 db_manager = AsyncDatabaseSessionManager()
 
@@ -18,11 +18,19 @@ from app.api.auth import (
 from app.core.config import get_settings
 from app.core.exceptions import ESNotFoundError, InvalidPayloadError
 from app.core.telemetry.logger import get_logger
+from app.core.telemetry.taskiq import queue_task_with_trace
 from app.domain.references.models.es import (
     ReferenceDocument,
     RobotAutomationPercolationDocument,
 )
+from app.domain.references.services.search_cache import (
+    SearchCacheStats,
+    SearchCoalescingStats,
+    get_search_request_coalescer,
+    get_search_result_cache,
+)
 from app.domain.references.tasks import (
+    backfill_enhancement_content_hashes,
     repair_reference_index,
     repair_reference_index_subset,
     repair_robot_automation_percolation_index,
@@ -247,3 +255,58 @@ async def repair_elasticsearch_index(
         },
         status_code=status.HTTP_202_ACCEPTED,
     )
+
+
+@router.post(
+    "/enhancements/content-hashes/backfill/",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(system_utility_auth)],
+)
+async def start_enhancement_content_hash_backfill() -> JSONResponse:
+    """
+    Record the content hashes of enhancements stored before they were recorded.
+
+    Runs in the background, a page of enhancements per task. Until it finishes,
+    exact duplicates of these enhancements are detected in the application rather
+    than by the database.
+    """
+    await queue_task_with_trace(
+        backfill_enhancement_content_hashes, otel_enabled=settings.otel_enabled
+    )
+    return JSONResponse(
+        content={
+            "status": "ok",
+            "message": "Enhancement content hash backfill has been initiated.",
+        },
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@router.get(
+    "/caches/search/",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(system_utility_auth)],
+)
+async def get_search_cache_stats() -> SearchCacheStats:
+    """
+    Report the effectiveness of the search result cache.
+
+    Counters are per process and reset on restart, so this reflects only the
+    instance that served the request.
+    """
+    return get_search_result_cache().stats()
+
+
+@router.get(
+    "/coalescers/search/",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(system_utility_auth)],
+)
+async def get_search_coalescing_stats() -> SearchCoalescingStats:
+    """
+    Report how often identical facet aggregations shared one execution.
+
+    Counters are per process and reset on restart, so this reflects only the
+    instance that served the request.
+    """
+    return get_search_request_coalescer().stats()
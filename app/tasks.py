@@ -5,6 +5,7 @@ from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_aio_pika import AioPikaBroker
 
 from app.core.azure_service_bus_broker import AzureServiceBusBroker
+from app.core.claim_check import ClaimCheckMiddleware
 from app.core.config import Environment, get_settings
 from app.core.telemetry.logger import logger_configurer
 from app.core.telemetry.otel import configure_otel
@@ -23,6 +24,9 @@ broker: AsyncBroker = AzureServiceBusBroker(
     namespace=settings.message_broker_namespace,
     queue_name=settings.message_broker_queue_name,
     priority_queue_name=settings.message_broker_priority_queue_name,
+    family_queues=settings.message_broker_family_queues,
+    queue_weight=settings.message_broker_queue_weight,
+    idle_queue_backoff=settings.message_broker_idle_queue_backoff,
     max_lock_renewal_duration=settings.message_lock_renewal_duration,
 )
 
@@ -38,6 +42,16 @@ elif settings.env == "test":
     broker = InMemoryBroker()
 
 
+# Added first so that offloaded arguments are restored before other middlewares
+# read them on execution. Service Bus releases claim checks on completion instead.
+if settings.message_claim_check.enabled:
+    broker.add_middlewares(
+        ClaimCheckMiddleware(
+            threshold_bytes=settings.message_claim_check.threshold_bytes,
+            delete_after_execution=not isinstance(broker, AzureServiceBusBroker),
+        )
+    )
+
 # Add OpenTelemetry middleware to all brokers
 if settings.otel_config and settings.otel_enabled:
     configure_otel(
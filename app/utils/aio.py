@@ -1,8 +1,9 @@
 """Utility functions for async iteration."""
 
 import asyncio
+import codecs
 import contextlib
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterable
 from typing import Any, Final, TypeVar
 
 T = TypeVar("T")
@@ -10,19 +11,24 @@ T = TypeVar("T")
 _DONE: Final = object()
 
 
-async def prefetch(source: AsyncGenerator[T, None]) -> AsyncGenerator[T, None]:
+async def prefetch(
+    source: AsyncGenerator[T, None], depth: int = 1
+) -> AsyncGenerator[T, None]:
     """
-    Yield from ``source`` with the next item already in flight.
+    Yield from ``source`` with the next items already in flight.
 
     Overlaps a slow producer with a slow consumer: fetching item n+1 starts
     before the caller has finished with item n. A slow consumer leaves the
-    source up to two items ahead - one queued, one fetched and waiting to be
-    queued - so three items can be alive at once.
+    source up to ``depth + 1`` items ahead - ``depth`` queued, one fetched and
+    waiting to be queued - so ``depth + 2`` items can be alive at once.
 
     Callers that may stop iterating early - via ``break``, or an exception in
     the loop body - must wrap this in :func:`contextlib.aclosing`.
     """
-    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=1)
+    if depth < 1:
+        msg = f"depth must be a positive integer, got {depth}."
+        raise ValueError(msg)
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=depth)
 
     async def _produce() -> None:
         try:
@@ -53,3 +59,21 @@ async def prefetch(source: AsyncGenerator[T, None]) -> AsyncGenerator[T, None]:
             consumer = asyncio.current_task()
             if consumer is not None and consumer.cancelling():
                 raise
+
+
+async def decode_lines(chunks: AsyncIterable[bytes]) -> AsyncGenerator[str, None]:
+    """
+    Decode a stream of UTF-8 byte chunks into lines, without their newlines.
+
+    Characters and lines split across chunk boundaries are reassembled.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)  # carries partial char across chunks
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
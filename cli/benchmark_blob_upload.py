@@ -0,0 +1,112 @@
+r"""
+Benchmark streamed uploads to Azure Blob Storage, e.g. against a local Azurite.
+
+Uploads a generated file once per combination of block size and concurrency, and
+reports the throughput of each. Start Azurite with:
+
+.. code-block:: sh
+
+    docker run -p 10000:10000 mcr.microsoft.com/azure-storage/azurite \
+        azurite-blob --blobHost 0.0.0.0
+
+The defaults target Azurite's well-known development account.
+"""
+
+# ruff: noqa: T201
+import argparse
+import asyncio
+import contextlib
+import itertools
+import os
+import time
+from collections.abc import AsyncGenerator
+
+from azure.core.exceptions import ResourceExistsError
+
+from app.core.config import AzureBlobConfig
+from app.persistence.blob.clients.azure import AzureBlobStorageClient
+from app.persistence.blob.models import (
+    BlobContainer,
+    BlobStorageFile,
+    BlobStorageLocation,
+)
+from app.persistence.blob.stream import FileStream
+
+_AZURITE_ENDPOINT = "http://127.0.0.1:10000/devstoreaccount1"
+_AZURITE_ACCOUNT = "devstoreaccount1"
+# Azurite's published development key, not a secret.
+_AZURITE_KEY = (
+    "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/"
+    "KBHBeksoGMGw=="
+)
+_MIB = 1024 * 1024
+
+
+async def _content(size: int, chunk_size: int) -> AsyncGenerator[bytes, None]:
+    """Yield ``size`` bytes of incompressible content in chunks."""
+    chunk = os.urandom(chunk_size)
+    for offset in range(0, size, chunk_size):
+        yield chunk[: size - offset]
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    """Upload the file for each configuration and print its throughput."""
+    size = args.size_mb * _MIB
+    print(f"{'block MiB':>10} {'concurrency':>12} {'seconds':>9} {'MiB/s':>9}")
+    for block_size_mb, concurrency in itertools.product(
+        args.block_size_mb, args.concurrency
+    ):
+        config = AzureBlobConfig(
+            storage_account_name=args.account,
+            credential=args.key,
+            endpoint=args.endpoint,
+            containers=dict.fromkeys(BlobContainer, args.container),
+            upload_block_size=block_size_mb * _MIB,
+            upload_max_concurrency=concurrency,
+        )
+        client = AzureBlobStorageClient(config, presigned_url_expiry_seconds=60)
+        try:
+            with contextlib.suppress(ResourceExistsError):
+                await client.blob_service_client.create_container(args.container)
+            file = BlobStorageFile(
+                location=BlobStorageLocation.AZURE,
+                container=args.container,
+                path="benchmark",
+                filename=f"{block_size_mb}mib-{concurrency}.bin",
+            )
+            started = time.perf_counter()
+            await client.upload_file(
+                FileStream(generator=_content(size, args.chunk_kb * 1024)), file
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            await client.aclose()
+        print(
+            f"{block_size_mb:>10} {concurrency:>12} {elapsed:>9.2f} "
+            f"{args.size_mb / elapsed:>9.1f}"
+        )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoint", default=_AZURITE_ENDPOINT)
+    parser.add_argument("--account", default=_AZURITE_ACCOUNT)
+    parser.add_argument("--key", default=_AZURITE_KEY)
+    parser.add_argument("--container", default="benchmark")
+    parser.add_argument(
+        "--size-mb", type=int, default=256, help="Size of the uploaded file."
+    )
+    parser.add_argument(
+        "--chunk-kb",
+        type=int,
+        default=64,
+        help="Size of the chunks the file is streamed in.",
+    )
+    parser.add_argument("--block-size-mb", type=int, nargs="+", default=[4])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    asyncio.run(benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
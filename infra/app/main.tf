@@ -88,6 +88,16 @@ locals {
       name  = "MESSAGE_BROKER_PRIORITY_QUEUE_NAME"
       value = local.active_servicebus_priority_queue.name
     },
+    {
+      name = "MESSAGE_BROKER_FAMILY_QUEUES"
+      value = jsonencode({
+        for family, queue in var.task_family_queues : family => {
+          name            = local.active_servicebus_family_queues[family].name
+          weight          = queue.weight
+          max_concurrency = queue.max_concurrency
+        }
+      })
+    },
     {
       name = "AZURE_BLOB_CONFIG"
       value = jsonencode({
@@ -306,7 +316,7 @@ module "container_app_tasks" {
   command = ["taskiq", "worker", "app.tasks:broker", "--fs-discover", "--tasks-pattern", "app/**/tasks.py", "--max-async-tasks", var.container_app_tasks_n_concurrent_jobs]
 
   # Unfortunately the Azure terraform provider doesn't support setting up managed identity auth for scaling rules.
-  custom_scale_rules = [
+  custom_scale_rules = concat([
     {
       name             = "queue-length-scale-rule"
       custom_rule_type = "azure-servicebus"
@@ -333,7 +343,21 @@ module "container_app_tasks" {
         trigger_parameter = "connection"
       }
     },
-  ]
+    ], [
+    for family, queue in local.active_servicebus_family_queues : {
+      name             = "${family}-queue-length-scale-rule"
+      custom_rule_type = "azure-servicebus"
+      metadata = {
+        namespace    = local.active_servicebus_ns.name
+        queueName    = queue.name
+        messageCount = var.queue_active_jobs_scaling_threshold
+      }
+      authentication = {
+        secret_name       = "servicebus-connection-string"
+        trigger_parameter = "connection"
+      }
+    }
+  ])
 }
 
 module "container_app_ui" {
@@ -392,6 +416,7 @@ locals {
   active_servicebus_ns             = local.servicebus_is_premium ? azurerm_servicebus_namespace.premium[0] : azurerm_servicebus_namespace.this
   active_servicebus_queue          = local.servicebus_is_premium ? azurerm_servicebus_queue.taskiq_premium[0] : azurerm_servicebus_queue.taskiq
   active_servicebus_priority_queue = local.servicebus_is_premium ? azurerm_servicebus_queue.taskiq_priority_premium[0] : azurerm_servicebus_queue.taskiq_priority
+  active_servicebus_family_queues  = local.servicebus_is_premium ? azurerm_servicebus_queue.taskiq_family_premium : azurerm_servicebus_queue.taskiq_family
 }
 
 resource "azurerm_servicebus_namespace" "this" {
@@ -418,6 +443,16 @@ resource "azurerm_servicebus_queue" "taskiq_priority" {
   partitioning_enabled = true
 }
 
+resource "azurerm_servicebus_queue" "taskiq_family" {
+  for_each = var.task_family_queues
+
+  name         = "taskiq-${each.key}"
+  namespace_id = azurerm_servicebus_namespace.this.id
+
+  partitioning_enabled = true
+  lock_duration        = "PT5M"
+}
+
 resource "azurerm_servicebus_namespace" "premium" {
   count = local.servicebus_is_premium ? 1 : 0
 
@@ -450,6 +485,16 @@ resource "azurerm_servicebus_queue" "taskiq_priority_premium" {
   partitioning_enabled = true
 }
 
+resource "azurerm_servicebus_queue" "taskiq_family_premium" {
+  for_each = local.servicebus_is_premium ? var.task_family_queues : {}
+
+  name         = "taskiq-${each.key}"
+  namespace_id = azurerm_servicebus_namespace.premium[0].id
+
+  partitioning_enabled = true
+  lock_duration        = "PT5M"
+}
+
 resource "azurerm_storage_account" "this" {
   # Storage account name ust be less than 24 characters, only lowercase letters and numbers,
   # and globally unique. This is the best we can do.
@@ -538,6 +583,22 @@ resource "azurerm_storage_management_policy" "operations" {
     }
   }
 
+  # Task arguments offloaded from the message broker are deleted once their task
+  # runs, this catches those of dead-lettered or expired messages.
+  rule {
+    name    = "delete-old-${azurerm_storage_container.operations.name}-claim-checks"
+    enabled = true
+    filters {
+      blob_types   = ["blockBlob"]
+      prefix_match = ["${azurerm_storage_container.operations.name}/claim-checks/"]
+    }
+    actions {
+      base_blob {
+        delete_after_days_since_modification_greater_than = 14
+      }
+    }
+  }
+
   rule {
     name    = "delete-old-${azurerm_storage_container.file_uploads.name}-blobs"
     enabled = true
@@ -841,10 +902,15 @@ resource "azurerm_container_app_job" "es_index_migrator" {
 locals {
   scheduled_jobs = {
     expire_pending_enhancements = {
-      cron_expression = "*/10 * * * *" # Every 10 minutes
+      cron_expression = "* * * * *" # Every minute
       command         = ["python", "-m", "app.run_task", "app.domain.references.tasks:expire_and_replace_stale_pending_enhancements"]
       timeout_seconds = 120
     }
+    sync_automation_percolator = {
+      cron_expression = "*/5 * * * *" # Every five minutes
+      command         = ["python", "-m", "app.run_task", "app.domain.references.tasks:repair_robot_automation_percolation_index"]
+      timeout_seconds = 300
+    }
   }
 }
 
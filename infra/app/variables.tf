@@ -160,6 +160,26 @@ variable "priority_queue_active_jobs_scaling_threshold" {
   default     = 20
 }
 
+variable "task_family_queues" {
+  description = "Queues for task families, so that a flood of one family's tasks doesn't hold up the others. Weights share receives between the queues, and concurrency limits cap each family's tasks per tasks container. Families not listed share the default queue."
+  type = map(object({
+    weight          = optional(number, 1)
+    max_concurrency = optional(number)
+  }))
+  default = {
+    import = { weight = 1, max_concurrency = 2 }
+    index  = { weight = 2 }
+    dedup  = { weight = 1 }
+    robot  = { weight = 2 }
+    export = { weight = 1, max_concurrency = 1 }
+  }
+
+  validation {
+    condition     = alltrue([for family in keys(var.task_family_queues) : contains(["import", "index", "dedup", "robot", "export"], family)])
+    error_message = "Task families must be one of import, index, dedup, robot or export."
+  }
+}
+
 
 variable "created_by" {
   description = "Who created this infrastructure. Required tag for resource groups"
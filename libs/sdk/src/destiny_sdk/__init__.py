@@ -3,6 +3,7 @@
 from . import (
     auth,
     client,
+    compression,
     deduplication,
     enhancements,
     identifiers,
@@ -19,6 +20,7 @@ __all__ = [
     "UUID",
     "auth",
     "client",
+    "compression",
     "deduplication",
     "enhancements",
     "identifiers",
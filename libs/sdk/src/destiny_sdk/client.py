@@ -16,6 +16,7 @@ from msal import (
 from pydantic import HttpUrl, SecretStr, TypeAdapter
 
 from destiny_sdk.auth import TOKEN_EXPIRED_MESSAGE, create_signature
+from destiny_sdk.compression import ContentEncoding, iter_lines
 from destiny_sdk.core import UUID, sdk_version
 from destiny_sdk.identifiers import IdentifierLookup
 from destiny_sdk.keycloak_auth import (
@@ -23,7 +24,12 @@ from destiny_sdk.keycloak_auth import (
     KeycloakClientCredentialsFlow,
     TokenResponse,
 )
-from destiny_sdk.references import Reference, ReferenceSearchResult
+from destiny_sdk.references import (
+    Reference,
+    ReferenceLookupRequest,
+    ReferenceLookupResult,
+    ReferenceSearchResult,
+)
 from destiny_sdk.robots import (
     EnhancementRequestRead,
     RobotEnhancementBatch,
@@ -148,12 +154,14 @@ class RobotClient:
         response.raise_for_status()
         return RobotEnhancementBatchRead.model_validate(response.json())
 
-    def poll_robot_enhancement_batch(
+    def poll_robot_enhancement_batch(  # noqa: PLR0913
         self,
         robot_id: UUID,
         limit: int = 10,
         lease: str | None = None,
         timeout: int = 60,
+        compression: ContentEncoding | None = None,
+        wait: int | None = None,
     ) -> RobotEnhancementBatch | None:
         """
         Poll for a robot enhancement batch.
@@ -168,6 +176,15 @@ class RobotClient:
             in ISO 8601 duration format eg PT10M. If not provided the repository will
             use a default lease duration.
         :type lease: str | None
+        :param compression: The compression to apply to the batch's reference data
+            file, if any. Use
+            :meth:`iter_robot_enhancement_batch_references` to read it back.
+        :type compression: destiny_sdk.compression.ContentEncoding | None
+        :param wait: How many seconds the repository may hold the request waiting
+            for pending enhancements if none are available, rather than returning
+            None straight away. The repository caps this at its own maximum. The
+            request's timeout is extended by this long.
+        :type wait: int | None
         :return: The RobotEnhancementBatch object from the response, or None if no
             batches available
         :rtype: destiny_sdk.robots.RobotEnhancementBatch | None
@@ -175,6 +192,11 @@ class RobotClient:
         params = {"robot_id": str(robot_id), "limit": limit}
         if lease:
             params["lease"] = lease
+        if compression:
+            params["compression"] = compression
+        if wait:
+            params["wait"] = f"PT{wait}S"
+            timeout += wait
         response = self.session.post(
             "/robot-enhancement-batches/",
             params=params,
@@ -187,6 +209,31 @@ class RobotClient:
         response.raise_for_status()
         return RobotEnhancementBatch.model_validate(response.json())
 
+    def iter_robot_enhancement_batch_references(
+        self,
+        robot_enhancement_batch: RobotEnhancementBatch,
+        timeout: int = 60,
+    ) -> Generator[Reference]:
+        """
+        Stream the references of a robot enhancement batch from its storage URL.
+
+        The reference data file is downloaded as it is iterated, and decompressed
+        transparently if the batch was requested with compression.
+
+        :param robot_enhancement_batch: The batch to read the references of
+        :type robot_enhancement_batch: destiny_sdk.robots.RobotEnhancementBatch
+        :return: A generator of the batch's references, in file order
+        :rtype: Generator[destiny_sdk.references.Reference]
+        """
+        # The storage URL is presigned, so must not carry the session's signature.
+        with httpx.stream(
+            "GET", str(robot_enhancement_batch.reference_storage_url), timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            for line in iter_lines(response.iter_bytes()):
+                if line := line.strip():
+                    yield Reference.from_jsonl(line)
+
     def renew_robot_enhancement_batch_lease(
         self, robot_enhancement_batch_id: UUID, lease_duration: str | None = None
     ) -> None:
@@ -932,6 +979,51 @@ class OAuthClient:
         self._raise_for_status(response)
         return TypeAdapter(list[Reference]).validate_python(response.json())
 
+    def bulk_lookup(
+        self,
+        identifiers: list[str | IdentifierLookup],
+        timeout: int | None = None,
+    ) -> Generator[ReferenceLookupResult, None, None]:
+        """
+        Lookup references by many identifiers in one request.
+
+        Unlike :meth:`lookup`, this accepts tens of thousands of identifiers and
+        streams the results back as the server produces them. There is at least one
+        result per identifier, in the order given: identifiers that match no
+        reference yield a result with no reference, and an identifier carried by
+        several references yields one result for each.
+
+        See also: :ref:`lookup-procedure`.
+
+        :param identifiers: The identifiers to look up.
+        :type identifiers: list[str | libs.sdk.src.destiny_sdk.identifiers.IdentifierLookup]
+        :param timeout: The timeout for the request, in seconds. If provided, this
+            will override the client timeout.
+        :type timeout: int | None
+        :return: A generator of lookup results, consumed as they arrive.
+        :rtype: Generator[libs.sdk.src.destiny_sdk.references.ReferenceLookupResult, None, None]
+        """  # noqa: E501
+        request = ReferenceLookupRequest(
+            identifiers=[
+                identifier.serialize()
+                if isinstance(identifier, IdentifierLookup)
+                else identifier
+                for identifier in identifiers
+            ]
+        )
+        with self._client.stream(
+            "POST",
+            "/references/lookup/",
+            json=request.model_dump(mode="json"),
+            timeout=timeout or httpx.USE_CLIENT_DEFAULT,
+        ) as response:
+            if response.is_error:
+                response.read()
+            self._raise_for_status(response)
+            for line in response.iter_lines():
+                if line:
+                    yield ReferenceLookupResult.model_validate_json(line)
+
     @overload
     def request_search_enhancement(
         self,
@@ -5,9 +5,10 @@ from typing import Self
 
 from pydantic import BaseModel, Field, HttpUrl, TypeAdapter, computed_field
 
+from destiny_sdk.compression import ContentEncoding
 from destiny_sdk.core import UUID, SearchResultMixIn, _JsonlFileInputMixIn
 from destiny_sdk.enhancements import Enhancement, EnhancementFileInput
-from destiny_sdk.identifiers import ExternalIdentifier
+from destiny_sdk.identifiers import ExternalIdentifier, IdentifierLookup
 from destiny_sdk.search import SearchResultTotal
 from destiny_sdk.visibility import Visibility
 
@@ -79,6 +80,34 @@ class ReferenceSearchResult(SearchResultMixIn, BaseModel):
     )
 
 
+class ReferenceLookupRequest(BaseModel):
+    """A request to look up references by many identifiers at once."""
+
+    identifiers: list[str] = Field(
+        min_length=1,
+        description=(
+            "The identifiers to look up, each in the format "
+            "``[[other:<name>:]<type>:]<identifier>``. A bare UUID is a DESTINY id."
+        ),
+        examples=[["doi:10.1000/abc123", "02e376ee-8374-4a8c-997f-9a813bc5b8f8"]],
+    )
+
+
+class ReferenceLookupResult(BaseModel):
+    """The outcome of looking up one identifier in a bulk lookup."""
+
+    identifier: IdentifierLookup = Field(
+        description="The identifier that was looked up.",
+    )
+    reference: Reference | None = Field(
+        default=None,
+        description=(
+            "The deduplicated reference carrying the identifier, or null if no "
+            "reference does."
+        ),
+    )
+
+
 class ReferenceIDSearchResult(BaseModel):
     """The matching reference IDs for a search, without the reference data."""
 
@@ -210,6 +239,8 @@ class ExportFormat(StrEnum):
     """JSON Lines: one reference per line."""
     RIS = auto()
     """RIS: tagged citation format."""
+    PARQUET = auto()
+    """Parquet: columnar, one flattened row per reference, for bulk analytics."""
 
     @property
     def extension(self) -> str:
@@ -245,6 +276,13 @@ class ExportReadBase(BaseModel):
         default=ExportFormat.JSONL,
         description="The serialization format of the produced file.",
     )
+    compression: ContentEncoding | None = Field(
+        default=None,
+        description=(
+            "The compression applied to the produced file, if any. Compressed "
+            "files have the encoding's extension appended to their name."
+        ),
+    )
     result_url: HttpUrl | None = Field(
         default=None,
         description=(
@@ -269,9 +307,9 @@ class SearchExportRead(ExportReadBase):
     truncated: bool = Field(
         default=False,
         description=(
-            "Whether the matching result set exceeded the server's result-window "
-            "cap. When true, the JSONL contains only the first window's worth of "
-            "matches."
+            "Whether the export contains only part of the matching result set. "
+            "Search exports include every match, so this is only true for exports "
+            "produced before the result-window cap was lifted."
         ),
     )
 
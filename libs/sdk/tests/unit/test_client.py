@@ -1,5 +1,6 @@
 """Tests client authentication"""
 
+import gzip
 import json
 import time
 from uuid import UUID, uuid7
@@ -15,11 +16,13 @@ from destiny_sdk.client import (
     RobotClient,
     create_signature,
 )
+from destiny_sdk.compression import ContentEncoding
 from destiny_sdk.identifiers import IdentifierLookup
 from destiny_sdk.references import Reference, ReferenceSearchResult
 from destiny_sdk.robots import (
     EnhancementRequestSearchStatus,
     EnhancementRequestStatus,
+    RobotEnhancementBatch,
     RobotEnhancementBatchRead,
     RobotEnhancementBatchResult,
     RobotError,
@@ -120,6 +123,79 @@ class TestRobotClient:
         callback_request = httpx_mock.get_requests()
         assert len(callback_request) == 1
 
+    def test_poll_requests_compression(
+        self, httpx_mock: HTTPXMock, base_url: str
+    ) -> None:
+        """Test that a requested compression is passed to the repository."""
+        robot_id = uuid7()
+        httpx_mock.add_response(
+            url=httpx.URL(
+                f"{base_url}/v1/robot-enhancement-batches/",
+                params={"robot_id": str(robot_id), "limit": 10, "compression": "gzip"},
+            ),
+            method="POST",
+            status_code=204,
+        )
+
+        batch = RobotClient(
+            base_url=HttpUrl(base_url), secret_key="secret", client_id=robot_id
+        ).poll_robot_enhancement_batch(
+            robot_id=robot_id, compression=ContentEncoding.GZIP
+        )
+
+        assert batch is None
+
+    def test_poll_requests_wait(self, httpx_mock: HTTPXMock, base_url: str) -> None:
+        """Test that a long poll passes its wait and outlasts it."""
+        robot_id = uuid7()
+        httpx_mock.add_response(
+            url=httpx.URL(
+                f"{base_url}/v1/robot-enhancement-batches/",
+                params={"robot_id": str(robot_id), "limit": 10, "wait": "PT20S"},
+            ),
+            method="POST",
+            status_code=204,
+        )
+
+        batch = RobotClient(
+            base_url=HttpUrl(base_url), secret_key="secret", client_id=robot_id
+        ).poll_robot_enhancement_batch(robot_id=robot_id, timeout=60, wait=20)
+
+        assert batch is None
+        assert httpx_mock.get_request().extensions["timeout"]["read"] == 80
+
+    def test_iter_references_decompresses_file(
+        self,
+        httpx_mock: HTTPXMock,
+        base_url: str,
+        test_reference_id: UUID,
+        mock_reference_response: dict,
+    ) -> None:
+        """Test that a compressed reference data file is read transparently."""
+        storage_url = "https://storage.example.com/batch.jsonl.gz?sig=abc"
+        httpx_mock.add_response(
+            url=storage_url,
+            method="GET",
+            content=gzip.compress(
+                (json.dumps(mock_reference_response) + "\n").encode() * 2
+            ),
+        )
+        batch = RobotEnhancementBatch(
+            id=uuid7(),
+            reference_storage_url=HttpUrl(storage_url),
+            result_storage_url=HttpUrl("https://storage.example.com/result.jsonl"),
+        )
+
+        references = list(
+            RobotClient(
+                base_url=HttpUrl(base_url), secret_key="secret", client_id=uuid7()
+            ).iter_robot_enhancement_batch_references(batch)
+        )
+
+        assert [reference.id for reference in references] == [test_reference_id] * 2
+        # The presigned storage URL must not carry the robot's signature.
+        assert "Authorization" not in httpx_mock.get_request().headers
+
 
 class TestOAuthClient:
     """Tests for OAuthClient request handling."""
@@ -276,6 +352,82 @@ class TestOAuthClient:
         assert isinstance(results[0], Reference)
         assert results[0].id == test_reference_id
 
+    def test_bulk_lookup(
+        self,
+        httpx_mock: HTTPXMock,
+        oauth_client: OAuthClient,
+        base_url: str,
+        test_reference_id: UUID,
+    ) -> None:
+        """Test bulk lookup streams a result per line."""
+        reference = {
+            "id": str(test_reference_id),
+            "visibility": "public",
+            "identifiers": [{"identifier_type": "doi", "identifier": "10.1234/test"}],
+            "enhancements": [],
+        }
+        httpx_mock.add_response(
+            url=f"{base_url}/v1/references/lookup/",
+            method="POST",
+            match_json={
+                "identifiers": ["doi:10.1234/test", "pm_id:123456"],
+            },
+            content="\n".join(
+                [
+                    json.dumps(
+                        {
+                            "identifier": {
+                                "identifier": "10.1234/test",
+                                "identifier_type": "doi",
+                            },
+                            "reference": reference,
+                        }
+                    ),
+                    json.dumps(
+                        {
+                            "identifier": {
+                                "identifier": "123456",
+                                "identifier_type": "pm_id",
+                            },
+                            "reference": None,
+                        }
+                    ),
+                ]
+            ).encode(),
+        )
+
+        results = list(
+            oauth_client.bulk_lookup(
+                identifiers=[
+                    "doi:10.1234/test",
+                    IdentifierLookup(identifier="123456", identifier_type="pm_id"),
+                ]
+            )
+        )
+
+        assert len(results) == 2
+        assert results[0].reference is not None
+        assert results[0].reference.id == test_reference_id
+        assert results[1].identifier.identifier == "123456"
+        assert results[1].reference is None
+
+    def test_bulk_lookup_error(
+        self,
+        httpx_mock: HTTPXMock,
+        oauth_client: OAuthClient,
+        base_url: str,
+    ) -> None:
+        """Test bulk lookup raises on an error response."""
+        httpx_mock.add_response(
+            url=f"{base_url}/v1/references/lookup/",
+            method="POST",
+            status_code=400,
+            json={"detail": "Invalid identifier lookup string"},
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            list(oauth_client.bulk_lookup(identifiers=["not-a-uuid"]))
+
     def test_request_search_enhancement(
         self,
         httpx_mock: HTTPXMock,
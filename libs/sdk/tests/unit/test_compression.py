@@ -0,0 +1,46 @@
+"""Tests for compression of files exchanged with the repository."""
+
+import gzip
+
+import pytest
+from destiny_sdk.compression import (
+    ContentEncoding,
+    compress,
+    decompress_chunks,
+    iter_lines,
+    sniff_content_encoding,
+)
+
+
+def test_compress_gzip_round_trip():
+    compressed = compress(b"one\ntwo\n", ContentEncoding.GZIP)
+    assert sniff_content_encoding(compressed) == ContentEncoding.GZIP
+    assert gzip.decompress(compressed) == b"one\ntwo\n"
+
+
+def test_compress_zstd_round_trip():
+    pytest.importorskip("compression.zstd")
+    compressed = compress(b"one\ntwo\n", ContentEncoding.ZSTD)
+    assert sniff_content_encoding(compressed) == ContentEncoding.ZSTD
+    assert b"".join(decompress_chunks([compressed])) == b"one\ntwo\n"
+
+
+def test_iter_lines_decompresses_across_chunks():
+    compressed = gzip.compress("one\ncafé\nthree".encode())
+    chunks = [compressed[i : i + 3] for i in range(0, len(compressed), 3)]
+    assert list(iter_lines(chunks)) == ["one", "café", "three"]
+
+
+def test_iter_lines_passes_through_uncompressed():
+    assert list(iter_lines([b"on", b"e\ntw", b"o\n"])) == ["one", "two"]
+
+
+def test_decompress_chunks_rejects_truncated_stream():
+    truncated = gzip.compress(b"one\n")[:-4]
+    with pytest.raises(ValueError, match="ended before it was complete"):
+        list(decompress_chunks([truncated]))
+
+
+def test_content_encoding_extension():
+    assert ContentEncoding.GZIP.extension == "gz"
+    assert ContentEncoding.ZSTD.extension == "zst"
@@ -8,13 +8,36 @@ import pytest
 from azure.servicebus import ServiceBusReceiveMode
 from azure.servicebus.aio import ServiceBusClient
 from azure.servicebus.amqp import AmqpAnnotatedMessage
+from azure.servicebus.exceptions import MessageSizeExceededError
 
 from app.core.azure_service_bus_broker import AzureServiceBusBroker
-from app.core.config import get_settings
+from app.core.config import TaskFamily, TaskQueueConfig, get_settings
 
 settings = get_settings()
 
 
+class FakeServiceBusMessageBatch:
+    """
+    Fake Service Bus message batch for testing.
+
+    Only the message bodies count towards the batch's size limit.
+    """
+
+    def __init__(self, max_size_in_bytes: int) -> None:
+        """Create an empty batch with the given size limit."""
+        self.max_size_in_bytes = max_size_in_bytes
+        self.size_in_bytes = 0
+
+    def add_message(self, message: AmqpAnnotatedMessage) -> None:
+        """Add a message to the batch if it fits."""
+        size = len(b"".join(message.body))
+        if self.size_in_bytes + size > self.max_size_in_bytes:
+            raise MessageSizeExceededError(
+                message="ServiceBusMessageBatch has reached its size limit"
+            )
+        self.size_in_bytes += size
+
+
 class FakeServiceBusSender:
     """
     Fake Service Bus sender for testing.
@@ -24,17 +47,25 @@ class FakeServiceBusSender:
     can assert which queue a message was routed to.
     """
 
+    max_batch_size_in_bytes = 256 * 1024
+
     def __init__(self, pending_tasks: list[asyncio.Task[AmqpAnnotatedMessage]]) -> None:
         """Bind the sender to its queue's pending-task list."""
         self._pending_tasks = pending_tasks
 
+    async def create_message_batch(self) -> FakeServiceBusMessageBatch:
+        """Create an empty message batch."""
+        return FakeServiceBusMessageBatch(self.max_batch_size_in_bytes)
+
     async def schedule_messages(
-        self, message: AmqpAnnotatedMessage, scheduled_time: datetime | None = None
+        self,
+        message: AmqpAnnotatedMessage | list[AmqpAnnotatedMessage],
+        scheduled_time: datetime | None = None,
     ) -> None:
         """
         Simulate sending messages asynchronously with a scheduled time.
 
-        :param message: The message to be sent.
+        :param message: The message or messages to be sent.
         :param scheduled_time: Optional scheduled time for the message.
         """
         if not scheduled_time:
@@ -42,21 +73,24 @@ class FakeServiceBusSender:
 
         delay = (scheduled_time - datetime.now(UTC)).total_seconds()
 
-        async def _delayed_append() -> AmqpAnnotatedMessage:
+        async def _delayed_append(
+            message: AmqpAnnotatedMessage,
+        ) -> AmqpAnnotatedMessage:
             await asyncio.sleep(delay)
             return message
 
-        task = asyncio.create_task(_delayed_append())
-        self._pending_tasks.append(task)
+        for each in message if isinstance(message, list) else [message]:
+            task = asyncio.create_task(_delayed_append(each))
+            self._pending_tasks.append(task)
 
     async def send_messages(
         self,
-        message: AmqpAnnotatedMessage,
+        message: AmqpAnnotatedMessage | list[AmqpAnnotatedMessage],
     ) -> None:
         """
         Simulate sending messages asynchronously.
 
-        :param message: The message to be sent.
+        :param message: The message or messages to be sent.
         """
         scheduled_time = datetime.now(UTC) + timedelta(seconds=0.1)
         await self.schedule_messages(message, scheduled_time)
@@ -230,3 +264,44 @@ async def broker(
     yield broker
 
     await broker.shutdown()
+
+
+@pytest.fixture
+async def family_broker(
+    connection_string: str,
+    queue_name: str,
+    priority_queue_name: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> AsyncGenerator[AzureServiceBusBroker, None]:
+    """
+    Yield a new broker with queues for the import and index task families.
+
+    :param connection_string: connection string for Azure Service Bus.
+    :param queue_name: test queue name.
+    :param priority_queue_name: test priority queue name.
+    :yield: broker.
+    """
+    broker = AzureServiceBusBroker(
+        connection_string=connection_string,
+        queue_name=queue_name,
+        priority_queue_name=priority_queue_name,
+        family_queues={
+            TaskFamily.IMPORT: TaskQueueConfig(
+                name=f"{queue_name}-import", weight=2, max_concurrency=1
+            ),
+            TaskFamily.INDEX: TaskQueueConfig(name=f"{queue_name}-index"),
+        },
+    )
+    broker.auto_lock_renewer = FakeServiceBusAutoLockRenewer()
+    broker.is_worker_process = True
+
+    monkeypatch.setattr(
+        ServiceBusClient,
+        "from_connection_string",
+        lambda *_args, **_kwargs: FakeServiceBusClient(),
+    )
+    await broker.startup()
+
+    yield broker
+
+    await broker.shutdown()
@@ -1,13 +1,21 @@
-"""Tests for the Taskiq tracing middleware."""
+"""Tests for the Taskiq tracing middleware and task queueing."""
 
 import asyncio
-from unittest.mock import MagicMock, patch
+from collections.abc import AsyncGenerator, Sequence
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from opentelemetry.trace import Link, SpanContext, SpanKind
-from taskiq import TaskiqMessage, TaskiqResult
+from taskiq import (
+    AsyncBroker,
+    BrokerMessage,
+    SendTaskError,
+    TaskiqMessage,
+    TaskiqResult,
+)
 
-from app.core.telemetry.taskiq import TaskiqTracingMiddleware
+from app.core.exceptions import MessageTooLargeError
+from app.core.telemetry.taskiq import TaskBatch, TaskiqTracingMiddleware, TaskPriority
 
 
 @pytest.mark.asyncio
@@ -168,3 +176,115 @@ async def test_context_isolation_between_tasks():
         # Verify both spans were properly cleaned up
         span_a.end.assert_called_once()
         span_b.end.assert_called_once()
+
+
+class RecordingBroker(AsyncBroker):
+    """Broker recording the messages sent in each request."""
+
+    def __init__(self) -> None:
+        """Initialise the broker with no requests."""
+        super().__init__()
+        self.requests: list[list[BrokerMessage]] = []
+
+    async def kick(self, message: BrokerMessage) -> None:
+        """Record a request sending one message."""
+        self.requests.append([message])
+
+    async def listen(self) -> AsyncGenerator[bytes, None]:
+        """Listen for nothing."""
+        for _ in ():
+            yield b""
+
+
+class BatchRecordingBroker(RecordingBroker):
+    """Broker which sends batches in one request, unless they include "large"."""
+
+    async def kick_batch(self, messages: Sequence[BrokerMessage]) -> None:
+        """Record a request sending all the messages that fit."""
+        too_large = [m.task_id for m in messages if b"large" in m.message]
+        self.requests.append([m for m in messages if m.task_id not in too_large])
+        if too_large:
+            raise MessageTooLargeError(detail="Too large.", task_ids=too_large)
+
+
+async def noop(value: str) -> None:
+    """Do nothing with the value."""
+
+
+def request_args(broker: RecordingBroker) -> list[list[str]]:
+    """Get the first argument of the task in each message, per request."""
+    return [
+        [broker.formatter.loads(message.message).args[0] for message in request]
+        for request in broker.requests
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("broker_cls", "requests"),
+    [
+        (BatchRecordingBroker, [["a", "b"], ["c"]]),
+        (RecordingBroker, [["a"], ["b"], ["c"]]),
+    ],
+)
+async def test_task_batch_is_sent_when_full(
+    broker_cls: type[RecordingBroker], requests: list[list[str]]
+):
+    """Tasks are held until the batch is full, and the rest sent on exit."""
+    broker = broker_cls()
+    task = broker.register_task(noop, task_name="task")
+
+    async with TaskBatch(max_messages=2, window=60, otel_enabled=False) as batch:
+        await batch.queue(task, "a", priority=TaskPriority.HIGH)
+        assert broker.requests == []
+        await batch.queue(task, "b")
+        await batch.queue(task, "c")
+        assert len(broker.requests) == len(requests) - 1
+
+    assert request_args(broker) == requests
+    assert broker.requests[0][0].labels["priority"] == str(TaskPriority.HIGH.value)
+
+
+@pytest.mark.asyncio
+async def test_task_batch_is_sent_after_window():
+    """A batch held for longer than the window is sent with the next task."""
+    broker = BatchRecordingBroker()
+    task = broker.register_task(noop, task_name="task")
+
+    async with TaskBatch(max_messages=100, window=0.05, otel_enabled=False) as batch:
+        await batch.queue(task, "a")
+        await asyncio.sleep(0.1)
+        await batch.queue(task, "b")
+        assert request_args(broker) == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_task_batch_reports_tasks_too_large_to_send():
+    """Oversized tasks are passed to their handler, or else raised."""
+    broker = BatchRecordingBroker()
+    task = broker.register_task(noop, task_name="task")
+    on_too_large = AsyncMock()
+
+    async with TaskBatch(max_messages=100, window=60, otel_enabled=False) as batch:
+        await batch.queue(task, "small")
+        await batch.queue(task, "large", on_too_large=on_too_large)
+
+    assert request_args(broker) == [["small"]]
+    on_too_large.assert_awaited_once()
+    assert isinstance(on_too_large.await_args.args[0], MessageTooLargeError)
+
+    with pytest.raises(MessageTooLargeError):
+        async with TaskBatch(max_messages=100, window=60, otel_enabled=False) as batch:
+            await batch.queue(task, "large")
+
+
+@pytest.mark.asyncio
+async def test_task_batch_wraps_send_failures():
+    """Other failures to send a batch are raised as kiq raises them."""
+    broker = BatchRecordingBroker()
+    broker.kick_batch = AsyncMock(side_effect=ConnectionError("down"))
+    task = broker.register_task(noop, task_name="task")
+
+    with pytest.raises(SendTaskError):
+        async with TaskBatch(max_messages=100, window=60, otel_enabled=False) as batch:
+            await batch.queue(task, "a")
@@ -23,7 +23,10 @@ from taskiq.utils import maybe_awaitable
 from app.core.azure_service_bus_broker import (
     _COMPRESSION_THRESHOLD_BYTES,
     AzureServiceBusBroker,
+    _QueueScheduler,
+    _ReceiveQueue,
 )
+from app.core.claim_check import CLAIM_CHECK_LABEL
 from app.core.exceptions import MessageBrokerError, MessageTooLargeError
 
 
@@ -388,6 +391,115 @@ async def test_listen_drains_priority_before_default(
     assert set(yielded[1:]) == {b"normal-1", b"normal-2"}
 
 
+@pytest.mark.anyio
+async def test_family_messages_route_to_family_queues(
+    family_broker: AzureServiceBusBroker,
+    queue_name: str,
+    priority_queue_name: str,
+) -> None:
+    """Task families with a queue use it, unless their tasks are high priority."""
+    for task_id, labels in [
+        ("import-task", {"family": "import"}),
+        ("index-task", {"family": "index"}),
+        ("export-task", {"family": "export"}),
+        ("unknown-task", {"family": "unknown"}),
+        ("priority-import-task", {"family": "import", "priority": "5"}),
+    ]:
+        await family_broker.kick(
+            BrokerMessage(
+                task_id=task_id, task_name="name", message=b"message", labels=labels
+            )
+        )
+
+    queues = family_broker.service_bus_client.queues  # type: ignore[union-attr]
+    assert len(queues[f"{queue_name}-import"]) == 1
+    assert len(queues[f"{queue_name}-index"]) == 1
+    # Families without a queue, and unknown families, use the default queue.
+    assert len(queues[queue_name]) == 2
+    assert len(queues[priority_queue_name]) == 1
+
+
+@pytest.mark.anyio
+async def test_completing_a_message_releases_its_queue_slot(
+    family_broker: AzureServiceBusBroker,
+    queue_name: str,
+) -> None:
+    """Messages count towards their queue's concurrency until completed."""
+    assert family_broker.scheduler is not None
+    import_queue = next(
+        queue
+        for queue in family_broker.scheduler.queues
+        if queue.name == f"{queue_name}-import"
+    )
+    await family_broker.kick(
+        BrokerMessage(
+            task_id="import-task",
+            task_name="name",
+            message=b"import-message",
+            labels={"family": "import"},
+        )
+    )
+
+    message = await asyncio.wait_for(get_first_task(family_broker), timeout=5.0)
+    assert message.data == b"import-message"
+    assert import_queue.in_flight == 1
+    await maybe_awaitable(message.ack())
+    assert import_queue.in_flight == 0
+
+
+def _scheduler(*queues: _ReceiveQueue) -> _QueueScheduler:
+    return _QueueScheduler(queues, idle_backoff=60, slot_timeout=60)
+
+
+@pytest.mark.anyio
+async def test_scheduler_shares_receives_by_weight() -> None:
+    """Queues are received from in proportion to their weights, interleaved."""
+    light = _ReceiveQueue("light", MagicMock(), weight=1)
+    heavy = _ReceiveQueue("heavy", MagicMock(), weight=2)
+    scheduler = _scheduler(light, heavy)
+
+    chosen = [scheduler.next().name for _ in range(6)]  # type: ignore[union-attr]
+
+    assert chosen == ["heavy", "light", "heavy"] * 2
+
+
+@pytest.mark.anyio
+async def test_scheduler_skips_queues_at_their_concurrency_limit() -> None:
+    """A queue at its limit isn't received from until a slot is released."""
+    unlimited = _ReceiveQueue("unlimited", MagicMock(), weight=1)
+    limited = _ReceiveQueue("limited", MagicMock(), weight=5, max_concurrency=1)
+    scheduler = _scheduler(unlimited, limited)
+
+    release = scheduler.acquire(limited)
+    assert {scheduler.next().name for _ in range(3)} == {"unlimited"}  # type: ignore[union-attr]
+
+    release()
+    release()
+    assert limited.in_flight == 0
+    assert scheduler.next() is limited
+
+    only_limited = _scheduler(limited)
+    only_limited.acquire(limited)
+    assert only_limited.next() is None
+
+
+@pytest.mark.anyio
+async def test_scheduler_skips_idle_queues_unless_none_are_ready() -> None:
+    """Empty queues are skipped while another queue can be received from."""
+    busy = _ReceiveQueue("busy", MagicMock(), weight=1)
+    idle = _ReceiveQueue("idle", MagicMock(), weight=5)
+    scheduler = _scheduler(busy, idle)
+
+    scheduler.received(idle, 0)
+    assert {scheduler.next().name for _ in range(3)} == {"busy"}  # type: ignore[union-attr]
+
+    scheduler.received(busy, 0)
+    assert scheduler.next() is idle
+
+    scheduler.received(idle, 1)
+    assert scheduler.next() is idle
+
+
 @pytest.mark.anyio
 async def test_raise_custom_exception_on_oversized_message(
     broker: AzureServiceBusBroker,
@@ -413,6 +525,86 @@ async def test_raise_custom_exception_on_oversized_message(
         )
 
 
+def batch_message(task_id: str, size: int, **labels: str) -> BrokerMessage:
+    """Build a broker message with a body of the given size."""
+    return BrokerMessage(
+        task_id=task_id, task_name="batch-name", message=b"x" * size, labels=labels
+    )
+
+
+@pytest.mark.anyio
+async def test_kick_batch_packs_messages_into_batches_per_queue(
+    broker: AzureServiceBusBroker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Messages are sent per queue, in as few batches as fit the size limit."""
+    assert broker.sender is not None
+    assert broker.priority_sender is not None
+    default_sends: list[list[AmqpAnnotatedMessage]] = []
+    priority_sends: list[list[AmqpAnnotatedMessage]] = []
+    monkeypatch.setattr(broker.sender, "max_batch_size_in_bytes", 25)
+    monkeypatch.setattr(broker.sender, "send_messages", AsyncMock())
+    broker.sender.send_messages.side_effect = default_sends.append
+    monkeypatch.setattr(broker.priority_sender, "send_messages", AsyncMock())
+    broker.priority_sender.send_messages.side_effect = priority_sends.append
+
+    await broker.kick_batch(
+        [
+            *(batch_message(f"task-{i}", 10) for i in range(5)),
+            batch_message("priority-task", 10, priority="5"),
+        ]
+    )
+
+    assert [
+        [message.properties.message_id for message in batch] for batch in default_sends
+    ] == [["task-0", "task-1"], ["task-2", "task-3"], ["task-4"]]
+    assert [len(batch) for batch in priority_sends] == [1]
+
+
+@pytest.mark.anyio
+async def test_kick_batch_schedules_delayed_messages_together(
+    broker: AzureServiceBusBroker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Messages with the same delay are scheduled in one request."""
+    assert broker.sender is not None
+    schedule_messages = AsyncMock()
+    monkeypatch.setattr(broker.sender, "schedule_messages", schedule_messages)
+    monkeypatch.setattr(broker.sender, "send_messages", AsyncMock())
+
+    await broker.kick_batch(
+        [
+            batch_message("delayed-1", 10, delay="5"),
+            batch_message("delayed-2", 10, delay="5"),
+            batch_message("later", 10, delay="60"),
+            batch_message("now", 10),
+        ]
+    )
+
+    assert [len(call.args[0]) for call in schedule_messages.await_args_list] == [2, 1]
+    broker.sender.send_messages.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_kick_batch_sends_what_fits_when_a_message_is_too_large(
+    broker: AzureServiceBusBroker,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Oversized messages are reported by task ID after the rest are sent."""
+    assert broker.sender is not None
+    monkeypatch.setattr(broker.sender, "max_batch_size_in_bytes", 25)
+
+    with pytest.raises(MessageTooLargeError) as exc_info:
+        await broker.kick_batch(
+            [batch_message("fits", 10), batch_message("too-large", 30)]
+        )
+
+    assert exc_info.value.task_ids == ["too-large"]
+    message = await asyncio.wait_for(get_first_task(broker), timeout=3.0)
+    assert message.data == b"x" * 10
+    await maybe_awaitable(message.ack())
+
+
 @pytest.mark.anyio
 async def test_large_message_is_compressed_and_decompressed(
     broker: AzureServiceBusBroker,
@@ -489,6 +681,30 @@ async def test_small_message_is_not_compressed(
     await maybe_awaitable(message.ack())
 
 
+@pytest.mark.anyio
+async def test_claim_check_is_released_on_completion(
+    broker: AzureServiceBusBroker,
+) -> None:
+    """Test that offloaded task arguments are deleted once the message completes."""
+    uri = "minio://operations/claim-checks/claimed-task.json"
+    await broker.kick(
+        BrokerMessage(
+            task_id="claimed-task",
+            task_name="claimed-name",
+            message=b"task-message",
+            labels={CLAIM_CHECK_LABEL: uri},
+        )
+    )
+    message = await asyncio.wait_for(get_first_task(broker), timeout=3.0)
+
+    with patch(
+        "app.core.azure_service_bus_broker.release_claim_check", new=AsyncMock()
+    ) as release:
+        await maybe_awaitable(message.ack())
+
+    release.assert_awaited_once_with(uri)
+
+
 @pytest.mark.anyio
 @pytest.mark.parametrize("renew_lock", [True, False, None])
 async def test_only_renew_lock_when_specified(
@@ -0,0 +1,130 @@
+"""Tests for offloading large task payloads to blob storage."""
+
+from io import BytesIO
+
+import pytest
+from taskiq import AsyncTaskiqDecoratedTask, InMemoryBroker
+
+from app.core.claim_check import CLAIM_CHECK_LABEL, ClaimCheckMiddleware
+from app.persistence.blob.models import (
+    BlobContainer,
+    BlobStorageFile,
+    BlobStorageLocation,
+)
+
+
+class FakeBlobRepository:
+    """In-memory stand-in for the blob repository."""
+
+    def __init__(self) -> None:
+        """Start with no files."""
+        self.files: dict[str, bytes] = {}
+
+    async def upload_file_to_blob_storage(
+        self,
+        content: BytesIO,
+        path: str,
+        filename: str,
+        container: BlobContainer,
+        content_type: str | None = None,  # noqa: ARG002
+    ) -> BlobStorageFile:
+        """Store the file's content under its URI."""
+        file = BlobStorageFile(
+            location=BlobStorageLocation.MINIO,
+            container=container,
+            path=path,
+            filename=filename,
+        )
+        self.files[file.to_uri()] = content.getvalue()
+        return file
+
+    async def read_file(self, file: BlobStorageFile) -> bytes:
+        """Return the file's content."""
+        return self.files[file.to_uri()]
+
+    async def delete_file(self, file: BlobStorageFile) -> None:
+        """Forget the file."""
+        self.files.pop(file.to_uri(), None)
+
+
+@pytest.fixture
+def blob_repository() -> FakeBlobRepository:
+    """Return an empty fake blob repository."""
+    return FakeBlobRepository()
+
+
+def make_broker(
+    blob_repository: FakeBlobRepository, *, delete_after_execution: bool = True
+) -> tuple[InMemoryBroker, AsyncTaskiqDecoratedTask, list]:
+    """Return a broker offloading payloads over 100 bytes, and a recording task."""
+    broker = InMemoryBroker()
+    broker.add_middlewares(
+        ClaimCheckMiddleware(
+            threshold_bytes=100,
+            blob_repository=blob_repository,  # type: ignore[arg-type]
+            delete_after_execution=delete_after_execution,
+        )
+    )
+    received: list = []
+
+    @broker.task
+    async def record(*args: object, **kwargs: object) -> None:
+        received.append((args, kwargs))
+
+    return broker, record, received
+
+
+@pytest.mark.asyncio
+async def test_large_payload_is_offloaded_and_restored(
+    blob_repository: FakeBlobRepository,
+) -> None:
+    """A large payload travels through blob storage and is deleted once run."""
+    broker, record, received = make_broker(blob_repository)
+    sent: list = []
+
+    original_kick = broker.kick
+
+    async def capture_kick(message) -> None:  # noqa: ANN001
+        sent.append(broker.formatter.loads(message.message))
+        assert blob_repository.files
+        await original_kick(message)
+
+    broker.kick = capture_kick  # type: ignore[method-assign]
+    ids = [str(i) * 20 for i in range(10)]
+
+    task = await record.kiq(ids, source="test")
+    await task.wait_result(timeout=3)
+
+    assert sent[0].args == []
+    assert sent[0].kwargs == {}
+    assert sent[0].labels[CLAIM_CHECK_LABEL].endswith(f"/{task.task_id}.json")
+    assert received == [((ids,), {"source": "test"})]
+    assert blob_repository.files == {}
+
+
+@pytest.mark.asyncio
+async def test_small_payload_is_sent_inline(
+    blob_repository: FakeBlobRepository,
+) -> None:
+    """Payloads under the threshold don't touch blob storage."""
+    _, record, received = make_broker(blob_repository)
+
+    task = await record.kiq("small")
+    await task.wait_result(timeout=3)
+
+    assert received == [(("small",), {})]
+    assert blob_repository.files == {}
+
+
+@pytest.mark.asyncio
+async def test_payload_is_kept_when_the_broker_releases_it(
+    blob_repository: FakeBlobRepository,
+) -> None:
+    """Brokers releasing claim checks on acknowledgement keep the blob until then."""
+    _, record, received = make_broker(blob_repository, delete_after_execution=False)
+
+    task = await record.kiq("x" * 200)
+    await task.wait_result(timeout=3)
+
+    assert received == [(("x" * 200,), {})]
+    assert len(blob_repository.files) == 1
@@ -22,6 +22,7 @@ from app.domain.references.models.models import (
     ReferenceWithChangeset,
     RetrievalPolicyName,
     RobotAutomation,
+    Visibility,
 )
 from app.domain.references.models.projections import (
     ReferenceSearchFieldsProjection,
@@ -34,6 +35,9 @@ from app.domain.references.repository import (
 from app.domain.references.services.deduplication_service import (
     build_candidate_canonical_search_query,
 )
+from app.domain.references.services.robot_automation_matcher import (
+    RobotAutomationMatcher,
+)
 from app.utils.time_and_date import utc_now
 from tests.factories import to_indexable
 
@@ -574,6 +578,138 @@ async def test_robot_automation_percolation(
             raise ValueError(msg)
 
 
+async def test_robot_automation_matcher_agrees_with_percolation(
+    es_robot_automation_repository: RobotAutomationESRepository,
+    reference: Reference,
+    abstract_robot_automation: RobotAutomation,
+    in_out_robot_automation: RobotAutomation,
+    taxonomy_robot_automation: RobotAutomation,
+):
+    """Automations matched in process match exactly what Elasticsearch percolates."""
+    automations = [
+        abstract_robot_automation,
+        in_out_robot_automation,
+        taxonomy_robot_automation,
+        *(
+            RobotAutomation(robot_id=uuid7(), query=query)
+            for query in [
+                {"term": {"reference.duplicate_determination": "canonical"}},
+                {"term": {"changeset.visibility": {"value": "restricted"}}},
+                {"exists": {"field": "changeset.duplicate_determination"}},
+                {
+                    "nested": {
+                        "path": "changeset.identifiers",
+                        "query": {
+                            "terms": {
+                                "changeset.identifiers.identifier_type": [
+                                    "pm_id",
+                                    "eric",
+                                ]
+                            }
+                        },
+                    }
+                },
+                {
+                    "bool": {
+                        "should": [
+                            abstract_robot_automation.query,
+                            in_out_robot_automation.query,
+                        ],
+                        "minimum_should_match": 1,
+                    }
+                },
+                {
+                    "bool": {
+                        "filter": {"match_all": {}},
+                        "must_not": taxonomy_robot_automation.query,
+                    }
+                },
+                {
+                    "nested": {
+                        "path": "reference.enhancements",
+                        "query": {
+                            "nested": {
+                                "path": "reference.enhancements.content.annotations",
+                                "query": {
+                                    "bool": {
+                                        "must": [
+                                            {
+                                                "term": {
+                                                    "reference.enhancements.content.annotations.scheme": "openalex:topic"
+                                                }
+                                            },
+                                            {
+                                                "term": {
+                                                    "reference.enhancements.content.annotations.value": "true"
+                                                }
+                                            },
+                                        ]
+                                    }
+                                },
+                            }
+                        },
+                    }
+                },
+            ]
+        ),
+    ]
+    for automation in automations:
+        await es_robot_automation_repository.add(automation)
+    await es_robot_automation_repository._client.indices.refresh(  # noqa: SLF001
+        index=es_robot_automation_repository._persistence_cls.Index.name,  # noqa: SLF001
+    )
+
+    abstract_enhancement = Enhancement(
+        reference_id=reference.id,
+        content={
+            "enhancement_type": "abstract",
+            "abstract": "This is a test abstract.",
+            "process": "closed_api",
+        },
+        source="test_source",
+        visibility="public",
+    )
+    restricted = reference.model_copy(
+        update={
+            "id": uuid7(),
+            "visibility": Visibility.RESTRICTED,
+            "duplicate_decision": None,
+        }
+    )
+    no_identifiers = reference.model_copy(update={"id": uuid7(), "identifiers": []})
+    percolatables = [
+        ReferenceWithChangeset(**reference.model_dump(), changeset=reference),
+        ReferenceWithChangeset(**restricted.model_dump(), changeset=restricted),
+        ReferenceWithChangeset(**no_identifiers.model_dump(), changeset=no_identifiers),
+        ReferenceWithChangeset(
+            **reference.model_dump(),
+            changeset=Reference(id=reference.id, enhancements=[abstract_enhancement]),
+        ),
+        ReferenceWithChangeset(
+            id=uuid7(),
+            changeset=Reference(
+                enhancements=[
+                    abstract_enhancement,
+                    *(reference.enhancements or [])[:1],
+                ]
+            ),
+        ),
+    ]
+
+    matcher = RobotAutomationMatcher(automations)
+    # Only then is every automation above compared.
+    assert matcher.unsupported_automation_ids == []
+
+    for automation in automations:
+        local = RobotAutomationMatcher([automation]).match(percolatables)
+        percolated = await es_robot_automation_repository.percolate(
+            percolatables, automation_ids=[automation.id]
+        )
+        assert [result.reference_ids for result in local] == [
+            result.reference_ids for result in percolated
+        ], automation.query
+
+
 async def test_canonical_candidate_search(
     es_reference_repository: ReferenceESRepository, reference: Reference
 ):
@@ -818,3 +954,35 @@ async def test_soft_year_decay_returns_and_reranks_year_drifted_candidate(
     assert soft.total.value == no_filter.total.value
     # Proximity bonus: the near-year duplicate outranks the far-year one.
     assert soft_ranks[near_target.id] < soft_ranks[far_target.id]
+
+
+async def test_robot_automation_sync(
+    es_robot_automation_repository: RobotAutomationESRepository,
+    abstract_robot_automation: RobotAutomation,
+    in_out_robot_automation: RobotAutomation,
+):
+    """Only automations revised since they were last indexed are written."""
+    repository = es_robot_automation_repository
+
+    async def sync(*automations: RobotAutomation) -> int:
+        await repository._client.indices.refresh(  # noqa: SLF001
+            index=repository._persistence_cls.Index.name,  # noqa: SLF001
+        )
+        return await repository.sync(automations, await repository.get_revisions())
+
+    assert await sync(abstract_robot_automation, in_out_robot_automation) == 2
+    assert await sync(abstract_robot_automation, in_out_robot_automation) == 0
+
+    revised = abstract_robot_automation.model_copy(
+        update={"query": in_out_robot_automation.query, "revision": 2}
+    )
+    assert await sync(revised, in_out_robot_automation) == 1
+    assert (await repository.get(revised.id)).query == revised.query
+
+    # Writing an older revision leaves the newer one in place.
+    await repository.add(abstract_robot_automation)
+    assert await sync(abstract_robot_automation) == 0
+    indexed = await repository.get(revised.id)
+    assert (indexed.query, indexed.revision) == (revised.query, 2)
+    assert await repository.sync([abstract_robot_automation], {}) == 0
+    assert (await repository.get(revised.id)).revision == 2
@@ -470,3 +470,66 @@ async def test_duplicate_decision_provenance_accepts_pre_migration_inserts(
 
     assert provenance == ("unclassified", "unclassified")
     await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("migration_id", ["4d2b8e17a9c3"])
+async def test_pending_enhancement_retry_depth_backfill(db_at_migration: str) -> None:
+    """Backfilling retry_depth numbers each retry chain from its original."""
+    db_url = db_at_migration
+    engine = create_async_engine(db_url, future=True)
+    now = datetime.datetime.now(datetime.UTC)
+    ref_id, rob_id = str(uuid7()), str(uuid7())
+    # A chain original <- retry <- retry, and an unrelated original.
+    chain = [str(uuid7()) for _ in range(3)]
+    unrelated = str(uuid7())
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            sa.text(
+                "INSERT INTO reference (id, visibility, created_at, updated_at) "
+                "VALUES (:id, 'public', :now, :now)"
+            ),
+            {"id": ref_id, "now": now},
+        )
+        await conn.execute(
+            sa.text(
+                "INSERT INTO robot (id, name, description, owner, client_secret, "
+                "created_at, updated_at) "
+                "VALUES (:id, 'R', 'd', 'o@e.com', 's', :now, :now)"
+            ),
+            {"id": rob_id, "now": now},
+        )
+        for pe_id, retry_of in [
+            (chain[0], None),
+            (chain[1], chain[0]),
+            (chain[2], chain[1]),
+            (unrelated, None),
+        ]:
+            await conn.execute(
+                sa.text(
+                    "INSERT INTO pending_enhancement (id, reference_id, robot_id, "
+                    "source, status, expires_at, retry_of, created_at, updated_at) "
+                    "VALUES (:id, :ref, :rob, 'test_source', 'expired', :now, "
+                    ":retry_of, :now, :now)"
+                ),
+                {
+                    "id": pe_id,
+                    "ref": ref_id,
+                    "rob": rob_id,
+                    "retry_of": retry_of,
+                    "now": now,
+                },
+            )
+
+    await run_migration(db_url, "8f3a5c1e7b92")
+
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            sa.text("SELECT id, retry_depth FROM pending_enhancement")
+        )
+        depths = {str(row.id): row.retry_depth for row in result}
+
+    assert depths == {chain[0]: 0, chain[1]: 1, chain[2]: 2, unrelated: 0}
+
+    await engine.dispose()
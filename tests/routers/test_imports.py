@@ -443,9 +443,7 @@ async def test_deduplicate_references(
     for more). If that changes, this test will need seeding.
     """
     mock_queue = AsyncMock()
-    monkeypatch.setattr(
-        "app.domain.references.service.queue_task_with_trace", mock_queue
-    )
+    monkeypatch.setattr("app.domain.references.service.TaskBatch.queue", mock_queue)
 
     ref_ids = {uuid7(), uuid7(), uuid7()}
     response = await client.post(
@@ -454,7 +452,7 @@ async def test_deduplicate_references(
     )
     assert response.status_code == status.HTTP_202_ACCEPTED
 
-    # Assert queue_task_with_trace was called 3 times with correct IDs
+    # Assert a task was queued 3 times with correct IDs
     assert mock_queue.call_count == 3
     called_ids = {
         call.kwargs["reference_duplicate_decision_id"]
@@ -1,6 +1,7 @@
 """Defines tests for the references router."""
 
 import datetime
+import json
 from collections.abc import AsyncGenerator
 from unittest.mock import ANY, AsyncMock, patch
 from uuid import UUID, uuid7
@@ -39,6 +40,7 @@ from app.domain.references.models.models import (
     EnhancementRequestSearchStatus,
     EnhancementRequestStatus,
     PendingEnhancementStatus,
+    SearchExport,
     Visibility,
 )
 from app.domain.references.models.sql import Enhancement as SQLEnhancement
@@ -63,7 +65,11 @@ from app.domain.references.service import ReferenceService
 from app.domain.references.services.export_service import SearchExportService
 from app.domain.references.services.search_service import SearchService
 from app.domain.robots.models.sql import Robot as SQLRobot
-from app.persistence.blob.models import BlobSignedUrlType, BlobStorageFile
+from app.persistence.blob.models import (
+    BlobSignedUrlType,
+    BlobStorageFile,
+    ContentEncoding,
+)
 from app.persistence.blob.repository import BlobRepository
 from app.persistence.es.persistence import (
     ESFacetBucket,
@@ -687,9 +693,10 @@ async def test_request_robot_enhancement_batch(
         ReferenceService, "claim_and_create_robot_enhancement_batch", mock_claim
     )
 
-    response = await client.post(
-        f"/v1/robot-enhancement-batches/?robot_id={robot.id}&limit=10&lease=PT5M"
-    )
+    with patch.object(references, "queue_task_with_trace", AsyncMock()) as enqueue:
+        response = await client.post(
+            f"/v1/robot-enhancement-batches/?robot_id={robot.id}&limit=10&lease=PT5M"
+        )
 
     assert response.status_code == status.HTTP_200_OK
     mock_claim.assert_awaited_once_with(
@@ -698,9 +705,39 @@ async def test_request_robot_enhancement_batch(
         lease_duration=datetime.timedelta(minutes=5),
         blob_repository=ANY,
         access_control_service=ANY,
+        compression=None,
+    )
+    # The robot's next batch is prepared while it works on this one.
+    enqueue.assert_awaited_once_with(
+        references.prepare_robot_enhancement_batch,
+        robot_id=robot.id,
+        limit=10,
+        compression=None,
+        otel_enabled=ANY,
     )
 
 
+async def test_request_robot_enhancement_batch_compressed(
+    session: AsyncSession,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a robot requesting a compressed reference data file."""
+    robot = await add_robot(session)
+
+    mock_claim = AsyncMock(return_value=None)
+    monkeypatch.setattr(
+        ReferenceService, "claim_and_create_robot_enhancement_batch", mock_claim
+    )
+
+    response = await client.post(
+        f"/v1/robot-enhancement-batches/?robot_id={robot.id}&compression=zstd"
+    )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert mock_claim.call_args.kwargs["compression"] == ContentEncoding.ZSTD
+
+
 async def test_request_robot_enhancement_batch_no_pending_enhancements(
     session: AsyncSession,
     client: AsyncClient,
@@ -722,6 +759,30 @@ async def test_request_robot_enhancement_batch_no_pending_enhancements(
     mock_claim.assert_awaited_once()
 
 
+async def test_request_robot_enhancement_batch_waits(
+    session: AsyncSession,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a long poll, capped at the configured maximum wait."""
+    robot = await add_robot(session)
+
+    mock_wait = AsyncMock(return_value=None)
+    monkeypatch.setattr(ReferenceService, "wait_for_robot_enhancement_batch", mock_wait)
+    monkeypatch.setattr(
+        get_settings(),
+        "max_robot_enhancement_batch_wait",
+        datetime.timedelta(seconds=5),
+    )
+
+    response = await client.post(
+        f"/v1/robot-enhancement-batches/?robot_id={robot.id}&wait=PT10M"
+    )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert mock_wait.call_args.kwargs["wait"] == datetime.timedelta(seconds=5)
+
+
 async def test_request_robot_enhancement_batch_limit_exceeded(
     session: AsyncSession,
     client: AsyncClient,
@@ -910,6 +971,74 @@ async def test_lookup_references_invalid_identifier_format(
     assert "Must be UUID" in response.text
 
 
+async def test_bulk_lookup_references_streams_results_in_order(
+    session: AsyncSession,
+    client: AsyncClient,
+) -> None:
+    """Test bulk lookup streams one line per identifier, marking unmatched ones."""
+    reference = await add_reference(session)
+    doi_identifier = "10.1000/abc123"
+    reference_doi = SQLReference(visibility=Visibility.RESTRICTED)
+    session.add(reference_doi)
+    await session.commit()
+    session.add(
+        ExternalIdentifier(
+            reference_id=reference_doi.id,
+            identifier=doi_identifier,
+            identifier_type="doi",
+        )
+    )
+    await session.commit()
+
+    response = await client.post(
+        "/v1/references/lookup/",
+        json={
+            "identifiers": [
+                f"doi:{doi_identifier}",
+                "doi:10.1000/missing",
+                str(reference.id),
+            ]
+        },
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    results = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [result["identifier"]["identifier"] for result in results] == [
+        doi_identifier,
+        "10.1000/missing",
+        str(reference.id),
+    ]
+    assert results[0]["reference"]["id"] == str(reference_doi.id)
+    assert results[1]["reference"] is None
+    assert results[2]["reference"]["id"] == str(reference.id)
+
+
+async def test_bulk_lookup_references_too_many_identifiers(
+    client: AsyncClient,
+) -> None:
+    """Test bulk lookup rejects requests over the identifier limit."""
+    too_many_identifiers = [
+        str(uuid7()) for _ in range(get_settings().max_bulk_lookup_identifiers + 1)
+    ]
+    response = await client.post(
+        "/v1/references/lookup/",
+        json={"identifiers": too_many_identifiers},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_bulk_lookup_references_invalid_identifier_format(
+    client: AsyncClient,
+) -> None:
+    """Test bulk lookup rejects an invalid identifier before streaming."""
+    response = await client.post(
+        "/v1/references/lookup/",
+        json={"identifiers": ["not-a-uuid"]},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Must be UUID" in response.text
+
+
 async def test_get_robot_enhancement_batch_nonexistent_batch(client: AsyncClient):
     """Test getting a robot enhancement batch that does not exist."""
     response = await client.get(f"/v1/robot-enhancement-batces/{uuid7()}/")
@@ -1001,7 +1130,9 @@ async def test_search_references_preserves_es_order(
     mock_get_dedup = AsyncMock(return_value=[ref_c, ref_a, ref_b])
     monkeypatch.setattr(ReferenceService, "get_deduplicated_references", mock_get_dedup)
 
-    response = await client.get("/v1/references/search/", params={"q": "test"})
+    response = await client.get(
+        "/v1/references/search/", params={"q": "test", "hydrate": True}
+    )
 
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -1011,6 +1142,40 @@ async def test_search_references_preserves_es_order(
     assert returned_ids == [str(ref_a.id), str(ref_b.id), str(ref_c.id)]
 
 
+async def test_search_references_serves_payloads_by_default(
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Without ``hydrate``, hits are rendered from their payloads in ES order."""
+    references = [ReferenceFactory.build() for _ in range(2)]
+    mock_search_result = ESSearchResult(
+        hits=[ESHit(id=reference.id) for reference in references],
+        total=ESSearchTotal(value=2, relation="eq"),
+        page=1,
+    )
+    mock_search = AsyncMock(return_value=mock_search_result)
+    monkeypatch.setattr(ReferenceService, "search_references", mock_search)
+    payloads = [
+        json.dumps({"id": str(reference.id), "visibility": "public"})
+        for reference in references
+    ]
+    mock_render = AsyncMock(return_value=payloads)
+    monkeypatch.setattr(ReferenceService, "render_search_hits", mock_render)
+    mock_get_dedup = AsyncMock()
+    monkeypatch.setattr(ReferenceService, "get_deduplicated_references", mock_get_dedup)
+
+    response = await client.get("/v1/references/search/", params={"q": "test"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "total": {"count": 2, "is_lower_bound": False},
+        "page": {"count": 2, "number": 1},
+        "references": [json.loads(payload) for payload in payloads],
+    }
+    assert mock_search.call_args.kwargs["with_payload"] is True
+    mock_get_dedup.assert_not_awaited()
+
+
 async def test_search_reference_ids_returns_ids_only(
     client: AsyncClient,
     monkeypatch: pytest.MonkeyPatch,
@@ -1147,11 +1312,13 @@ async def test_request_search_export_happy_path(
         filename="fake.jsonl",
     )
 
-    monkeypatch.setattr(
-        SearchExportService,
-        "_collect_search_export_ids",
-        AsyncMock(return_value=([fake_reference_id], False)),
-    )
+    async def _pages(
+        self: SearchExportService,  # noqa: ARG001
+        export: SearchExport,  # noqa: ARG001
+    ) -> AsyncGenerator[list[UUID], None]:
+        yield [fake_reference_id]
+
+    monkeypatch.setattr(SearchExportService, "_reference_id_pages", _pages)
     monkeypatch.setattr(
         SearchExportService,
         "stream_export_file",
@@ -1182,6 +1349,47 @@ async def test_request_search_export_happy_path(
     assert status_body["error"] is None
 
 
+async def test_request_search_export_compressed(
+    session: AsyncSession,  # noqa: ARG001
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    mock_blob_repository: None,  # noqa: ARG001
+) -> None:
+    """Test that the requested compression is recorded and applied to the file."""
+
+    async def _pages(
+        self: SearchExportService,  # noqa: ARG001
+        export: SearchExport,  # noqa: ARG001
+    ) -> AsyncGenerator[list[UUID], None]:
+        yield [uuid7()]
+
+    stream_export_file = AsyncMock(
+        return_value=(
+            BlobStorageFile(
+                location="minio",
+                container="destiny-repository",
+                path="search_exports",
+                filename="fake.jsonl.gz",
+            ),
+            1,
+        )
+    )
+    monkeypatch.setattr(SearchExportService, "_reference_id_pages", _pages)
+    monkeypatch.setattr(SearchExportService, "stream_export_file", stream_export_file)
+
+    response = await client.post(
+        "/v1/references/search/exports/",
+        params={"q": "climate", "compression": "gzip"},
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["compression"] == "gzip"
+
+    assert isinstance(broker, InMemoryBroker)
+    await broker.wait_all()
+
+    assert stream_export_file.call_args.kwargs["compression"] == ContentEncoding.GZIP
+
+
 async def test_request_search_export_marks_failed_on_error(
     session: AsyncSession,  # noqa: ARG001
     client: AsyncClient,
@@ -1189,11 +1397,16 @@ async def test_request_search_export_marks_failed_on_error(
     mock_blob_repository: None,  # noqa: ARG001
 ) -> None:
     """Test that a failure during the export job is reflected via the status API."""
-    monkeypatch.setattr(
-        SearchExportService,
-        "_collect_search_export_ids",
-        AsyncMock(side_effect=RuntimeError("kaboom")),
-    )
+
+    async def _pages(
+        self: SearchExportService,  # noqa: ARG001
+        export: SearchExport,  # noqa: ARG001
+    ) -> AsyncGenerator[list[UUID], None]:
+        msg = "kaboom"
+        raise RuntimeError(msg)
+        yield
+
+    monkeypatch.setattr(SearchExportService, "_reference_id_pages", _pages)
 
     response = await client.post(
         "/v1/references/search/exports/", params={"q": "climate"}
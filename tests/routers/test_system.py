@@ -125,3 +125,32 @@ async def test_healthcheck_es_failure(app: FastAPI, client: AsyncClient) -> None
 
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert response.json() == {"detail": "Elasticsearch connection failed."}
+
+
+async def test_search_cache_stats(client: AsyncClient) -> None:
+    """The search cache stats endpoint reports this process's counters."""
+    response = await client.get("/system/caches/search/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.json()) == {
+        "enabled",
+        "entries",
+        "hits",
+        "misses",
+        "hit_rate",
+        "saved_seconds",
+    }
+
+
+async def test_search_coalescing_stats(client: AsyncClient) -> None:
+    """The search coalescing stats endpoint reports this process's counters."""
+    response = await client.get("/system/coalescers/search/")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.json()) == {
+        "enabled",
+        "in_flight",
+        "executed",
+        "coalesced",
+        "fresh",
+    }
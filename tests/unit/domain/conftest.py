@@ -65,14 +65,18 @@ class FakeRepository:
         return self.repository[pk]
 
     async def get_by_pks(
-        self, pks: list[UUID], preload: list[str] | None = None
+        self,
+        pks: list[UUID],
+        preload: list[str] | None = None,
+        *,
+        fail_on_missing: bool = True,
     ) -> list[DummyDomainSQLModel]:
         # Currently just ignoring preloading in favour of creating
         # models with the data needed.
         if not pks:
             return []
         records = [self.repository[pk] for pk in pks if pk in self.repository]
-        if len(records) != len(pks):
+        if fail_on_missing and len(records) != len(pks):
             missing_pks = set(pks) - set(self.repository.keys())
             raise SQLNotFoundError(
                 detail=f"{missing_pks} not in repository",
@@ -250,6 +254,57 @@ class FakeRepository:
             inserted += 1
         return inserted
 
+    async def add_bulk_ignore_duplicates(
+        self, records: list[DummyDomainSQLModel]
+    ) -> set[UUID]:
+        """Insert records, skipping those that collide on (reference, content hash).
+
+        Emulates the unique index on ``(reference_id, content_hash)``.
+        """
+
+        def key(record: DummyDomainSQLModel) -> tuple[object, object]:
+            return (
+                getattr(record, "reference_id", None),
+                getattr(record, "content_hash", None),
+            )
+
+        existing = {key(r) for r in self.repository.values()}
+        inserted = set()
+        for record in records:
+            if key(record) in existing:
+                continue
+            self.repository[record.id] = record
+            existing.add(key(record))
+            inserted.add(record.id)
+        return inserted
+
+    async def get_unhashed_by_reference_ids(
+        self, reference_ids: list[UUID]
+    ) -> list[DummyDomainSQLModel]:
+        """Fake records always carry their content hash."""
+        del reference_ids
+        return []
+
+    async def find_prepared_for_robot(
+        self, robot_id: UUID
+    ) -> DummyDomainSQLModel | None:
+        """Return the robot's first unclaimed batch."""
+        return next(
+            (
+                record
+                for record in self.repository.values()
+                if record.robot_id == robot_id and record.claimed_at is None
+            ),
+            None,
+        )
+
+    async def count_prepared_for_robot(self, robot_id: UUID) -> int:
+        """Count the robot's unclaimed batches."""
+        return sum(
+            record.robot_id == robot_id and record.claimed_at is None
+            for record in self.repository.values()
+        )
+
     async def claim_search_request(self, enhancement_request_id: UUID) -> bool:
         """Move a PENDING/SEARCHING request to SEARCHING; False if terminal."""
         record = self.repository.get(enhancement_request_id)
@@ -1,5 +1,6 @@
 """Unit tests for the ImportService class."""
 
+import gzip
 from unittest.mock import AsyncMock
 from uuid import uuid7
 
@@ -196,12 +197,12 @@ class TestDistributeImportBatch:
             self.status_code = 200
             self.is_success = True
 
-        async def aiter_lines(self):
+        async def aiter_bytes(self):
             for i, line in enumerate(self._lines):
                 if self._fail_after is not None and i >= self._fail_after:
                     msg = "peer closed connection"
                     raise httpx.RemoteProtocolError(msg)
-                yield line
+                yield line if isinstance(line, bytes) else f"{line}\n".encode()
 
         async def __aenter__(self):
             return self
@@ -265,15 +266,12 @@ class TestDistributeImportBatch:
             created_results.append(result)
             return result
 
-        async def fake_queue_task_with_trace(*args, otel_enabled):  # noqa: ARG001
+        async def fake_queue(_tasks, *args, on_too_large):  # noqa: ARG001
             queued_tasks.append(args)
 
         service = ImportService(ImportAntiCorruptionService(), fake_uow())
         monkeypatch.setattr(service, "register_result", fake_register_result)
-        monkeypatch.setattr(
-            "app.domain.imports.service.queue_task_with_trace",
-            fake_queue_task_with_trace,
-        )
+        monkeypatch.setattr("app.domain.imports.service.TaskBatch.queue", fake_queue)
 
         await service.distribute_import_batch(import_batch)
 
@@ -281,6 +279,36 @@ class TestDistributeImportBatch:
         assert len(queued_tasks) == len(lines)
         assert client.streamed_url == str(import_batch.storage_url)
 
+    @pytest.mark.asyncio
+    async def test_decompresses_gzip_batch_file(self, monkeypatch, fake_uow):
+        """A gzip-compressed batch file is decompressed as it streams."""
+        import_batch = ImportBatch(
+            id=uuid7(),
+            storage_url="https://fake-storage-url.com/batch.jsonl.gz",
+            status=ImportBatchStatus.CREATED,
+            import_record_id=uuid7(),
+        )
+        compressed = gzip.compress(b"ref1\nref2\nref3\n")
+        # Split mid-stream, so decompression must carry state across chunks.
+        client = self.FakeClient([compressed[:1], compressed[1:15], compressed[15:]])
+        monkeypatch.setattr(httpx, "AsyncClient", lambda **_kwargs: client)
+
+        queued_lines = []
+
+        async def fake_register_result(result):
+            return result
+
+        async def fake_queue(_tasks, *args, on_too_large):  # noqa: ARG001
+            queued_lines.append(args[2])
+
+        service = ImportService(ImportAntiCorruptionService(), fake_uow())
+        monkeypatch.setattr(service, "register_result", fake_register_result)
+        monkeypatch.setattr("app.domain.imports.service.TaskBatch.queue", fake_queue)
+
+        await service.distribute_import_batch(import_batch)
+
+        assert queued_lines == ["ref1", "ref2", "ref3"]
+
     @pytest.mark.asyncio
     async def test_retries_on_connection_error(self, monkeypatch, fake_uow):
         """Test that it retries and resumes from last line on connection error."""
@@ -302,15 +330,12 @@ class TestDistributeImportBatch:
         async def fake_register_result(result):
             return result
 
-        async def fake_queue_task_with_trace(*args, otel_enabled):  # noqa: ARG001
+        async def fake_queue(_tasks, *args, on_too_large):  # noqa: ARG001
             queued_lines.append(args[2])
 
         service = ImportService(ImportAntiCorruptionService(), fake_uow())
         monkeypatch.setattr(service, "register_result", fake_register_result)
-        monkeypatch.setattr(
-            "app.domain.imports.service.queue_task_with_trace",
-            fake_queue_task_with_trace,
-        )
+        monkeypatch.setattr("app.domain.imports.service.TaskBatch.queue", fake_queue)
 
         await service.distribute_import_batch(import_batch)
 
@@ -348,9 +373,12 @@ class TestDistributeImportBatch:
             update_result_calls.append({"import_result_id": import_result_id, **kwargs})
             return import_result_id
 
-        async def fake_queue_task_with_trace(*args, otel_enabled):  # noqa: ARG001
+        async def fake_queue(_tasks, *args, on_too_large):
             if args[2] == real_big_reference:
-                raise MessageTooLargeError(detail="message size limit exceeded.")
+                await on_too_large(
+                    MessageTooLargeError(detail="message size limit exceeded.")
+                )
+                return
             queued_lines.append(args[2])
 
         service = ImportService(
@@ -358,10 +386,7 @@ class TestDistributeImportBatch:
         )
         monkeypatch.setattr(service, "register_result", fake_register_result)
         monkeypatch.setattr(service, "_update_import_result", fake_update_result)
-        monkeypatch.setattr(
-            "app.domain.imports.service.queue_task_with_trace",
-            fake_queue_task_with_trace,
-        )
+        monkeypatch.setattr("app.domain.imports.service.TaskBatch.queue", fake_queue)
 
         await service.distribute_import_batch(import_batch)
 
@@ -394,7 +419,7 @@ async def test_distribute_import_batch_rejects_redirect(monkeypatch, fake_uow):
         def __init__(self):
             self.request = httpx.Request("GET", str(import_batch.storage_url))
 
-        async def aiter_lines(self):
+        async def aiter_bytes(self):
             return
             yield
 
@@ -232,6 +232,27 @@ def test_reference_create_result_error_str_multiple():
     assert result.error_str == "first error\n\nsecond error"
 
 
+def test_enhancement_content_hash_identifies_content():
+    """The content hash matches hash_data's notion of an exact duplicate."""
+    enhancement = EnhancementFactory.build(content=FullTextEnhancementFactory.build())
+    duplicate = enhancement.model_copy(
+        update={
+            "id": uuid7(),
+            "created_at": datetime.now(tz=UTC),
+            # Full texts are identified without their storage location.
+            "content": enhancement.content.model_copy(
+                update={"blob": BlobStorageFileFactory.build()}
+            ),
+        }
+    )
+    different = enhancement.model_copy(update={"source": "another source"})
+
+    assert len(enhancement.content_hash) == 64
+    assert duplicate.content_hash == enhancement.content_hash
+    assert duplicate.hash_data() == enhancement.hash_data()
+    assert different.content_hash != enhancement.content_hash
+
+
 def test_full_text_enhancement_discriminator_resolves_to_domain():
     """
     A FULL_TEXT payload resolves to the domain FullTextEnhancement.
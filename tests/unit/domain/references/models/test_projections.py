@@ -14,12 +14,14 @@ from app.domain.references.models.models import (
     Enhancement,
     EnhancementType,
     ExternalIdentifierType,
+    LinkedDataProjection,
     LinkedExternalIdentifier,
     Reference,
     Visibility,
 )
 from app.domain.references.models.projections import (
     DeduplicatedReferenceProjection,
+    ReferenceParquetProjection,
     ReferenceRisProjection,
     ReferenceSearchFieldsProjection,
 )
@@ -1180,3 +1182,114 @@ class TestReferenceRisProjection:
         assert result.authors == []
         assert result.doi is None
         assert result.urls == []
+
+
+class TestReferenceParquetProjection:
+    """Test the ReferenceParquetProjection class."""
+
+    def test_flattens_reference(self):
+        """Identifiers, bibliography, annotations and linked data become columns."""
+        ref_id = uuid7()
+        now = datetime.now(tz=UTC)
+        bibliographic = EnhancementFactory.build(
+            reference_id=ref_id,
+            created_at=now,
+            content=BibliographicMetadataEnhancementFactory.build(
+                title="A Title",
+                authorship=[
+                    AuthorshipFactory.build(
+                        display_name="Jit Mark",
+                        position=destiny_sdk.enhancements.AuthorPosition.FIRST,
+                    ),
+                ],
+                publication_date=datetime(2020, 4, 2, tzinfo=UTC),
+                publication_venue=PublicationVenueFactory.build(
+                    display_name="The Journal", issn=["1234-5678"]
+                ),
+            ),
+        )
+        annotation = EnhancementFactory.build(
+            reference_id=ref_id,
+            created_at=now,
+            content=AnnotationEnhancementFactory.build(
+                annotations=[
+                    BooleanAnnotationFactory.build(
+                        scheme="inclusion:destiny",
+                        label="include",
+                        value=True,
+                        score=0.9,
+                    ),
+                    BooleanAnnotationFactory.build(
+                        scheme="taxonomy:science",
+                        label="physics",
+                        value=False,
+                        score=None,
+                    ),
+                    ScoreAnnotationFactory.build(
+                        scheme="taxonomy:science", label="biology", score=0.25
+                    ),
+                ]
+            ),
+        )
+        reference = ReferenceFactory.build(
+            id=ref_id,
+            visibility=Visibility.PUBLIC,
+            enhancements=[bibliographic, annotation],
+            identifiers=[
+                LinkedExternalIdentifierFactory.build(
+                    identifier=DOIIdentifierFactory.build(identifier="10.1000/abc")
+                ),
+                LinkedExternalIdentifierFactory.build(
+                    identifier=PubMedIdentifierFactory.build(identifier=12345678)
+                ),
+            ],
+        )
+
+        result = ReferenceParquetProjection.get_from_reference(
+            reference,
+            LinkedDataProjection(
+                concepts={"https://example.org/b", "https://example.org/a"},
+                countries={"GB"},
+            ),
+        )
+
+        assert result.id == str(ref_id)
+        assert result.visibility == Visibility.PUBLIC
+        assert result.doi == "10.1000/abc"
+        assert result.pm_id == "12345678"
+        assert result.open_alex is None
+        assert result.title == "A Title"
+        assert result.authors == ["Jit Mark"]
+        assert result.publication_year == 2020
+        assert result.venue == "The Journal"
+        assert result.issns == ["1234-5678"]
+        assert result.annotations == ["inclusion:destiny/include"]
+        assert result.evaluated_schemes == ["inclusion:destiny", "taxonomy:science"]
+        assert result.destiny_inclusion_score == 0.9
+        assert result.annotation_scores == {
+            "inclusion:destiny/include": 0.9,
+            "taxonomy:science/biology": 0.25,
+        }
+        assert result.linked_data_concepts == [
+            "https://example.org/a",
+            "https://example.org/b",
+        ]
+        assert result.linked_data_countries == ["GB"]
+        assert result.linked_data_labels == []
+
+    def test_empty_reference(self):
+        """A reference with no enhancements or linked data projects empty columns."""
+        reference = Reference(
+            id=uuid7(),
+            visibility=Visibility.PUBLIC,
+            enhancements=[],
+            identifiers=[],
+        )
+
+        result = ReferenceParquetProjection.get_from_reference(reference)
+
+        assert result.id == str(reference.id)
+        assert result.title is None
+        assert result.doi is None
+        assert result.annotation_scores == {}
+        assert result.linked_data_concepts == []
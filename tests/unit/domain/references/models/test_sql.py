@@ -99,6 +99,7 @@ class DummyDomainEnhancement:
         self.robot_version = robot_version
         self.derived_from = derived_from
         self.content = content
+        self.content_hash = f"hash-of-{id}"
         # For preload test on Enhancement.to_domain
         self.reference = None
 
@@ -203,6 +204,7 @@ async def test_enhancement_from_and_to_domain():
     # Verify that content was dumped to JSON string correctly
     dumped = dummy_content.model_dump(mode="json")
     assert sql_enh.content == dumped
+    assert sql_enh.content_hash == dummy_enh.content_hash
 
     # For preload test, assign a dummy SQL Reference to the relationship
     dummy_sql_ref = Reference(id=ref_id, visibility=Visibility.HIDDEN)
@@ -1,6 +1,7 @@
 """Tests for ReferenceAntiCorruptionService."""
 
 import datetime
+import json
 from unittest.mock import AsyncMock
 from uuid import uuid7
 
@@ -17,16 +18,24 @@ from app.domain.references.models.models import (
     EnhancementType,
     FullTextEnhancement,
     PendingEnhancementStatus,
+    RobotEnhancementBatch,
     SearchQuery,
 )
+from app.domain.references.services.access_control_service import RedactedReference
 from app.domain.references.services.anti_corruption_service import (
     ReferenceAntiCorruptionService,
 )
-from app.persistence.blob.models import BlobSignedUrlType
+from app.persistence.blob.models import (
+    BlobSignedUrlType,
+    BlobStorageFile,
+    BlobStorageLocation,
+)
+from app.persistence.es.persistence import ESHit, ESSearchResult, ESSearchTotal
 from tests.factories import (
     AbstractContentEnhancementFactory,
     EnhancementFactory,
     FullTextEnhancementFactory,
+    ReferenceFactory,
 )
 
 
@@ -398,3 +407,128 @@ class TestSearchEnhancementRequest:
         assert read.n_matched == 100
         assert read.n_enhancements_requested == 4
         assert read.enhancement_status_counts == {"completed": 3, "failed": 1}
+
+
+class TestRobotEnhancementBatchSigning:
+    """Tests for signing the several files of a robot enhancement batch."""
+
+    @staticmethod
+    def _file(filename: str) -> BlobStorageFile:
+        return BlobStorageFile(
+            location=BlobStorageLocation.MINIO,
+            container="c",
+            path="robot_enhancement_batches",
+            filename=filename,
+        )
+
+    async def test_signs_all_files_in_one_bulk_call(self):
+        batch = RobotEnhancementBatch(
+            robot_id=uuid7(),
+            reference_data_file=self._file("refs.jsonl"),
+            result_file=self._file("result.jsonl"),
+        )
+        sign_url = AsyncMock()
+        sign_urls = AsyncMock(
+            return_value=[
+                HttpUrl("https://example.com/refs"),
+                HttpUrl("https://example.com/result"),
+            ]
+        )
+        service = ReferenceAntiCorruptionService(sign_url=sign_url, sign_urls=sign_urls)
+
+        read = await service.robot_enhancement_batch_to_sdk(batch)
+
+        sign_urls.assert_awaited_once_with(
+            [
+                (batch.reference_data_file, BlobSignedUrlType.DOWNLOAD),
+                (batch.result_file, BlobSignedUrlType.UPLOAD),
+            ]
+        )
+        sign_url.assert_not_awaited()
+        assert read.reference_data_url == HttpUrl("https://example.com/refs")
+        assert read.result_storage_url == HttpUrl("https://example.com/result")
+        assert read.validation_result_url is None
+
+    async def test_falls_back_to_signing_one_by_one(self):
+        batch = RobotEnhancementBatch(
+            robot_id=uuid7(),
+            reference_data_file=self._file("refs.jsonl"),
+            result_file=self._file("result.jsonl"),
+        )
+        sign_url = AsyncMock(
+            side_effect=[
+                HttpUrl("https://example.com/refs"),
+                HttpUrl("https://example.com/result"),
+            ]
+        )
+        service = ReferenceAntiCorruptionService(sign_url=sign_url)
+
+        robot_batch = await service.robot_enhancement_batch_to_sdk_robot(batch)
+
+        assert [call.args for call in sign_url.await_args_list] == [
+            (batch.reference_data_file, BlobSignedUrlType.DOWNLOAD),
+            (batch.result_file, BlobSignedUrlType.UPLOAD),
+        ]
+        assert robot_batch.reference_storage_url == HttpUrl("https://example.com/refs")
+        assert robot_batch.result_storage_url == HttpUrl("https://example.com/result")
+
+
+class TestReferenceSearchResultToSdkJson:
+    """Search results rendered from pre-rendered payloads match hydrated ones."""
+
+    @pytest.fixture
+    def service(self) -> ReferenceAntiCorruptionService:
+        return ReferenceAntiCorruptionService(sign_url=AsyncMock())
+
+    async def test_matches_hydrated_rendering(
+        self, service: ReferenceAntiCorruptionService
+    ) -> None:
+        references = [
+            ReferenceFactory.build(
+                enhancements=[
+                    EnhancementFactory.build(
+                        content=AbstractContentEnhancementFactory.build()
+                    )
+                ]
+            )
+            for _ in range(3)
+        ]
+        search_result = ESSearchResult(
+            hits=[ESHit(id=reference.id, score=1.0) for reference in references],
+            total=ESSearchTotal(value=10_000, relation="gte"),
+            page=2,
+        )
+
+        rendered = service.reference_search_result_to_sdk_json(
+            search_result,
+            [
+                await service.reference_to_sdk_payload(reference)
+                for reference in references
+            ],
+        )
+        hydrated = await service.two_stage_reference_search_result_to_sdk(
+            search_result,
+            [RedactedReference(reference) for reference in references],
+        )
+
+        assert json.loads(rendered) == hydrated.model_dump(mode="json", by_alias=True)
+
+    async def test_payload_omits_full_text_without_signing(self) -> None:
+        sign_url = AsyncMock()
+        service = ReferenceAntiCorruptionService(sign_url=sign_url)
+        abstract = EnhancementFactory.build(
+            content=AbstractContentEnhancementFactory.build()
+        )
+        reference = ReferenceFactory.build(
+            enhancements=[
+                abstract,
+                EnhancementFactory.build(content=FullTextEnhancementFactory.build()),
+            ]
+        )
+
+        payload = json.loads(await service.reference_to_sdk_payload(reference))
+
+        sign_url.assert_not_awaited()
+        assert [enhancement["id"] for enhancement in payload["enhancements"]] == [
+            str(abstract.id)
+        ]
@@ -7,6 +7,7 @@ import pytest
 
 from app.core.entitlements import Entitlement
 from app.core.exceptions import (
+    BlobIntegrityError,
     BlobSizeExceededError,
     FullTextDownloadError,
     FullTextIngestionError,
@@ -34,6 +35,7 @@ from app.domain.references.services.enhancement_service import (
     ProcessedResults,
 )
 from app.persistence.blob.models import (
+    BlobContainer,
     BlobCopyResult,
     BlobStorageFile,
     BlobStorageLocation,
@@ -134,6 +136,15 @@ def create_processed_results():
     )
 
 
+def batched(add_enhancement):
+    """Helper to adapt a per-enhancement fake to the chunked ``add_enhancements``."""
+
+    async def add_enhancements(enhancements):
+        return [await add_enhancement(enhancement) for enhancement in enhancements]
+
+    return add_enhancements
+
+
 @pytest.mark.asyncio
 async def test_build_robot_request_happy_path(fake_uow, fake_repository):
     references = [Reference(id=uuid7()) for _ in range(2)]
@@ -237,7 +248,7 @@ async def test_process_robot_enhancement_batch_result_happy_path():
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -292,7 +303,7 @@ async def test_process_robot_enhancement_batch_result_handles_both_entry_types()
             mock_blob_repo,
             result_file,
             [pending_enhancement_1, pending_enhancement_2],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -345,7 +356,7 @@ async def test_process_robot_enhancement_batch_result_missing_reference_id():
             mock_blob_repo,
             result_file,
             [pending_enhancement_1, pending_enhancement_2],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -401,7 +412,7 @@ async def test_process_robot_enhancement_batch_result_surplus_reference_id(fake_
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -449,7 +460,7 @@ async def test_process_robot_enhancement_batch_result_parse_failure(fake_uow):
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -516,7 +527,7 @@ async def test_process_robot_enhancement_batch_result_raw_enhancement(fake_uow):
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -566,7 +577,7 @@ async def test_process_robot_enhancement_batch_result_entitled_raw_enhancement(
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(
                 entitlements=frozenset({Entitlement.RAW_ENHANCEMENT_WRITER})
@@ -619,7 +630,7 @@ async def test_process_robot_enhancement_batch_result_add_enhancement_fails(fake
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -661,7 +672,7 @@ async def test_process_robot_enhancement_batch_result_empty_result_file():
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -714,7 +725,7 @@ async def test_process_robot_enhancement_batch_result_duplicate_reference_ids():
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -731,6 +742,141 @@ async def test_process_robot_enhancement_batch_result_duplicate_reference_ids():
     assert len(results.failed_pending_enhancement_ids) == 0
 
 
+@pytest.mark.asyncio
+async def test_process_robot_enhancement_batch_result_commits_in_chunks(monkeypatch):
+    """
+    Test that result lines are added and committed a chunk at a time, with each
+    chunk committed before its validation messages are yielded.
+    """
+    monkeypatch.setattr(
+        "app.domain.references.services.enhancement_service.settings.robot_result_chunk_size",
+        2,
+    )
+    reference_ids = [uuid7() for _ in range(3)]
+    missing_reference_id = uuid7()
+    pending_enhancements = [
+        create_pending_enhancement(reference_id)
+        for reference_id in [*reference_ids, missing_reference_id]
+    ]
+    result_file = create_result_file()
+
+    mock_blob_repo = MagicMock()
+    mock_blob_repo.stream_file_from_blob_storage = create_fake_stream(
+        [
+            make_enhancement_result_entry(reference_ids[0], as_error=False),
+            make_enhancement_result_entry(reference_ids[1], as_error=True),
+            make_enhancement_result_entry(reference_ids[2], as_error=False),
+        ]
+    )
+    service = EnhancementService(
+        ReferenceAntiCorruptionService(mock_blob_repo), None, MagicMock()
+    )
+
+    added_chunks = []
+
+    async def add_enhancements(enhancements):
+        added_chunks.append([e.reference_id for e in enhancements])
+        return [(PendingEnhancementStatus.COMPLETED, "Enhancement added.")] * len(
+            enhancements
+        )
+
+    committed = []
+    yielded = []
+
+    async def commit_chunk(chunk_results):
+        committed.append((len(yielded), chunk_results))
+
+    results = create_processed_results()
+    async for msg in service.process_robot_enhancement_batch_result(
+        pending_enhancements[0].robot_enhancement_batch_id,
+        mock_blob_repo,
+        result_file,
+        pending_enhancements,
+        add_enhancements,
+        results,
+        ReferenceAccessControlService(),
+        commit_chunk,
+    ):
+        yielded.append(RobotResultValidationEntry.model_validate_json(msg))  # noqa: PERF401
+
+    assert added_chunks == [[reference_ids[0]], [reference_ids[2]]]
+    assert [entry.reference_id for entry in yielded] == [
+        *reference_ids,
+        missing_reference_id,
+    ]
+    # Each chunk is committed before its messages are yielded, missing references last
+    assert [yielded_before for yielded_before, _ in committed] == [0, 2, 4]
+    first, second, missing = (chunk_results for _, chunk_results in committed)
+    assert first.successful_pending_enhancement_ids == {pending_enhancements[0].id}
+    assert first.failed_pending_enhancement_ids == {pending_enhancements[1].id}
+    assert second.successful_pending_enhancement_ids == {pending_enhancements[2].id}
+    assert not second.failed_pending_enhancement_ids
+    assert missing.failed_pending_enhancement_ids == {pending_enhancements[3].id}
+    assert results.successful_pending_enhancement_ids == {
+        pending_enhancements[0].id,
+        pending_enhancements[2].id,
+    }
+    assert results.failed_pending_enhancement_ids == {
+        pending_enhancements[1].id,
+        pending_enhancements[3].id,
+    }
+    assert len(results.imported_enhancement_ids) == 2
+
+
+@pytest.mark.asyncio
+async def test_process_robot_enhancement_batch_result_duplicate_across_chunks(
+    monkeypatch,
+):
+    """
+    Test that a duplicate line in a later chunk doesn't recategorize the pending
+    enhancement settled by an earlier chunk.
+    """
+    monkeypatch.setattr(
+        "app.domain.references.services.enhancement_service.settings.robot_result_chunk_size",
+        1,
+    )
+    reference_id = uuid7()
+    pending_enhancement = create_pending_enhancement(reference_id)
+    result_file = create_result_file()
+
+    mock_blob_repo = MagicMock()
+    mock_blob_repo.stream_file_from_blob_storage = create_fake_stream(
+        [
+            make_enhancement_result_entry(reference_id, as_error=False),
+            make_enhancement_result_entry(reference_id, as_error=False),
+        ]
+    )
+    service = EnhancementService(
+        ReferenceAntiCorruptionService(mock_blob_repo), None, MagicMock()
+    )
+
+    async def fake_add_enhancement(_):
+        return (PendingEnhancementStatus.COMPLETED, "Enhancement added.")
+
+    commit_chunk = AsyncMock()
+    results = create_processed_results()
+    messages = [
+        RobotResultValidationEntry.model_validate_json(msg)
+        async for msg in service.process_robot_enhancement_batch_result(
+            pending_enhancement.robot_enhancement_batch_id,
+            mock_blob_repo,
+            result_file,
+            [pending_enhancement],
+            batched(fake_add_enhancement),
+            results,
+            ReferenceAccessControlService(),
+            commit_chunk,
+        )
+    ]
+
+    assert messages[1].error == "Duplicate reference ID in enhancement result."
+    assert commit_chunk.await_count == 2
+    second_chunk_results = commit_chunk.await_args_list[1].args[0]
+    assert not second_chunk_results.failed_pending_enhancement_ids
+    assert results.successful_pending_enhancement_ids == {pending_enhancement.id}
+    assert not results.failed_pending_enhancement_ids
+
+
 @pytest.mark.asyncio
 async def test_process_robot_enhancement_batch_result_multiple_pending_enhancements(
     fake_uow,
@@ -777,7 +923,7 @@ async def test_process_robot_enhancement_batch_result_multiple_pending_enhanceme
             mock_blob_repo,
             result_file,
             [pending_enhancement_1, pending_enhancement_2, pending_enhancement_3],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -831,7 +977,7 @@ async def test_process_robot_enhancement_batch_result_discarded_enhancements():
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -889,6 +1035,7 @@ async def test_process_robot_result_stores_full_text_before_persistence():
         [make_full_text_result_entry(reference_id)]
     )
     mock_blob_repo.destination = Mock(return_value=owned_destination)
+    mock_blob_repo.get_file_size = AsyncMock(return_value=None)
     mock_blob_repo.copy = AsyncMock(return_value=copy_result)
 
     service = EnhancementService(
@@ -913,7 +1060,7 @@ async def test_process_robot_result_stores_full_text_before_persistence():
             mock_blob_repo,
             result_file,
             [pending_enhancement],
-            fake_add_enhancement,
+            batched(fake_add_enhancement),
             results,
             ReferenceAccessControlService(),
         )
@@ -939,6 +1086,7 @@ async def test_process_robot_result_full_text_download_failure_skips_add():
         [make_full_text_result_entry(reference_id)]
     )
     mock_blob_repo.destination = MagicMock()
+    mock_blob_repo.get_file_size = AsyncMock(return_value=None)
     mock_blob_repo.copy = AsyncMock(
         side_effect=RemoteBlobStorageError("publisher unreachable")
     )
@@ -1026,6 +1174,7 @@ async def test_store_full_text_sha256_mismatch_raises_integrity_error():
     destination = _owned_destination()
     blob_repo = MagicMock()
     blob_repo.destination = Mock(return_value=destination)
+    blob_repo.get_file_size = AsyncMock(return_value=None)
     blob_repo.copy = AsyncMock(
         return_value=BlobCopyResult(
             source=BlobStorageFile.from_uri("https://example.com/papers/foo.pdf"),
@@ -1069,6 +1218,104 @@ async def test_store_full_text_oversize_raises_size_exceeded():
         await _service_with_blob_repo(blob_repo).store_full_text(ft, blob_repo)
 
 
+@pytest.mark.asyncio
+async def test_store_full_text_copy_integrity_failure_raises_integrity_error():
+    """A copy aborted on a checksum mismatch raises FullTextIntegrityError."""
+    blob_repo = MagicMock()
+    blob_repo.destination = Mock(return_value=_owned_destination())
+    blob_repo.get_file_size = AsyncMock(return_value=None)
+    blob_repo.copy = AsyncMock(side_effect=BlobIntegrityError("wrong content"))
+
+    ft = _ft_enhancement(remote=True, sha256_declared=True, byte_size_declared=False)
+
+    with pytest.raises(FullTextIntegrityError, match="sha256 mismatch"):
+        await _service_with_blob_repo(blob_repo).store_full_text(ft, blob_repo)
+    assert blob_repo.copy.await_args.kwargs["expected_sha256"] == "a" * 64
+
+
+@pytest.mark.asyncio
+async def test_store_full_text_declared_sha256_is_content_addressed():
+    """Content with a declared sha256 is stored under its digest."""
+    blob_repo = MagicMock()
+    blob_repo.destination = Mock(return_value=_owned_destination())
+    blob_repo.get_file_size = AsyncMock(return_value=12345)
+    blob_repo.copy = AsyncMock()
+
+    ft = _ft_enhancement(remote=True, sha256_declared=True, byte_size_declared=False)
+
+    await _service_with_blob_repo(blob_repo).store_full_text(ft, blob_repo)
+
+    blob_repo.destination.assert_called_once_with(
+        path="sha256/aa",
+        filename=f"{'a' * 64}.pdf",
+        container=BlobContainer.FULL_TEXTS,
+    )
+    # Already stored: the copy is skipped and the existing blob reused.
+    blob_repo.copy.assert_not_awaited()
+    assert ft.content.blob == blob_repo.destination.return_value
+    assert ft.content.byte_size == 12345
+
+
+@pytest.mark.asyncio
+async def test_store_full_text_already_stored_size_mismatch_raises():
+    """A stored blob disagreeing with the declared byte_size is rejected."""
+    blob_repo = MagicMock()
+    blob_repo.destination = Mock(return_value=_owned_destination())
+    blob_repo.get_file_size = AsyncMock(return_value=1)
+    blob_repo.copy = AsyncMock()
+
+    ft = _ft_enhancement(remote=True, sha256_declared=True, byte_size_declared=True)
+
+    with pytest.raises(FullTextIntegrityError, match="byte_size mismatch"):
+        await _service_with_blob_repo(blob_repo).store_full_text(ft, blob_repo)
+    blob_repo.copy.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("byte_size_declared", "deferred"), [(True, True), (False, False)]
+)
+async def test_store_full_text_defer(monkeypatch, byte_size_declared, deferred):
+    """Only content with a known digest and size has its copy queued."""
+    destination = _owned_destination()
+    blob_repo = MagicMock()
+    blob_repo.destination = Mock(return_value=destination)
+    blob_repo.get_file_size = AsyncMock(return_value=None)
+    blob_repo.copy = AsyncMock(
+        return_value=BlobCopyResult(
+            source=BlobStorageFile.from_uri("https://example.com/papers/foo.pdf"),
+            destination=destination,
+            byte_size=12345,
+            sha256_checksum="a" * 64,
+        )
+    )
+    queue_task = AsyncMock()
+    monkeypatch.setattr(
+        "app.domain.references.services.enhancement_service.queue_task_with_trace",
+        queue_task,
+    )
+
+    ft = _ft_enhancement(
+        remote=True, sha256_declared=True, byte_size_declared=byte_size_declared
+    )
+
+    await _service_with_blob_repo(blob_repo).store_full_text(ft, blob_repo, defer=True)
+
+    assert ft.content.blob == destination
+    if deferred:
+        blob_repo.copy.assert_not_awaited()
+        queue_task.assert_awaited_once()
+        assert queue_task.await_args.args[0] == (
+            "app.domain.references.tasks",
+            "store_deferred_full_text",
+        )
+        assert queue_task.await_args.kwargs["enhancement_id"] == ft.id
+        assert queue_task.await_args.kwargs["destination_uri"] == (destination.to_uri())
+    else:
+        blob_repo.copy.assert_awaited_once()
+        queue_task.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_store_full_text_non_remote_raises_ingestion_error():
     """Non-remote blob is an upstream invariant violation: raises and skips copy."""
@@ -1093,3 +1340,39 @@ async def test_store_full_text_non_ft_raises_value_error():
     with pytest.raises(ValueError, match="non-full-text"):
         await _service_with_blob_repo(blob_repo).store_full_text(non_ft, blob_repo)
     blob_repo.copy.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_mark_robot_enhancement_batch_failed_keeps_settled_statuses(
+    fake_uow, fake_repository
+):
+    """Pending enhancements settled by an imported chunk keep their status."""
+    batch_id = uuid7()
+    processing, completed = (
+        PendingEnhancement(
+            id=uuid7(),
+            reference_id=uuid7(),
+            robot_id=uuid7(),
+            enhancement_request_id=uuid7(),
+            robot_enhancement_batch_id=batch_id,
+            status=status,
+        )
+        for status in (
+            PendingEnhancementStatus.PROCESSING,
+            PendingEnhancementStatus.COMPLETED,
+        )
+    )
+    uow = fake_uow(
+        pending_enhancements=fake_repository([processing, completed]),
+        robot_enhancement_batches=fake_repository(),
+    )
+    uow.robot_enhancement_batches.update_by_pk = AsyncMock()
+    service = EnhancementService(ReferenceAntiCorruptionService(None), uow, MagicMock())
+
+    await service.mark_robot_enhancement_batch_failed(batch_id, "boom")
+
+    assert processing.status == PendingEnhancementStatus.FAILED
+    assert completed.status == PendingEnhancementStatus.COMPLETED
+    uow.robot_enhancement_batches.update_by_pk.assert_awaited_once_with(
+        pk=batch_id, error="boom"
+    )
@@ -1,14 +1,19 @@
 """Unit tests for the search-export lifecycle service and reference streaming."""
 
+import asyncio
+import gzip
+import io
 import json
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, PropertyMock
 from uuid import uuid7
 
+import pyarrow.parquet as pq
 import pytest
 
-from app.core.exceptions import SQLNotFoundError
+from app.core.exceptions import ExportSupersededError, SQLNotFoundError
 from app.domain.references.models.models import (
     ExportFormat,
+    ExportStatus,
     ReferenceExport,
     SearchExport,
     SearchQuery,
@@ -23,6 +28,8 @@ from app.domain.references.services.export_service import (
     SearchExportService,
 )
 from app.domain.references.services.search_service import SearchService
+from app.persistence.blob.models import ContentEncoding
+from app.persistence.blob.repository import BlobRepository
 from app.persistence.es.persistence import ESHit, ESSearchResult, ESSearchTotal
 from tests.factories import (
     BibliographicMetadataEnhancementFactory,
@@ -32,7 +39,7 @@ from tests.factories import (
 )
 
 # Undecorated body — tests drive the implementation with mocks instead of a UoW.
-_collect_export_ids = SearchExportService._collect_search_export_ids.__wrapped__  # type: ignore[attr-defined]  # noqa: SLF001
+_search_export_pages = SearchExportService._reference_id_pages.__wrapped__  # type: ignore[attr-defined]  # noqa: SLF001
 
 
 def _make_service() -> SearchExportService:
@@ -42,46 +49,31 @@ def _make_service() -> SearchExportService:
     return service
 
 
-@pytest.mark.parametrize(
-    ("total", "n_hits", "expected_truncated"),
-    [
-        pytest.param(
-            ESSearchTotal(value=10_000, relation="gte"), 10_000, True, id="gte_at_cap"
-        ),
-        pytest.param(
-            ESSearchTotal(value=25_000, relation="eq"), 10_000, True, id="eq_above_cap"
-        ),
-        pytest.param(ESSearchTotal(value=0, relation="eq"), 0, False, id="empty"),
-        pytest.param(
-            ESSearchTotal(value=10_000, relation="eq"), 10_000, False, id="eq_at_cap"
-        ),
-    ],
-)
-async def test_collect_search_export_ids_truncation(
+async def test_search_export_pages_scan_every_match(
     monkeypatch: pytest.MonkeyPatch,
-    total: ESSearchTotal,
-    n_hits: int,
-    expected_truncated: bool,  # noqa: FBT001
 ) -> None:
-    """`truncated` is set iff the match set exceeded the result-window cap."""
-    monkeypatch.setattr(
-        SearchService,
-        "search",
-        AsyncMock(
-            return_value=ESSearchResult(
-                hits=[ESHit(id=uuid7(), score=1.0) for _ in range(n_hits)],
-                total=total,
-                page=1,
+    """Search exports page through the whole scan, with no result-window cap."""
+    pages = [[uuid7() for _ in range(3)], [uuid7() for _ in range(2)]]
+    scan_calls = []
+
+    async def _scan(self, query, **kwargs):  # noqa: ARG001
+        scan_calls.append((query, kwargs))
+        for number, page in enumerate(pages, start=1):
+            yield ESSearchResult(
+                hits=[ESHit(id=reference_id) for reference_id in page],
+                total=ESSearchTotal(value=25_000, relation="eq"),
+                page=number,
             )
-        ),
-    )
 
-    ids, truncated = await _collect_export_ids(
-        _make_service(), SearchExport(query=SearchQuery(query_string="climate"))
-    )
+    monkeypatch.setattr(SearchService, "scan", _scan)
+    export = SearchExport(query=SearchQuery(query_string="climate"), sort=["year"])
 
-    assert len(ids) == n_hits
-    assert truncated is expected_truncated
+    streamed = [page async for page in _search_export_pages(_make_service(), export)]
+
+    assert streamed == pages
+    [(query, kwargs)] = scan_calls
+    assert query == export.query
+    assert kwargs["sort"] == ["year"]
 
 
 def _reference_with_title(title: str):
@@ -116,7 +108,8 @@ async def _capture_uploaded_body(reference_service, export_format, reference):
     captured = {}
 
     async def _capture(*, content, filename, **_):
-        captured["content"] = content
+        # Like the real repositories, consume the stream within the upload call.
+        captured["body"] = b"".join([chunk async for chunk in content.stream()])
         captured["filename"] = filename
         return BlobStorageFileFactory.build()
 
@@ -132,8 +125,7 @@ async def _capture_uploaded_body(reference_service, export_format, reference):
         filename=f"{reference.id}.{export_format.extension}",
         chunk_size=100,
     )
-    body = b"".join([chunk async for chunk in captured["content"].stream()]).decode()
-    return body, count, captured["filename"]
+    return captured["body"].decode(), count, captured["filename"]
 
 
 async def test_stream_references_to_blob_serializes_ris() -> None:
@@ -171,10 +163,157 @@ async def test_stream_references_to_blob_serializes_jsonl() -> None:
     anti_corruption.reference_to_sdk.assert_awaited_once_with(reference)
 
 
+async def test_stream_reference_pages_to_blob_counts_and_skips_empty_pages() -> None:
+    """Pages are serialized as they arrive; empty pages are skipped, not fetched."""
+    first, second = _reference_with_title("First"), _reference_with_title("Second")
+    reference_service = ReferenceService.__new__(ReferenceService)
+    reference_service._get_deduplicated_references = AsyncMock(  # noqa: SLF001
+        side_effect=[[first], [second]]
+    )
+    captured = {}
+
+    async def _capture(*, content, **_):
+        captured["body"] = b"".join([chunk async for chunk in content.stream()])
+        return BlobStorageFileFactory.build()
+
+    blob_repository = MagicMock()
+    blob_repository.upload_file_to_blob_storage = AsyncMock(side_effect=_capture)
+
+    async def _pages():
+        yield [first.id]
+        yield []
+        yield [second.id]
+
+    _, count = await reference_service.stream_reference_pages_to_blob(
+        reference_id_pages=_pages(),
+        export_format=ExportFormat.RIS,
+        access_control_service=_identity_access_control(),
+        blob_repository=blob_repository,
+        path="search_exports",
+        filename="export.ris",
+    )
+
+    assert count == 2
+    assert captured["body"].decode().count("ER  - ") == 2
+    assert reference_service._get_deduplicated_references.await_count == 2  # noqa: SLF001
+
+
+async def test_stream_reference_pages_to_blob_writes_parquet_row_groups() -> None:
+    """A Parquet export streams a row group per page, then the footer."""
+    first, second = _reference_with_title("First"), _reference_with_title("Second")
+    reference_service = ReferenceService.__new__(ReferenceService)
+    reference_service._get_deduplicated_references = AsyncMock(  # noqa: SLF001
+        side_effect=[[first], [second]]
+    )
+    captured = {}
+
+    async def _capture(*, content, **_):
+        captured["chunks"] = [chunk async for chunk in content.stream()]
+        return BlobStorageFileFactory.build()
+
+    blob_repository = MagicMock()
+    blob_repository.upload_file_to_blob_storage = AsyncMock(side_effect=_capture)
+
+    _, count = await reference_service.stream_reference_pages_to_blob(
+        reference_id_pages=_pages_of([first.id], [second.id]),
+        export_format=ExportFormat.PARQUET,
+        access_control_service=_identity_access_control(),
+        blob_repository=blob_repository,
+        path="search_exports",
+        filename="export.parquet",
+    )
+
+    assert count == 2
+    # A chunk per row group, plus the footer.
+    assert len(captured["chunks"]) == 3
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(captured["chunks"])))
+    assert parquet_file.metadata.num_row_groups == 2
+    assert parquet_file.read(columns=["id", "title"]).to_pylist() == [
+        {"id": str(first.id), "title": "First"},
+        {"id": str(second.id), "title": "Second"},
+    ]
+
+
+async def test_stream_reference_pages_to_blob_compresses_file() -> None:
+    """A compressed export streams the serialized references through the codec."""
+    reference = _reference_with_title("A Title")
+    reference_service = ReferenceService.__new__(ReferenceService)
+    reference_service._get_deduplicated_references = AsyncMock(  # noqa: SLF001
+        return_value=[reference]
+    )
+    captured = {}
+
+    async def _capture(*, content, **_):
+        captured["compression"] = content.compression
+        captured["body"] = b"".join([chunk async for chunk in content.stream()])
+        return BlobStorageFileFactory.build()
+
+    blob_repository = MagicMock()
+    blob_repository.upload_file_to_blob_storage = AsyncMock(side_effect=_capture)
+
+    await reference_service.stream_reference_pages_to_blob(
+        reference_id_pages=_pages_of([reference.id]),
+        export_format=ExportFormat.RIS,
+        access_control_service=_identity_access_control(),
+        blob_repository=blob_repository,
+        path="search_exports",
+        filename="export.ris",
+        compression=ContentEncoding.GZIP,
+    )
+
+    assert captured["compression"] == ContentEncoding.GZIP
+    assert "TI  - A Title" in gzip.decompress(captured["body"]).decode()
+
+
+async def test_stream_reference_pages_to_blob_stops_pipeline_when_upload_fails() -> (
+    None
+):
+    """A failed upload stops the pipeline rather than leaving hydration running."""
+    references = [_reference_with_title(f"Title {i}") for i in range(20)]
+    reference_service = ReferenceService.__new__(ReferenceService)
+    reference_service._get_deduplicated_references = AsyncMock(  # noqa: SLF001
+        side_effect=[[reference] for reference in references]
+    )
+
+    async def _pages():
+        for reference in references:
+            yield [reference.id]
+
+    async def _fail_after_first_chunk(*, content, **_):
+        async for _ in content.stream():
+            msg = "upload failed"
+            raise RuntimeError(msg)
+
+    blob_repository = MagicMock()
+    blob_repository.upload_file_to_blob_storage = AsyncMock(
+        side_effect=_fail_after_first_chunk
+    )
+
+    with pytest.raises(RuntimeError, match="upload failed"):
+        await reference_service.stream_reference_pages_to_blob(
+            reference_id_pages=_pages(),
+            export_format=ExportFormat.RIS,
+            access_control_service=_identity_access_control(),
+            blob_repository=blob_repository,
+            path="search_exports",
+            filename="export.ris",
+        )
+
+    hydrated = reference_service._get_deduplicated_references.await_count  # noqa: SLF001
+    await asyncio.sleep(0.01)
+    assert reference_service._get_deduplicated_references.await_count == hydrated  # noqa: SLF001
+    assert hydrated < len(references)
+
+
+async def _pages_of(*pages):
+    for page in pages:
+        yield page
+
+
 async def test_stream_export_file_uses_format_extension_and_path() -> None:
     """The primitive names the file by export id + format, and uses the blob path."""
     reference_service = MagicMock()
-    reference_service.stream_references_to_blob = AsyncMock(
+    reference_service.stream_reference_pages_to_blob = AsyncMock(
         return_value=(BlobStorageFileFactory.build(), 2)
     )
     service = ReferenceExportService.__new__(ReferenceExportService)
@@ -185,12 +324,12 @@ async def test_stream_export_file_uses_format_extension_and_path() -> None:
     await ReferenceExportService.stream_export_file.__wrapped__(  # type: ignore[attr-defined]
         service,
         export_id=export_id,
-        reference_ids=[uuid7(), uuid7()],
+        reference_id_pages=_pages_of([uuid7(), uuid7()]),
         export_format=ExportFormat.RIS,
         blob_repository=MagicMock(),
     )
 
-    kwargs = reference_service.stream_references_to_blob.await_args.kwargs
+    kwargs = reference_service.stream_reference_pages_to_blob.await_args.kwargs
     assert kwargs["filename"] == f"{export_id}.ris"
     assert kwargs["export_format"] == ExportFormat.RIS
     assert kwargs["path"] == "reference_exports"
@@ -240,22 +379,30 @@ def test_reference_export_sql_round_trip() -> None:
     """from_domain → to_domain preserves the reference ids and shared export fields."""
     reference_ids = [uuid7(), uuid7(), uuid7()]
     domain = ReferenceExport(
-        reference_ids=reference_ids, export_format=ExportFormat.RIS
+        reference_ids=reference_ids,
+        export_format=ExportFormat.RIS,
+        compression=ContentEncoding.GZIP,
     )
 
     restored = SQLReferenceExport.from_domain(domain).to_domain()
 
     assert restored.reference_ids == reference_ids
     assert restored.export_format == ExportFormat.RIS
+    assert restored.compression == ContentEncoding.GZIP
     assert restored.status == domain.status
     assert restored.n_references is None
     assert restored.result_file is None
+    assert restored.attempt == 0
+    assert restored.committed_chunks == 0
+    assert restored.committed_references == 0
 
 
 async def test_run_reference_export_streams_stored_ids_without_search() -> None:
-    """run streams the stored reference ids directly."""
+    """run streams the stored reference ids of an unchunkable format directly."""
     reference_ids = [uuid7(), uuid7()]
-    export = ReferenceExport(reference_ids=reference_ids)
+    export = ReferenceExport(
+        reference_ids=reference_ids, export_format=ExportFormat.PARQUET
+    )
     blob = BlobStorageFileFactory.build()
 
     service = ReferenceExportService.__new__(ReferenceExportService)
@@ -269,11 +416,195 @@ async def test_run_reference_export_streams_stored_ids_without_search() -> None:
     stream_call = service.stream_export_file.await_args
     assert stream_call is not None
     stream_kwargs = stream_call.kwargs
-    assert stream_kwargs["reference_ids"] == reference_ids
+    assert [page async for page in stream_kwargs["reference_id_pages"]] == [
+        reference_ids
+    ]
     assert stream_kwargs["export_id"] == export.id
     service._complete.assert_awaited_once_with(export.id, blob, 2)  # noqa: SLF001
 
 
+def _checkpointed_service(
+    monkeypatch: pytest.MonkeyPatch,
+    page_size: int,
+) -> tuple[ReferenceExportService, MagicMock]:
+    """A ReferenceExportService serializing each page as its ids, one per line."""
+    service = ReferenceExportService.__new__(ReferenceExportService)
+
+    async def _serialize_chunk(export, reference_ids):  # noqa: ARG001
+        return "".join(f"{reference_id}\n" for reference_id in reference_ids).encode()
+
+    service._serialize_chunk = AsyncMock(side_effect=_serialize_chunk)  # type: ignore[method-assign] # noqa: SLF001
+    service._checkpoint = AsyncMock()  # type: ignore[method-assign] # noqa: SLF001
+    blob_repository = MagicMock()
+    blob_repository.destination = BlobRepository().destination
+    blob_repository.staged = {}
+
+    async def _stage_block(file, index, data):  # noqa: ARG001
+        blob_repository.staged[index] = data
+
+    blob_repository.stage_block = AsyncMock(side_effect=_stage_block)
+    blob_repository.commit_blocks = AsyncMock()
+    monkeypatch.setattr(
+        ReferenceExportService, "_page_size", PropertyMock(return_value=page_size)
+    )
+    return service, blob_repository
+
+
+async def test_stream_checkpointed_export_file_checkpoints_each_block(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Each page is staged as a block and checkpointed before the file commits."""
+    reference_ids = [uuid7() for _ in range(5)]
+    export = ReferenceExport(reference_ids=reference_ids, attempt=1)
+    service, blob_repository = _checkpointed_service(monkeypatch, page_size=2)
+
+    file, n_references = await service.stream_checkpointed_export_file(
+        export=export, blob_repository=blob_repository
+    )
+
+    assert n_references == 5
+    assert file.filename == f"{export.id}.jsonl"
+    assert file.path == "reference_exports"
+    assert sorted(blob_repository.staged) == [0, 1, 2]
+    body = b"".join(blob_repository.staged[index] for index in range(3))
+    assert body.decode().split() == [str(i) for i in reference_ids]
+    assert [call.args for call in service._checkpoint.await_args_list] == [  # noqa: SLF001
+        (export, 1, 2),
+        (export, 2, 4),
+        (export, 3, 5),
+    ]
+    blob_repository.commit_blocks.assert_awaited_once_with(file, 3)
+
+
+async def test_stream_checkpointed_export_file_resumes_from_checkpoint(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A resumed export skips committed references and appends the next blocks."""
+    reference_ids = [uuid7() for _ in range(5)]
+    export = ReferenceExport(
+        reference_ids=reference_ids,
+        status=ExportStatus.RUNNING,
+        attempt=2,
+        committed_chunks=1,
+        committed_references=2,
+    )
+    service, blob_repository = _checkpointed_service(monkeypatch, page_size=2)
+
+    file, n_references = await service.stream_checkpointed_export_file(
+        export=export, blob_repository=blob_repository
+    )
+
+    assert n_references == 5
+    assert sorted(blob_repository.staged) == [1, 2]
+    body = b"".join(blob_repository.staged[index] for index in (1, 2))
+    assert body.decode().split() == [str(i) for i in reference_ids[2:]]
+    blob_repository.commit_blocks.assert_awaited_once_with(file, 3)
+
+
+async def test_stream_checkpointed_export_file_compresses_each_block(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Blocks are whole gzip members, so the assembled file decompresses as one."""
+    reference_ids = [uuid7() for _ in range(3)]
+    export = ReferenceExport(
+        reference_ids=reference_ids, compression=ContentEncoding.GZIP
+    )
+    service, blob_repository = _checkpointed_service(monkeypatch, page_size=2)
+
+    file, _ = await service.stream_checkpointed_export_file(
+        export=export, blob_repository=blob_repository
+    )
+
+    assert file.filename == f"{export.id}.jsonl.gz"
+    body = gzip.decompress(blob_repository.staged[0] + blob_repository.staged[1])
+    assert body.decode().split() == [str(i) for i in reference_ids]
+
+
+async def test_stream_checkpointed_export_file_compresses_empty_export(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """An export matching nothing is still a valid, empty, compressed file."""
+    export = ReferenceExport(reference_ids=[], compression=ContentEncoding.GZIP)
+    service, blob_repository = _checkpointed_service(monkeypatch, page_size=2)
+
+    file, n_references = await service.stream_checkpointed_export_file(
+        export=export, blob_repository=blob_repository
+    )
+
+    assert n_references == 0
+    assert sorted(blob_repository.staged) == [0]
+    assert gzip.decompress(blob_repository.staged[0]) == b""
+    service._checkpoint.assert_not_awaited()  # noqa: SLF001
+    blob_repository.commit_blocks.assert_awaited_once_with(file, 1)
+
+
+async def test_run_abandons_superseded_export(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """An attempt fenced out by a later claim stops without failing the export."""
+    export = ReferenceExport(reference_ids=[uuid7(), uuid7()], attempt=1)
+    service, blob_repository = _checkpointed_service(monkeypatch, page_size=1)
+    service._claim = AsyncMock(return_value=export)  # type: ignore[method-assign] # noqa: SLF001
+    service._checkpoint.side_effect = ExportSupersededError("superseded")  # noqa: SLF001
+    service._complete = AsyncMock()  # type: ignore[method-assign] # noqa: SLF001
+    service._fail_attempt = AsyncMock()  # type: ignore[method-assign] # noqa: SLF001
+
+    await service.run(export.id, blob_repository)
+
+    blob_repository.commit_blocks.assert_not_awaited()
+    service._complete.assert_not_awaited()  # noqa: SLF001
+    service._fail_attempt.assert_not_awaited()  # noqa: SLF001
+
+
+@pytest.mark.parametrize(
+    ("service_cls", "status", "claimed"),
+    [
+        (ReferenceExportService, ExportStatus.PENDING, True),
+        (ReferenceExportService, ExportStatus.RUNNING, True),
+        (ReferenceExportService, ExportStatus.COMPLETED, False),
+        (SearchExportService, ExportStatus.PENDING, True),
+        (SearchExportService, ExportStatus.RUNNING, False),
+    ],
+)
+async def test_claim_reclaims_running_resumable_exports(
+    service_cls, status, claimed
+) -> None:
+    """Only resumable exports are reclaimed while running; claims bump the attempt."""
+    export = ReferenceExport(reference_ids=[uuid7()], status=status, attempt=3)
+    repository = MagicMock()
+    repository.get_by_pk = AsyncMock(return_value=export)
+    repository.bulk_update_by_filter = AsyncMock(return_value=1)
+    service = service_cls.__new__(service_cls)
+    service.sql_uow = MagicMock(reference_exports=repository, search_exports=repository)
+
+    result = await service_cls._claim.__wrapped__(service, export.id)  # type: ignore[attr-defined] # noqa: SLF001
+
+    if not claimed:
+        assert result is None
+        repository.bulk_update_by_filter.assert_not_awaited()
+        return
+    assert result.status == ExportStatus.RUNNING
+    assert result.attempt == 4
+    repository.bulk_update_by_filter.assert_awaited_once_with(
+        filter_conditions={"id": export.id, "status": status, "attempt": 3},
+        status=ExportStatus.RUNNING,
+        attempt=4,
+    )
+
+
+async def test_checkpoint_raises_when_superseded() -> None:
+    """A checkpoint matching no row means a later attempt owns the export."""
+    export = ReferenceExport(reference_ids=[uuid7()], attempt=1)
+    service = ReferenceExportService.__new__(ReferenceExportService)
+    service.sql_uow = MagicMock()
+    service.sql_uow.reference_exports.bulk_update_by_filter = AsyncMock(return_value=0)
+
+    with pytest.raises(ExportSupersededError):
+        await ReferenceExportService._checkpoint.__wrapped__(  # type: ignore[attr-defined] # noqa: SLF001
+            service, export, 2, 10
+        )
+
+
 async def test_stream_references_to_blob_jsonl_flattens_duplicates(
     fake_repository, fake_uow
 ):
@@ -0,0 +1,280 @@
+"""Unit tests for in-process robot automation matching."""
+
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import uuid7
+
+import pytest
+
+from app.domain.references.models.es import RobotAutomationPercolationDocument
+from app.domain.references.models.models import (
+    Enhancement,
+    Reference,
+    ReferenceWithChangeset,
+    RobotAutomation,
+)
+from app.domain.references.services.robot_automation_matcher import (
+    RobotAutomationMatcher,
+    RobotAutomationMatcherCache,
+    compile_automation_query,
+)
+
+CHANGESET_ABSTRACT = {
+    "nested": {
+        "path": "changeset.enhancements",
+        "query": {
+            "term": {"changeset.enhancements.content.enhancement_type": "abstract"}
+        },
+    }
+}
+CHANGESET_DOI = {
+    "nested": {
+        "path": "changeset.identifiers",
+        "query": {"term": {"changeset.identifiers.identifier_type": "doi"}},
+    }
+}
+CHANGESET_IN_DOMAIN = {
+    "nested": {
+        "path": "changeset.enhancements.content.annotations",
+        "query": {
+            "bool": {
+                "must": [
+                    {
+                        "term": {
+                            "changeset.enhancements.content.annotations.label": (
+                                "in_destiny_domain"
+                            )
+                        }
+                    },
+                    {
+                        "term": {
+                            "changeset.enhancements.content.annotations.value": True
+                        }
+                    },
+                ]
+            }
+        },
+    }
+}
+
+
+def abstract_enhancement(reference_id) -> Enhancement:
+    return Enhancement(
+        reference_id=reference_id,
+        source="test",
+        visibility="public",
+        content={
+            "enhancement_type": "abstract",
+            "abstract": "An abstract.",
+            "process": "closed_api",
+        },
+    )
+
+
+def annotation_enhancement(reference_id, *, value: bool) -> Enhancement:
+    return Enhancement(
+        reference_id=reference_id,
+        source="test",
+        visibility="public",
+        content={
+            "enhancement_type": "annotation",
+            "annotations": [
+                {
+                    "annotation_type": "boolean",
+                    "scheme": "inclusion:destiny",
+                    "label": "in_destiny_domain",
+                    "value": value,
+                }
+            ],
+        },
+    )
+
+
+def percolatable(
+    changeset_enhancements: list[Enhancement] | None = None,
+    *,
+    doi: bool = False,
+) -> ReferenceWithChangeset:
+    reference_id = uuid7()
+    identifiers = (
+        [
+            {
+                "reference_id": reference_id,
+                "identifier": {
+                    "identifier_type": "doi",
+                    "identifier": "10.1234/abc",
+                },
+            }
+        ]
+        if doi
+        else []
+    )
+    changeset = Reference(
+        id=reference_id,
+        visibility="public",
+        identifiers=identifiers,
+        enhancements=changeset_enhancements or [],
+    )
+    return ReferenceWithChangeset(**changeset.model_dump(), changeset=changeset)
+
+
+def matches(query: dict[str, Any], document: ReferenceWithChangeset) -> bool:
+    predicate = compile_automation_query(query)
+    assert predicate is not None
+    return predicate(
+        RobotAutomationPercolationDocument.percolatable_document_from_domain(
+            document
+        ).to_dict()
+    )
+
+
+def test_nested_terms_match_changeset():
+    """Terms are matched within the nested objects of their path."""
+    with_abstract = percolatable([abstract_enhancement(uuid7())])
+    without_abstract = percolatable([annotation_enhancement(uuid7(), value=True)])
+
+    assert matches(CHANGESET_ABSTRACT, with_abstract)
+    assert not matches(CHANGESET_ABSTRACT, without_abstract)
+    assert matches(CHANGESET_IN_DOMAIN, without_abstract)
+    assert not matches(
+        CHANGESET_IN_DOMAIN,
+        percolatable([annotation_enhancement(uuid7(), value=False)]),
+    )
+
+
+def test_bool_clauses():
+    """must, must_not and should combine as in Elasticsearch."""
+    missing_abstract = {
+        "bool": {
+            "must": [CHANGESET_DOI],
+            "must_not": [
+                {
+                    "nested": {
+                        "path": "reference.enhancements",
+                        "query": {
+                            "term": {
+                                "reference.enhancements.content.enhancement_type": (
+                                    "abstract"
+                                )
+                            }
+                        },
+                    }
+                }
+            ],
+        }
+    }
+    either = {"bool": {"should": [CHANGESET_DOI, CHANGESET_ABSTRACT]}}
+    both = {**either["bool"], "minimum_should_match": 2}
+
+    doi_only = percolatable(doi=True)
+    doi_and_abstract = percolatable([abstract_enhancement(uuid7())], doi=True)
+
+    assert matches(missing_abstract, doi_only)
+    assert not matches(missing_abstract, doi_and_abstract)
+    assert matches(either, doi_only)
+    assert not matches(either, percolatable())
+    assert not matches({"bool": both}, doi_only)
+    assert matches({"bool": both}, doi_and_abstract)
+    # A should clause is optional alongside a must clause.
+    assert matches(
+        {"bool": {"must": [CHANGESET_DOI], "should": [CHANGESET_ABSTRACT]}}, doi_only
+    )
+
+
+def test_terms_and_exists():
+    """terms matches any of its values, and exists any non-null value."""
+    document = percolatable(doi=True)
+
+    assert matches(
+        {
+            "nested": {
+                "path": "changeset.identifiers",
+                "query": {
+                    "terms": {"changeset.identifiers.identifier_type": ["pm_id", "doi"]}
+                },
+            }
+        },
+        document,
+    )
+    assert matches({"exists": {"field": "changeset.visibility"}}, document)
+    assert not matches(
+        {"exists": {"field": "changeset.duplicate_determination"}}, document
+    )
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # Full text and range queries
+        {"match": {"changeset.visibility": "public"}},
+        {"range": {"changeset.enhancements.created_at": {"gte": "now-1d"}}},
+        # Dynamically mapped enhancement content
+        {
+            "nested": {
+                "path": "changeset.enhancements",
+                "query": {"term": {"changeset.enhancements.content.abstract": "x"}},
+            }
+        },
+        # A nested field referenced outside its nested query
+        {"term": {"changeset.enhancements.content.enhancement_type": "abstract"}},
+        # Values Elasticsearch would coerce
+        {"term": {"changeset.visibility": 1}},
+        {
+            "term": {
+                "changeset.visibility": {"value": "PUBLIC", "case_insensitive": True}
+            }
+        },
+        {"bool": {"should": [CHANGESET_DOI], "minimum_should_match": "50%"}},
+        # Malformed queries
+        {"term": {"changeset.visibility": "public"}, "match_all": {}},
+        {"bool": {"must": "nope"}},
+    ],
+)
+def test_unsupported_queries_are_not_compiled(query: dict[str, Any]):
+    """Anything outside the compiled subset is left to Elasticsearch."""
+    assert compile_automation_query(query) is None
+
+
+def test_matcher_splits_unsupported_automations():
+    """Supported automations are matched locally and the rest listed for ES."""
+    robot_id = uuid7()
+    unsupported = RobotAutomation(
+        robot_id=uuid7(), query={"match": {"changeset.visibility": "public"}}
+    )
+    matcher = RobotAutomationMatcher(
+        [RobotAutomation(robot_id=robot_id, query=CHANGESET_ABSTRACT), unsupported]
+    )
+    with_abstract = percolatable([abstract_enhancement(uuid7())])
+
+    results = matcher.match([with_abstract, percolatable(doi=True)])
+
+    assert matcher.unsupported_automation_ids == [unsupported.id]
+    assert [(result.robot_id, result.reference_ids) for result in results] == [
+        (robot_id, {with_abstract.id})
+    ]
+
+
+async def test_cache_recompiles_when_automations_change():
+    """The matcher is reused until the stored automations' fingerprint changes."""
+    cache = RobotAutomationMatcherCache(enabled=True)
+    fingerprint = AsyncMock(return_value="a")
+    load = AsyncMock(return_value=[])
+
+    first = await cache.get(fingerprint, load)
+    assert await cache.get(fingerprint, load) is first
+    load.assert_awaited_once()
+
+    fingerprint.return_value = "b"
+    assert await cache.get(fingerprint, load) is not first
+    assert load.await_count == 2
+
+
+async def test_disabled_cache_has_no_matcher():
+    """With in-process matching disabled, everything is percolated in ES."""
+    cache = RobotAutomationMatcherCache(enabled=False)
+    fingerprint = AsyncMock()
+    load = AsyncMock()
+
+    assert await cache.get(fingerprint, load) is None
+    fingerprint.assert_not_awaited()
+    load.assert_not_awaited()
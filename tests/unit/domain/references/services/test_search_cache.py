@@ -0,0 +1,267 @@
+"""Unit tests for the search result cache and request coalescer."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.domain.references.models.es import ReferenceDocument
+from app.domain.references.models.models import (
+    AnnotationFilter,
+    LinkedDataCountryFilter,
+    SearchQuery,
+)
+from app.domain.references.services.search_cache import (
+    RequestCoalescer,
+    SearchResultCache,
+    search_query_cache_key,
+)
+from app.persistence.es.generation import IndexGenerations
+
+
+@pytest.fixture
+def generations() -> IndexGenerations:
+    return IndexGenerations()
+
+
+@pytest.fixture
+def cache(generations: IndexGenerations) -> SearchResultCache:
+    return SearchResultCache(
+        enabled=True, max_entries=8, ttl_seconds=60, generations=generations
+    )
+
+
+async def test_hit_serves_cached_result_and_counts(cache: SearchResultCache):
+    """A repeated lookup is served from the cache and counted as a hit."""
+    compute = AsyncMock(return_value="result")
+
+    first = await cache.get_or_compute("search", {"q": "a"}, compute)
+    second = await cache.get_or_compute("search", {"q": "a"}, compute)
+
+    assert first == second == "result"
+    compute.assert_awaited_once()
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+async def test_operations_and_keys_are_distinct(cache: SearchResultCache):
+    """The operation name namespaces otherwise identical keys."""
+    compute = AsyncMock(side_effect=["search", "facets", "other"])
+
+    assert await cache.get_or_compute("search", {"q": "a"}, compute) == "search"
+    assert await cache.get_or_compute("facets", {"q": "a"}, compute) == "facets"
+    assert await cache.get_or_compute("search", {"q": "b"}, compute) == "other"
+
+
+async def test_generation_bump_invalidates(
+    cache: SearchResultCache, generations: IndexGenerations
+):
+    """A write to the reference index makes existing entries unreachable."""
+    compute = AsyncMock(side_effect=["stale", "fresh"])
+
+    await cache.get_or_compute("search", {"q": "a"}, compute)
+    generations.bump(ReferenceDocument.Index.name)
+
+    assert await cache.get_or_compute("search", {"q": "a"}, compute) == "fresh"
+
+
+async def test_generation_bump_on_other_index_does_not_invalidate(
+    cache: SearchResultCache, generations: IndexGenerations
+):
+    """Writes to unrelated indices leave reference search entries alone."""
+    compute = AsyncMock(return_value="result")
+
+    await cache.get_or_compute("search", {"q": "a"}, compute)
+    generations.bump("robot_automation_percolation")
+    await cache.get_or_compute("search", {"q": "a"}, compute)
+
+    compute.assert_awaited_once()
+
+
+async def test_exceptions_are_not_cached(cache: SearchResultCache):
+    """A failed computation is retried on the next lookup."""
+    compute = AsyncMock(side_effect=[ValueError("boom"), "result"])
+
+    with pytest.raises(ValueError, match="boom"):
+        await cache.get_or_compute("search", {"q": "a"}, compute)
+    assert await cache.get_or_compute("search", {"q": "a"}, compute) == "result"
+
+
+async def test_disabled_cache_always_computes():
+    """A disabled cache is a pass-through and records nothing."""
+    cache = SearchResultCache(enabled=False, max_entries=8, ttl_seconds=60)
+    compute = AsyncMock(return_value="result")
+
+    await cache.get_or_compute("search", {"q": "a"}, compute)
+    await cache.get_or_compute("search", {"q": "a"}, compute)
+
+    assert compute.await_count == 2
+    assert cache.stats().hits == 0
+
+
+def test_search_query_cache_key_normalises_commutative_parts():
+    """Whitespace and filter ordering do not affect the key."""
+    query_a = SearchQuery(
+        query_string="climate   change",
+        annotation_filters=[
+            AnnotationFilter(scheme="a", label="x"),
+            AnnotationFilter(scheme="b", label="y"),
+        ],
+        linked_data_country_filters=[
+            LinkedDataCountryFilter(country_codes=["GB", "US"])
+        ],
+    )
+    query_b = SearchQuery(
+        query_string=" climate change ",
+        annotation_filters=[
+            AnnotationFilter(scheme="b", label="y"),
+            AnnotationFilter(scheme="a", label="x"),
+        ],
+        linked_data_country_filters=[
+            LinkedDataCountryFilter(country_codes=["US", "GB"])
+        ],
+    )
+    assert search_query_cache_key(query_a) == search_query_cache_key(query_b)
+    assert search_query_cache_key(query_a) != search_query_cache_key(
+        SearchQuery(query_string="climate")
+    )
+
+
+def _coalescer(
+    generations: IndexGenerations, freshness_seconds: float = 0
+) -> RequestCoalescer:
+    return RequestCoalescer(
+        enabled=True,
+        freshness_seconds=freshness_seconds,
+        max_fresh_entries=8,
+        generations=generations,
+    )
+
+
+def _gated_compute(release: asyncio.Event, result: str = "result") -> AsyncMock:
+    async def compute() -> str:
+        await release.wait()
+        return result
+
+    return AsyncMock(side_effect=compute)
+
+
+async def test_concurrent_identical_requests_share_one_execution(
+    generations: IndexGenerations,
+):
+    """Identical requests overlapping in flight await a single computation."""
+    coalescer = _coalescer(generations)
+    release = asyncio.Event()
+    compute = _gated_compute(release)
+
+    requests = [
+        asyncio.ensure_future(coalescer.run("facets", {"q": "a"}, compute))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    assert coalescer.stats().in_flight == 1
+    release.set()
+
+    assert await asyncio.gather(*requests) == ["result"] * 5
+    compute.assert_awaited_once()
+    stats = coalescer.stats()
+    assert (stats.executed, stats.coalesced, stats.in_flight) == (1, 4, 0)
+
+
+async def test_distinct_requests_are_not_coalesced(generations: IndexGenerations):
+    """Different keys, operations and index generations run independently."""
+    coalescer = _coalescer(generations)
+    compute = AsyncMock(side_effect=["a", "b", "c", "d"])
+
+    results = await asyncio.gather(
+        coalescer.run("facets", {"q": "a"}, compute),
+        coalescer.run("facets", {"q": "b"}, compute),
+        coalescer.run("cross", {"q": "a"}, compute),
+    )
+    generations.bump(ReferenceDocument.Index.name)
+    results.append(await coalescer.run("facets", {"q": "a"}, compute))
+
+    assert results == ["a", "b", "c", "d"]
+    assert coalescer.stats().coalesced == 0
+
+
+async def test_sequential_requests_recompute_without_freshness(
+    generations: IndexGenerations,
+):
+    """With no freshness window, only overlapping requests are coalesced."""
+    coalescer = _coalescer(generations)
+    compute = AsyncMock(side_effect=["first", "second"])
+
+    assert await coalescer.run("facets", {"q": "a"}, compute) == "first"
+    assert await coalescer.run("facets", {"q": "a"}, compute) == "second"
+
+
+async def test_freshness_window_serves_just_completed_result(
+    generations: IndexGenerations,
+):
+    """A request arriving just after an identical one completes reuses it."""
+    coalescer = _coalescer(generations, freshness_seconds=60)
+    compute = AsyncMock(side_effect=["first", "second"])
+
+    assert await coalescer.run("facets", {"q": "a"}, compute) == "first"
+    assert await coalescer.run("facets", {"q": "a"}, compute) == "first"
+    assert coalescer.stats().fresh == 1
+
+
+async def test_failure_is_shared_but_not_kept_fresh(generations: IndexGenerations):
+    """Every coalesced request sees the failure, and the next request retries."""
+    coalescer = _coalescer(generations, freshness_seconds=60)
+    release = asyncio.Event()
+
+    async def fail() -> str:
+        await release.wait()
+        msg = "boom"
+        raise ValueError(msg)
+
+    requests = [
+        asyncio.ensure_future(coalescer.run("facets", {"q": "a"}, fail))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*requests, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    compute = AsyncMock(return_value="result")
+    assert await coalescer.run("facets", {"q": "a"}, compute) == "result"
+
+
+async def test_cancelled_request_does_not_cancel_others(
+    generations: IndexGenerations,
+):
+    """A requester going away leaves the shared computation running for the rest."""
+    coalescer = _coalescer(generations)
+    release = asyncio.Event()
+    compute = _gated_compute(release)
+
+    leader = asyncio.ensure_future(coalescer.run("facets", {"q": "a"}, compute))
+    follower = asyncio.ensure_future(coalescer.run("facets", {"q": "a"}, compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    assert await follower == "result"
+    assert leader.cancelled()
+    compute.assert_awaited_once()
+
+
+async def test_disabled_coalescer_always_computes():
+    """A disabled coalescer is a pass-through and records nothing."""
+    coalescer = RequestCoalescer(
+        enabled=False, freshness_seconds=60, max_fresh_entries=8
+    )
+    compute = AsyncMock(return_value="result")
+
+    await asyncio.gather(
+        coalescer.run("facets", {"q": "a"}, compute),
+        coalescer.run("facets", {"q": "a"}, compute),
+    )
+
+    assert compute.await_count == 2
+    assert coalescer.stats().executed == 0
@@ -1,5 +1,6 @@
 """Unit tests for the reference synchronizer service."""
 
+import json
 from collections.abc import AsyncGenerator
 from typing import cast
 from unittest.mock import AsyncMock
@@ -12,7 +13,15 @@ from app.domain.references.models.models import (
     Reference,
     ReferenceDuplicateDecision,
 )
+from app.domain.references.services.anti_corruption_service import (
+    ReferenceAntiCorruptionService,
+)
 from app.domain.references.services.synchronizer_service import ReferenceSynchronizer
+from tests.factories import (
+    AbstractContentEnhancementFactory,
+    EnhancementFactory,
+    FullTextEnhancementFactory,
+)
 
 
 def _canonical(reference_id: UUID | None = None) -> Reference:
@@ -116,3 +125,44 @@ async def test_multiple_duplicates_reindex_canonical_once(
     await synchronizer.bulk_sql_to_es([d.id for d in duplicates])
 
     assert indexed == [canonical.id]
+
+
+async def test_indexable_carries_rendered_payload() -> None:
+    """The projection stores the SDK payload and flags the omitted full text."""
+    reference = _canonical()
+    reference.duplicate_references = []
+    reference.enhancements = [
+        EnhancementFactory.build(
+            reference_id=reference.id,
+            content=AbstractContentEnhancementFactory.build(),
+        ),
+        EnhancementFactory.build(
+            reference_id=reference.id, content=FullTextEnhancementFactory.build()
+        ),
+    ]
+    synchronizer = ReferenceSynchronizer(
+        sql_uow=AsyncMock(),
+        es_uow=AsyncMock(),
+        anti_corruption_service=ReferenceAntiCorruptionService(sign_url=AsyncMock()),
+    )
+
+    projection = await synchronizer._to_indexable(reference)  # noqa: SLF001
+
+    assert projection.has_full_text
+    assert projection.sdk_payload is not None
+    payload = json.loads(projection.sdk_payload)
+    assert payload["id"] == str(reference.id)
+    assert len(payload["enhancements"]) == 1
+
+
+async def test_indexable_without_anti_corruption_has_no_payload() -> None:
+    """Without a renderer, no payload is stored and search falls back to SQL."""
+    synchronizer = ReferenceSynchronizer(sql_uow=AsyncMock(), es_uow=AsyncMock())
+
+    reference = _canonical()
+    reference.duplicate_references = []
+
+    projection = await synchronizer._to_indexable(reference)  # noqa: SLF001
+
+    assert projection.sdk_payload is None
+    assert not projection.has_full_text
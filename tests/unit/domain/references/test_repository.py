@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid7
 
 import pytest
+from elasticsearch import AsyncElasticsearch
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,6 +13,8 @@ from app.domain.references.models.models import (
     GenericExternalIdentifier,
     PendingEnhancement,
     PendingEnhancementStatus,
+    Reference,
+    ReferenceWithChangeset,
 )
 from app.domain.references.models.sql import ExternalIdentifier as SQLExternalIdentifier
 from app.domain.references.models.sql import (
@@ -21,6 +24,7 @@ from app.domain.references.models.sql import Reference as SQLReference
 from app.domain.references.repository import (
     PendingEnhancementSQLRepository,
     ReferenceSQLRepository,
+    RobotAutomationESRepository,
 )
 from app.utils.time_and_date import utc_now
 from tests.factories import ReferenceFactory
@@ -157,66 +161,29 @@ class TestReferenceSQLRepository:
 
 
 class TestPendingEnhancementSQLRepository:
-    async def test_get_retry_depths(
+    async def test_retry_depth_is_persisted(
         self, session: AsyncSession, pending_enhancement_factory
     ):
-        """get_retry_depths returns each id's depth in its retry chain."""
+        """Persisted retry depths round-trip."""
         repo = PendingEnhancementSQLRepository(session)
 
-        # A chain original <- retry <- retry.
-        pe1 = await pending_enhancement_factory(
-            status=PendingEnhancementStatus.EXPIRED,
-            expires_at=utc_now() - datetime.timedelta(hours=1),
-        )
-        pe2 = await pending_enhancement_factory(
-            status=PendingEnhancementStatus.EXPIRED,
-            expires_at=utc_now() - datetime.timedelta(minutes=30),
-            retry_of=pe1.id,
-        )
-        pe3 = await pending_enhancement_factory(
-            status=PendingEnhancementStatus.PENDING,
-            expires_at=utc_now() + datetime.timedelta(hours=1),
-            retry_of=pe2.id,
-        )
-        await session.commit()
-
-        depths = await repo.get_retry_depths([pe1.id, pe2.id, pe3.id])
-        assert depths == {pe1.id: 0, pe2.id: 1, pe3.id: 2}
-
-    async def test_get_retry_depths_omits_unknown_ids(
-        self, session: AsyncSession, created_pending_enhancement
-    ):
-        """Ids with no matching record are absent from the result."""
-        repo = PendingEnhancementSQLRepository(session)
-
-        depths = await repo.get_retry_depths([created_pending_enhancement.id, uuid7()])
-        assert depths == {created_pending_enhancement.id: 0}
-
-    async def test_get_retry_depths_above_bind_param_limit(
-        self, session: AsyncSession, pending_enhancement_factory
-    ):
-        """Retry chains still resolve when the id list exceeds asyncpg's limit.
-
-        The expiry sweep feeding this method is unbounded, so the seed list can
-        outgrow the number of bind parameters a single statement may carry.
-        """
-        repo = PendingEnhancementSQLRepository(session)
-
-        pe1 = await pending_enhancement_factory(
+        original = await pending_enhancement_factory(
             status=PendingEnhancementStatus.EXPIRED,
             expires_at=utc_now() - datetime.timedelta(hours=1),
         )
-        pe2 = await pending_enhancement_factory(
+        retry = await pending_enhancement_factory(
             status=PendingEnhancementStatus.PENDING,
             expires_at=utc_now() + datetime.timedelta(hours=1),
-            retry_of=pe1.id,
+            retry_of=original.id,
+            retry_depth=1,
         )
         await session.commit()
 
-        padding = [uuid7() for _ in range(2**15 - 1)]
-        depths = await repo.get_retry_depths([pe1.id, *padding, pe2.id])
-
-        assert depths == {pe1.id: 0, pe2.id: 1}
+        persisted = {
+            pe.id: pe.retry_depth
+            for pe in await repo.get_by_pks([original.id, retry.id])
+        }
+        assert persisted == {original.id: 0, retry.id: 1}
 
     async def test_expire_pending_enhancements_past_expiry(
         self, session: AsyncSession, pending_enhancement_factory
@@ -237,6 +204,7 @@ class TestPendingEnhancementSQLRepository:
         result = await repo.expire_pending_enhancements_past_expiry(
             now=utc_now(),
             statuses=[PendingEnhancementStatus.PROCESSING],
+            limit=10,
         )
 
         # Should only return and update the expired one
@@ -252,6 +220,33 @@ class TestPendingEnhancementSQLRepository:
         non_expired = await repo.get_by_pk(non_expired_pe.id)
         assert non_expired.status == PendingEnhancementStatus.PROCESSING
 
+    async def test_expire_pending_enhancements_past_expiry_limit(
+        self, session: AsyncSession, pending_enhancement_factory
+    ):
+        """A limited sweep expires the longest-lapsed leases first."""
+        repo = PendingEnhancementSQLRepository(session)
+
+        oldest = await pending_enhancement_factory(
+            status=PendingEnhancementStatus.PROCESSING,
+            expires_at=utc_now() - datetime.timedelta(hours=1),
+        )
+        newest = await pending_enhancement_factory(
+            status=PendingEnhancementStatus.PROCESSING,
+            expires_at=utc_now() - datetime.timedelta(minutes=5),
+        )
+        await session.commit()
+
+        result = await repo.expire_pending_enhancements_past_expiry(
+            now=utc_now(),
+            statuses=[PendingEnhancementStatus.PROCESSING],
+            limit=1,
+        )
+
+        assert [pe.id for pe in result] == [oldest.id]
+        assert (
+            await repo.get_by_pk(newest.id)
+        ).status == PendingEnhancementStatus.PROCESSING
+
     async def test_update_by_pk_validates_status_transitions(
         self, session: AsyncSession, pending_enhancement_factory
     ):
@@ -385,29 +380,74 @@ class TestPendingEnhancementSQLRepository:
         """
         n_records = 7000
         mock_session = AsyncMock(spec=AsyncSession)
+        robot_ids = [uuid7() for _ in range(n_records)]
         mock_session.execute.return_value = MagicMock(
-            all=MagicMock(return_value=[object()] * n_records)
+            scalars=MagicMock(
+                return_value=MagicMock(all=MagicMock(return_value=robot_ids))
+            )
         )
         repo = PendingEnhancementSQLRepository(mock_session)
 
         records = [
             PendingEnhancement(
                 reference_id=uuid7(),
-                robot_id=uuid7(),
+                robot_id=robot_id,
                 enhancement_request_id=uuid7(),
                 expires_at=utc_now() + datetime.timedelta(hours=1),
             )
-            for _ in range(n_records)
+            for robot_id in robot_ids
         ]
 
         inserted = await repo.add_bulk_ignore_conflicts(records)
 
         assert inserted == n_records
-        mock_session.execute.assert_awaited_once()
-        statement, params = mock_session.execute.await_args.args
+        # The insert, then a single notification statement for every robot.
+        assert mock_session.execute.await_count == 2
+        statement, params = mock_session.execute.await_args_list[0].args
         assert len(params) == n_records
 
         # One row's worth of placeholders however many rows are inserted, so the
         # bind parameter ceiling is unreachable.
         compiled = statement.compile(dialect=postgresql.dialect())
         assert len(compiled.params) == len(SQLPendingEnhancement.__table__.columns)
+
+
+class TestRobotAutomationESRepository:
+    async def test_percolate_sends_chunks_in_one_multi_search(self):
+        """Chunks go as percolate queries of one msearch; slots map per chunk."""
+        robot_id, other_robot_id = uuid7(), uuid7()
+        percolatables = [
+            ReferenceWithChangeset(id=uuid7(), changeset=Reference()) for _ in range(5)
+        ]
+
+        def _hit(robot, slots):
+            return {
+                "_index": "robot-automation-percolation",
+                "_id": str(uuid7()),
+                "_source": {"robot_id": str(robot)},
+                "fields": {"_percolator_document_slot": slots},
+            }
+
+        def _response(*hits):
+            return {"hits": {"total": {"value": len(hits)}, "hits": list(hits)}}
+
+        client = AsyncMock(spec=AsyncElasticsearch)
+        client.msearch.return_value = {
+            "responses": [
+                _response(_hit(robot_id, [0, 1])),
+                _response(_hit(robot_id, [1]), _hit(other_robot_id, [0])),
+                _response(),
+            ]
+        }
+        repo = RobotAutomationESRepository(client)
+
+        results = await repo.percolate(percolatables, chunk_size=2)
+
+        client.msearch.assert_awaited_once()
+        body = client.msearch.await_args.kwargs["body"]
+        queries = [line["query"]["percolate"] for line in body[1::2]]
+        assert [len(query["documents"]) for query in queries] == [2, 2, 1]
+        assert {result.robot_id: result.reference_ids for result in results} == {
+            robot_id: {percolatables[0].id, percolatables[1].id, percolatables[3].id},
+            other_robot_id: {percolatables[2].id},
+        }
@@ -1,8 +1,10 @@
 """Unit tests for the ReferenceService class."""
 
+import asyncio
 import datetime
 import json
-from unittest.mock import AsyncMock, Mock, call, patch
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, Mock, call, patch
 from uuid import uuid7
 
 import pytest
@@ -10,8 +12,10 @@ from destiny_sdk.enhancements import BibliographicMetadataEnhancement
 from destiny_sdk.identifiers import DOIIdentifier
 from destiny_sdk.references import ReferenceFileInput
 
+from app.core.entitlements import Entitlement
 from app.core.exceptions import (
     DuplicateEnhancementError,
+    FullTextDownloadError,
     InvalidParentEnhancementError,
     SQLNotFoundError,
 )
@@ -25,6 +29,7 @@ from app.domain.references.models.models import (
     EnhancementRequest,
     EnhancementRequestSearchStatus,
     ExternalIdentifierAdapter,
+    IdentifierLookup,
     InputSearchability,
     LinkedExternalIdentifier,
     PendingEnhancement,
@@ -32,8 +37,11 @@ from app.domain.references.models.models import (
     Reference,
     ReferenceDuplicateDecision,
     ReferenceIds,
+    ReferenceSearchFields,
+    ReferenceSearchProjection,
     ReferenceWithChangeset,
     RetrievalPolicyName,
+    RobotAutomation,
     RobotAutomationPercolationResult,
     RobotEnhancementBatch,
     SearchQuery,
@@ -46,13 +54,24 @@ from app.domain.references.services.access_control_service import (
 from app.domain.references.services.anti_corruption_service import (
     ReferenceAntiCorruptionService,
 )
+from app.domain.references.services.enhancement_service import ProcessedResults
+from app.domain.references.services.robot_automation_matcher import (
+    RobotAutomationMatcherCache,
+)
 from app.domain.robots.models.models import Robot
 from app.persistence.blob.models import (
     BlobStorageFile,
+    ContentEncoding,
 )
 from app.persistence.es.persistence import ESHit, ESSearchResult, ESSearchTotal
+from app.persistence.sql.notifications import NotificationListener
 from app.utils.time_and_date import utc_now
-from tests.factories import SearchEnhancementRequestFactory
+from tests.factories import (
+    BibliographicMetadataEnhancementFactory,
+    EnhancementFactory,
+    FullTextEnhancementFactory,
+    SearchEnhancementRequestFactory,
+)
 from tests.unit.domain.conftest import FakeRepository
 
 
@@ -258,7 +277,8 @@ async def test_add_enhancement_happy_path(
 ):
     dummy_reference = Reference(id=uuid7())
     repo_refs = fake_repository(init_entries=[dummy_reference])
-    uow = fake_uow(references=repo_refs)
+    repo_enhs = fake_repository()
+    uow = fake_uow(references=repo_refs, enhancements=repo_enhs)
     service = ReferenceService(
         ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
     )
@@ -269,10 +289,7 @@ async def test_add_enhancement_happy_path(
 
     await service.add_enhancement(enhancement_to_add)
 
-    reference_enhancements = repo_refs.get_first_record().enhancements
-
-    assert len(reference_enhancements) == 1
-    assert reference_enhancements[0].id == enhancement_to_add.id
+    assert list(repo_enhs.iter_records()) == [enhancement_to_add]
 
 
 @pytest.mark.asyncio
@@ -369,8 +386,9 @@ async def test_add_enhancement_derived_from_enhancement_for_duplicate_reference(
         **fake_enhancement_data,
     )
 
-    reference = await service.add_enhancement(enhancement_to_add)
-    assert reference.enhancements[0].id == enhancement_to_add.id
+    enhancement = await service.add_enhancement(enhancement_to_add)
+    assert enhancement.id == enhancement_to_add.id
+    assert repo_enhs.repository[enhancement_to_add.id] == enhancement_to_add
 
 
 @pytest.mark.asyncio
@@ -379,7 +397,7 @@ async def test_add_enhancement_duplicate_enhancement(
 ):
     dummy_reference = Reference(id=uuid7())
     repo_refs = fake_repository(init_entries=[dummy_reference])
-    uow = fake_uow(references=repo_refs)
+    uow = fake_uow(references=repo_refs, enhancements=fake_repository())
     service = ReferenceService(
         ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
     )
@@ -393,7 +411,154 @@ async def test_add_enhancement_duplicate_enhancement(
 
     # Second addition with the same data should raise DuplicateEnhancementError
     with pytest.raises(DuplicateEnhancementError):
-        await service.add_enhancement(enhancement_to_add)
+        await service.add_enhancement(
+            enhancement_to_add.model_copy(update={"id": uuid7()})
+        )
+
+
+@pytest.mark.asyncio
+async def test_add_enhancement_duplicate_of_unhashed_enhancement(
+    fake_repository, fake_uow, fake_enhancement_data
+):
+    """Enhancements stored without a content hash are compared in Python."""
+    dummy_reference = Reference(id=uuid7())
+    existing = Enhancement(reference_id=dummy_reference.id, **fake_enhancement_data)
+    repo_enhs = fake_repository()
+    repo_enhs.get_unhashed_by_reference_ids = AsyncMock(return_value=[existing])
+    uow = fake_uow(
+        references=fake_repository(init_entries=[dummy_reference]),
+        enhancements=repo_enhs,
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+
+    with pytest.raises(DuplicateEnhancementError):
+        await service.add_enhancement(
+            Enhancement(reference_id=dummy_reference.id, **fake_enhancement_data)
+        )
+    repo_enhs.get_unhashed_by_reference_ids.assert_awaited_once_with(
+        [dummy_reference.id]
+    )
+    assert repo_enhs.repository == {}
+
+
+@pytest.mark.asyncio
+async def test_handle_enhancement_result_entries_reports_each_outcome(
+    fake_repository, fake_uow, fake_enhancement_data
+):
+    """A chunk is inserted together, with each enhancement's outcome reported."""
+    dummy_reference = Reference(id=uuid7())
+    existing = Enhancement(reference_id=dummy_reference.id, **fake_enhancement_data)
+    repo_enhs = fake_repository([existing])
+    uow = fake_uow(
+        references=fake_repository(init_entries=[dummy_reference]),
+        enhancements=repo_enhs,
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+    added = Enhancement(
+        reference_id=dummy_reference.id,
+        **(fake_enhancement_data | {"source": "another source"}),
+    )
+
+    outcomes = await service.handle_enhancement_result_entries(
+        [
+            added,
+            Enhancement(reference_id=uuid7(), **fake_enhancement_data),
+            existing.model_copy(update={"id": uuid7()}),
+            Enhancement(
+                reference_id=dummy_reference.id,
+                derived_from=[uuid7()],
+                **fake_enhancement_data,
+            ),
+        ]
+    )
+
+    assert outcomes == [
+        (PendingEnhancementStatus.COMPLETED, "Enhancement added."),
+        (PendingEnhancementStatus.FAILED, "Reference does not exist."),
+        (
+            PendingEnhancementStatus.DISCARDED,
+            "Exact duplicate enhancement already exists on reference.",
+        ),
+        (PendingEnhancementStatus.FAILED, "Failed to add enhancement to reference."),
+    ]
+    assert set(repo_enhs.repository) == {existing.id, added.id}
+
+
+@pytest.mark.asyncio
+async def test_commit_enhancement_result_chunk(fake_repository, fake_uow):
+    """A chunk's pending enhancements are settled and its references indexed."""
+    pending_enhancements = [
+        PendingEnhancement(
+            id=uuid7(),
+            reference_id=uuid7(),
+            robot_id=uuid7(),
+            enhancement_request_id=uuid7(),
+            status=PendingEnhancementStatus.PROCESSING,
+        )
+        for _ in range(3)
+    ]
+    succeeded, failed, discarded = pending_enhancements
+    repo_pending = fake_repository(pending_enhancements)
+    uow = fake_uow(pending_enhancements=repo_pending)
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+    service._synchronizer = Mock()  # noqa: SLF001
+    bulk_sql_to_es = service._synchronizer.references.bulk_sql_to_es = AsyncMock()  # noqa: SLF001
+
+    await service.commit_enhancement_result_chunk(
+        ProcessedResults(
+            imported_enhancement_ids={uuid7()},
+            successful_pending_enhancement_ids={succeeded.id},
+            failed_pending_enhancement_ids={failed.id},
+            discarded_pending_enhancement_ids={discarded.id},
+        ),
+        pending_enhancements,
+    )
+
+    bulk_sql_to_es.assert_awaited_once_with([succeeded.reference_id])
+    assert uow.committed
+    assert succeeded.status == PendingEnhancementStatus.COMPLETED
+    assert failed.status == PendingEnhancementStatus.FAILED
+    assert discarded.status == PendingEnhancementStatus.DISCARDED
+
+
+@pytest.mark.asyncio
+async def test_commit_enhancement_result_chunk_indexing_failure(
+    fake_repository, fake_uow
+):
+    """Indexing failures are recorded on the chunk without failing the batch."""
+    pending_enhancement = PendingEnhancement(
+        id=uuid7(),
+        reference_id=uuid7(),
+        robot_id=uuid7(),
+        enhancement_request_id=uuid7(),
+        status=PendingEnhancementStatus.PROCESSING,
+    )
+    uow = fake_uow(pending_enhancements=fake_repository([pending_enhancement]))
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+    service._synchronizer = Mock()  # noqa: SLF001
+    service._synchronizer.references.bulk_sql_to_es = AsyncMock(  # noqa: SLF001
+        side_effect=Exception("Indexing failed")
+    )
+
+    await service.commit_enhancement_result_chunk(
+        ProcessedResults(
+            imported_enhancement_ids={uuid7()},
+            successful_pending_enhancement_ids={pending_enhancement.id},
+            failed_pending_enhancement_ids=set(),
+            discarded_pending_enhancement_ids=set(),
+        ),
+        [pending_enhancement],
+    )
+
+    assert pending_enhancement.status == PendingEnhancementStatus.INDEXING_FAILED
 
 
 @pytest.mark.asyncio
@@ -564,6 +729,50 @@ async def test_ingest_reference(
         assert getattr(result, "duplicate_decision_id", None) == expected_decision_id
 
 
+@pytest.mark.asyncio
+async def test_ingest_reference_drops_exact_duplicate_enhancements(
+    fake_repository, fake_uow, fake_enhancement_data
+):
+    """Exact duplicate enhancements in an import are stored once."""
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()),
+        fake_uow(references=fake_repository()),
+        fake_uow(),
+    )
+    reference = Reference(id=uuid7())
+    first = Enhancement(reference_id=reference.id, **fake_enhancement_data)
+    other = EnhancementFactory.build(reference_id=reference.id)
+    reference.enhancements = [first, other, first.model_copy(update={"id": uuid7()})]
+    dummy_parsed = ReferenceCreateResult(
+        reference=ReferenceFileInput(visibility="public", enhancements=[])
+    )
+
+    with (
+        patch.object(
+            service._deduplication_service,  # noqa: SLF001
+            "register_pending_import_decision",
+            AsyncMock(return_value=Mock(id=uuid7())),
+        ),
+        patch.object(service, "_merge_reference", AsyncMock()) as mock_merge,
+        patch.object(
+            service._anti_corruption_service,  # noqa: SLF001
+            "reference_from_sdk_file_input",
+            Mock(return_value=reference),
+        ),
+        patch.object(
+            ReferenceCreateResult, "from_raw", Mock(return_value=dummy_parsed)
+        ),
+        patch.object(
+            service._deduplication_service,  # noqa: SLF001
+            "find_exact_duplicate",
+            AsyncMock(return_value=None),
+        ),
+    ):
+        await service.ingest_reference("{}", 1, AsyncMock())
+
+    assert mock_merge.await_args.args[0].enhancements == [first, other]
+
+
 @pytest.mark.asyncio
 async def test_detect_robot_automations(
     fake_repository, fake_uow, fake_enhancement_data
@@ -591,7 +800,9 @@ async def test_detect_robot_automations(
             super().__init__(init_entries=init_entries)
             self.hydrated_references = init_entries
 
-        async def percolate(self, documents):
+        async def percolate(self, documents, chunk_size=None, automation_ids=None):
+            # Only the automation that can't be matched locally goes to ES
+            assert automation_ids == [es_automation.id]
             # Returns a match on all documents against one robot
             return [
                 RobotAutomationPercolationResult(
@@ -603,18 +814,35 @@ async def test_detect_robot_automations(
                 )
             ]
 
+    es_automation = RobotAutomation(
+        robot_id=robot_id, query={"match": {"changeset.visibility": "public"}}
+    )
+    local_robot_id = uuid7()
+    local_automation = RobotAutomation(
+        robot_id=local_robot_id,
+        query={"term": {"changeset.visibility": "public"}},
+    )
+
     fake_enhancements_repo = fake_repository([enhancement])
     fake_references_repo = FakeRepo([reference, reference_2])
     fake_robot_automations_repo = FakeRepo()
 
+    class FakeRobotAutomationSQLRepo(fake_repository):
+        async def get_fingerprint(self):
+            return "fingerprint"
+
     sql_uow = fake_uow(
         references=fake_references_repo,
         enhancements=fake_enhancements_repo,
+        robot_automations=FakeRobotAutomationSQLRepo([es_automation, local_automation]),
     )
     es_uow = fake_uow(robot_automations=fake_robot_automations_repo)
 
     service = ReferenceService(
-        ReferenceAntiCorruptionService(fake_repository), sql_uow=sql_uow, es_uow=es_uow
+        ReferenceAntiCorruptionService(fake_repository),
+        sql_uow=sql_uow,
+        es_uow=es_uow,
+        robot_automation_matcher_cache=RobotAutomationMatcherCache(enabled=True),
     )
     results = await service.detect_robot_automations(
         reference=ReferenceWithChangeset(
@@ -622,9 +850,77 @@ async def test_detect_robot_automations(
         ),
         enhancement_ids=[enhancement.id],
     )
-    assert len(results) == 1
-    assert results[0].robot_id == robot_id
-    assert len(results[0].reference_ids) == 2
+    reference_ids_by_robot = {
+        result.robot_id: result.reference_ids for result in results
+    }
+    assert reference_ids_by_robot.keys() == {robot_id, local_robot_id}
+    assert len(reference_ids_by_robot[robot_id]) == 2
+    assert reference_ids_by_robot[local_robot_id] == {reference_id, reference_2.id}
+
+
+@pytest.mark.asyncio
+async def test_detect_robot_automations_percolation_disabled(
+    fake_repository, fake_uow, monkeypatch
+):
+    """Nothing is matched, in process or in Elasticsearch, with percolation off."""
+    from app.domain.references import service as reference_service_module
+
+    monkeypatch.setattr(
+        reference_service_module.settings.feature_flags, "enable_percolation", False
+    )
+    reference = Reference(id=uuid7(), visibility="public")
+    robot_automations = AsyncMock()
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository),
+        sql_uow=fake_uow(robot_automations=robot_automations),
+        es_uow=fake_uow(robot_automations=robot_automations),
+        robot_automation_matcher_cache=RobotAutomationMatcherCache(enabled=True),
+    )
+
+    results = await service.detect_robot_automations(
+        reference=ReferenceWithChangeset(**reference.model_dump(), changeset=reference)
+    )
+
+    assert results == []
+    robot_automations.get_fingerprint.assert_not_awaited()
+    robot_automations.get_all.assert_not_awaited()
+    robot_automations.percolate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_repopulate_robot_automation_percolation_index(fake_repository, fake_uow):
+    """Automations are synced, moving past documents indexed ahead of them."""
+    in_sync, ahead = (
+        RobotAutomation(robot_id=uuid7(), query={"match_all": {}}) for _ in range(2)
+    )
+    indexed_revisions = {in_sync.id: 1, ahead.id: 4}
+    synced: list[RobotAutomation] = []
+
+    class FakeSQLRepo(fake_repository):
+        async def advance_revision(self, automation_id, revision):
+            automation = await self.get_by_pk(automation_id)
+            automation.revision = max(automation.revision, revision)
+            return automation
+
+    class FakeESRepo(fake_repository):
+        async def get_revisions(self):
+            return indexed_revisions
+
+        async def sync(self, automations, indexed_revisions):
+            synced.extend(automations)
+            return len(automations)
+
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository),
+        sql_uow=fake_uow(robot_automations=FakeSQLRepo([in_sync, ahead])),
+        es_uow=fake_uow(robot_automations=FakeESRepo()),
+    )
+    await service.repopulate_robot_automation_percolation_index()
+
+    assert {automation.id: automation.revision for automation in synced} == {
+        in_sync.id: 1,
+        ahead.id: 5,
+    }
 
 
 @pytest.fixture
@@ -898,13 +1194,20 @@ async def test_claim_and_create_robot_enhancement_batch(
     fake_repository, fake_uow, test_robot
 ):
     """Test atomic claiming of pending enhancements and batch creation."""
+    uploaded = {}
+
+    async def _upload(*, content, **_):
+        # The stream is only readable for the duration of the upload call.
+        uploaded["content"] = await content.read()
+        return BlobStorageFile(
+            location="minio",
+            container="test",
+            filename="test.jsonl",
+            path="robot_enhancement_batch_reference_data",
+        )
+
     mock_blob_repository = AsyncMock()
-    mock_blob_repository.upload_file_to_blob_storage.return_value = BlobStorageFile(
-        location="minio",
-        container="test",
-        filename="test.jsonl",
-        path="robot_enhancement_batch_reference_data",
-    )
+    mock_blob_repository.upload_file_to_blob_storage.side_effect = _upload
     # destination is sync; override AsyncMock's default async-by-attribute behaviour.
     mock_blob_repository.destination = Mock(
         return_value=BlobStorageFile(
@@ -985,10 +1288,7 @@ async def test_claim_and_create_robot_enhancement_batch(
 
     mock_blob_repository.upload_file_to_blob_storage.assert_awaited_once()
 
-    args, kwargs = mock_blob_repository.upload_file_to_blob_storage.call_args
-    filestream = kwargs["content"]
-    file_content = await filestream.read()
-    content_lines = file_content.getvalue().decode().strip().split("\n")
+    content_lines = uploaded["content"].getvalue().decode().strip().split("\n")
 
     # Verify we have the correct number of references and each has the expected ID
     assert len(content_lines) == len(references)
@@ -1031,6 +1331,317 @@ async def test_claim_and_create_robot_enhancement_batch_returns_none_when_empty(
     mock_blob_repository.upload_file_to_blob_storage.assert_not_awaited()
 
 
+async def test_wait_for_robot_enhancement_batch_claims_when_notified(
+    fake_repository, fake_uow, test_robot
+):
+    """A waiting poll claims again as soon as the robot is notified."""
+    listener = NotificationListener("channel")
+    batch = RobotEnhancementBatch(robot_id=test_robot.id)
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), fake_uow(), fake_uow()
+    )
+
+    async def _claim(**_):
+        if service.claim_and_create_robot_enhancement_batch.await_count == 1:
+            # Pending enhancements are created while the poll is claiming.
+            listener._on_notification(None, 0, "channel", str(test_robot.id))  # noqa: SLF001
+            return None
+        return batch
+
+    service.claim_and_create_robot_enhancement_batch = AsyncMock(side_effect=_claim)
+
+    result = await asyncio.wait_for(
+        service.wait_for_robot_enhancement_batch(
+            robot_id=test_robot.id,
+            limit=10,
+            lease_duration=datetime.timedelta(minutes=5),
+            blob_repository=AsyncMock(),
+            access_control_service=ReferenceAccessControlService(),
+            wait=datetime.timedelta(minutes=1),
+            listener=listener,
+        ),
+        timeout=5,
+    )
+
+    assert result == batch
+    assert service.claim_and_create_robot_enhancement_batch.await_count == 2
+
+
+async def test_wait_for_robot_enhancement_batch_claims_again_at_deadline(
+    fake_repository, fake_uow, test_robot, monkeypatch
+):
+    """A poll that is never notified claims once more when its wait is up."""
+    from app.domain.references import service as reference_service_module
+
+    clock = [0.0]
+    waits = []
+
+    async def _wait_for(awaitable, remaining):
+        # The notification never comes, so the wait runs out its time.
+        awaitable.close()
+        waits.append(remaining)
+        clock[0] += remaining
+        raise TimeoutError
+
+    loop = SimpleNamespace(time=lambda: clock[0])
+    monkeypatch.setattr(
+        reference_service_module,
+        "asyncio",
+        SimpleNamespace(get_running_loop=lambda: loop, wait_for=_wait_for),
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), fake_uow(), fake_uow()
+    )
+    service.claim_and_create_robot_enhancement_batch = AsyncMock(return_value=None)
+
+    result = await service.wait_for_robot_enhancement_batch(
+        robot_id=test_robot.id,
+        limit=10,
+        lease_duration=datetime.timedelta(minutes=5),
+        blob_repository=AsyncMock(),
+        access_control_service=ReferenceAccessControlService(),
+        wait=datetime.timedelta(minutes=1),
+        listener=NotificationListener("channel"),
+    )
+
+    assert result is None
+    assert waits == [60]
+    assert service.claim_and_create_robot_enhancement_batch.await_count == 2
+
+
+def _pollable_pending_enhancements(fake_repository, pending_enhancements):
+    """Build a fake pending enhancement repository supporting robot polling."""
+
+    class FakePendingEnhancementRepository(fake_repository):
+        async def find_available_for_robot(self, robot_id, limit):
+            results = [
+                pe
+                for pe in self.repository.values()
+                if pe.robot_id == robot_id
+                and pe.robot_enhancement_batch_id is None
+                and pe.status == PendingEnhancementStatus.PENDING
+            ]
+            return results[:limit]
+
+    return FakePendingEnhancementRepository(init_entries=pending_enhancements)
+
+
+def _expirable_pending_enhancements(
+    fake_repository, pending_enhancements, batches=None
+):
+    """
+    Build a fake pending enhancement repository supporting lease expiry.
+
+    The ids of each expired batch are appended to ``batches``, if given.
+    """
+
+    class FakePendingEnhancementRepository(fake_repository):
+        async def expire_pending_enhancements_past_expiry(self, now, statuses, limit):
+            expired = sorted(
+                (
+                    pe
+                    for pe in self.repository.values()
+                    if pe.expires_at < now and pe.status in statuses
+                ),
+                key=lambda pe: pe.expires_at,
+            )[:limit]
+            for pe in expired:
+                pe.status = PendingEnhancementStatus.EXPIRED
+            if batches is not None:
+                batches.append([pe.id for pe in expired])
+            return expired
+
+    return FakePendingEnhancementRepository(init_entries=pending_enhancements)
+
+
+def _reference_data_blob_repository():
+    """Build a blob repository mock accepting reference data uploads."""
+    blob_repository = AsyncMock()
+    blob_repository.upload_file_to_blob_storage.return_value = BlobStorageFile(
+        location="minio",
+        container="test",
+        filename="batch.jsonl",
+        path="robot_enhancement_batch_reference_data",
+    )
+    blob_repository.destination = Mock(
+        return_value=BlobStorageFile(
+            location="minio",
+            container="test",
+            filename="batch_robot.jsonl",
+            path="robot_enhancement_batch_result_data",
+        )
+    )
+    return blob_repository
+
+
+@pytest.mark.asyncio
+async def test_prepare_robot_enhancement_batch(fake_repository, fake_uow, test_robot):
+    """A prepared batch reserves pending enhancements without leasing them."""
+    references = [Reference(id=uuid7(), duplicate_references=[]) for _ in range(2)]
+    pending_enhancements = [
+        PendingEnhancement(
+            reference_id=ref.id,
+            robot_id=test_robot.id,
+            enhancement_request_id=uuid7(),
+        )
+        for ref in references
+    ]
+    uow = fake_uow(
+        references=fake_repository(init_entries=references),
+        pending_enhancements=_pollable_pending_enhancements(
+            fake_repository, pending_enhancements
+        ),
+        robot_enhancement_batches=fake_repository(),
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+    blob_repository = _reference_data_blob_repository()
+
+    prepared = await service.prepare_robot_enhancement_batch(
+        robot_id=test_robot.id,
+        limit=10,
+        blob_repository=blob_repository,
+        access_control_service=ReferenceAccessControlService(),
+    )
+
+    assert prepared is not None
+    assert prepared.claimed_at is None
+    assert prepared.reference_data_file is not None
+    for pe in pending_enhancements:
+        assert pe.status == PendingEnhancementStatus.PENDING
+        assert pe.robot_enhancement_batch_id == prepared.id
+    blob_repository.upload_file_to_blob_storage.assert_awaited_once()
+
+    # The robot already has a prepared batch waiting.
+    assert (
+        await service.prepare_robot_enhancement_batch(
+            robot_id=test_robot.id,
+            limit=10,
+            blob_repository=blob_repository,
+            access_control_service=ReferenceAccessControlService(),
+        )
+        is None
+    )
+
+
+def _prepared_batch(robot_id, pending_enhancements, **kwargs):
+    """Build a prepared batch holding the given pending enhancements."""
+    batch = RobotEnhancementBatch(
+        robot_id=robot_id,
+        reference_data_file=BlobStorageFile(
+            location="minio",
+            container="test",
+            filename="batch.jsonl",
+            path="robot_enhancement_batch_reference_data",
+        ),
+        pending_enhancements=pending_enhancements,
+        created_at=utc_now(),
+        **kwargs,
+    )
+    for pe in pending_enhancements:
+        pe.robot_enhancement_batch_id = batch.id
+    return batch
+
+
+@pytest.mark.asyncio
+async def test_claim_and_create_robot_enhancement_batch_claims_prepared(
+    fake_repository, fake_uow, test_robot
+):
+    """A poll claims a suitable prepared batch without building a file."""
+    pending_enhancements = [
+        PendingEnhancement(
+            reference_id=uuid7(),
+            robot_id=test_robot.id,
+            enhancement_request_id=uuid7(),
+        )
+        for _ in range(2)
+    ]
+    prepared = _prepared_batch(test_robot.id, pending_enhancements)
+    uow = fake_uow(
+        pending_enhancements=_pollable_pending_enhancements(
+            fake_repository, pending_enhancements
+        ),
+        robot_enhancement_batches=fake_repository([prepared]),
+        robots=fake_repository([test_robot]),
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+    blob_repository = _reference_data_blob_repository()
+
+    claimed = await service.claim_and_create_robot_enhancement_batch(
+        robot_id=test_robot.id,
+        limit=10,
+        lease_duration=datetime.timedelta(minutes=5),
+        blob_repository=blob_repository,
+        access_control_service=ReferenceAccessControlService(),
+    )
+
+    assert claimed is not None
+    assert claimed.id == prepared.id
+    assert claimed.claimed_at is not None
+    for pe in pending_enhancements:
+        assert pe.status == PendingEnhancementStatus.PROCESSING
+        assert pe.expires_at is not None
+    blob_repository.upload_file_to_blob_storage.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("limit", "compression", "age"),
+    [
+        (1, None, datetime.timedelta()),
+        (10, ContentEncoding.GZIP, datetime.timedelta()),
+        (10, None, datetime.timedelta(days=1)),
+    ],
+)
+async def test_claim_and_create_robot_enhancement_batch_releases_unsuited_prepared(
+    fake_repository, fake_uow, test_robot, limit, compression, age
+):
+    """A prepared batch unsuited to the poll is released and a batch built."""
+    references = [Reference(id=uuid7(), duplicate_references=[]) for _ in range(2)]
+    pending_enhancements = [
+        PendingEnhancement(
+            reference_id=ref.id,
+            robot_id=test_robot.id,
+            enhancement_request_id=uuid7(),
+        )
+        for ref in references
+    ]
+    prepared = _prepared_batch(test_robot.id, pending_enhancements)
+    object.__setattr__(prepared, "created_at", utc_now() - age)
+    uow = fake_uow(
+        references=fake_repository(init_entries=references),
+        pending_enhancements=_pollable_pending_enhancements(
+            fake_repository, pending_enhancements
+        ),
+        robot_enhancement_batches=fake_repository([prepared]),
+        robots=fake_repository([test_robot]),
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+    blob_repository = _reference_data_blob_repository()
+
+    claimed = await service.claim_and_create_robot_enhancement_batch(
+        robot_id=test_robot.id,
+        limit=limit,
+        lease_duration=datetime.timedelta(minutes=5),
+        blob_repository=blob_repository,
+        access_control_service=ReferenceAccessControlService(),
+        compression=compression,
+    )
+
+    assert claimed is not None
+    assert claimed.id != prepared.id
+    assert prepared.id not in uow.robot_enhancement_batches.repository
+    # The released pending enhancements are available to the poll again.
+    assert pending_enhancements[0].robot_enhancement_batch_id == claimed.id
+    assert pending_enhancements[0].status == PendingEnhancementStatus.PROCESSING
+    blob_repository.upload_file_to_blob_storage.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_renew_robot_enhancement_batch_lease(
     fake_repository, fake_uow, test_robot
@@ -1100,19 +1711,7 @@ async def test_expire_and_replace_stale_pending_enhancements_no_expired(
         for _ in range(3)
     ]
 
-    class FakePendingEnhancementRepo(fake_repository):
-        async def expire_pending_enhancements_past_expiry(self, now, statuses):
-            """Atomically find and expire pending enhancements."""
-            expired = [
-                pe
-                for pe in self.repository.values()
-                if pe.expires_at < now and pe.status in statuses
-            ]
-            for pe in expired:
-                pe.status = PendingEnhancementStatus.EXPIRED
-            return expired
-
-    repo = FakePendingEnhancementRepo(init_entries=pending_enhancements)
+    repo = _expirable_pending_enhancements(fake_repository, pending_enhancements)
     uow = fake_uow(pending_enhancements=repo)
     service = ReferenceService(
         ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
@@ -1173,24 +1772,7 @@ async def test_expire_and_replace_stale_pending_enhancements_with_expired(
 
     all_enhancements = [*expired_enhancements, non_expired, pending_past_expiry]
 
-    class FakePendingEnhancementRepo(fake_repository):
-        async def get_retry_depths(self, ids):
-            """No previous retries, so depth is 0 for all."""
-            return {pe_id: 0 for pe_id in ids}
-
-        async def expire_pending_enhancements_past_expiry(self, now, statuses):
-            """Atomically find and expire pending enhancements."""
-            expired = [
-                pe
-                for pe in self.repository.values()
-                if pe.expires_at < now and pe.status in statuses
-            ]
-            # Update status to EXPIRED for matched records
-            for pe in expired:
-                pe.status = PendingEnhancementStatus.EXPIRED
-            return expired
-
-    repo = FakePendingEnhancementRepo(init_entries=all_enhancements)
+    repo = _expirable_pending_enhancements(fake_repository, all_enhancements)
     uow = fake_uow(pending_enhancements=repo)
     service = ReferenceService(
         ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
@@ -1236,6 +1818,7 @@ async def test_expire_and_replace_stale_pending_enhancements_with_expired(
         assert new_pe.enhancement_request_id == enhancement_request_id
         assert new_pe.source == "test-source"
         assert new_pe.status == PendingEnhancementStatus.PENDING
+        assert new_pe.retry_depth == 1
 
 
 @pytest.mark.asyncio
@@ -1339,8 +1922,108 @@ async def test_make_duplicate_decisions_reapplies_side_effects_for_old_canonical
 
     assert len(results) == 1
     assert mock_side_effects.await_count == 2
-    mock_side_effects.assert_any_await(new_decision, decision_changed=True)
-    mock_side_effects.assert_any_await(old_canonical_decision, decision_changed=True)
+    mock_side_effects.assert_any_await(
+        new_decision, decision_changed=True, automation_triggers=ANY
+    )
+    mock_side_effects.assert_any_await(
+        old_canonical_decision, decision_changed=True, automation_triggers=ANY
+    )
+
+
+@pytest.mark.asyncio
+async def test_make_duplicate_decisions_dispatches_automations_together(
+    fake_repository, fake_uow
+):
+    """Changed decisions are percolated in one detection, each with its source."""
+    decisions = [
+        ReferenceDuplicateDecision(
+            reference_id=uuid7(),
+            duplicate_determination=DuplicateDetermination.CANONICAL,
+            active_decision=True,
+        )
+        for _ in range(2)
+    ]
+    references = {
+        decision.reference_id: ReferenceWithChangeset(
+            id=decision.reference_id,
+            changeset=Reference(id=decision.reference_id),
+        )
+        for decision in decisions
+    }
+
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), fake_uow(), fake_uow()
+    )
+    service._synchronizer = Mock()  # noqa: SLF001
+    service._synchronizer.references.sql_to_es = AsyncMock()  # noqa: SLF001
+    mock_dispatch = AsyncMock()
+
+    with (
+        patch.object(
+            service._deduplication_service,  # noqa: SLF001
+            "map_duplicate_decision",
+            AsyncMock(side_effect=lambda d, **kw: (d, True, None)),  # noqa: ARG005
+        ),
+        patch.object(
+            service,
+            "_get_canonical_reference_with_implied_changeset",
+            AsyncMock(side_effect=references.__getitem__),
+        ),
+        patch.object(service, "_detect_and_dispatch_robot_automations", mock_dispatch),
+    ):
+        await service.make_duplicate_decisions(decisions)
+
+    mock_dispatch.assert_awaited_once_with(
+        references=list(references.values()),
+        reference_sources={
+            decision.reference_id: f"DuplicateDecision:{decision.id}"
+            for decision in decisions
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_expire_and_replace_stale_pending_enhancements_in_batches(
+    fake_repository, fake_uow, test_robot, monkeypatch
+):
+    """The sweep commits each batch and carries on until none are left."""
+    monkeypatch.setattr(
+        "app.domain.references.service.settings.pending_enhancement_expiry_batch_size",
+        2,
+    )
+    expired_enhancements = [
+        PendingEnhancement(
+            reference_id=uuid7(),
+            robot_id=test_robot.id,
+            source="test-source",
+            status=PendingEnhancementStatus.PROCESSING,
+            expires_at=utc_now() - datetime.timedelta(minutes=minutes),
+        )
+        for minutes in range(5, 0, -1)
+    ]
+    batches = []
+
+    uow = fake_uow(
+        pending_enhancements=_expirable_pending_enhancements(
+            fake_repository, expired_enhancements, batches=batches
+        )
+    )
+    uow.commit = AsyncMock()
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
+    )
+
+    result = await service.expire_and_replace_stale_pending_enhancements()
+
+    assert result == {"expired": 5, "replaced_with": 5}
+    # Longest-lapsed first; the short last batch ends the sweep.
+    assert batches == [
+        [pe.id for pe in expired_enhancements[:2]],
+        [pe.id for pe in expired_enhancements[2:4]],
+        [expired_enhancements[4].id],
+    ]
+    # One commit per batch, then the unit of work's own.
+    assert uow.commit.await_count == 4
 
 
 @pytest.mark.asyncio
@@ -1357,6 +2040,7 @@ async def test_expire_and_replace_stale_pending_enhancements_at_retry_limit(
         source="test-source",
         status=PendingEnhancementStatus.PROCESSING,
         expires_at=past_expiry,
+        retry_depth=1,
     )
 
     expired_at_limit = PendingEnhancement(
@@ -1366,6 +2050,7 @@ async def test_expire_and_replace_stale_pending_enhancements_at_retry_limit(
         source="test-source",
         status=PendingEnhancementStatus.PROCESSING,
         expires_at=past_expiry,
+        retry_depth=3,
     )
 
     expired_over_limit = PendingEnhancement(
@@ -1375,33 +2060,12 @@ async def test_expire_and_replace_stale_pending_enhancements_at_retry_limit(
         source="test-source",
         status=PendingEnhancementStatus.PROCESSING,
         expires_at=past_expiry,
+        retry_depth=4,
     )
 
     all_enhancements = [expired_low_depth, expired_at_limit, expired_over_limit]
 
-    # Create repository that returns different retry depths
-    class FakePendingEnhancementRepo(fake_repository):
-        async def get_retry_depths(self, ids):
-            """Return different depths based on ID."""
-            depth_by_id = {
-                expired_low_depth.id: 1,  # Below limit
-                expired_at_limit.id: 3,  # At limit
-                expired_over_limit.id: 4,  # Over limit
-            }
-            return {pe_id: depth_by_id[pe_id] for pe_id in ids}
-
-        async def expire_pending_enhancements_past_expiry(self, now, statuses):
-            """Atomically find and expire pending enhancements."""
-            expired = [
-                pe
-                for pe in self.repository.values()
-                if pe.expires_at < now and pe.status in statuses
-            ]
-            for pe in expired:
-                pe.status = PendingEnhancementStatus.EXPIRED
-            return expired
-
-    repo = FakePendingEnhancementRepo(init_entries=all_enhancements)
+    repo = _expirable_pending_enhancements(fake_repository, all_enhancements)
     uow = fake_uow(pending_enhancements=repo)
     service = ReferenceService(
         ReferenceAntiCorruptionService(fake_repository()), uow, fake_uow()
@@ -1428,6 +2092,7 @@ async def test_expire_and_replace_stale_pending_enhancements_at_retry_limit(
     ]
     assert len(new_pending) == 1
     assert new_pending[0].retry_of == expired_low_depth.id
+    assert new_pending[0].retry_depth == 2
 
     warning_logs = [
         record
@@ -1651,3 +2316,252 @@ async def test_collect_search_enhancement_request_marks_failed_on_error(
     stored = fake_requests.get_first_record()
     assert stored.search_status == EnhancementRequestSearchStatus.FAILED
     assert "boom" in stored.error
+
+
+def _payload_hit(reference: Reference, *, has_full_text: bool = False) -> ESHit:
+    return ESHit(
+        id=reference.id,
+        document=ReferenceSearchProjection(
+            id=reference.id,
+            visibility=reference.visibility,
+            search_fields=ReferenceSearchFields(),
+            sdk_payload=json.dumps({"id": str(reference.id), "from": "payload"}),
+            has_full_text=has_full_text,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookup_references_in_bulk(
+    fake_repository, fake_uow, canonical_reference, get_duplicate_reference
+):
+    """Results follow the request order, resolving duplicates and marking misses."""
+    duplicate = get_duplicate_reference(canonical_reference.id)
+    other = Reference(id=uuid7(), duplicate_references=[])
+    references = fake_repository([canonical_reference, duplicate, other])
+    references.resolve_identifiers = AsyncMock(
+        return_value=[
+            [duplicate.id, canonical_reference.id],
+            [],
+            [other.id, canonical_reference.id],
+        ]
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()),
+        fake_uow(references=references),
+        fake_uow(),
+    )
+    doi = IdentifierLookup(identifier="10.1234/example.doi", identifier_type="doi")
+    by_id = IdentifierLookup(identifier=str(other.id), identifier_type=None)
+    missing = IdentifierLookup(identifier="10.1234/missing", identifier_type="doi")
+    shared = IdentifierLookup(identifier="123456", identifier_type="pm_id")
+    unknown_id = IdentifierLookup(identifier=str(uuid7()), identifier_type=None)
+
+    results = [
+        (identifier, reference.id if reference else None)
+        async for identifier, reference in service.lookup_references_in_bulk(
+            [doi, by_id, missing, shared, unknown_id], chunk_size=2
+        )
+    ]
+
+    assert results == [
+        (doi, canonical_reference.id),
+        (by_id, other.id),
+        (missing, None),
+        (shared, other.id),
+        (shared, canonical_reference.id),
+        (unknown_id, None),
+    ]
+    references.resolve_identifiers.assert_awaited_once_with([doi, missing, shared])
+
+
+@pytest.mark.asyncio
+async def test_render_search_hits_hydrates_only_hits_without_payload(
+    fake_repository, fake_uow
+):
+    """Hits with a payload skip the database; the rest are hydrated in order."""
+    with_payload = Reference(id=uuid7(), duplicate_references=[])
+    without_payload = Reference(id=uuid7(), duplicate_references=[])
+    references = fake_repository(init_entries=[without_payload])
+    references.get_by_pks = AsyncMock(wraps=references.get_by_pks)
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()),
+        fake_uow(references=references),
+        fake_uow(),
+    )
+    search_result = ESSearchResult(
+        hits=[ESHit(id=without_payload.id), _payload_hit(with_payload)],
+        total=ESSearchTotal(value=2, relation="eq"),
+        page=1,
+    )
+
+    rendered = await service.render_search_hits(
+        search_result, ReferenceAccessControlService()
+    )
+
+    assert [json.loads(payload)["id"] for payload in rendered] == [
+        str(without_payload.id),
+        str(with_payload.id),
+    ]
+    assert json.loads(rendered[1])["from"] == "payload"
+    assert references.get_by_pks.await_args.args[0] == [without_payload.id]
+
+
+@pytest.mark.asyncio
+async def test_render_search_hits_hydrates_full_text_for_entitled_principals(
+    fake_repository, fake_uow
+):
+    """The payload omits full text, so only principals who may see it hydrate."""
+    reference = Reference(id=uuid7(), duplicate_references=[])
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()),
+        fake_uow(references=fake_repository(init_entries=[reference])),
+        fake_uow(),
+    )
+    search_result = ESSearchResult(
+        hits=[_payload_hit(reference, has_full_text=True)],
+        total=ESSearchTotal(value=1, relation="eq"),
+        page=1,
+    )
+
+    unentitled = await service.render_search_hits(
+        search_result, ReferenceAccessControlService()
+    )
+    entitled = await service.render_search_hits(
+        search_result,
+        ReferenceAccessControlService(frozenset({Entitlement.FULL_TEXT})),
+    )
+
+    assert json.loads(unentitled[0])["from"] == "payload"
+    assert "from" not in json.loads(entitled[0])
+
+
+@pytest.mark.asyncio
+async def test_store_full_texts_copies_concurrently_within_limit(
+    fake_repository, fake_uow, monkeypatch
+):
+    """Full texts are copied concurrently, bounded, dropping those that fail."""
+    monkeypatch.setattr(
+        "app.domain.references.service.settings.full_text_copy_concurrency", 2
+    )
+    full_texts = [
+        EnhancementFactory.build(content=FullTextEnhancementFactory.build())
+        for _ in range(5)
+    ]
+    other = EnhancementFactory.build(
+        content=BibliographicMetadataEnhancementFactory.build()
+    )
+    reference = Reference(
+        id=uuid7(), enhancements=[full_texts[0], other, *full_texts[1:]]
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()), fake_uow(), fake_uow()
+    )
+
+    in_flight = peak = 0
+
+    async def store_full_text(enhancement, _blob_repository, *, defer):
+        nonlocal in_flight, peak
+        assert defer is False
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if enhancement is full_texts[2]:
+            msg = "publisher is down"
+            raise FullTextDownloadError(msg)
+
+    monkeypatch.setattr(
+        service._enhancement_service,  # noqa: SLF001
+        "store_full_text",
+        store_full_text,
+    )
+
+    errors = await service._store_full_texts(reference, Mock())  # noqa: SLF001
+
+    assert peak == 2
+    assert errors == ["publisher is down"]
+    assert reference.enhancements == [
+        full_texts[0],
+        other,
+        full_texts[1],
+        full_texts[3],
+        full_texts[4],
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("remaining_retries", "requeued"), [(2, True), (0, False)])
+async def test_remove_unstored_full_text_requeues_until_committed(
+    fake_repository, fake_uow, monkeypatch, remaining_retries, requeued
+):
+    """An enhancement not yet committed has its removal queued again."""
+    enhancement_id, reference_id = uuid7(), uuid7()
+    enhancements = Mock()
+    enhancements.wait_for_pk = AsyncMock(
+        side_effect=SQLNotFoundError(
+            detail="Not found",
+            lookup_model="Enhancement",
+            lookup_type="id",
+            lookup_value=enhancement_id,
+        )
+    )
+    enhancements.delete_by_pk = AsyncMock()
+    mock_queue = AsyncMock()
+    monkeypatch.setattr(
+        "app.domain.references.service.queue_task_with_trace", mock_queue
+    )
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()),
+        fake_uow(enhancements=enhancements),
+        fake_uow(),
+    )
+
+    await service.remove_unstored_full_text(
+        enhancement_id, reference_id, remaining_retries=remaining_retries
+    )
+
+    enhancements.delete_by_pk.assert_not_awaited()
+    if requeued:
+        mock_queue.assert_awaited_once_with(
+            ("app.domain.references.tasks", "remove_unstored_full_text"),
+            enhancement_id=enhancement_id,
+            reference_id=reference_id,
+            remaining_retries=remaining_retries - 1,
+            otel_enabled=ANY,
+        )
+    else:
+        mock_queue.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_backfill_enhancement_content_hashes(fake_repository, fake_uow):
+    """A page's hashes are recorded once per reference and content, in ID order."""
+    reference_id = uuid7()
+    original, other = (
+        EnhancementFactory.build(reference_id=reference_id) for _ in range(2)
+    )
+    duplicate = original.model_copy(update={"id": uuid7()})
+    enhancements = Mock()
+    enhancements.get_unhashed_page = AsyncMock(
+        side_effect=[[original, duplicate, other], [other]]
+    )
+    enhancements.set_content_hashes = AsyncMock(return_value=2)
+    service = ReferenceService(
+        ReferenceAntiCorruptionService(fake_repository()),
+        fake_uow(enhancements=enhancements),
+        fake_uow(),
+    )
+
+    next_after_id = await service.backfill_enhancement_content_hashes(
+        after_id=None, limit=3
+    )
+
+    assert next_after_id == other.id
+    enhancements.set_content_hashes.assert_awaited_once_with(
+        {original.id: original.content_hash, other.id: other.content_hash}
+    )
+    assert (
+        await service.backfill_enhancement_content_hashes(after_id=other.id, limit=3)
+        is None
+    )
@@ -1,6 +1,6 @@
 """Unit tests for the tasks module in the references domain."""
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid7
 
 import pytest
@@ -11,8 +11,6 @@ from app.core.entitlements import Entitlement
 from app.core.exceptions import SQLIntegrityError
 from app.domain.references.models.models import (
     DuplicateDetermination,
-    EnhancementRequest,
-    PendingEnhancementStatus,
     Reference,
     ReferenceDuplicateDecision,
     ReferenceWithChangeset,
@@ -27,12 +25,13 @@ from app.domain.references.services.anti_corruption_service import (
 from app.domain.references.services.enhancement_service import ProcessedResults
 from app.domain.references.services.export_service import SearchExportService
 from app.domain.references.tasks import (
+    prepare_robot_enhancement_batch,
     process_reference_duplicate_decision,
     run_search_export_task,
     validate_and_import_robot_enhancement_batch_result,
 )
 from app.domain.robots.models.models import Robot
-from app.persistence.blob.models import BlobStorageFile
+from app.persistence.blob.models import BlobStorageFile, ContentEncoding
 from app.tasks import broker
 
 
@@ -45,20 +44,7 @@ async def test_robot_automations(monkeypatch, fake_uow, fake_repository):
     in_enhancement_ids = {uuid7(), uuid7()}
     robot_id = uuid7()
 
-    expected_request = EnhancementRequest(
-        reference_ids=[reference.id],
-        robot_id=robot_id,
-        id=uuid7(),
-        status="RECEIVED",
-        source="test_source",
-    )
-    mock_create_pending_enhancements = AsyncMock(return_value=expected_request)
-    monkeypatch.setattr(
-        ReferenceService,
-        "_create_pending_enhancements",
-        mock_create_pending_enhancements,
-    )
-
+    pending_enhancements = fake_repository()
     mock_detect_robot_automations = AsyncMock(
         return_value=[
             RobotAutomationPercolationResult(
@@ -73,21 +59,23 @@ async def test_robot_automations(monkeypatch, fake_uow, fake_repository):
     )
 
     await ReferenceService(
-        ReferenceAntiCorruptionService(fake_repository), fake_uow(), fake_uow()
+        ReferenceAntiCorruptionService(fake_repository),
+        fake_uow(pending_enhancements=pending_enhancements),
+        fake_uow(),
     ).detect_and_dispatch_robot_automations(
         reference=reference,
         enhancement_ids=in_enhancement_ids,
         source_str="test_source",
     )
 
-    mock_create_pending_enhancements.assert_awaited_once()
-    assert set(mock_create_pending_enhancements.call_args[1]["reference_ids"]) == {
-        reference.id
-    }
-    assert mock_create_pending_enhancements.call_args[1]["robot_id"] == robot_id
-    assert mock_create_pending_enhancements.call_args[1]["source"] == "test_source"
+    created = await pending_enhancements.get_all()
+    assert [
+        (pending_enhancement.reference_id, pending_enhancement.robot_id)
+        for pending_enhancement in created
+    ] == [(reference.id, robot_id)]
+    assert created[0].source == "test_source"
     mock_detect_robot_automations.assert_awaited_once_with(
-        reference=reference, enhancement_ids=in_enhancement_ids
+        references=[reference], enhancement_ids=in_enhancement_ids
     )
 
 
@@ -191,35 +179,10 @@ async def test_validate_and_import_robot_enhancement_batch_result(monkeypatch):
     assert call_kwargs["source_str"] == expected_source
     assert call_kwargs["skip_robot_id"] == robot_id
 
-    status_calls = (
-        mock_reference_service.update_pending_enhancements_status.call_args_list
-    )
-
-    assert len(status_calls) == 4
-
-    failed_call = status_calls[0]
-    assert failed_call[1]["pending_enhancement_ids"] == list(
-        failed_pending_enhancement_ids
-    )
-    assert failed_call[1]["status"] == PendingEnhancementStatus.FAILED
-
-    discarded_call = status_calls[1]
-    assert discarded_call[1]["pending_enhancement_ids"] == list(
-        discarded_pending_enhancement_ids
-    )
-    assert discarded_call[1]["status"] == PendingEnhancementStatus.DISCARDED
-
-    indexing_call = status_calls[2]
-    assert indexing_call[1]["pending_enhancement_ids"] == list(
-        successful_pending_enhancement_ids
-    )
-    assert indexing_call[1]["status"] == PendingEnhancementStatus.INDEXING
-
-    completed_call = status_calls[3]
-    assert completed_call[1]["pending_enhancement_ids"] == list(
-        successful_pending_enhancement_ids
-    )
-    assert completed_call[1]["status"] == PendingEnhancementStatus.COMPLETED
+    # Pending enhancements are updated and references indexed chunk by chunk
+    # while the result is imported.
+    mock_reference_service.update_pending_enhancements_status.assert_not_awaited()
+    mock_reference_service.index_references.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -269,34 +232,20 @@ async def test_validate_and_import_robot_enhancement_batch_result_handles_except
     )
 
 
-@pytest.mark.usefixtures("mock_sql_uow_cm", "mock_es_uow_cm")
 @pytest.mark.asyncio
-async def test_validate_and_import_robot_enhancement_batch_result_indexing_failure(
-    monkeypatch,
-):
-    """Test that indexing failures are properly handled without failing the batch."""
-    robot_enhancement_batch_id = uuid7()
-
+@pytest.mark.usefixtures("mock_sql_uow_cm", "mock_es_uow_cm")
+async def test_prepare_robot_enhancement_batch(monkeypatch):
+    """The batch is prepared with the robot's own entitlements."""
+    robot_id = uuid7()
     mock_reference_service = AsyncMock()
-
-    mock_batch = AsyncMock()
-    mock_batch.id = robot_enhancement_batch_id
-    mock_batch.robot_id = uuid7()
-    mock_batch.pending_enhancements = [AsyncMock(reference_id=uuid7())]
-    mock_reference_service.get_robot_enhancement_batch.return_value = mock_batch
-
-    validate_method = (
-        mock_reference_service.validate_and_import_robot_enhancement_batch_result
-    )
-    validate_method.return_value = ProcessedResults(
-        {uuid7()},  # imported_enhancement_ids
-        {uuid7()},  # successful_pending_enhancement_ids
-        set(),  # failed_pending_enhancement_ids
-        set(),  # discarded_pending_enhancement_ids
+    mock_robot_service = AsyncMock()
+    mock_robot_service.get_robot_standalone.return_value = Robot(
+        id=robot_id,
+        name="robot",
+        description="a robot",
+        owner="owner",
+        entitlements=frozenset({Entitlement.FULL_TEXT}),
     )
-
-    mock_reference_service.index_references.side_effect = Exception("Indexing failed")
-
     monkeypatch.setattr(
         "app.domain.references.tasks.get_blob_repository",
         AsyncMock(return_value=AsyncMock()),
@@ -306,31 +255,21 @@ async def test_validate_and_import_robot_enhancement_batch_result_indexing_failu
         AsyncMock(return_value=mock_reference_service),
     )
     monkeypatch.setattr(
-        "app.domain.references.service.ReferenceService.detect_and_dispatch_robot_automations",
-        AsyncMock(return_value=[]),
+        "app.domain.references.tasks.get_robot_service",
+        AsyncMock(return_value=mock_robot_service),
     )
 
-    await validate_and_import_robot_enhancement_batch_result(robot_enhancement_batch_id)
-
-    mock_reference_service.index_references.assert_awaited_once()
-    mock_reference_service.mark_robot_enhancement_batch_failed.assert_not_called()
-
-    status_calls = (
-        mock_reference_service.update_pending_enhancements_status.call_args_list
+    await prepare_robot_enhancement_batch(
+        robot_id, limit=100, compression=ContentEncoding.GZIP
     )
-    assert len(status_calls) == 4
-
-    failed_call = status_calls[0]
-    assert failed_call[1]["pending_enhancement_ids"] == []
-    assert failed_call[1]["status"] == PendingEnhancementStatus.FAILED
-
-    indexing_call = status_calls[2]
-    assert len(indexing_call[1]["pending_enhancement_ids"]) == 1
-    assert indexing_call[1]["status"] == PendingEnhancementStatus.INDEXING
 
-    indexing_failed_call = status_calls[3]
-    assert len(indexing_failed_call[1]["pending_enhancement_ids"]) == 1
-    assert indexing_failed_call[1]["status"] == PendingEnhancementStatus.INDEXING_FAILED
+    prepare = mock_reference_service.prepare_robot_enhancement_batch
+    prepare.assert_awaited_once()
+    call_kwargs = prepare.call_args.kwargs
+    assert call_kwargs["robot_id"] == robot_id
+    assert call_kwargs["limit"] == 100
+    assert call_kwargs["compression"] == ContentEncoding.GZIP
+    assert call_kwargs["access_control_service"].may_read_full_text
 
 
 class TestProcessReferenceDuplicateDecisionRaceCondition:
@@ -603,16 +542,16 @@ async def test_run_search_export_task_skips_non_pending_row(
     await session.commit()
     export_id = export.id
 
-    collect_mock = AsyncMock()
+    pages_mock = MagicMock()
     stream_mock = AsyncMock()
-    monkeypatch.setattr(SearchExportService, "_collect_search_export_ids", collect_mock)
+    monkeypatch.setattr(SearchExportService, "_reference_id_pages", pages_mock)
     monkeypatch.setattr(SearchExportService, "stream_export_file", stream_mock)
 
     assert isinstance(broker, InMemoryBroker)
     await run_search_export_task.kiq(search_export_id=export_id, entitlements=[])
     await broker.wait_all()
 
-    collect_mock.assert_not_awaited()
+    pages_mock.assert_not_called()
     stream_mock.assert_not_awaited()
 
     await session.refresh(export)
@@ -2,26 +2,45 @@
 Unit tests for the blob module (repository, client, models, stream).
 """
 
+import asyncio
+import gzip
 import hashlib
 import logging
 import types
 from io import BytesIO
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-
-from app.core.config import AzureBlobConfig
-from app.core.exceptions import BlobSizeExceededError, BlobStorageError
+import tenacity
+from azure.core.exceptions import (
+    HttpResponseError,
+    ResourceNotFoundError,
+    ServiceResponseError,
+)
+from pydantic import HttpUrl
+
+from app.core.config import AzureBlobConfig, MinioConfig
+from app.core.exceptions import (
+    AzureBlobStorageError,
+    BlobIntegrityError,
+    BlobSizeExceededError,
+    BlobStorageError,
+)
 from app.persistence.blob.client import GenericBlobStorageClient
+from app.persistence.blob.clients import azure as azure_blob
 from app.persistence.blob.clients.azure import AzureBlobStorageClient
+from app.persistence.blob.clients.minio import MinioBlobStorageClient
+from app.persistence.blob.compression import compress_bytes, decompress_chunks
 from app.persistence.blob.models import (
     BlobContainer,
     BlobSignedUrlType,
     BlobStorageFile,
     BlobStorageLocation,
+    ContentEncoding,
     infer_content_type,
 )
 from app.persistence.blob.repository import BlobRepository, _BlobClientRegistry
+from app.persistence.blob.signed_url_cache import SignedUrlCache
 from app.persistence.blob.stream import FileStream
 
 
@@ -61,6 +80,14 @@ async def test_stream_file_from_blob_storage():
             assert lines == ["dummy"]
 
 
+@pytest.mark.asyncio
+async def test_read_file_joins_raw_chunks():
+    repo = BlobRepository()
+    dummy_client = DummyClient()
+    with patch.object(repo, "_preload_config", return_value=dummy_client):
+        assert await repo.read_file(_AZURE_FILE) == b"dummy"
+
+
 @pytest.mark.asyncio
 async def test_get_signed_url():
     repo = BlobRepository()
@@ -117,6 +144,8 @@ async def test_filestream_stream_and_read_gen():
         ("file.unknown", "application/octet-stream"),
         ("noextension", "application/octet-stream"),
         ("MIXED.Pdf", "application/pdf"),
+        ("export.jsonl.gz", "application/gzip"),
+        ("export.ris.zst", "application/zstd"),
     ],
 )
 def test_infer_content_type(filename, expected_content_type):
@@ -310,6 +339,40 @@ async def test_copy_aborts_when_max_bytes_exceeded():
         await repo.copy(source, destination, max_bytes=150)
 
 
+@pytest.mark.parametrize("matches", [True, False])
+@pytest.mark.asyncio
+async def test_copy_checks_expected_sha256_before_last_chunk(matches):
+    """A mismatching copy fails before its final chunk reaches the destination."""
+    payload_chunks = [b"first", b"second", b"last"]
+    digest = hashlib.sha256(b"".join(payload_chunks)).hexdigest()
+
+    source = BlobStorageFile.from_uri("https://example.com/foo.pdf")
+    destination = BlobStorageFile(
+        location=BlobStorageLocation.MINIO,
+        container="full-texts",
+        path="p",
+        filename="foo.pdf",
+    )
+    src_client = _RecordingClient(chunks=payload_chunks)
+    dest_client = _RecordingClient()
+
+    repo = BlobRepository()
+    with patch.object(
+        repo,
+        "_preload_config",
+        side_effect=lambda f: src_client if f is source else dest_client,
+    ):
+        if matches:
+            result = await repo.copy(source, destination, expected_sha256=digest)
+            assert result.sha256_checksum == digest
+            assert dest_client.uploaded_chunks == payload_chunks
+        else:
+            with pytest.raises(BlobIntegrityError, match="expected 'f+'"):
+                await repo.copy(source, destination, expected_sha256="f" * 64)
+            assert dest_client.uploaded_chunks == [b"first", b"second"]
+            assert dest_client.uploaded_to is None
+
+
 @pytest.mark.asyncio
 async def test_copy_max_bytes_none_disables_check():
     """A None max_bytes does not enforce any cap."""
@@ -352,6 +415,53 @@ async def test_copy_rejects_destination_on_other_backend():
         await repo.copy(source, destination)
 
 
+@pytest.mark.asyncio
+async def test_filestream_compresses_stream():
+    async def fake_gen():
+        yield ["one", "two"]
+        yield ["three"]
+
+    fs = FileStream(generator=fake_gen(), compression=ContentEncoding.GZIP)
+    result = await fs.read()
+    assert gzip.decompress(result.getvalue()) == b"one\ntwo\nthree\n"
+
+
+@pytest.mark.asyncio
+async def test_upload_compressed_filestream_records_encoding():
+    async def fake_gen():
+        yield "line"
+
+    repo = BlobRepository()
+    dummy_client = DummyClient()
+    with patch.object(repo, "_preload_config", return_value=dummy_client):
+        result = await repo.upload_file_to_blob_storage(
+            content=FileStream(generator=fake_gen(), compression=ContentEncoding.GZIP),
+            path="test/path",
+            filename="export.jsonl",
+        )
+    assert result.filename == "export.jsonl.gz"
+    assert result.content_encoding == ContentEncoding.GZIP
+    assert BlobStorageFile.from_uri(result.to_uri()).content_encoding == (
+        ContentEncoding.GZIP
+    )
+
+
+@pytest.mark.parametrize(
+    ("filename", "expected_encoding"),
+    [
+        ("export.jsonl", None),
+        ("export.jsonl.gz", ContentEncoding.GZIP),
+        ("export.ris.ZST", ContentEncoding.ZSTD),
+        ("noextension", None),
+    ],
+)
+def test_blobstoragefile_content_encoding(filename, expected_encoding):
+    file = BlobStorageFile(
+        location=BlobStorageLocation.MINIO, container="c", path="p", filename=filename
+    )
+    assert file.content_encoding == expected_encoding
+
+
 _STREAM_FILE = BlobStorageFile(
     location=BlobStorageLocation.MINIO,
     container="c",
@@ -377,6 +487,66 @@ async def test_stream_file_splits_lines_across_chunks():
     assert lines == ["one", "two", "three"]
 
 
+@pytest.mark.asyncio
+async def test_stream_file_decompresses_gzip():
+    """Compressed content is detected and decompressed, regardless of filename."""
+    compressed = gzip.compress("one\ncafé\n".encode())
+    # Split inside the gzip header, before the encoding can be sniffed.
+    client = _RecordingClient(chunks=[compressed[:1], compressed[1:9], compressed[9:]])
+    lines = [line async for line in client.stream_file(_STREAM_FILE)]
+    assert lines == ["one", "café"]
+
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_decompress_chunks_handles_concatenated_members():
+    content = gzip.compress(b"one\n") + gzip.compress(b"two\n")
+    result = b"".join([chunk async for chunk in decompress_chunks(_chunks(content))])
+    assert result == b"one\ntwo\n"
+
+
+@pytest.mark.asyncio
+async def test_decompress_chunks_passes_through_uncompressed():
+    result = [chunk async for chunk in decompress_chunks(_chunks(b"a", b"bcd", b"e"))]
+    assert b"".join(result) == b"abcde"
+
+
+@pytest.mark.asyncio
+async def test_decompress_chunks_rejects_truncated_stream():
+    truncated = gzip.compress(b"one\ntwo\n")[:-4]
+    with pytest.raises(BlobStorageError, match="ended before it was complete"):
+        _ = [chunk async for chunk in decompress_chunks(_chunks(truncated))]
+
+
+@pytest.mark.asyncio
+async def test_zstd_round_trip():
+    pytest.importorskip("compression.zstd")
+
+    async def fake_gen():
+        yield ["one", "two"]
+
+    fs = FileStream(generator=fake_gen(), compression=ContentEncoding.ZSTD)
+    compressed = (await fs.read()).getvalue()
+    result = b"".join([chunk async for chunk in decompress_chunks(_chunks(compressed))])
+    assert result == b"one\ntwo\n"
+
+
+@pytest.mark.asyncio
+async def test_compress_bytes_blocks_concatenate():
+    blocks = [
+        await compress_bytes(block, ContentEncoding.GZIP)
+        for block in (b"one\n", b"two\n")
+    ]
+    result = b"".join(
+        [chunk async for chunk in decompress_chunks(_chunks(b"".join(blocks)))]
+    )
+    assert result == b"one\ntwo\n"
+
+
 class DummyClient(GenericBlobStorageClient):
     async def upload_file(self, content, file, content_type=None):
         self.uploaded = (content, file, content_type)
@@ -413,6 +583,100 @@ async def test_generic_blob_storage_client_interface():
     assert url.startswith("http://signed/")
 
 
+@pytest.mark.asyncio
+async def test_generic_blob_storage_client_rejects_staged_uploads_by_default():
+    file = BlobStorageFile(
+        location=BlobStorageLocation.AZURE, container="c", path="p", filename="f.txt"
+    )
+    with pytest.raises(BlobStorageError, match="does not support staged uploads"):
+        await DummyClient().stage_block(file, 0, b"block")
+    with pytest.raises(BlobStorageError, match="does not support staged uploads"):
+        await DummyClient().commit_blocks(file, 1)
+
+
+class _CountingSigner(DummyClient):
+    def __init__(self) -> None:
+        self.signed: list[tuple[str, BlobSignedUrlType]] = []
+
+    async def generate_signed_url(
+        self, file, interaction_type, content_disposition=None
+    ):
+        self.signed.append((file.filename, interaction_type))
+        return f"http://signed/{file.filename}/{interaction_type}/{len(self.signed)}"
+
+
+def _minio_file(filename: str) -> BlobStorageFile:
+    return BlobStorageFile(
+        location=BlobStorageLocation.MINIO,
+        container="test-container",
+        path="test/path",
+        filename=filename,
+    )
+
+
+@pytest.fixture
+def signed_url_cache():
+    cache = SignedUrlCache(
+        enabled=True, max_entries=16, expiry_seconds=3600, min_remaining_seconds=600
+    )
+    with patch(
+        "app.persistence.blob.repository.get_signed_url_cache", return_value=cache
+    ):
+        yield cache
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("signed_url_cache")
+async def test_get_signed_url_reuses_cached_url():
+    repo = BlobRepository()
+    signer = _CountingSigner()
+    file = _minio_file("test.txt")
+    with patch.object(repo, "_preload_config", return_value=signer):
+        first = await repo.get_signed_url(file, BlobSignedUrlType.DOWNLOAD)
+        second = await repo.get_signed_url(file, BlobSignedUrlType.DOWNLOAD)
+        upload = await repo.get_signed_url(file, BlobSignedUrlType.UPLOAD)
+        inline = await repo.get_signed_url(file, BlobSignedUrlType.DOWNLOAD, None)
+
+    assert first == second
+    assert len({str(first), str(upload), str(inline)}) == 3
+    assert len(signer.signed) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("signed_url_cache")
+async def test_get_signed_urls_dedupes_and_preserves_order():
+    repo = BlobRepository()
+    signer = _CountingSigner()
+    a, b = _minio_file("a.txt"), _minio_file("b.txt")
+    with patch.object(repo, "_preload_config", return_value=signer):
+        urls = await repo.get_signed_urls(
+            [
+                (a, BlobSignedUrlType.DOWNLOAD),
+                (b, BlobSignedUrlType.UPLOAD),
+                (a, BlobSignedUrlType.DOWNLOAD),
+            ]
+        )
+
+    assert sorted(signer.signed) == [
+        ("a.txt", BlobSignedUrlType.DOWNLOAD),
+        ("b.txt", BlobSignedUrlType.UPLOAD),
+    ]
+    assert urls[0] == urls[2]
+    assert "/a.txt/" in str(urls[0])
+    assert "/b.txt/" in str(urls[1])
+
+
+def test_signed_url_cache_disabled_when_no_time_left_to_cache():
+    cache = SignedUrlCache(
+        enabled=True, max_entries=16, expiry_seconds=600, min_remaining_seconds=600
+    )
+    key = cache.key(_minio_file("a.txt"), BlobSignedUrlType.DOWNLOAD, None)
+    cache.put(key, HttpUrl("http://signed/a"))
+
+    assert not cache.enabled
+    assert cache.get(key) is None
+
+
 class _CloseRecordingClient(GenericBlobStorageClient):
     """Test double tracking aclose() calls; raises on demand."""
 
@@ -557,3 +821,256 @@ async def test_azure_blob_client_aclose_no_credential_when_using_account_key():
     default_credential_cls.assert_not_called()
     fake_service_client.close.assert_awaited_once()
     assert client._aio_credential is None  # noqa: SLF001
+
+
+def _minio_client(part_size: int = 5 * 1024 * 1024):
+    config = MinioConfig(
+        host="minio",
+        access_key="a",
+        secret_key="s",
+        containers={c: "test" for c in BlobContainer},
+        upload_part_size=part_size,
+    )
+    with patch("app.persistence.blob.clients.minio.Minio"):
+        return MinioBlobStorageClient(config, presigned_url_expiry_seconds=60)
+
+
+def _read_parts(uploaded: dict, part_size: int):
+    """Stand in for Minio.put_object, reading the body a part at a time."""
+
+    def put_object(**kwargs):
+        uploaded["kwargs"] = kwargs
+        uploaded["reads"] = []
+        data = kwargs["data"]
+        body = b""
+        while part := data.read(part_size + 1):
+            uploaded["reads"].append(len(part))
+            body += part
+        uploaded["body"] = body
+
+    return put_object
+
+
+@pytest.mark.asyncio
+async def test_minio_upload_streams_filestream_in_parts():
+    client = _minio_client()
+    part_size = client.upload_part_size
+    uploaded: dict = {}
+    client.client.put_object.side_effect = _read_parts(uploaded, part_size)
+    produced = []
+
+    async def gen():
+        for i in range(12):
+            produced.append(i)
+            yield b"x" * (1024 * 1024)
+
+    file = BlobStorageFile(
+        location=BlobStorageLocation.MINIO,
+        container="c",
+        path="p",
+        filename="f.jsonl",
+    )
+    await client.upload_file(FileStream(generator=gen()), file)
+
+    assert uploaded["kwargs"]["length"] == -1
+    assert uploaded["kwargs"]["part_size"] == part_size
+    assert uploaded["kwargs"]["num_parallel_uploads"] == 1
+    assert uploaded["kwargs"]["object_name"] == "p/f.jsonl"
+    assert uploaded["body"] == b"x" * (12 * 1024 * 1024)
+    assert max(uploaded["reads"]) <= part_size + 1
+    assert produced == list(range(12))
+
+
+@pytest.mark.asyncio
+async def test_minio_upload_propagates_stream_errors():
+    client = _minio_client()
+    client.client.put_object.side_effect = _read_parts({}, client.upload_part_size)
+
+    async def gen():
+        yield b"one"
+        msg = "producer failed"
+        raise RuntimeError(msg)
+
+    file = BlobStorageFile(
+        location=BlobStorageLocation.MINIO, container="c", path="p", filename="f"
+    )
+    with pytest.raises(RuntimeError, match="producer failed"):
+        await client.upload_file(gen(), file)
+
+
+@pytest.mark.asyncio
+async def test_minio_commit_blocks_streams_blocks_then_removes_them():
+    client = _minio_client()
+    uploaded: dict = {}
+    client.client.put_object.side_effect = _read_parts(
+        uploaded, client.upload_part_size
+    )
+    responses = {}
+
+    def get_object(bucket_name, object_name):  # noqa: ARG001
+        response = MagicMock()
+        response.stream.return_value = iter([object_name[-1:].encode(), b"\n"])
+        responses[object_name] = response
+        return response
+
+    client.client.get_object.side_effect = get_object
+    file = BlobStorageFile(
+        location=BlobStorageLocation.MINIO, container="c", path="p", filename="f"
+    )
+
+    await client.commit_blocks(file, 3)
+
+    assert uploaded["body"] == b"0\n1\n2\n"
+    assert uploaded["kwargs"]["object_name"] == "p/f"
+    for response in responses.values():
+        response.release_conn.assert_called_once()
+    assert [
+        call.kwargs["object_name"]
+        for call in client.client.remove_object.call_args_list
+    ] == [f"p/f.blocks/{i:010d}" for i in range(3)]
+
+
+class _FakeAzureBlobClient:
+    """Records staged blocks and commits, failing blocks on demand."""
+
+    blob_name = "p/f"
+
+    def __init__(self, failures: dict[str, list[Exception]] | None = None) -> None:
+        self.failures = failures or {}
+        self.staged: dict[str, bytes] = {}
+        self.stage_calls: list[str] = []
+        self.committed: list[str] | None = None
+        self.uploaded: bytes | None = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def stage_block(self, block_id, data):
+        self.stage_calls.append(block_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            if self.failures.get(block_id):
+                raise self.failures[block_id].pop(0)
+            self.staged[block_id] = data
+        finally:
+            self.in_flight -= 1
+
+    async def commit_block_list(self, blocks, content_settings):
+        self.committed = [block.id for block in blocks]
+
+    async def upload_blob(self, data, overwrite, content_settings):
+        self.uploaded = data
+
+
+def _azure_client(blob_client: _FakeAzureBlobClient, **config):
+    service_client = MagicMock()
+    service_client.get_blob_client.return_value = blob_client
+    with patch(
+        "app.persistence.blob.clients.azure.BlobServiceClient",
+        return_value=service_client,
+    ):
+        return AzureBlobStorageClient(
+            AzureBlobConfig(
+                storage_account_name="acct",
+                credential="account-key",
+                containers={c: "test" for c in BlobContainer},
+                **config,
+            ),
+            presigned_url_expiry_seconds=60,
+        )
+
+
+_AZURE_FILE = BlobStorageFile(
+    location=BlobStorageLocation.AZURE, container="c", path="p", filename="f"
+)
+
+
+@pytest.mark.asyncio
+async def test_azure_blocks_regroups_chunks():
+    blocks = [
+        block
+        async for block in azure_blob._blocks(  # noqa: SLF001
+            _chunks(b"abc", b"defgh", b"i"), 4
+        )
+    ]
+    assert blocks == [b"abcd", b"efgh", b"i"]
+
+
+@pytest.mark.asyncio
+async def test_azure_upload_stages_blocks_concurrently():
+    block_size = 64 * 1024
+    blob_client = _FakeAzureBlobClient()
+    client = _azure_client(
+        blob_client, upload_block_size=block_size, upload_max_concurrency=3
+    )
+    content = bytes(range(256)) * (block_size * 10 // 256 + 1)
+
+    await client.upload_file(
+        _chunks(*(content[i : i + 1000] for i in range(0, len(content), 1000))),
+        _AZURE_FILE,
+    )
+
+    assert blob_client.committed == [f"{i:010d}" for i in range(11)]
+    assert b"".join(blob_client.staged[i] for i in blob_client.committed) == content
+    assert 1 < blob_client.max_in_flight <= 3
+    assert blob_client.uploaded is None
+
+
+@pytest.mark.asyncio
+async def test_azure_upload_single_block_uses_one_request():
+    blob_client = _FakeAzureBlobClient()
+    client = _azure_client(blob_client)
+
+    await client.upload_file(FileStream(generator=_chunks(b"one", b"two")), _AZURE_FILE)
+
+    assert blob_client.uploaded == b"onetwo"
+    assert blob_client.stage_calls == []
+    assert blob_client.committed is None
+
+
+@pytest.mark.asyncio
+async def test_azure_upload_restages_only_the_failed_block():
+    blob_client = _FakeAzureBlobClient(
+        failures={f"{1:010d}": [ServiceResponseError("connection reset")]}
+    )
+    client = _azure_client(blob_client, upload_block_size=64 * 1024)
+    content = b"x" * (64 * 1024 * 3)
+
+    with patch.object(azure_blob, "_BLOCK_RETRY_WAIT", tenacity.wait_none()):
+        await client.upload_file(_chunks(content), _AZURE_FILE)
+
+    assert sorted(blob_client.stage_calls) == [
+        f"{0:010d}",
+        f"{1:010d}",
+        f"{1:010d}",
+        f"{2:010d}",
+    ]
+    assert blob_client.committed == [f"{i:010d}" for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_azure_upload_fails_without_commit_on_permanent_error():
+    blob_client = _FakeAzureBlobClient(
+        failures={f"{0:010d}": [HttpResponseError("forbidden")]}
+    )
+    client = _azure_client(blob_client, upload_block_size=64 * 1024)
+
+    with pytest.raises(AzureBlobStorageError, match="forbidden"):
+        await client.upload_file(_chunks(b"x" * (64 * 1024 * 2)), _AZURE_FILE)
+
+    assert blob_client.stage_calls.count(f"{0:010d}") == 1
+    assert blob_client.committed is None
+
+
+@pytest.mark.asyncio
+async def test_azure_delete_ignores_missing_blob():
+    blob_client = _FakeAzureBlobClient()
+    blob_client.delete_blob = AsyncMock(side_effect=ResourceNotFoundError("gone"))
+    client = _azure_client(blob_client)
+
+    await client.delete_file(_AZURE_FILE)
+
+    blob_client.delete_blob.side_effect = HttpResponseError("boom")
+    with pytest.raises(AzureBlobStorageError, match="Failed to delete file"):
+        await client.delete_file(_AZURE_FILE)
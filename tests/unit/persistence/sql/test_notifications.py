@@ -0,0 +1,45 @@
+"""Unit tests for Postgres notifications."""
+
+from unittest.mock import AsyncMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.persistence.sql.notifications import NotificationListener, notify
+
+
+def test_subscribe_wakes_only_matching_payloads() -> None:
+    listener = NotificationListener("channel")
+
+    with (
+        listener.subscribe("a") as first,
+        listener.subscribe("a") as second,
+        listener.subscribe("b") as other,
+    ):
+        listener._on_notification(None, 0, "channel", "a")  # noqa: SLF001
+
+        assert first.is_set()
+        assert second.is_set()
+        assert not other.is_set()
+
+    # Unsubscribing leaves nothing behind to notify.
+    assert not listener._waiters  # noqa: SLF001
+
+
+async def test_notify_sends_every_payload_in_one_statement() -> None:
+    session = AsyncMock(spec=AsyncSession)
+
+    await notify(session, "channel", {"a", "b"})
+
+    session.execute.assert_awaited_once()
+    compiled = session.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+    assert "pg_notify" in str(compiled)
+    assert sorted(compiled.params["payloads"]) == ["a", "b"]
+
+
+async def test_notify_skips_empty_payloads() -> None:
+    session = AsyncMock(spec=AsyncSession)
+
+    await notify(session, "channel", set())
+
+    session.execute.assert_not_awaited()
@@ -104,6 +104,29 @@ async def test_prefetch_lookahead_is_bounded_at_two():
     assert max(lookaheads) == 2
 
 
+@pytest.mark.asyncio
+async def test_prefetch_lookahead_is_bounded_by_depth():
+    """A deeper queue lets the source run ``depth + 1`` items ahead, and no further."""
+    produced: list[int] = []
+    seen: list[int] = []
+    lookaheads: list[int] = []
+
+    async for item in prefetch(_slow_source(8, 0.001, produced), depth=3):
+        await asyncio.sleep(0.01)
+        seen.append(item)
+        lookaheads.append(len(produced) - len(seen))
+
+    assert seen == [0, 1, 2, 3, 4, 5, 6, 7]
+    assert max(lookaheads) == 4
+
+
+@pytest.mark.asyncio
+async def test_prefetch_rejects_non_positive_depth():
+    """An unbounded queue would defeat the point, so depth must be positive."""
+    with pytest.raises(ValueError, match="depth"):
+        await anext(prefetch(_slow_source(1, 0), depth=0))
+
+
 @pytest.mark.asyncio
 async def test_prefetch_propagates_cancellation_of_the_consumer():
     consuming = asyncio.Event()